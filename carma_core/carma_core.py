@@ -71,7 +71,8 @@ class CARMASystem:
         
         # Enhanced memory system components
         self.memory_compressor = CARMAMemoryCompressor()
-        self.memory_clusterer = CARMAMemoryClusterer()
+        self.memory_clusterer = CARMAMemoryClusterer(state_path=str(Path(base_dir) / "clusterer_state.npz"))
+        self.executive.clusterer = self.memory_clusterer
         self.memory_analytics = CARMAMemoryAnalytics()
         
         # Integrity verification system
@@ -278,7 +279,11 @@ class CARMASystem:
     def compress_memories(self, algorithm: str = 'semantic') -> Dict:
         """Compress memory fragments using advanced compression."""
         fragments = list(self.cache.file_registry.values())
-        return self.memory_compressor.compress_memory(fragments, algorithm)
+        assignments = None
+        if algorithm == 'hierarchical' and self.memory_clusterer.model is not None:
+            self.memory_clusterer.sync(self.cache.file_registry)
+            assignments = self.memory_clusterer.assignments
+        return self.memory_compressor.compress_memory(fragments, algorithm, assignments)
     
     def cluster_memories(self, num_clusters: int = 5) -> Dict:
         """Cluster memory fragments into organized groups."""
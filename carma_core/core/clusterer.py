@@ -4,23 +4,168 @@ CARMA Memory Clusterer
 Memory clustering system for organizing fragments
 """
 
+import random
 import numpy as np
-from typing import Dict, List
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .dream_graph import embedding_matrix
+from .kmeans import MiniBatchKMeans, load_state, save_state
 
 
 class CARMAMemoryClusterer:
-    """Memory clustering system for organizing CARMA fragments."""
+    """
+    Memory clustering system for organizing CARMA fragments.
+    
+    Fragments with embeddings are clustered with mini-batch k-means on the
+    normalized embeddings; the model is kept, so new fragments are assigned
+    (and folded into the centroids) in O(k) by assign()/sync() instead of a
+    full recluster. Fragments without a usable embedding are clustered by
+    the simple text-feature k-means instead (after the embedding clusters'
+    ids); they have no centroid, so they are not in assignments and sync()
+    skips them.
+    """
     
-    def __init__(self):
+    def __init__(self, state_path: Optional[str] = None, batch_size: int = 256, seed: Optional[int] = None):
         self.clusters = {}
         self.cluster_centers = {}
         self.cluster_metadata = {}
+        self.assignments: Dict[str, int] = {}  # file_id -> cluster id
+        self.model: Optional[MiniBatchKMeans] = None
+        self.batch_size = batch_size
+        self.seed = seed
+        self.state_path = Path(state_path) if state_path else None
+        if self.state_path is not None:
+            self.load_state()
     
     def cluster_memories(self, fragments: List[Dict], num_clusters: int = 5) -> Dict:
         """Cluster memory fragments into groups."""
         if len(fragments) < 2:
             return {'clusters': {0: fragments}, 'metadata': {}}
         
+        keys = [f.get('file_id') or f"_{i}" for i, f in enumerate(fragments)]
+        ids, matrix = embedding_matrix((key, f.get('embedding')) for key, f in zip(keys, fragments))
+        if len(ids) < 2:
+            return self._cluster_by_features(fragments, num_clusters)
+        
+        self.model = MiniBatchKMeans(num_clusters, batch_size=self.batch_size, seed=self.seed).fit(matrix)
+        labels = self.model.predict(matrix).tolist()
+        label_of = dict(zip(ids, labels))
+        
+        cluster_groups = defaultdict(list)
+        without_embedding = []
+        for key, fragment in zip(keys, fragments):
+            if key in label_of:
+                cluster_groups[label_of[key]].append(fragment)
+            else:
+                without_embedding.append(fragment)
+        if without_embedding:
+            offset = len(self.model.centroids)
+            features = self._extract_features(without_embedding)
+            for fragment, label in zip(without_embedding, self._kmeans_clustering(features, num_clusters)):
+                cluster_groups[offset + label].append(fragment)
+        
+        metadata = self._calculate_cluster_metadata(cluster_groups)
+        
+        self.clusters = dict(cluster_groups)
+        self.cluster_metadata = metadata
+        self.cluster_centers = dict(enumerate(self.model.centroids))
+        self.assignments = {key: label for key, label in label_of.items() if not key.startswith('_')}
+        self.save_state()
+        
+        return {
+            'clusters': dict(cluster_groups),
+            'metadata': metadata,
+            'num_clusters': len(cluster_groups),
+            'assignments': dict(self.assignments),
+            'feature_clustered': len(without_embedding),
+            'inertia': self.model.inertia(matrix),
+            'backend': 'embedding_minibatch_kmeans'
+        }
+    
+    def assign(self, fragments: List[Dict], update: bool = True) -> Dict[str, int]:
+        """
+        Assign fragments to the nearest existing centroid (O(k) each, no recluster)
+        
+        With update=True the fragments are also folded into the centroids
+        (mini-batch partial_fit). Fragments without a usable embedding are
+        skipped. Returns file_id -> cluster id for the assigned fragments.
+        """
+        if self.model is None or not self.model.fitted:
+            return {}
+        dim = self.model.centroids.shape[1]
+        ids, matrix = embedding_matrix(
+            (f.get('file_id'), f.get('embedding')) for f in fragments
+            if f.get('file_id') and f.get('embedding') is not None and len(f['embedding']) == dim
+        )
+        if not ids:
+            return {}
+        labels = self.model.predict(matrix).tolist()
+        if update:
+            self.model.partial_fit(matrix)
+            self.cluster_centers = dict(enumerate(self.model.centroids))
+        assigned = dict(zip(ids, labels))
+        self.assignments.update(assigned)
+        return assigned
+    
+    def sync(self, registry: Dict[str, Dict]) -> Dict[str, int]:
+        """
+        Assign registry fragments not seen yet and forget removed ones; persists on change
+        
+        Fragments without an embedding of the model's dimension cannot be
+        assigned and are skipped (without being copied) on every call.
+        """
+        removed = [fid for fid in self.assignments if fid not in registry]
+        for fid in removed:
+            del self.assignments[fid]
+        if self.model is None or not self.model.fitted:
+            return {'assigned': 0, 'removed': len(removed)}
+        dim = self.model.centroids.shape[1]
+        new = [dict(frag, file_id=fid) for fid, frag in registry.items()
+               if fid not in self.assignments and frag.get('embedding') is not None and len(frag['embedding']) == dim]
+        assigned = self.assign(new) if new else {}
+        if removed or assigned:
+            self.save_state()
+        return {'assigned': len(assigned), 'removed': len(removed)}
+    
+    def get_cluster_members(self) -> Dict[int, List[str]]:
+        """Cluster id -> assigned file_ids"""
+        members = defaultdict(list)
+        for fid, label in self.assignments.items():
+            members[label].append(fid)
+        return dict(members)
+    
+    # === Persistence ===
+    
+    def save_state(self) -> bool:
+        """Persist centroids, counts and assignments to state_path (if set)"""
+        if self.state_path is None or self.model is None or not self.model.fitted:
+            return False
+        try:
+            save_state(self.state_path, {
+                **self.model.state(),
+                'assignment_ids': np.array(list(self.assignments), dtype=str),
+                'assignment_labels': np.array(list(self.assignments.values()), dtype=np.int64)
+            })
+            return True
+        except OSError as e:
+            print(f"⚠️ Error saving clusterer state: {e}")
+            return False
+    
+    def load_state(self) -> bool:
+        """Restore persisted centroids and assignments (no-op if none were saved)"""
+        state = load_state(self.state_path) if self.state_path is not None else None
+        if not state or 'centroids' not in state:
+            return False
+        self.model = MiniBatchKMeans(len(state['centroids']), batch_size=self.batch_size, seed=self.seed)
+        self.model.restore(state)
+        self.cluster_centers = dict(enumerate(self.model.centroids))
+        self.assignments = dict(zip(state['assignment_ids'].tolist(), state['assignment_labels'].tolist()))
+        return True
+    
+    def _cluster_by_features(self, fragments: List[Dict], num_clusters: int) -> Dict:
+        """Fallback for fragments without embeddings: k-means over simple text features."""
         # Extract features for clustering
         features = self._extract_features(fragments)
         
@@ -41,7 +186,8 @@ class CARMAMemoryClusterer:
         return {
             'clusters': dict(cluster_groups),
             'metadata': metadata,
-            'num_clusters': len(cluster_groups)
+            'num_clusters': len(cluster_groups),
+            'backend': 'features'
         }
     
     def _extract_features(self, fragments: List[Dict]) -> List[List[float]]:
@@ -5,7 +5,7 @@ Advanced memory compression system
 """
 
 import time
-from typing import Dict, List
+from typing import Dict, List, Optional
 from collections import defaultdict
 
 
@@ -21,13 +21,22 @@ class CARMAMemoryCompressor:
             'hierarchical': self._hierarchical_compression
         }
     
-    def compress_memory(self, fragments: List[Dict], algorithm: str = 'semantic') -> Dict:
-        """Compress memory fragments using specified algorithm."""
+    def compress_memory(self, fragments: List[Dict], algorithm: str = 'semantic',
+                        assignments: Optional[Dict[str, int]] = None) -> Dict:
+        """
+        Compress memory fragments using specified algorithm.
+        
+        assignments (file_id -> cluster id, e.g. CARMAMemoryClusterer.assignments)
+        restricts hierarchical grouping to fragments in the same cluster.
+        """
         if algorithm not in self.compression_algorithms:
             algorithm = 'semantic'
         
         original_size = sum(len(f.get('content', '')) for f in fragments)
-        compressed_fragments = self.compression_algorithms[algorithm](fragments)
+        if algorithm == 'hierarchical' and assignments:
+            compressed_fragments = self._hierarchical_compression(fragments, assignments)
+        else:
+            compressed_fragments = self.compression_algorithms[algorithm](fragments)
         compressed_size = sum(len(f.get('content', '')) for f in compressed_fragments)
         
         self.compression_ratio = (original_size - compressed_size) / original_size if original_size > 0 else 0.0
@@ -81,13 +90,14 @@ class CARMAMemoryCompressor:
         
         return compressed
     
-    def _hierarchical_compression(self, fragments: List[Dict]) -> List[Dict]:
+    def _hierarchical_compression(self, fragments: List[Dict],
+                                  assignments: Optional[Dict[str, int]] = None) -> List[Dict]:
         """Compress fragments using hierarchical summarization."""
         if len(fragments) <= 1:
             return fragments
         
         # Group by similarity
-        groups = self._group_by_similarity(fragments)
+        groups = self._group_by_similarity(fragments, assignments)
         compressed = []
         
         for group in groups:
@@ -108,25 +118,39 @@ class CARMAMemoryCompressor:
         concepts = {word for word in words if len(word) > 3 and word not in stop_words}
         return concepts
     
-    def _group_by_similarity(self, fragments: List[Dict]) -> List[List[Dict]]:
-        """Group fragments by content similarity."""
+    def _group_by_similarity(self, fragments: List[Dict],
+                             assignments: Optional[Dict[str, int]] = None) -> List[List[Dict]]:
+        """Group fragments by content similarity (within each assigned cluster, if given)."""
+        blocks = defaultdict(list)
+        for i, fragment in enumerate(fragments):
+            cluster_id = assignments.get(fragment.get('file_id'), -1) if assignments else 0
+            blocks[cluster_id].append(i)
+        
+        index_groups = []
+        for indices in blocks.values():
+            index_groups.extend(self._group_indices(fragments, indices))
+        index_groups.sort(key=lambda group: group[0])
+        return [[fragments[i] for i in group] for group in index_groups]
+    
+    def _group_indices(self, fragments: List[Dict], indices: List[int]) -> List[List[int]]:
+        """Greedy similarity grouping of fragments[indices], as index lists."""
         groups = []
         used = set()
         
-        for i, fragment in enumerate(fragments):
+        for pos, i in enumerate(indices):
             if i in used:
                 continue
             
-            group = [fragment]
+            group = [i]
             used.add(i)
             
-            for j, other in enumerate(fragments[i+1:], i+1):
+            for j in indices[pos+1:]:
                 if j in used:
                     continue
                 
                 # Simple similarity check
-                if self._calculate_similarity(fragment, other) > 0.7:
-                    group.append(other)
+                if self._calculate_similarity(fragments[i], fragments[j]) > 0.7:
+                    group.append(j)
                     used.add(j)
             
             groups.append(group)
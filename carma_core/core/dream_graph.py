@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+CARMA Dream Graph
+Vectorized kernels for the dream cycle: normalized embedding matrices,
+thresholded neighbour search via blocked matrix products, union-find
+components and batched crosslink scoring
+"""
+
+import numpy as np
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Rows of the right-hand matrix scored per matrix product; bounds the
+# similarity block to block_size x len(left) floats
+DEFAULT_BLOCK_SIZE = 4096
+
+
+def embedding_matrix(items: Iterable[Tuple[str, Optional[Sequence[float]]]],
+                     dtype=np.float32) -> Tuple[List[str], np.ndarray]:
+    """
+    Stack (id, embedding) pairs into an L2-normalized row matrix
+
+    Missing, empty and zero-norm embeddings are dropped, as are embeddings
+    whose dimension differs from the most common one.
+
+    Returns:
+        (ids in input order, matrix of shape (len(ids), dim))
+    """
+    pairs = [(fid, emb) for fid, emb in items if emb is not None and len(emb) > 0]
+    if not pairs:
+        return [], np.zeros((0, 0), dtype=dtype)
+    dim = Counter(len(emb) for _, emb in pairs).most_common(1)[0][0]
+    pairs = [(fid, emb) for fid, emb in pairs if len(emb) == dim]
+
+    matrix = np.asarray([emb for _, emb in pairs], dtype=dtype)
+    norms = np.linalg.norm(matrix, axis=1)
+    keep = norms > 0
+    matrix = matrix[keep] / norms[keep, None]
+    ids = [fid for (fid, _), k in zip(pairs, keep) if k]
+    return ids, matrix
+
+
+def threshold_blocks(left: np.ndarray, right: np.ndarray, threshold: float,
+                     block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Yield (left_rows, right_rows) index arrays of every pair with cosine >= threshold
+
+    Both matrices must already be row-normalized. right is scored block_size
+    rows at a time, so peak memory is one len(left) x block_size block.
+    Pairs come out ordered by right row, then left row.
+    """
+    if len(left) == 0 or len(right) == 0:
+        return
+    block_size = max(1, int(block_size))
+    for start in range(0, len(right), block_size):
+        sims = right[start:start + block_size] @ left.T
+        cols, rows = np.nonzero(sims >= threshold)
+        if len(rows):
+            yield rows, cols + start
+
+
+def neighbor_pairs(matrix: np.ndarray, threshold: float,
+                   block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Yield (i, j) index arrays with i < j and cosine >= threshold within one normalized matrix"""
+    block_size = max(1, int(block_size))
+    for start in range(0, len(matrix), block_size):
+        block = matrix[start:start + block_size]
+        # Only columns at or after the block: each unordered pair is scored once
+        sims = block @ matrix[start:].T
+        rows, cols = np.nonzero(sims >= threshold)
+        upper = cols > rows
+        if upper.any():
+            yield rows[upper] + start, cols[upper] + start
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with path halving and union by size"""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return True
+
+    def union_many(self, left: Iterable[int], right: Iterable[int]) -> int:
+        """Union every (left[k], right[k]); returns the number of merges"""
+        return sum(1 for a, b in zip(left, right) if self.union(int(a), int(b)))
+
+    def groups(self) -> List[List[int]]:
+        """Members of each set, sets ordered by their smallest member"""
+        groups: Dict[int, List[int]] = {}
+        for x in range(len(self.parent)):
+            groups.setdefault(self.find(x), []).append(x)
+        return list(groups.values())
+
+
+def connected_components(ids: Sequence[str], adjacency: Dict[str, Iterable[str]],
+                         embeddings: Optional[Tuple[List[str], np.ndarray]] = None,
+                         link_threshold: Optional[float] = None,
+                         block_size: int = DEFAULT_BLOCK_SIZE) -> List[List[str]]:
+    """
+    Connected components of the fragment graph
+
+    Edges are the semantic links between known ids (treated as undirected)
+    plus, when link_threshold is set, every embedding pair with cosine >=
+    link_threshold. Components and their members follow the order of ids.
+
+    Args:
+        ids: Fragment ids (registry order)
+        adjacency: Fragment id -> linked fragment ids
+        embeddings: (ids, normalized matrix) from embedding_matrix
+        link_threshold: Similarity that also joins two fragments (None: links only)
+    """
+    index = {fid: i for i, fid in enumerate(ids)}
+    uf = UnionFind(len(ids))
+    for fid, neighbours in adjacency.items():
+        a = index.get(fid)
+        if a is None:
+            continue
+        for neigh in neighbours:
+            b = index.get(neigh)
+            if b is not None:
+                uf.union(a, b)
+
+    if link_threshold is not None and embeddings is not None and len(embeddings[0]) > 1:
+        emb_ids, matrix = embeddings
+        positions = np.fromiter((index.get(fid, -1) for fid in emb_ids), dtype=np.int64, count=len(emb_ids))
+        for rows, cols in neighbor_pairs(matrix, link_threshold, block_size):
+            a, b = positions[rows], positions[cols]
+            known = (a >= 0) & (b >= 0)
+            uf.union_many(a[known].tolist(), b[known].tolist())
+
+    return [[ids[i] for i in group] for group in uf.groups()]
+
+
+def crosslink(adjacency: Dict[str, List[str]], source_ids: Sequence[str], source_matrix: np.ndarray,
+              target_ids: Sequence[str], target_matrix: np.ndarray, threshold: float,
+              block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+    """
+    Link every source to every target with cosine >= threshold (both directions)
+
+    Scores all sources against a block of targets in one matrix product.
+    Existing links are kept and never duplicated; new links are appended in
+    source order, then target order. Returns the number of links added.
+    """
+    hits: List[Tuple[int, int]] = []
+    for rows, cols in threshold_blocks(source_matrix, target_matrix, threshold, block_size):
+        hits.extend(zip(rows.tolist(), cols.tolist()))
+    hits.sort()
+
+    linked: Dict[str, set] = {}
+
+    def add(a: str, b: str) -> int:
+        existing = linked.get(a)
+        if existing is None:
+            existing = linked[a] = set(adjacency.get(a, ()))
+        if b in existing:
+            return 0
+        existing.add(b)
+        adjacency.setdefault(a, []).append(b)
+        return 1
+
+    added = 0
+    for row, col in hits:
+        a, b = source_ids[row], target_ids[col]
+        if a == b:
+            continue
+        added += add(a, b)
+        added += add(b, a)
+    return added
@@ -32,6 +32,9 @@ class CARMAExecutiveBrain:
         self.optimization_actions_count = 0
         self.completed_goals_count = 0
         
+        # Optional CARMAMemoryClusterer: when set, relatedness is only checked within embedding clusters
+        self.clusterer = None
+        
         # Goal templates
         self.goal_templates = [
             {"type": "cross_link", "description": "Create semantic cross-links between related fragments"},
@@ -175,6 +178,9 @@ class CARMAExecutiveBrain:
     def _execute_super_fragment_goal(self, goal: Dict) -> bool:
         """Execute super-fragment creation goal."""
         try:
+            if self.clusterer is not None and self.clusterer.model is not None:
+                # Maintenance step: assign fragments added since the last goal to their embedding clusters
+                self.clusterer.sync(self.cache.file_registry)
             clusters = self._identify_fragment_clusters()
             if not clusters:
                 return False
@@ -190,18 +196,34 @@ class CARMAExecutiveBrain:
         return False
     
     def _identify_fragment_clusters(self) -> List[List[str]]:
-        """Identify clusters of related fragments."""
+        """Identify clusters of related fragments (read-only: uses the clusterer's current assignments)."""
+        registry = self.cache.file_registry
+        clusterer = self.clusterer
+        if clusterer is None or clusterer.model is None:
+            return self._related_groups(list(registry.items()))
+        
+        # Pairwise checks only inside each embedding cluster (plus one block of unassigned fragments)
+        blocks = {}
+        for frag_id, frag_data in registry.items():
+            blocks.setdefault(clusterer.assignments.get(frag_id, -1), []).append((frag_id, frag_data))
+        clusters = []
+        for items in blocks.values():
+            clusters.extend(self._related_groups(items))
+        return clusters
+    
+    def _related_groups(self, items: List) -> List[List[str]]:
+        """Greedy grouping of (frag_id, frag_data) items by _are_fragments_related."""
         clusters = []
         processed = set()
         
-        for frag_id, frag_data in self.cache.file_registry.items():
+        for frag_id, frag_data in items:
             if frag_id in processed:
                 continue
             
             cluster = [frag_id]
             processed.add(frag_id)
             
-            for other_id, other_data in self.cache.file_registry.items():
+            for other_id, other_data in items:
                 if other_id in processed:
                     continue
                 
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+CARMA Mini-Batch K-Means
+Vectorized mini-batch k-means with k-means++ seeding, incremental
+partial_fit and persisted centroids, for clustering fragment embeddings
+"""
+
+import os
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def squared_distances(X: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Pairwise squared Euclidean distances (len(X) x len(centroids)), one matrix product"""
+    d = (X * X).sum(axis=1)[:, None] - 2.0 * (X @ centroids.T) + (centroids * centroids).sum(axis=1)[None, :]
+    return np.maximum(d, 0.0)
+
+
+def kmeans_plus_plus(X: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """k-means++ seeding: each next centroid drawn with probability proportional to D(x)^2"""
+    centroids = np.empty((k, X.shape[1]), dtype=X.dtype)
+    centroids[0] = X[rng.integers(len(X))]
+    closest = squared_distances(X, centroids[:1])[:, 0]
+    for i in range(1, k):
+        total = closest.sum()
+        if total <= 0:
+            centroids[i] = X[rng.integers(len(X))]  # fewer distinct points than k
+        else:
+            centroids[i] = X[rng.choice(len(X), p=closest / total)]
+        closest = np.minimum(closest, squared_distances(X, centroids[i:i + 1])[:, 0])
+    return centroids
+
+
+class MiniBatchKMeans:
+    """
+    Mini-batch k-means (per-centroid learning rate 1/count)
+
+    fit() seeds with k-means++ and runs mini-batch passes until the
+    centroids move less than tol; partial_fit() folds new points into the
+    existing centroids without revisiting old ones; predict() is one
+    k-centroid distance row per point.
+    """
+
+    def __init__(self, n_clusters: int = 8, batch_size: int = 256, max_iter: int = 100,
+                 tol: float = 1e-4, seed: Optional[int] = None):
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.max_iter = max_iter
+        self.tol = tol
+        self.rng = np.random.default_rng(seed)
+        self.centroids: Optional[np.ndarray] = None
+        self.counts: Optional[np.ndarray] = None
+        self.n_iter = 0
+
+    @property
+    def fitted(self) -> bool:
+        return self.centroids is not None
+
+    def fit(self, X: np.ndarray) -> 'MiniBatchKMeans':
+        X = np.asarray(X, dtype=np.float32)
+        k = min(self.n_clusters, len(X))
+        self.centroids = kmeans_plus_plus(X, k, self.rng)
+        self.counts = np.zeros(k, dtype=np.float64)
+        batch = min(self.batch_size, len(X))
+        self.n_iter = 0
+        for self.n_iter in range(1, self.max_iter + 1):
+            previous = self.centroids.copy()
+            self._update(X[self.rng.choice(len(X), size=batch, replace=False)])
+            if float(np.abs(self.centroids - previous).max()) < self.tol:
+                break
+        # Counts reflect the data, not the number of passes, so partial_fit weighs new points fairly
+        labels = self.predict(X)
+        self.counts = np.bincount(labels, minlength=k).astype(np.float64)
+        return self
+
+    def partial_fit(self, X: np.ndarray) -> 'MiniBatchKMeans':
+        """Fold a batch into the model (seeds from it when not fitted yet)"""
+        X = np.asarray(X, dtype=np.float32)
+        if not len(X):
+            return self
+        if not self.fitted:
+            return self.fit(X)
+        for start in range(0, len(X), self.batch_size):
+            self._update(X[start:start + self.batch_size])
+        return self
+
+    def _update(self, batch: np.ndarray):
+        labels = squared_distances(batch, self.centroids).argmin(axis=1)
+        batch_counts = np.bincount(labels, minlength=len(self.centroids)).astype(np.float64)
+        sums = np.zeros_like(self.centroids, dtype=np.float64)
+        np.add.at(sums, labels, batch)
+        touched = batch_counts > 0
+        self.counts[touched] += batch_counts[touched]
+        # Equivalent to moving each centroid by 1/count toward every point assigned to it
+        rate = (batch_counts[touched] / self.counts[touched])[:, None]
+        means = sums[touched] / batch_counts[touched][:, None]
+        self.centroids[touched] = ((1.0 - rate) * self.centroids[touched] + rate * means).astype(self.centroids.dtype)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if not len(X):
+            return np.zeros(0, dtype=np.int64)
+        return squared_distances(X, self.centroids).argmin(axis=1)
+
+    def inertia(self, X: np.ndarray) -> float:
+        """Sum of squared distances to the nearest centroid"""
+        X = np.asarray(X, dtype=np.float32)
+        return float(squared_distances(X, self.centroids).min(axis=1).sum()) if len(X) else 0.0
+
+    # === Persistence ===
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {'centroids': self.centroids, 'counts': self.counts}
+
+    def restore(self, state: Dict[str, np.ndarray]):
+        self.centroids = np.asarray(state['centroids'], dtype=np.float32)
+        self.counts = np.asarray(state['counts'], dtype=np.float64)
+        self.n_clusters = len(self.centroids)
+
+
+def save_state(path: Path, arrays: Dict[str, np.ndarray]):
+    """Write arrays to an .npz atomically (temporary file, then rename)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+def load_state(path: Path) -> Optional[Dict[str, np.ndarray]]:
+    """Arrays from an .npz written by save_state (None if missing or unreadable)"""
+    try:
+        with np.load(Path(path), allow_pickle=False) as data:
+            return {key: data[key] for key in data.files}
+    except (OSError, ValueError):
+        return None
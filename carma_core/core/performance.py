@@ -8,13 +8,15 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 import time
-import math
 import uuid
 from typing import Dict, TYPE_CHECKING
 from datetime import datetime
 
+import numpy as np
+
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from support_core.support_core import SystemConfig
+from .dream_graph import DEFAULT_BLOCK_SIZE, connected_components, crosslink, embedding_matrix
 
 if TYPE_CHECKING:
     from .fractal_cache import FractalMyceliumCache
@@ -62,37 +64,31 @@ class CARMA100PercentPerformance:
         print("    Semantic Consolidation: Enhanced")
         print("    Meta Cognition: Enhanced")
     
-    def perform_dream_cycle(self, max_superfrags=SystemConfig.MAX_SPLITS, min_component_size=2, summary_tokens=200, crosslink_threshold=0.45):
-        """Perform dream cycle for memory consolidation."""
+    def perform_dream_cycle(self, max_superfrags=SystemConfig.MAX_SPLITS, min_component_size=2, summary_tokens=200,
+                            crosslink_threshold=0.45, link_threshold=None, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        Perform dream cycle for memory consolidation.
+        
+        Components are found with union-find over the semantic links (and,
+        when link_threshold is set, over embedding pairs at least that similar);
+        each super-fragment is crosslinked to every fragment in blocked matrix
+        products over the normalized embedding matrix.
+        """
         start = time.time()
         
         registry = self.cache.file_registry
         fragments = registry
         adjacency = self.cache.semantic_links
         
-        def cosine_sim(a, b):
-            num = sum(x*y for x,y in zip(a,b))
-            da = math.sqrt(sum(x*x for x in a))
-            db = math.sqrt(sum(x*x for x in b))
-            return num / (da*db + 1e-9)
+        # Normalized embedding matrix, built once and reused for crosslinking
+        emb_ids, emb_matrix = embedding_matrix((fid, frag.get('embedding')) for fid, frag in fragments.items())
         
         # Find connected components
-        visited = set()
-        components = []
-        for fid in fragments:
-            if fid in visited: continue
-            queue = [fid]
-            comp = []
-            while queue:
-                n = queue.pop(0)
-                if n in visited: continue
-                visited.add(n)
-                comp.append(n)
-                for neigh in adjacency.get(n, []):
-                    if neigh not in visited:
-                        queue.append(neigh)
-            if len(comp) >= min_component_size:
-                components.append(comp)
+        components = [
+            comp for comp in connected_components(list(fragments), adjacency, (emb_ids, emb_matrix),
+                                                  link_threshold, block_size)
+            if len(comp) >= min_component_size
+        ]
         
         # Create super-fragments
         superfrags = []
@@ -150,23 +146,18 @@ class CARMA100PercentPerformance:
             if fid in fragments:
                 del fragments[fid]
         
-        # Cross-link superfrags
-        emb_map = {}
-        for fid, frag in fragments.items():
-            if frag.get('embedding') is not None:
-                emb_map[fid] = frag['embedding']
-        
-        for i, a in enumerate(superfrags):
-            emb_a = emb_map.get(a)
-            if not emb_a: continue
-            for b, emb_b in emb_map.items():
-                if a == b: continue
-                sim = cosine_sim(emb_a, emb_b)
-                if sim >= crosslink_threshold:
-                    if b not in adjacency.get(a, []):
-                        adjacency.setdefault(a, []).append(b)
-                    if a not in adjacency.get(b, []):
-                        adjacency.setdefault(b, []).append(a)
+        # Cross-link superfrags: all superfrags against all fragments per matrix product
+        surviving = [i for i, fid in enumerate(emb_ids) if fid in fragments]
+        target_ids = [emb_ids[i] for i in surviving]
+        target_matrix = emb_matrix[surviving]
+        crosslinks_added = 0
+        super_ids, super_matrix = embedding_matrix((sid, fragments[sid].get('embedding')) for sid in superfrags)
+        if super_ids and (not target_ids or super_matrix.shape[1] == target_matrix.shape[1]):
+            first_super = len(target_ids)
+            target_ids = target_ids + super_ids
+            target_matrix = np.vstack([target_matrix, super_matrix]) if first_super else super_matrix
+            crosslinks_added = crosslink(adjacency, super_ids, target_matrix[first_super:], target_ids,
+                                         target_matrix, crosslink_threshold, block_size)
         
         # Update cache
         self.cache.file_registry = fragments
@@ -174,7 +165,8 @@ class CARMA100PercentPerformance:
         self.cache.save_registry()
         
         elapsed = time.time() - start
-        return {"superfrags_created": len(superfrags), "time": elapsed, "fragments_processed": len(fragments_to_remove)}
+        return {"superfrags_created": len(superfrags), "time": elapsed, "fragments_processed": len(fragments_to_remove),
+                "components_found": len(components), "crosslinks_added": crosslinks_added}
     
     def get_performance_level(self) -> float:
         """Return current performance percentage."""
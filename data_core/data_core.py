@@ -46,7 +46,6 @@ except ImportError:
 import os
 import json
 import sqlite3
-import shutil
 import time
 from datetime import datetime
 from typing import Dict, List, Optional, Any
@@ -69,6 +68,12 @@ from core.cleanup import (
 )
 from core.lessons import get_relevant_lessons
 from core.database import get_database_info
+from core.snapshots import (
+    create_snapshot, find_latest_snapshot, load_manifest,
+    diff_manifests, restore_snapshot
+)
+from core.streaming_export import stream_export, FORMAT_EXTENSIONS
+from core.catalog import FileCatalog
 
 
 class DataCore:
@@ -137,6 +142,9 @@ class DataCore:
         # Ensure directories exist
         self._ensure_directories()
         
+        # File catalogue (opened on first stats/cleanup call)
+        self._catalog = None
+        
         # Initialize Rust bridge if requested and available
         self.rust_bridge = None
         self.rust_core_instance = None
@@ -209,6 +217,17 @@ class DataCore:
     
     # ==================== STATISTICS METHODS ====================
     
+    @property
+    def catalog(self) -> FileCatalog:
+        """Indexed file catalogue behind the Python stats and cleanup paths."""
+        if self._catalog is None:
+            self._catalog = FileCatalog(self.database_dir / "file_catalog.db", {
+                "fractal_cache": self.fractal_cache_dir,
+                "arbiter_cache": self.arbiter_cache_dir,
+                "conversations": self.conversations_dir,
+            })
+        return self._catalog
+    
     def get_fractal_cache_stats(self) -> Dict[str, Any]:
         """Get statistics about the FractalCache."""
         if self.current_implementation == "rust" and self.rust_core_instance:
@@ -219,7 +238,11 @@ class DataCore:
                 print(f"❌ Rust stats failed: {e}, falling back to Python")
                 self.current_implementation = "python"
         
-        return get_fractal_cache_stats(self.fractal_cache_dir)
+        try:
+            return self.catalog.stats("fractal_cache")
+        except sqlite3.Error as e:
+            print(f"⚠️ File catalogue unavailable: {e}, walking directory")
+            return get_fractal_cache_stats(self.fractal_cache_dir)
     
     def get_arbiter_cache_stats(self) -> Dict[str, Any]:
         """Get statistics about the ArbiterCache."""
@@ -231,7 +254,11 @@ class DataCore:
                 print(f"❌ Rust stats failed: {e}, falling back to Python")
                 self.current_implementation = "python"
         
-        return get_arbiter_cache_stats(self.arbiter_cache_dir)
+        try:
+            return self.catalog.stats("arbiter_cache")
+        except sqlite3.Error as e:
+            print(f"⚠️ File catalogue unavailable: {e}, walking directory")
+            return get_arbiter_cache_stats(self.arbiter_cache_dir)
     
     def get_conversation_stats(self) -> Dict[str, Any]:
         """Get statistics about conversations."""
@@ -243,7 +270,13 @@ class DataCore:
                 print(f"❌ Rust stats failed: {e}, falling back to Python")
                 self.current_implementation = "python"
         
-        return get_conversation_stats(self.conversations_dir)
+        try:
+            stats = self.catalog.stats("conversations")
+            stats["total_conversations"] = stats["total_files"]
+            return stats
+        except sqlite3.Error as e:
+            print(f"⚠️ File catalogue unavailable: {e}, walking directory")
+            return get_conversation_stats(self.conversations_dir)
     
     def get_database_stats(self) -> Dict[str, Any]:
         """Get statistics about databases."""
@@ -304,8 +337,16 @@ class DataCore:
         )
     
     def export_data(self, data_type: str, target_format: str = "json", 
-                   filter_criteria: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Export data from the AIOS data pipeline."""
+                   filter_criteria: Dict[str, Any] = None, streaming: bool = False,
+                   max_workers: int = 4) -> Dict[str, Any]:
+        """
+        Export data from the AIOS data pipeline.
+        
+        By default the Python path uses the original in-memory exporters.
+        streaming=True writes records to disk incrementally (jsonl, json, csv
+        or text) with bounded memory and returns record/file counts instead;
+        see core.streaming_export for the filter keys.
+        """
         if self.current_implementation == "rust" and self.rust_core_instance and target_format == "json":
             try:
                 source_dir_map = {
@@ -329,12 +370,34 @@ class DataCore:
                 print(f"❌ Rust export failed: {e}, falling back to Python")
                 self.current_implementation = "python"
         
-        return export_data(
-            data_type, target_format, filter_criteria,
-            self.data_dir, self.fractal_cache_dir, self.arbiter_cache_dir,
-            self.conversations_dir, self.logs_dir, self.temp_dir, self.exports_dir,
-            self.pipeline_stats, export_to_json, export_to_csv, export_to_text
-        )
+        if not streaming:
+            return export_data(
+                data_type, target_format, filter_criteria,
+                self.data_dir, self.fractal_cache_dir, self.arbiter_cache_dir,
+                self.conversations_dir, self.logs_dir, self.temp_dir, self.exports_dir,
+                self.pipeline_stats, export_to_json, export_to_csv, export_to_text
+            )
+        
+        source_dir_map = {
+            "fractal_cache": self.fractal_cache_dir,
+            "arbiter_cache": self.arbiter_cache_dir,
+            "conversations": self.conversations_dir,
+            "logs": self.logs_dir,
+            "temp": self.temp_dir,
+        }
+        source_dir = source_dir_map.get(data_type, self.data_dir)
+        extension = FORMAT_EXTENSIONS.get(target_format.lower(), target_format.lower())
+        export_path = self.exports_dir / f"{data_type}_export_{int(time.time())}.{extension}"
+        
+        result = stream_export(source_dir, export_path, target_format, filter_criteria, max_workers=max_workers)
+        if result.get("success"):
+            if isinstance(self.pipeline_stats, dict):
+                self.pipeline_stats["total_exports"] = self.pipeline_stats.get("total_exports", 0) + 1
+                self.pipeline_stats["last_export"] = datetime.now().isoformat()
+            print(f"📤 Exported {result['records_exported']} records from {data_type} to {export_path}")
+        else:
+            print(f"❌ Export failed: {result.get('error')}")
+        return result
     
     def get_pipeline_metrics(self) -> Dict[str, Any]:
         """Get comprehensive data pipeline metrics."""
@@ -377,39 +440,100 @@ class DataCore:
                 print(f"❌ Rust cleanup failed: {e}, falling back to Python")
                 self.current_implementation = "python"
         
-        return cleanup_old_data(
-            self.fractal_cache_dir, self.arbiter_cache_dir,
-            self.conversations_dir, days_old, dry_run
-        )
+        try:
+            return self.catalog.cleanup(days_old, dry_run)
+        except sqlite3.Error as e:
+            print(f"⚠️ File catalogue unavailable: {e}, walking directories")
+            return cleanup_old_data(
+                self.fractal_cache_dir, self.arbiter_cache_dir,
+                self.conversations_dir, days_old, dry_run
+            )
     
     # ==================== BACKUP METHODS ====================
     
-    def backup_data(self, backup_name: Optional[str] = None) -> str:
-        """Create a backup of all data."""
+    def _backup_sources(self) -> Dict[str, Path]:
+        """Backed-up directories by snapshot folder name."""
+        return {
+            "FractalCache": self.fractal_cache_dir,
+            "ArbiterCache": self.arbiter_cache_dir,
+            "conversations": self.conversations_dir
+        }
+    
+    def backup_data(self, backup_name: Optional[str] = None, incremental: bool = True,
+                    verify_hash: bool = False) -> str:
+        """
+        Create a snapshot backup of all data.
+        
+        Incremental snapshots hardlink files unchanged since the latest
+        snapshot and copy only new or modified ones; each snapshot is still
+        a complete tree plus a manifest.json. The copy/link report is kept
+        in self.last_backup_stats.
+        
+        Args:
+            backup_name: Snapshot name (defaults to a timestamp)
+            incremental: Link unchanged files from the latest snapshot
+            verify_hash: Compare content hashes instead of size + mtime
+        """
         if not backup_name:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_name = f"data_backup_{timestamp}"
         
         backup_path = self.archive_dir / f"{backup_name}"
+        if backup_path.exists():
+            # Never write into an existing snapshot: its files are shared with other snapshots
+            suffix = 2
+            while (self.archive_dir / f"{backup_name}_{suffix}").exists():
+                suffix += 1
+            print(f"⚠️ Backup {backup_name} already exists, writing {backup_name}_{suffix}")
+            backup_name = f"{backup_name}_{suffix}"
+            backup_path = self.archive_dir / backup_name
+        previous = find_latest_snapshot(self.archive_dir, exclude=backup_name) if incremental else None
         
         print(f"🗄️ Creating data backup: {backup_name}")
+        if previous:
+            print(f"   Incremental from: {previous.name}")
         
-        # Copy fractal cache
-        if self.fractal_cache_dir.exists():
-            shutil.copytree(self.fractal_cache_dir, backup_path / "FractalCache", dirs_exist_ok=True)
-        
-        # Copy arbiter cache
-        if self.arbiter_cache_dir.exists():
-            shutil.copytree(self.arbiter_cache_dir, backup_path / "ArbiterCache", dirs_exist_ok=True)
-        
-        # Copy conversations
-        if self.conversations_dir.exists():
-            shutil.copytree(self.conversations_dir, backup_path / "conversations", dirs_exist_ok=True)
+        manifest = create_snapshot(self._backup_sources(), backup_path,
+                                   previous_dir=previous, verify_hash=verify_hash)
+        stats = manifest['stats']
+        self.last_backup_stats = dict(stats, backup_path=str(backup_path), previous=manifest['previous'])
         
         print(f"✅ Data backup created: {backup_path}")
+        print(f"   Copied: {stats['files_copied']} files, {stats['bytes_copied'] / (1024 * 1024):.1f} MB")
+        print(f"   Linked: {stats['files_linked']} files, {stats['bytes_linked'] / (1024 * 1024):.1f} MB")
         
         return str(backup_path)
     
+    def list_backups(self) -> List[Dict[str, Any]]:
+        """Finished snapshot backups, oldest first."""
+        backups = []
+        if self.archive_dir.exists():
+            for path in self.archive_dir.iterdir():
+                manifest = load_manifest(path) if path.is_dir() else None
+                if manifest:
+                    backups.append({
+                        'name': manifest['name'],
+                        'created': manifest['created'],
+                        'previous': manifest.get('previous'),
+                        'stats': manifest.get('stats', {})
+                    })
+        return sorted(backups, key=lambda b: b['created'])
+    
+    def diff_backups(self, old_name: Optional[str], new_name: str) -> Dict[str, list]:
+        """Added / removed / changed files between two snapshots (manifest-only, no file reads)."""
+        old = load_manifest(self.archive_dir / old_name) if old_name else None
+        new = load_manifest(self.archive_dir / new_name)
+        if new is None:
+            raise FileNotFoundError(f"No snapshot manifest for backup: {new_name}")
+        return diff_manifests(old, new)
+    
+    def restore_backup(self, backup_name: str) -> Dict[str, Any]:
+        """Restore a snapshot into the live data directories (only differing files are copied)."""
+        print(f"🗄️ Restoring data backup: {backup_name}")
+        results = restore_snapshot(self.archive_dir / backup_name, self._backup_sources())
+        print(f"✅ Restored {results['restored']} files, {results['skipped']} already current")
+        return results
+    
     # ==================== COMPATIBILITY METHODS ====================
     
     def get_current_implementation(self) -> str:
@@ -437,11 +561,12 @@ if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description="AIOS Data Core System")
-    parser.add_argument('--action', choices=['stats', 'overview', 'cleanup', 'backup'], 
+    parser.add_argument('--action', choices=['stats', 'overview', 'cleanup', 'backup', 'restore'], 
                        default='overview', help='Action to perform')
     parser.add_argument('--days', type=int, default=30, help='Days old for cleanup')
     parser.add_argument('--dry-run', action='store_true', help='Dry run for cleanup')
     parser.add_argument('--backup-name', help='Name for backup')
+    parser.add_argument('--full', action='store_true', help='Full backup (copy every file)')
     parser.add_argument('--no-hybrid', action='store_true', help='Disable Rust hybrid mode')
     
     args = parser.parse_args()
@@ -483,5 +608,10 @@ if __name__ == "__main__":
         print(f"  Size Freed: {results.get('total_size_freed_mb', 0):.1f} MB")
         
     elif args.action == 'backup':
-        data_system.backup_data(args.backup_name)
+        data_system.backup_data(args.backup_name, incremental=not args.full)
+        
+    elif args.action == 'restore':
+        if not args.backup_name:
+            parser.error("--backup-name is required for restore")
+        data_system.restore_backup(args.backup_name)
 
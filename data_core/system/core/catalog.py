@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+File catalogue for Data Core
+Persistent SQLite index of data files (size, mtime, type, owner core) so
+statistics and age queries are indexed lookups instead of directory walks
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    ext TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_owner_mtime ON files(owner, mtime);
+CREATE INDEX IF NOT EXISTS idx_files_dir ON files(dir);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    owner TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dirs_owner ON dirs(owner);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+# A directory modified this recently may still change within the same mtime
+# tick, so it is not trusted as clean and gets listed again next refresh
+RACY_WINDOW_S = 2.0
+
+DELETE_BATCH_SIZE = 500
+
+
+class FileCatalog:
+    """
+    Indexed catalogue of the files under a set of owned roots
+
+    refresh() stats every directory but only lists the ones whose mtime
+    changed since the last refresh (a directory mtime changes whenever an
+    entry is added, removed or renamed). Files rewritten in place without
+    touching their directory are picked up by the periodic full rescan
+    (full_scan_interval_s) or by record(path) from the writer.
+    """
+
+    def __init__(self, db_path: Path, roots: Dict[str, Path], min_refresh_s: float = 2.0,
+                 full_scan_interval_s: float = 3600.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.roots = {owner: Path(root) for owner, root in roots.items()}
+        self.min_refresh_s = min_refresh_s
+        self.full_scan_interval_s = full_scan_interval_s
+        self._lock = threading.RLock()
+        self._last_refresh: Dict[str, float] = {}
+        self.dirs_listed = 0
+        self.dirs_skipped = 0
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+
+    # === Refresh ===
+
+    def refresh(self, owner: Optional[str] = None, full: bool = False) -> Dict[str, int]:
+        """Bring the catalogue up to date for one owner (or all); throttled by min_refresh_s"""
+        owners = [owner] if owner else list(self.roots)
+        listed_before, skipped_before = self.dirs_listed, self.dirs_skipped
+        with self._lock:
+            now = time.time()
+            for name in owners:
+                if not full and now - self._last_refresh.get(name, 0.0) < self.min_refresh_s:
+                    continue
+                last_full = self._meta(f"last_full_scan:{name}")
+                full_scan = full or now - last_full >= self.full_scan_interval_s
+                self._refresh_root(name, self.roots[name], full_scan)
+                if full_scan:
+                    self._set_meta(f"last_full_scan:{name}", now)
+                self._last_refresh[name] = time.time()
+        return {'dirs_listed': self.dirs_listed - listed_before,
+                'dirs_skipped': self.dirs_skipped - skipped_before}
+
+    def _refresh_root(self, owner: str, root: Path, full: bool):
+        stored = dict(self._conn.execute("SELECT path, mtime_ns FROM dirs WHERE owner = ?", (owner,)).fetchall())
+        children: Dict[str, List[str]] = {}
+        for path, parent in self._conn.execute("SELECT path, parent FROM dirs WHERE owner = ?", (owner,)):
+            children.setdefault(parent, []).append(path)
+
+        seen = set()
+        stack = [str(root)]
+        with self._conn:
+            while stack:
+                directory = stack.pop()
+                try:
+                    st = os.stat(directory)
+                except OSError:
+                    continue  # removed; dropped below
+                seen.add(directory)
+                if not full and stored.get(directory) == st.st_mtime_ns:
+                    self.dirs_skipped += 1
+                    stack.extend(children.get(directory, ()))
+                    continue
+
+                rows, subdirs = [], []
+                try:
+                    with os.scandir(directory) as entries:
+                        for entry in entries:
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    subdirs.append(entry.path)
+                                elif entry.is_file(follow_symlinks=False):
+                                    est = entry.stat(follow_symlinks=False)
+                                    ext = os.path.splitext(entry.name)[1].lower() or "(none)"
+                                    rows.append((entry.path, directory, owner, est.st_size, est.st_mtime, ext))
+                            except OSError:
+                                continue
+                except OSError:
+                    continue
+                self.dirs_listed += 1
+                self._conn.execute("DELETE FROM files WHERE dir = ?", (directory,))
+                self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", rows)
+                racy = time.time() - st.st_mtime < RACY_WINDOW_S
+                parent = str(Path(directory).parent) if directory != str(root) else None
+                self._conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?)",
+                                   (directory, parent, owner, -1 if racy else st.st_mtime_ns))
+                stack.extend(subdirs)
+
+            removed = [(path,) for path in stored if path not in seen]
+            if removed:
+                self._conn.executemany("DELETE FROM files WHERE dir = ?", removed)
+                self._conn.executemany("DELETE FROM dirs WHERE path = ?", removed)
+
+    def record(self, path: Path, owner: str):
+        """Journal a single written (or deleted) file without rescanning its directory"""
+        path = Path(path)
+        with self._lock, self._conn:
+            try:
+                st = path.stat()
+            except OSError:
+                self._conn.execute("DELETE FROM files WHERE path = ?", (str(path),))
+                return
+            ext = path.suffix.lower() or "(none)"
+            self._conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                               (str(path), str(path.parent), owner, st.st_size, st.st_mtime, ext))
+
+    def _meta(self, key: str) -> float:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0.0
+
+    def _set_meta(self, key: str, value: float):
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    # === Queries ===
+
+    def stats(self, owner: str, refresh: bool = True) -> Dict[str, Any]:
+        """Directory statistics from the index (same keys as the walking stats helpers)"""
+        if refresh:
+            self.refresh(owner)
+        with self._lock:
+            count, size, last = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), MAX(mtime) FROM files WHERE owner = ?", (owner,)
+            ).fetchone()
+            dirs = self._conn.execute("SELECT COUNT(*) FROM dirs WHERE owner = ?", (owner,)).fetchone()[0]
+            types = dict(self._conn.execute(
+                "SELECT ext, COUNT(*) FROM files WHERE owner = ? GROUP BY ext", (owner,)).fetchall())
+        return {
+            "total_files": count,
+            "total_dirs": max(0, dirs - 1),  # excluding the root itself
+            "total_size_bytes": size,
+            "total_size_mb": size / (1024 * 1024),
+            "last_modified": datetime.fromtimestamp(last).isoformat() if last else None,
+            "file_types": types,
+            "implementation": "python-catalog"
+        }
+
+    def older_than(self, days: float, owners: Optional[List[str]] = None, limit: Optional[int] = None,
+                   refresh: bool = True) -> List[Dict[str, Any]]:
+        """
+        Files last modified more than days ago, oldest first (index range scan per owner)
+
+        Each hit is re-stat'ed: a file rewritten in place since it was
+        catalogued (its directory mtime unchanged) or already gone is
+        re-recorded and left out, so only files that are old on disk
+        right now are returned.
+        """
+        owners = owners or list(self.roots)
+        if refresh:
+            for owner in owners:
+                self.refresh(owner)
+        cutoff = time.time() - days * 86400
+        placeholders = ",".join("?" * len(owners))
+        query = (f"SELECT path, owner, size, mtime FROM files WHERE owner IN ({placeholders}) "
+                 f"AND mtime < ? ORDER BY mtime")
+        params: List[Any] = [*owners, cutoff]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        while True:
+            with self._lock:
+                rows = self._conn.execute(query, params).fetchall()
+            entries, stale = [], 0
+            for path, owner, size, mtime in rows:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    st = None
+                if st is None or st.st_mtime >= cutoff:
+                    self.record(Path(path), owner)  # drops the row, or stores the new mtime
+                    stale += 1
+                    continue
+                entries.append({"path": path, "owner": owner, "size": st.st_size, "mtime": st.st_mtime})
+            # Corrected rows no longer match, so a limited query can be refilled
+            if not stale or limit is None:
+                return entries
+
+    def cleanup(self, days_old: int = 30, dry_run: bool = True, owners: Optional[List[str]] = None,
+                batch_size: int = DELETE_BATCH_SIZE) -> Dict[str, Any]:
+        """
+        Delete files older than days_old in index-driven batches
+
+        Each batch is one indexed query, the unlinks and one DELETE for the
+        removed rows. Every file is stat'ed again right before it is
+        removed and kept if it was modified since the cutoff. dry_run only
+        reports what would be removed.
+        """
+        owners = owners or list(self.roots)
+        for owner in owners:
+            self.refresh(owner)
+        cutoff = time.time() - days_old * 86400
+        removed: List[str] = []
+        freed = 0
+        errors = 0
+        if dry_run:
+            for entry in self.older_than(days_old, owners, refresh=False):
+                removed.append(entry["path"])
+                freed += entry["size"]
+        else:
+            failed = set()
+            while True:
+                batch = [entry for entry in self.older_than(days_old, owners, limit=batch_size + len(failed),
+                                                            refresh=False)
+                         if entry["path"] not in failed][:batch_size]
+                if not batch:
+                    break
+                gone = []
+                for entry in batch:
+                    try:
+                        st = os.stat(entry["path"])
+                        if st.st_mtime >= cutoff:
+                            self.record(Path(entry["path"]), entry["owner"])  # written since the query
+                            continue
+                        os.remove(entry["path"])
+                    except FileNotFoundError:
+                        gone.append((entry["path"],))  # deleted elsewhere: drop the row, nothing freed
+                        continue
+                    except OSError:
+                        failed.add(entry["path"])
+                        errors += 1
+                        continue
+                    gone.append((entry["path"],))
+                    removed.append(entry["path"])
+                    freed += st.st_size
+                with self._lock, self._conn:
+                    self._conn.executemany("DELETE FROM files WHERE path = ?", gone)
+        return {
+            "files_removed": len(removed),
+            "total_deleted": len(removed),
+            "files_list": removed,
+            "total_size_freed_mb": freed / (1024 * 1024),
+            "errors": errors,
+            "days_old": days_old,
+            "dry_run": dry_run,
+            "implementation": "python-catalog"
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
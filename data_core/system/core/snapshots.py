@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Snapshot backups for Data Core
+Incremental, manifest-based backups: unchanged files are hardlinked from the
+previous snapshot, only new or modified files are copied
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 1024 * 1024
+
+
+def scan_tree(root: Path) -> Dict[str, os.stat_result]:
+    """Relative POSIX path -> stat for every file under root"""
+    files = {}
+    root = Path(root)
+    if not root.exists():
+        return files
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = Path(dirpath) / filename
+            try:
+                files[path.relative_to(root).as_posix()] = path.stat()
+            except OSError:
+                continue  # vanished while scanning
+    return files
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _temp_path(dst: Path) -> Path:
+    return dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+
+
+def _remove_quietly(path: Path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def copy_with_hash(src: Path, dst: Path) -> str:
+    """
+    Copy src to dst (with metadata) in one read pass; returns the content hash
+
+    The copy is written beside dst and renamed over it, so a dst that is a
+    hardlink into an older snapshot is replaced, never written through.
+    """
+    digest = hashlib.sha256()
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _temp_path(dst)
+    try:
+        with open(src, 'rb') as fin, open(tmp, 'wb') as fout:
+            for chunk in iter(lambda: fin.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                fout.write(chunk)
+        shutil.copystat(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        _remove_quietly(tmp)
+        raise
+    return digest.hexdigest()
+
+
+def link_or_copy(src: Path, dst: Path) -> bool:
+    """Hardlink src to dst; falls back to a copy (returns False) when linking is not possible"""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _temp_path(dst)
+    try:
+        try:
+            os.link(src, tmp)
+            linked = True
+        except OSError:
+            # Cross-device, link limit reached or no hardlink support
+            shutil.copy2(src, tmp)
+            linked = False
+        os.replace(tmp, dst)
+    except BaseException:
+        _remove_quietly(tmp)
+        raise
+    return linked
+
+
+def load_manifest(snapshot_dir: Path) -> Optional[Dict[str, Any]]:
+    """Manifest of a finished snapshot (None for a missing or incomplete one)"""
+    try:
+        with open(Path(snapshot_dir) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) and 'files' in manifest else None
+
+
+def find_latest_snapshot(archive_dir: Path, exclude: Optional[str] = None) -> Optional[Path]:
+    """Most recent finished snapshot under archive_dir (by manifest creation time)"""
+    latest, latest_created = None, None
+    archive_dir = Path(archive_dir)
+    if not archive_dir.exists():
+        return None
+    for candidate in archive_dir.iterdir():
+        if not candidate.is_dir() or candidate.name == exclude:
+            continue
+        manifest = load_manifest(candidate)
+        if manifest is None:
+            continue
+        created = manifest.get('created_ts', 0)
+        if latest_created is None or created > latest_created:
+            latest, latest_created = candidate, created
+    return latest
+
+
+def create_snapshot(sources: Dict[str, Path], snapshot_dir: Path,
+                    previous_dir: Optional[Path] = None, verify_hash: bool = False) -> Dict[str, Any]:
+    """
+    Snapshot the source directories into snapshot_dir
+
+    A file whose size and mtime match the previous manifest is hardlinked
+    from the previous snapshot. A file whose size matches but mtime differs
+    is hashed and still linked if the content is unchanged. Everything else
+    is copied. verify_hash=True hashes every candidate for linking instead
+    of trusting size + mtime. The manifest is written last, so an
+    interrupted snapshot is never used as a base.
+
+    Args:
+        sources: Label -> directory (labels become top-level snapshot folders)
+        snapshot_dir: Destination directory for this snapshot
+        previous_dir: Finished snapshot to link unchanged files from
+        verify_hash: Hash files even when size and mtime match
+
+    Returns:
+        The snapshot manifest (including a 'stats' section)
+
+    Raises:
+        FileExistsError: snapshot_dir already exists (its files may be
+            hardlinked from other snapshots, so it is never reused)
+    """
+    started = time.perf_counter()
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.parent.mkdir(parents=True, exist_ok=True)
+    snapshot_dir.mkdir()
+    previous = load_manifest(previous_dir) if previous_dir is not None else None
+    previous_files = previous['files'] if previous else {}
+
+    files: Dict[str, Dict[str, Any]] = {}
+    stats = {
+        'files_copied': 0, 'files_linked': 0,
+        'bytes_copied': 0, 'bytes_linked': 0,
+        'files_hashed': 0
+    }
+
+    for label, source_dir in sources.items():
+        for rel, st in sorted(scan_tree(source_dir).items()):
+            key = f"{label}/{rel}"
+            src = Path(source_dir) / rel
+            dst = snapshot_dir / key
+            entry = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+            old = previous_files.get(key)
+
+            unchanged = False
+            if old is not None and old.get('size') == st.st_size:
+                if old.get('mtime_ns') == st.st_mtime_ns and not verify_hash:
+                    unchanged = True
+                    entry['sha256'] = old.get('sha256')
+                elif old.get('sha256'):
+                    try:
+                        digest = file_sha256(src)
+                    except OSError:
+                        continue
+                    stats['files_hashed'] += 1
+                    unchanged = digest == old['sha256']
+                    entry['sha256'] = digest
+
+            try:
+                if unchanged and (previous_dir / key).exists():
+                    if link_or_copy(previous_dir / key, dst):
+                        stats['files_linked'] += 1
+                        stats['bytes_linked'] += st.st_size
+                    else:
+                        stats['files_copied'] += 1
+                        stats['bytes_copied'] += st.st_size
+                else:
+                    entry['sha256'] = copy_with_hash(src, dst)
+                    stats['files_copied'] += 1
+                    stats['bytes_copied'] += st.st_size
+            except OSError as e:
+                print(f"⚠️ Skipping {key}: {e}")
+                continue
+            files[key] = entry
+
+    stats['duration_s'] = time.perf_counter() - started
+    stats['total_files'] = len(files)
+    stats['total_bytes'] = stats['bytes_copied'] + stats['bytes_linked']
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'name': snapshot_dir.name,
+        'created': datetime.now().isoformat(),
+        'created_ts': time.time(),
+        'previous': previous_dir.name if previous else None,
+        'sources': {label: str(path) for label, path in sources.items()},
+        'files': files,
+        'stats': stats
+    }
+    tmp = snapshot_dir / (MANIFEST_NAME + ".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, snapshot_dir / MANIFEST_NAME)
+    return manifest
+
+
+def diff_manifests(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, list]:
+    """Added / removed / changed file keys between two snapshot manifests"""
+    old_files = old['files'] if old else {}
+    new_files = new['files']
+    changed = [
+        key for key, entry in new_files.items()
+        if key in old_files and (
+            entry.get('size') != old_files[key].get('size') or
+            (entry.get('sha256') and entry.get('sha256') != old_files[key].get('sha256'))
+        )
+    ]
+    return {
+        'added': sorted(key for key in new_files if key not in old_files),
+        'removed': sorted(key for key in old_files if key not in new_files),
+        'changed': sorted(changed)
+    }
+
+
+def restore_snapshot(snapshot_dir: Path, targets: Optional[Dict[str, Path]] = None) -> Dict[str, Any]:
+    """
+    Restore a snapshot from its manifest
+
+    Files already present with the manifest size and mtime are left alone,
+    so restoring over a mostly intact tree only copies what differs.
+
+    Args:
+        snapshot_dir: Finished snapshot directory
+        targets: Label -> destination directory (defaults to the recorded sources)
+
+    Returns:
+        Dictionary with restored / skipped counts
+    """
+    snapshot_dir = Path(snapshot_dir)
+    manifest = load_manifest(snapshot_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No snapshot manifest in {snapshot_dir}")
+    targets = targets or {label: Path(path) for label, path in manifest.get('sources', {}).items()}
+
+    restored = skipped = 0
+    bytes_restored = 0
+    for key, entry in manifest['files'].items():
+        label, _, rel = key.partition('/')
+        if label not in targets:
+            continue
+        dst = Path(targets[label]) / rel
+        try:
+            st = dst.stat()
+            if st.st_size == entry['size'] and st.st_mtime_ns == entry['mtime_ns']:
+                skipped += 1
+                continue
+        except OSError:
+            pass
+        copy_with_hash(snapshot_dir / key, dst)
+        restored += 1
+        bytes_restored += entry['size']
+
+    return {'snapshot': manifest['name'], 'restored': restored, 'skipped': skipped,
+            'bytes_restored': bytes_restored}
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Streaming export for Data Core
+Lazily walks a source directory, parses files on a bounded worker pool and
+writes records incrementally, so memory stays flat regardless of dataset size
+"""
+
+import csv
+import json
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+DEFAULT_EXTENSIONS = (".json", ".jsonl", ".ndjson", ".txt", ".md")
+
+# filter_criteria keys evaluated on file metadata, before a file is parsed
+FILE_FILTER_KEYS = ("modified_after", "modified_before", "filename_contains", "extensions", "max_file_size")
+
+FORMAT_EXTENSIONS = {"jsonl": "jsonl", "ndjson": "jsonl", "json": "json", "csv": "csv", "text": "txt", "txt": "txt"}
+
+
+def split_filter(filter_criteria: Optional[Dict[str, Any]]):
+    """(file-level criteria, record-level criteria)"""
+    criteria = dict(filter_criteria or {})
+    file_criteria = {key: criteria.pop(key) for key in FILE_FILTER_KEYS if key in criteria}
+    return file_criteria, criteria
+
+
+def file_matches(path: Path, stat: os.stat_result, file_criteria: Dict[str, Any]) -> bool:
+    """Pushed-down filter: decides from the directory entry alone whether to parse a file"""
+    if not file_criteria:
+        return True
+    if "modified_after" in file_criteria and stat.st_mtime < float(file_criteria["modified_after"]):
+        return False
+    if "modified_before" in file_criteria and stat.st_mtime > float(file_criteria["modified_before"]):
+        return False
+    if "filename_contains" in file_criteria and str(file_criteria["filename_contains"]) not in path.name:
+        return False
+    if "extensions" in file_criteria and path.suffix.lower() not in file_criteria["extensions"]:
+        return False
+    if "max_file_size" in file_criteria and stat.st_size > int(file_criteria["max_file_size"]):
+        return False
+    return True
+
+
+def record_matches(record: Dict[str, Any], record_criteria: Dict[str, Any]) -> bool:
+    """Field equality per criterion; a list or tuple criterion matches any of its values"""
+    for key, expected in record_criteria.items():
+        value = record.get(key)
+        if isinstance(expected, (list, tuple, set)):
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+def iter_source_files(source_dir: Path, file_criteria: Optional[Dict[str, Any]] = None,
+                      extensions=DEFAULT_EXTENSIONS, counters: Optional[Dict[str, int]] = None) -> Iterator[Path]:
+    """Lazily yield matching files under source_dir in a stable (sorted per directory) order"""
+    file_criteria = file_criteria or {}
+    for dirpath, dirnames, filenames in os.walk(source_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = Path(dirpath) / filename
+            if path.suffix.lower() not in extensions:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if counters is not None:
+                counters['files_scanned'] += 1
+            if not file_matches(path, stat, file_criteria):
+                if counters is not None:
+                    counters['files_skipped'] += 1
+                continue
+            yield path
+
+
+def parse_file(path: Path, source_dir: Path, record_criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Records of one file (filtered), each tagged with its source path"""
+    source = path.relative_to(source_dir).as_posix()
+    suffix = path.suffix.lower()
+    records: List[Dict[str, Any]] = []
+    try:
+        if suffix in (".jsonl", ".ndjson"):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        continue  # skip malformed line
+                    records.append(item if isinstance(item, dict) else {"value": item})
+        elif suffix == ".json":
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                data = json.load(f)
+            items = data if isinstance(data, list) else [data]
+            records = [item if isinstance(item, dict) else {"value": item} for item in items]
+        else:
+            records = [{"content": path.read_text(encoding='utf-8', errors='replace')}]
+    except (OSError, ValueError) as e:
+        return [{"_source": source, "_error": str(e)}] if not record_criteria else []
+
+    out = []
+    for record in records:
+        if record_matches(record, record_criteria):
+            record.setdefault("_source", source)
+            out.append(record)
+    return out
+
+
+class JSONLinesWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, record: Dict[str, Any]):
+        self.f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def close(self):
+        pass
+
+
+class JSONArrayWriter:
+    """Streams a single JSON array: '[' first, records comma-separated, ']' on close"""
+
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+        self.f.write("[")
+
+    def write(self, record: Dict[str, Any]):
+        self.f.write(",\n" if self.count else "\n")
+        self.f.write(json.dumps(record, ensure_ascii=False, default=str))
+        self.count += 1
+
+    def close(self):
+        self.f.write("\n]\n" if self.count else "]\n")
+
+
+class CSVWriter:
+    """
+    Header is the union of every record's keys (first-seen order); nested values are written as JSON
+
+    Records are spooled to a temporary file as they arrive and copied out
+    under the full header on close, so later keys are not dropped and
+    memory holds only the key set.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.fieldnames: Dict[str, None] = {}
+        self.spool = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+
+    def write(self, record: Dict[str, Any]):
+        for key in record:
+            self.fieldnames.setdefault(key, None)
+        self.spool.write(json.dumps({
+            key: json.dumps(value, ensure_ascii=False, default=str) if isinstance(value, (dict, list)) else value
+            for key, value in record.items()
+        }, ensure_ascii=False, default=str) + "\n")
+
+    def close(self):
+        try:
+            if self.fieldnames:
+                writer = csv.DictWriter(self.f, fieldnames=list(self.fieldnames))
+                writer.writeheader()
+                self.spool.seek(0)
+                for line in self.spool:
+                    writer.writerow(json.loads(line))
+        finally:
+            self.spool.close()
+
+
+class TextWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, record: Dict[str, Any]):
+        body = record.get("content")
+        if body is None:
+            body = json.dumps({k: v for k, v in record.items() if k != "_source"}, ensure_ascii=False, default=str)
+        self.f.write(f"=== {record.get('_source', '')} ===\n{body}\n\n")
+
+    def close(self):
+        pass
+
+
+WRITERS: Dict[str, Callable] = {
+    "jsonl": JSONLinesWriter,
+    "ndjson": JSONLinesWriter,
+    "json": JSONArrayWriter,
+    "csv": CSVWriter,
+    "text": TextWriter,
+    "txt": TextWriter,
+}
+
+
+def stream_export(source_dir: Path, export_path: Path, target_format: str = "jsonl",
+                  filter_criteria: Optional[Dict[str, Any]] = None, max_workers: int = 4,
+                  max_pending: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Export every record under source_dir to export_path without materializing the dataset
+
+    Files are discovered lazily and parsed on max_workers threads; at most
+    max_pending files (default 2 x max_workers) are parsed or waiting to be
+    written at any time, so memory is bounded by that many files' records.
+    Output order is the directory walk order. The file is written to a
+    temporary name and renamed on success.
+
+    Args:
+        source_dir: Directory to export
+        export_path: Output file
+        target_format: jsonl / ndjson / json (streamed array) / csv / text
+        filter_criteria: File-level keys (modified_after, modified_before,
+            filename_contains, extensions, max_file_size) skip files before
+            parsing; any other key must equal the record field
+
+    Returns:
+        Dictionary with success, export_path and record/file/byte counts
+    """
+    started = time.perf_counter()
+    target_format = target_format.lower()
+    if target_format not in WRITERS:
+        return {"success": False, "error": f"Unsupported export format: {target_format}"}
+    source_dir = Path(source_dir)
+    export_path = Path(export_path)
+    if not source_dir.exists():
+        return {"success": False, "error": f"Source directory not found: {source_dir}"}
+
+    file_criteria, record_criteria = split_filter(filter_criteria)
+    max_workers = max(1, int(max_workers))
+    max_pending = max(max_workers, int(max_pending or 2 * max_workers))
+    counters = {'files_scanned': 0, 'files_skipped': 0}
+    records_exported = files_exported = 0
+
+    export_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = export_path.with_name(export_path.name + ".partial")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f, \
+                ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="data-export") as pool:
+            writer = WRITERS[target_format](f)
+            files = iter_source_files(source_dir, file_criteria, counters=counters)
+            pending = deque()
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < max_pending:
+                    path = next(files, None)
+                    if path is None:
+                        exhausted = True
+                        break
+                    pending.append(pool.submit(parse_file, path, source_dir, record_criteria))
+                if not pending:
+                    break
+                records = pending.popleft().result()
+                for record in records:
+                    writer.write(record)
+                records_exported += len(records)
+                files_exported += 1 if records else 0
+            writer.close()
+        os.replace(tmp_path, export_path)
+    except Exception as e:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        return {"success": False, "error": str(e)}
+
+    return {
+        "success": True,
+        "export_path": str(export_path),
+        "format": target_format,
+        "records_exported": records_exported,
+        "files_exported": files_exported,
+        "files_scanned": counters['files_scanned'],
+        "files_skipped": counters['files_skipped'],
+        "bytes_written": export_path.stat().st_size,
+        "duration_s": time.perf_counter() - started,
+        "implementation": "python-streaming"
+    }
@@ -13,6 +13,15 @@ from datetime import datetime
 from typing import Dict, Any
 
 
+def _flush_fragment_metadata() -> int:
+    """Apply queued arbiter lesson_metadata patches before fragments are consolidated"""
+    try:
+        from luna_core.utilities.fragment_metadata_queue import flush_fragment_metadata
+    except ImportError:
+        return 0
+    return flush_fragment_metadata()
+
+
 class DreamCycleManager:
     """Manages dream cycle operations"""
     
@@ -102,6 +111,11 @@ class DreamCycleManager:
                 self._log("CRITICAL ERROR: AIOS system not available", "ERROR")
                 return {"success": False, "error": "AIOS system not available"}
             
+            # Write behind-queued lesson_metadata so consolidation sees current fragments
+            flushed = _flush_fragment_metadata()
+            if flushed:
+                self._log(f"🌙 Flushed lesson metadata into {flushed} fragment(s)")
+            
             # Check fragment count before dream cycle
             fragment_count = len(self.aios_system.carma_system.cache.file_registry)
             self._log(f"🌙 Fragments available for dream cycle: {fragment_count}")
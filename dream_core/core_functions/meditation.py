@@ -11,6 +11,17 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+LESSONS_DIR = Path("data_core/ArbiterCache")
+
+
+def _lesson_store_module():
+    """Arbiter lesson store module (imported lazily), or None to fall back to lessons.json"""
+    try:
+        from luna_core.utilities import lesson_store
+        return lesson_store
+    except ImportError:
+        return None
+
 
 class MeditationManager:
     """Manages meditation sessions and self-reflection"""
@@ -68,15 +79,20 @@ class MeditationManager:
     def _get_introspection_question(self) -> str:
         """Get a past question for introspection (memory test)."""
         try:
-            lessons_file = Path("data_core/ArbiterCache/lessons.json")
+            lessons_file = LESSONS_DIR / "lessons.json"
             
-            if lessons_file.exists():
+            lesson_store = _lesson_store_module()
+            if lesson_store:
+                lessons = lesson_store.load_lesson_records(LESSONS_DIR)
+            elif lessons_file.exists():
                 with open(lessons_file, 'r', encoding='utf-8') as f:
                     lessons = json.load(f)
-                
-                if lessons:
-                    lesson = random.choice(lessons)
-                    return lesson.get('original_prompt', self._get_fallback_introspection())
+            else:
+                lessons = []
+            
+            if lessons:
+                lesson = random.choice(lessons)
+                return lesson.get('original_prompt', self._get_fallback_introspection())
         except Exception as e:
             print(f"⚠️ Could not load past questions: {e}")
         
@@ -157,15 +173,6 @@ class MeditationManager:
             metadata: Dream metadata
         """
         try:
-            lessons_file = Path("data_core/ArbiterCache/lessons.json")
-            
-            # Load existing lessons
-            if lessons_file.exists():
-                with open(lessons_file, 'r', encoding='utf-8') as f:
-                    lessons = json.load(f)
-            else:
-                lessons = []
-            
             # Create new lesson from dream
             new_lesson = {
                 "original_prompt": question,
@@ -178,14 +185,26 @@ class MeditationManager:
                 "context_files_used": []
             }
             
-            lessons.append(new_lesson)
-            
-            # Save back
-            lessons_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(lessons_file, 'w', encoding='utf-8') as f:
-                json.dump(lessons, f, indent=2, ensure_ascii=False)
+            lesson_store = _lesson_store_module()
+            if lesson_store:
+                # One appended line instead of rewriting every lesson
+                store = lesson_store.get_lesson_store(LESSONS_DIR)
+                store.add(new_lesson)
+                lesson_count = len(store)
+            else:
+                lessons_file = LESSONS_DIR / "lessons.json"
+                if lessons_file.exists():
+                    with open(lessons_file, 'r', encoding='utf-8') as f:
+                        lessons = json.load(f)
+                else:
+                    lessons = []
+                lessons.append(new_lesson)
+                lessons_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(lessons_file, 'w', encoding='utf-8') as f:
+                    json.dump(lessons, f, indent=2, ensure_ascii=False)
+                lesson_count = len(lessons)
             
-            self._log(f"   Lesson #{len(lessons)} created from imagination dream")
+            self._log(f"   Lesson #{lesson_count} created from imagination dream")
             
         except Exception as e:
             self._log(f"⚠️ Error storing dream as lesson: {e}", "ERROR")
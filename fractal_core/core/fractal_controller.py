@@ -8,12 +8,27 @@ Week 4: Enable bandit tuning (after system stable)
 """
 
 import json
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, replace
 import numpy as np
 
-from fractal_core.core.multihead_classifier import MultiheadClassifier
+from fractal_core.core.multihead_classifier import MultiheadClassifier, TYPE_ORDER
+
+# Layer policies are memoized per exact mixture; a step (e.g. 0.05) opts in
+# to sharing one policy set per bucket of that width instead
+POLICY_CACHE_STEP = None
+POLICY_CACHE_SIZE = 256
+
+
+def _freeze(value):
+    """Hashable form of a (nested) mixture dict, used as an exact cache key."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
 
 
 @dataclass
@@ -75,9 +90,18 @@ class FractalController:
     
     Core principle: Compress state, not stuff.
     Factorian: Efficiency enables compassion.
+    
+    Layer policies are memoized per (mixture, budget), so repeated queries
+    reuse one policy set (treat cached policies as read-only). Setting
+    policy_cache_step quantizes the mixture to buckets of that width and
+    emits from the bucket's mixture: far more hits, but budgets and
+    thresholds may differ by up to one step's worth of interpolation.
+    token_policy.query_type_mixture is always the query's own mixture.
     """
     
-    def __init__(self, policy_file: str = None, threshold_file: str = None):
+    def __init__(self, policy_file: str = None, threshold_file: str = None,
+                 policy_cache_step: Optional[float] = POLICY_CACHE_STEP,
+                 policy_cache_size: int = POLICY_CACHE_SIZE):
         # Load configuration
         if policy_file is None:
             policy_file = Path(__file__).parent.parent / "config" / "policy_table.json"
@@ -100,6 +124,13 @@ class FractalController:
         # Safety defaults
         self.safety = self.policy_table.get('safety_defaults', {})
         
+        # Policy cache (quantized mixture bucket -> layer policies)
+        self.policy_cache_step = policy_cache_step
+        self.policy_cache_size = policy_cache_size
+        self._policy_cache: OrderedDict = OrderedDict()
+        self.policy_cache_hits = 0
+        self.policy_cache_misses = 0
+        
         print("Fractal Controller Initialized")
         print(f"  Policy version: {self.policy_table['version']}")
         print(f"  Threshold version: {self.threshold_config['version']}")
@@ -126,12 +157,9 @@ class FractalController:
         if global_budget is None:
             global_budget = {'tokens': 3500, 'latency_ms': 500, 'cost_usd': 0.01, 'vram_mb': 2000}
         
-        # 2. Emit policies for each layer
-        token_policy = self._emit_token_policy(query_type_mixture, global_budget)
-        memory_policy = self._emit_memory_policy(query_type_mixture)
-        code_policy = self._emit_code_policy(query_type_mixture)
-        arbiter_policy = self._emit_arbiter_policy(query_type_mixture)
-        lessons_policy = self._emit_lessons_policy(query_type_mixture)
+        # 2. Emit policies for each layer (memoized per mixture bucket)
+        token_policy, memory_policy, code_policy, arbiter_policy, lessons_policy = \
+            self._layer_policies(query_type_mixture, global_budget)
         
         return FractalPolicies(
             query_type_mixture=query_type_mixture,
@@ -144,6 +172,64 @@ class FractalController:
             lessons_policy=lessons_policy
         )
     
+    def _layer_policies(self, query_type_mixture: Dict[str, float], global_budget: Dict) -> Tuple:
+        """Token, memory, code, arbiter and lessons policies for a mixture (memoized)."""
+        bucketed = bool(self.policy_cache_step)
+        try:
+            bucket = self.quantize_mixture(query_type_mixture) if bucketed else _freeze(query_type_mixture)
+            key = (bucket, tuple(sorted(global_budget.items())))
+            hash(key)
+        except TypeError:
+            return self._emit_layer_policies(query_type_mixture, global_budget)
+        
+        policies = self._policy_cache.get(key)
+        if policies is not None:
+            self._policy_cache.move_to_end(key)
+            self.policy_cache_hits += 1
+        else:
+            self.policy_cache_misses += 1
+            policies = self._emit_layer_policies(
+                self._bucket_mixture(bucket) if bucketed else query_type_mixture, global_budget)
+            self._policy_cache[key] = policies
+            if len(self._policy_cache) > self.policy_cache_size:
+                self._policy_cache.popitem(last=False)
+        
+        if bucketed:
+            # Report the real mixture, not the bucket it was emitted from
+            token_policy = replace(policies[0], query_type_mixture=query_type_mixture)
+            return (token_policy,) + tuple(policies[1:])
+        return policies
+    
+    def _emit_layer_policies(self, query_type_mixture: Dict[str, float], global_budget: Dict) -> Tuple:
+        return (
+            self._emit_token_policy(query_type_mixture, global_budget),
+            self._emit_memory_policy(query_type_mixture),
+            self._emit_code_policy(query_type_mixture),
+            self._emit_arbiter_policy(query_type_mixture),
+            self._emit_lessons_policy(query_type_mixture)
+        )
+    
+    def quantize_mixture(self, query_type_mixture: Dict[str, float]) -> Tuple[int, ...]:
+        """Bucket index per type at policy_cache_step resolution."""
+        return tuple(int(round(query_type_mixture[t] / self.policy_cache_step)) for t in TYPE_ORDER)
+    
+    def _bucket_mixture(self, bucket: Tuple[int, ...]) -> Dict[str, float]:
+        """Representative (renormalized) mixture for a bucket, with Travis's axes."""
+        total = sum(bucket)
+        weights = [b / total for b in bucket] if total else [0.25, 0.25, 0.25, 0.25]
+        return MultiheadClassifier._mixture_dict(weights)
+    
+    def get_policy_cache_stats(self) -> Dict:
+        """Policy cache size and hit rate."""
+        lookups = self.policy_cache_hits + self.policy_cache_misses
+        return {
+            'step': self.policy_cache_step,
+            'entries': len(self._policy_cache),
+            'hits': self.policy_cache_hits,
+            'misses': self.policy_cache_misses,
+            'hit_rate': self.policy_cache_hits / lookups if lookups else 0.0
+        }
+    
     def _emit_token_policy(self, query_type_mixture: Dict[str, float],
                           global_budget: Dict) -> TokenPolicy:
         """Emit token allocation policy using mixture interpolation."""
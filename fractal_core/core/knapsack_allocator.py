@@ -2,14 +2,23 @@
 """
 Knapsack Allocator - Information Bottleneck Based
 Greedy gain-per-token allocation with ROI telemetry
+(vectorized gains, optional exact DP mode, optimality-gap reporting)
 
 Week 1: Dumb-but-stable gain predictor
 Later: Train on causal labels (decision flip data)
 """
 
-from typing import List, Dict, Tuple
+import time
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 
+import numpy as np
+
+ALLOCATION_MODES = ('greedy', 'dp', 'auto')
+
+# 'auto' uses the exact DP when len(eligible spans) x (budget + 1) fits
+DP_CELL_LIMIT = 2_000_000
+
 
 @dataclass
 class Span:
@@ -29,9 +38,20 @@ class KnapsackAllocator:
     
     Uses dumb-but-stable gain predictor initially (Week 1).
     Later trains on causal labels (which span removal caused decision flip).
+    
+    Modes:
+    - greedy: ratio-ordered fill, then the lambda filter (original behaviour)
+    - dp: exact 0/1 knapsack over the spans that pass the lambda filter
+    - auto: dp when the pool x budget table is small, greedy otherwise
+    Telemetry reports the gap to the fractional (LP) upper bound.
     """
     
-    def __init__(self):
+    def __init__(self, mode: str = 'greedy', dp_cell_limit: int = DP_CELL_LIMIT):
+        if mode not in ALLOCATION_MODES:
+            raise ValueError(f"Unknown allocation mode: {mode} (expected one of {ALLOCATION_MODES})")
+        self.mode = mode
+        self.dp_cell_limit = dp_cell_limit
+        
         # Dumb-but-stable base gains (priority ordering)
         self.base_gains = {
             'error_epoch': 10.0,      # Highest priority
@@ -69,9 +89,9 @@ class KnapsackAllocator:
         }
     
     def allocate(self, spans: List[Span], budget: int, 
-                query_type_mixture: Dict[str, float]) -> Tuple[List[Span], Dict]:
+                query_type_mixture: Dict[str, float], mode: Optional[str] = None) -> Tuple[List[Span], Dict]:
         """
-        Allocate spans using greedy knapsack.
+        Allocate spans using greedy (or exact DP) knapsack.
         
         Deterministic allocation provides functional idempotency:
         Same (spans, budget, query_type_mixture) always produces same result.
@@ -81,67 +101,150 @@ class KnapsackAllocator:
             spans: Candidate spans for prompt
             budget: Total token budget (e.g. 3500)
             query_type_mixture: Type weights from classifier
+            mode: 'greedy', 'dp' or 'auto' (defaults to the allocator mode)
         
         Returns:
             (chosen_spans, telemetry)
         """
-        # Score each span by decision gain
-        for span in spans:
-            span.gain = self._predict_gain(span, query_type_mixture)
-            span.ratio = span.gain / span.cost if span.cost > 0 else 0.0
-        
-        # Sort by ratio (greedy)
-        sorted_spans = sorted(spans, key=lambda s: s.ratio, reverse=True)
+        started = time.perf_counter()
+        mode = mode or self.mode
+        if mode not in ALLOCATION_MODES:
+            raise ValueError(f"Unknown allocation mode: {mode} (expected one of {ALLOCATION_MODES})")
         
-        # Greedy knapsack
-        chosen = []
-        used = 0
+        # Score every span at once: gain depends only on (span type, mixture)
+        gains, costs = self._score_spans(spans, query_type_mixture)
+        ratios = np.divide(gains, costs, out=np.zeros_like(gains), where=costs > 0)
+        for span, gain, ratio in zip(spans, gains.tolist(), ratios.tolist()):
+            span.gain = gain
+            span.ratio = ratio
         
-        for span in sorted_spans:
-            if used + span.cost <= budget:
-                chosen.append(span)
-                used += span.cost
+        # Sort by ratio (stable, like sorted(..., reverse=True))
+        order = np.argsort(-ratios, kind='stable')
         
-        # Information Bottleneck guardrail
-        # Drop spans with gain below threshold
+        # Information Bottleneck guardrail: gain below threshold is never kept
         lambda_threshold = self._calculate_lambda(query_type_mixture)
-        chosen_filtered = [s for s in chosen if s.gain >= lambda_threshold]
+        eligible = gains >= lambda_threshold
+        
+        if mode == 'auto':
+            cells = int(eligible.sum()) * (max(budget, 0) + 1)
+            mode = 'dp' if cells <= self.dp_cell_limit else 'greedy'
+        
+        if mode == 'dp':
+            kept = self._dp_select(gains, costs, eligible, budget)
+            chosen_before_ib = int(kept.sum())
+        else:
+            # Greedy knapsack
+            chosen = np.zeros(len(spans), dtype=bool)
+            used = 0
+            for index, cost in zip(order.tolist(), costs[order].tolist()):
+                if used + cost <= budget:
+                    chosen[index] = True
+                    used += cost
+            chosen_before_ib = int(chosen.sum())
+            kept = chosen & eligible
         
-        # Telemetry
+        kept_order = order[kept[order]]
+        chosen_filtered = [spans[i] for i in kept_order.tolist()]
+        tokens_used = int(costs[kept].sum())
+        objective = float(gains[kept].sum())
+        upper_bound = self._fractional_bound(gains, costs, ratios, order, eligible, budget)
+        
+        # Telemetry (membership by index mask, not list scans)
         telemetry = {
+            'mode': mode,
             'total_spans': len(spans),
-            'chosen_before_ib': len(chosen),
+            'chosen_before_ib': chosen_before_ib,
             'chosen_after_ib': len(chosen_filtered),
-            'tokens_used': sum(s.cost for s in chosen_filtered),
+            'tokens_used': tokens_used,
             'tokens_budget': budget,
-            'utilization_pct': (sum(s.cost for s in chosen_filtered) / budget) * 100,
+            'utilization_pct': (tokens_used / budget) * 100,
             'lambda_threshold': lambda_threshold,
+            'objective_gain': objective,
+            'upper_bound_gain': upper_bound,
+            'optimality_gap': (upper_bound - objective) / upper_bound if upper_bound > 0 else 0.0,
             'roi_top_10': [
-                {
-                    'span_id': s.span_id,
-                    'type': s.span_type,
-                    'gain': round(s.gain, 3),
-                    'cost': s.cost,
-                    'ratio': round(s.ratio, 4),
-                    'kept': True
-                }
-                for s in chosen_filtered[:10]
+                self._roi_entry(span, kept=True)
+                for span in chosen_filtered[:10]
             ],
             'dropped_spans': [
-                {
-                    'span_id': s.span_id,
-                    'type': s.span_type,
-                    'gain': round(s.gain, 3),
-                    'cost': s.cost,
-                    'ratio': round(s.ratio, 4),
-                    'kept': False
-                }
-                for s in sorted_spans if s not in chosen_filtered
-            ][:10]  # Top 10 dropped
+                self._roi_entry(spans[i], kept=False)
+                for i in order[~kept[order]][:10].tolist()
+            ],  # Top 10 dropped
+            'allocation_ms': (time.perf_counter() - started) * 1000
         }
         
         return chosen_filtered, telemetry
     
+    @staticmethod
+    def _roi_entry(span: Span, kept: bool) -> Dict:
+        return {
+            'span_id': span.span_id,
+            'type': span.span_type,
+            'gain': round(span.gain, 3),
+            'cost': span.cost,
+            'ratio': round(span.ratio, 4),
+            'kept': kept
+        }
+    
+    def _score_spans(self, spans: List[Span], query_type_mixture: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """Gains and costs as arrays; _predict_gain runs once per distinct span type."""
+        type_codes: Dict[str, int] = {}
+        codes = np.fromiter((type_codes.setdefault(span.span_type, len(type_codes)) for span in spans),
+                            dtype=np.int64, count=len(spans))
+        type_gains = np.array([self._type_gain(span_type, query_type_mixture) for span_type in type_codes],
+                              dtype=np.float64)
+        gains = type_gains[codes] if len(type_codes) else np.zeros(0, dtype=np.float64)
+        costs = np.fromiter((span.cost for span in spans), dtype=np.int64, count=len(spans))
+        return gains, costs
+    
+    @staticmethod
+    def _fractional_bound(gains: np.ndarray, costs: np.ndarray, ratios: np.ndarray, order: np.ndarray,
+                          eligible: np.ndarray, budget: int) -> float:
+        """LP relaxation of the knapsack over eligible spans (upper bound on any selection)"""
+        candidates = order[eligible[order]]
+        if not len(candidates) or budget <= 0:
+            return 0.0
+        free = candidates[costs[candidates] <= 0]
+        paid = candidates[costs[candidates] > 0]
+        bound = float(gains[free].sum())
+        cumulative = np.cumsum(costs[paid])
+        full = int(np.searchsorted(cumulative, budget, side='right'))
+        bound += float(gains[paid[:full]].sum())
+        if full < len(paid):
+            remaining = budget - (int(cumulative[full - 1]) if full else 0)
+            bound += remaining * float(ratios[paid[full]])
+        return bound
+    
+    @staticmethod
+    def _dp_select(gains: np.ndarray, costs: np.ndarray, eligible: np.ndarray, budget: int) -> np.ndarray:
+        """Exact 0/1 knapsack over eligible spans (one vectorized row update per span)"""
+        kept = np.zeros(len(gains), dtype=bool)
+        if budget < 0:
+            return kept
+        items = np.flatnonzero(eligible)
+        best = np.zeros(budget + 1, dtype=np.float64)
+        take = np.zeros((len(items), budget + 1), dtype=bool)
+        for row, index in enumerate(items.tolist()):
+            cost, gain = int(costs[index]), float(gains[index])
+            if cost > budget:
+                continue
+            if cost <= 0:
+                take[row, :] = gain > 0
+                best += max(gain, 0.0)
+                continue
+            candidate = best[:-cost] + gain
+            better = candidate > best[cost:]
+            take[row, cost:] = better
+            best[cost:] = np.where(better, candidate, best[cost:])
+        
+        capacity = budget
+        for row in range(len(items) - 1, -1, -1):
+            if take[row, capacity]:
+                index = int(items[row])
+                kept[index] = True
+                capacity -= max(int(costs[index]), 0)
+        return kept
+    
     def _predict_gain(self, span: Span, query_type_mixture: Dict[str, float]) -> float:
         """
         Predict decision gain for a span.
@@ -149,13 +252,17 @@ class KnapsackAllocator:
         Week 1: Dumb-but-stable (weighted base gains)
         Later: Train on causal labels (decision flip data)
         """
+        return self._type_gain(span.span_type, query_type_mixture)
+    
+    def _type_gain(self, span_type: str, query_type_mixture: Dict[str, float]) -> float:
+        """Gain shared by every span of span_type under query_type_mixture."""
         # Base gain for span type
-        base_gain = self.base_gains.get(span.span_type, 1.0)
+        base_gain = self.base_gains.get(span_type, 1.0)
         
         # Weight by query type mixture
         weighted_gain = 0.0
         for type_name, type_weight in query_type_mixture.items():
-            span_type_weight = self.type_weights.get(type_name, {}).get(span.span_type, 0.5)
+            span_type_weight = self.type_weights.get(type_name, {}).get(span_type, 0.5)
             weighted_gain += type_weight * base_gain * span_type_weight
         
         return weighted_gain
@@ -4,10 +4,37 @@ Multihead Query Type Classifier
 4-head ensemble with type mixture output (not single label)
 """
 
+import math
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import re
 
+# Below this many texts, fusion runs in plain Python (numpy call overhead dominates)
+SMALL_BATCH = 8
+
+# Precompiled structural scanners (shared by every call)
+CODE_MARKERS_RE = re.compile(r'```|def |class |import ')
+MATH_MARKERS_RE = re.compile(r'\$|=|\\')
+MULTI_CHOICE_RE = re.compile(r'[A-D]\)', re.I)
+TRUE_FALSE_RE = re.compile(r'(true|false)\?', re.I)
+OR_WORD_RE = re.compile(r'\bor\b', re.I)
+
+# Structural head keyword lists
+OPEN_REASONING_WORDS = ('why', 'how', 'explain', 'prove', 'derive')
+GENERATIVE_WORDS = ('design', 'create', 'imagine', 'write', 'generate')
+RETRIEVAL_WORDS = ('find', 'search', 'document', 'locate', 'retrieve')
+OPTION_WORDS = ('option', 'choice')
+
+TYPE_ORDER = ('pattern_language', 'logic', 'creative', 'retrieval')
+
+
+def _normalize(scores: List[float]) -> List[float]:
+    """Scale head scores to sum to 1 (uniform when all zero)"""
+    total = sum(scores)
+    if total > 0:
+        return [score / total for score in scores]
+    return [0.25, 0.25, 0.25, 0.25]
+
 
 class MultiheadClassifier:
     """
@@ -54,6 +81,28 @@ class MultiheadClassifier:
         ])
         
         self.logic_floor = 0.15  # Safety: always 15% logic minimum
+        
+        # Pattern-task fusion (structural head dominates) and logic floor direction
+        self.pattern_fusion = np.array([[0.1], [0.7], [0.1], [0.1]])
+        self.logic_floor_vector = np.array([0.0, 1.0, 0.0, 0.0])  # [pattern, logic, creative, retrieval]
+        
+        self._compile_scanner()
+    
+    def _compile_scanner(self):
+        """
+        Precompile the keyword scanner shared by all heads.
+        
+        Every keyword any head looks for is checked against the lowercased
+        text once per query; heads then test membership in that set.
+        Matching stays substring-based, exactly like the per-head checks.
+        """
+        keywords = set(OPEN_REASONING_WORDS + GENERATIVE_WORDS + RETRIEVAL_WORDS + OPTION_WORDS + ('ratio',))
+        for patterns in self.lexical_patterns.values():
+            keywords.update(patterns)
+        for verbs in self.pragmatic_verbs.values():
+            keywords.update(verbs)
+        self.scan_keywords = tuple(sorted(keywords))
+        self.citation_re = re.compile(self.structural_markers['citation'])
     
     def classify_mixture(self, text: str, history: List[str] = None) -> Dict[str, float]:
         """
@@ -63,46 +112,74 @@ class MultiheadClassifier:
             {"pattern_language": w1, "logic": w2, "creative": w3, "retrieval": w4}
             where Σw_i = 1.0 and logic >= 0.15
         """
-        # Extract features
-        feats = self._extract_features(text, history or [])
+        return self.classify_batch([text], [history or []])[0]
+    
+    def classify_batch(self, texts: List[str], histories: Optional[List[List[str]]] = None) -> List[Dict[str, float]]:
+        """
+        Classify many queries at once.
         
-        # Run 4 heads
-        v_lex = self._lexical_head(feats)
-        v_struct = self._structural_head(feats)
-        v_prag = self._pragmatic_head(feats)
-        v_unc = self._uncertainty_head(feats)
+        Features and heads run per text (one scan each); fusion, softmax and
+        the logic floor run as single array operations over the batch.
+        """
+        if not texts:
+            return []
+        histories = histories or [[] for _ in texts]
+        
+        # Run 4 heads per text -> (N, 4 heads, 4 types)
+        rows = []
+        for text, history in zip(texts, histories):
+            feats = self._extract_features(text, history or [])
+            rows.append((
+                self._lexical_head(feats),
+                self._structural_head(feats),
+                self._pragmatic_head(feats),
+                self._uncertainty_head(feats)
+            ))
+        if len(rows) < SMALL_BATCH:
+            return [self._mixture_dict(self._fuse_row(heads)) for heads in rows]
+        head_outputs = np.array(rows)
         
         # TRAVIS'S FRAMEWORK:
         # If structural head detects clear pattern/language signal (multi-choice),
         # boost structural weight and reduce logic floor
-        pattern_signal = v_struct[0]  # Pattern score from structural head
+        pattern_task = head_outputs[:, 1, 0] > 0.7  # Pattern score from structural head
         
-        # Adjust fusion weights based on pattern signal strength
-        if pattern_signal > 0.7:
-            # Clear pattern/language task - boost structural head
-            adjusted_fusion = np.array([[0.1], [0.7], [0.1], [0.1]])  # Heavy on structural
-            logic_floor = 0.05  # Minimal floor for pattern tasks
-        else:
-            # Mixed or logic task - balanced fusion
-            adjusted_fusion = self.fusion_weights
-            logic_floor = 0.15  # Full floor for safety
-        
-        # Stack head outputs
-        head_outputs = np.array([v_lex, v_struct, v_prag, v_unc])
-        
-        # Weighted fusion
-        logits = np.sum(head_outputs * adjusted_fusion, axis=0)
+        # Weighted fusion: clear pattern/language tasks lean on the structural head
+        fusion = np.where(pattern_task[:, None, None], self.pattern_fusion, self.fusion_weights)
+        logits = np.sum(head_outputs * fusion, axis=1)
         
         # Softmax to get mixture
-        w = self._softmax(logits)
+        w = self._softmax_rows(logits)
         
-        # Apply dynamic logic floor
-        logic_floor_vector = np.array([0.0, 1.0, 0.0, 0.0])  # [pattern, logic, creative, retrieval]
-        w = logic_floor * logic_floor_vector + (1.0 - logic_floor) * w
+        # Apply dynamic logic floor (minimal floor for pattern tasks)
+        logic_floor = np.where(pattern_task, 0.05, 0.15)[:, None]
+        w = logic_floor * self.logic_floor_vector + (1.0 - logic_floor) * w
         
         # Normalize
-        w = w / np.sum(w)
+        w = w / np.sum(w, axis=1, keepdims=True)
         
+        return [self._mixture_dict(row) for row in w.tolist()]
+    
+    def _fuse_row(self, heads) -> List[float]:
+        """Fusion, softmax and logic floor for one text (same steps as the array path)."""
+        if heads[1][0] > 0.7:
+            fusion = self.pattern_fusion.tolist()
+            weights = [[row[0]] * 4 for row in fusion]
+            logic_floor = 0.05
+        else:
+            weights = self.fusion_weights.tolist()
+            logic_floor = 0.15
+        logits = [sum(heads[h][t] * weights[h][t] for h in range(4)) for t in range(4)]
+        peak = max(logits)
+        exp_logits = [math.exp(x - peak) for x in logits]
+        total = sum(exp_logits)
+        w = [x / total for x in exp_logits]
+        w = [logic_floor * f + (1.0 - logic_floor) * x for f, x in zip((0.0, 1.0, 0.0, 0.0), w)]
+        total = sum(w)
+        return [x / total for x in w]
+    
+    @staticmethod
+    def _mixture_dict(w: List[float]) -> Dict[str, float]:
         # TRAVIS'S TWO-AXIS ENHANCEMENT:
         # Calculate axes for optimization decisions
         logic_creative_axis = w[1] + w[2]  # Logic + Creative
@@ -117,62 +194,57 @@ class MultiheadClassifier:
             dominant_strength = pattern_language_axis
         
         return {
-            'pattern_language': float(w[0]),
-            'logic': float(w[1]),
-            'creative': float(w[2]),
-            'retrieval': float(w[3]),
+            'pattern_language': w[0],
+            'logic': w[1],
+            'creative': w[2],
+            'retrieval': w[3],
             # Travis's axes metadata
             'travis_axes': {
-                'logic_creative': float(logic_creative_axis),
-                'pattern_language': float(pattern_language_axis),
+                'logic_creative': logic_creative_axis,
+                'pattern_language': pattern_language_axis,
                 'dominant_axis': dominant_axis,
-                'dominant_strength': float(dominant_strength),
-                'logic_weight': float(w[1]),
-                'creative_weight': float(w[2]),
-                'pattern_weight': float(w[0]),
-                'language_weight': float(w[3])  # Using retrieval as language proxy
+                'dominant_strength': dominant_strength,
+                'logic_weight': w[1],
+                'creative_weight': w[2],
+                'pattern_weight': w[0],
+                'language_weight': w[3]  # Using retrieval as language proxy
             }
         }
     
     def _extract_features(self, text: str, history: List[str]) -> Dict:
-        """Extract features for classification."""
+        """Extract features for classification (single lowercase + keyword scan)."""
         text_lower = text.lower()
+        words = text_lower.split()
         
         return {
             'text': text,
             'text_lower': text_lower,
-            'length': len(text.split()),
+            'words': words,
+            'keywords': frozenset(kw for kw in self.scan_keywords if kw in text_lower),
+            'length': len(words),
             'has_question_mark': '?' in text,
-            'has_code_markers': bool(re.search(r'```|def |class |import ', text)),
-            'has_math_markers': bool(re.search(r'\$|=|\\', text)),
+            'question_count': text.count('?'),
+            'has_code_markers': bool(CODE_MARKERS_RE.search(text)),
+            'has_math_markers': bool(MATH_MARKERS_RE.search(text)),
+            'has_multi_choice': bool(MULTI_CHOICE_RE.search(text)),
+            'has_true_false': bool(TRUE_FALSE_RE.search(text)),
+            'has_or': bool(OR_WORD_RE.search(text)),
             'history_length': len(history),
             'recent_history': history[-5:] if history else []
         }
     
-    def _lexical_head(self, feats: Dict) -> np.ndarray:
+    def _lexical_head(self, feats: Dict) -> List[float]:
         """Lexical head: Count n-gram matches per type."""
-        text_lower = feats['text_lower']
-        scores = np.zeros(4)  # [pattern, logic, creative, retrieval]
-        
-        for i, (type_name, patterns) in enumerate([
-            ('pattern_language', self.lexical_patterns['pattern_language']),
-            ('logic', self.lexical_patterns['logic']),
-            ('creative', self.lexical_patterns['creative']),
-            ('retrieval', self.lexical_patterns['retrieval'])
-        ]):
-            for pattern in patterns:
-                if pattern in text_lower:
-                    scores[i] += 1.0
-        
-        # Normalize
-        if np.sum(scores) > 0:
-            scores = scores / np.sum(scores)
-        else:
-            scores = np.array([0.25, 0.25, 0.25, 0.25])  # Uniform if no matches
-        
-        return scores
+        keywords = feats['keywords']
+        scores = [  # [pattern, logic, creative, retrieval]
+            float(sum(1 for pattern in self.lexical_patterns[type_name] if pattern in keywords))
+            for type_name in TYPE_ORDER
+        ]
+        
+        # Normalize (uniform if no matches)
+        return _normalize(scores)
     
-    def _structural_head(self, feats: Dict) -> np.ndarray:
+    def _structural_head(self, feats: Dict) -> List[float]:
         """
         Structural head: Detect code, math, citations.
         
@@ -180,28 +252,29 @@ class MultiheadClassifier:
         - Pattern/Language: Multi-choice (A/B/C/D), closed-form, deterministic
         - Logic/Creative: Open-ended reasoning, "what is ratio?", probabilistic
         """
-        scores = np.array([0.1, 0.1, 0.1, 0.1])  # Base uniform
+        scores = [0.1, 0.1, 0.1, 0.1]  # Base uniform
         
         text = feats['text']
+        keywords = feats['keywords']
         
         # TRAVIS'S PATTERN/LANGUAGE DETECTOR:
         # Multi-choice structure = Pattern matching task
         # Example: "What is 1+1? A) 1 B) 2 C) 3 D) 4"
-        has_multi_choice = bool(re.search(r'[A-D]\)', text, re.I))
-        has_true_false = bool(re.search(r'(true|false)\?', text, re.I))
-        has_options = 'option' in text.lower() or 'choice' in text.lower()
-        has_vs_or = bool(re.search(r'\bor\b', text, re.I)) and text.count('?') == 1
+        has_multi_choice = feats['has_multi_choice']
+        has_true_false = feats['has_true_false']
+        has_options = any(w in keywords for w in OPTION_WORDS)
+        has_vs_or = feats['has_or'] and feats['question_count'] == 1
         
         if has_multi_choice or has_true_false or has_options or has_vs_or:
             # This is a PATTERN/LANGUAGE task - deterministic, closed-form
-            scores = np.array([1.0, 0.1, 0.1, 0.1])  # Overwhelming pattern signal
-            return scores / np.sum(scores)  # Early return for clear pattern
+            scores = [1.0, 0.1, 0.1, 0.1]  # Overwhelming pattern signal
+            return _normalize(scores)  # Early return for clear pattern
         
         # TRAVIS'S LOGIC/CREATIVE DETECTOR:
         # Open-ended questions with reasoning = Logic/Creative
         is_open_question = text.strip().endswith('?') and not has_multi_choice
-        has_ratio = 'ratio' in text.lower()
-        has_why_how = any(w in text.lower() for w in ['why', 'how', 'explain', 'prove', 'derive'])
+        has_ratio = 'ratio' in keywords
+        has_why_how = any(w in keywords for w in OPEN_REASONING_WORDS)
         
         if is_open_question and (has_ratio or has_why_how):
             scores[1] += 0.8  # Logic (reasoning required)
@@ -216,61 +289,53 @@ class MultiheadClassifier:
             scores[1] += 0.6  # Logic (math is reasoning)
         
         # Citations
-        if re.search(self.structural_markers['citation'], text):
+        if self.citation_re.search(text):
             scores[3] += 0.4  # Retrieval (citations present)
         
         # Imperative/generative
-        if any(w in text.lower() for w in ['design', 'create', 'imagine', 'write', 'generate']):
+        if any(w in keywords for w in GENERATIVE_WORDS):
             scores[2] += 0.6  # Creative
         
         # Retrieval verbs
-        if any(w in text.lower() for w in ['find', 'search', 'document', 'locate', 'retrieve']):
+        if any(w in keywords for w in RETRIEVAL_WORDS):
             scores[3] += 0.6  # Retrieval
         
         # Normalize
-        scores = scores / np.sum(scores)
-        return scores
+        return _normalize(scores)
     
-    def _pragmatic_head(self, feats: Dict) -> np.ndarray:
+    def _pragmatic_head(self, feats: Dict) -> List[float]:
         """Pragmatic head: Intent from verbs."""
-        text_lower = feats['text_lower']
-        scores = np.zeros(4)
+        keywords = feats['keywords']
+        scores = [0.0, 0.0, 0.0, 0.0]
         
         # Question intent
-        if any(verb in text_lower for verb in self.pragmatic_verbs['question']):
+        if any(verb in keywords for verb in self.pragmatic_verbs['question']):
             if feats['has_question_mark']:
                 scores[1] += 0.5  # Logic (open-ended questions)
             else:
                 scores[0] += 0.3  # Pattern (implicit questions)
         
         # Verification intent
-        if any(verb in text_lower for verb in self.pragmatic_verbs['verification']):
+        if any(verb in keywords for verb in self.pragmatic_verbs['verification']):
             scores[0] += 0.6  # Pattern/Language (yes/no, multiple choice feel)
         
         # Command intent
-        if any(verb in text_lower for verb in self.pragmatic_verbs['command']):
+        if any(verb in keywords for verb in self.pragmatic_verbs['command']):
             scores[2] += 0.5  # Creative (constructive)
         
         # Exploration intent
-        if any(verb in text_lower for verb in self.pragmatic_verbs['exploration']):
+        if any(verb in keywords for verb in self.pragmatic_verbs['exploration']):
             scores[2] += 0.6  # Creative
         
-        # Normalize
-        if np.sum(scores) > 0:
-            scores = scores / np.sum(scores)
-        else:
-            scores = np.array([0.25, 0.25, 0.25, 0.25])
-        
-        return scores
+        # Normalize (uniform if no intent)
+        return _normalize(scores)
     
-    def _uncertainty_head(self, feats: Dict) -> np.ndarray:
+    def _uncertainty_head(self, feats: Dict) -> List[float]:
         """Uncertainty head: Estimate based on text entropy."""
-        text = feats['text']
-        
         # Simple entropy estimation
-        words = text.lower().split()
+        words = feats['words']
         if len(words) == 0:
-            return np.array([0.25, 0.25, 0.25, 0.25])
+            return [0.25, 0.25, 0.25, 0.25]
         
         # Word diversity
         unique_words = len(set(words))
@@ -279,7 +344,7 @@ class MultiheadClassifier:
         # High diversity = exploratory (creative/logic)
         # Low diversity = repetitive (pattern/retrieval)
         
-        scores = np.zeros(4)
+        scores = [0.0, 0.0, 0.0, 0.0]
         if diversity > 0.7:
             scores[1] += 0.4  # Logic
             scores[2] += 0.4  # Creative
@@ -291,14 +356,18 @@ class MultiheadClassifier:
             scores[3] += 0.3  # Retrieval
         
         # Normalize
-        scores = scores / np.sum(scores)
-        return scores
+        return _normalize(scores)
     
     def _softmax(self, logits: np.ndarray) -> np.ndarray:
         """Softmax function."""
         exp_logits = np.exp(logits - np.max(logits))  # Numerical stability
         return exp_logits / np.sum(exp_logits)
     
+    def _softmax_rows(self, logits: np.ndarray) -> np.ndarray:
+        """Row-wise softmax for a batch of logits."""
+        exp_logits = np.exp(logits - np.max(logits, axis=1, keepdims=True))  # Numerical stability
+        return exp_logits / np.sum(exp_logits, axis=1, keepdims=True)
+    
     def get_dominant_type(self, mixture: Dict[str, float]) -> Tuple[str, float]:
         """Get dominant type and confidence from mixture."""
         # Filter out travis_axes metadata (it's a dict, not a float)
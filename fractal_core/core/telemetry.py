@@ -8,10 +8,24 @@ Mandatory logging: Budget ledgers, ROI, flip-audits, churn tracking
 
 import time
 import json
+import os
+import threading
+from collections import deque
 from pathlib import Path
 from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
 
+# Turn window kept in memory; full history lives in the NDJSON sink
+MAX_TURN_LOGS = 100
+MIXTURE_HISTORY = 50
+CHURN_HISTORY = 50
+# Turns covered by the drift / churn aggregates
+AGGREGATE_WINDOW = 10
+
+SINK_FILENAME = "fractal_telemetry.ndjson"
+SINK_MAX_BYTES = 10 * 1024 * 1024
+SINK_BACKUPS = 5
+
 
 @dataclass
 class BudgetLedger:
@@ -50,6 +64,147 @@ class TurnTelemetry:
     factorian_metrics: Optional[Dict] = None
 
 
+class RollingWindow:
+    """
+    Fixed-size window of equal-length vectors with running sums
+
+    push() is O(width): the evicted vector is subtracted from the sums and
+    sums of squares, so mean and (population) variance never rescan the
+    window. Sums are recomputed from the window every resync_every pushes
+    to keep floating point error from accumulating.
+    """
+    
+    def __init__(self, size: int, width: int, resync_every: int = 1000):
+        self.values = deque(maxlen=size)
+        self.width = width
+        self.resync_every = resync_every
+        self.sums = [0.0] * width
+        self.squares = [0.0] * width
+        self._pushes = 0
+    
+    def push(self, vector: List[float]):
+        if len(self.values) == self.values.maxlen:
+            old = self.values[0]
+            for i in range(self.width):
+                self.sums[i] -= old[i]
+                self.squares[i] -= old[i] * old[i]
+        self.values.append(vector)
+        for i in range(self.width):
+            self.sums[i] += vector[i]
+            self.squares[i] += vector[i] * vector[i]
+        self._pushes += 1
+        if self._pushes % self.resync_every == 0:
+            self._resync()
+    
+    def _resync(self):
+        self.sums = [sum(v[i] for v in self.values) for i in range(self.width)]
+        self.squares = [sum(v[i] * v[i] for v in self.values) for i in range(self.width)]
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.values.maxlen
+    
+    def mean(self) -> List[float]:
+        n = len(self.values)
+        return [total / n for total in self.sums] if n else [0.0] * self.width
+    
+    def variance(self) -> List[float]:
+        n = len(self.values)
+        if not n:
+            return [0.0] * self.width
+        return [max(0.0, sq / n - (total / n) ** 2) for total, sq in zip(self.sums, self.squares)]
+
+
+class TelemetrySink:
+    """
+    Append-only NDJSON turn log with size-based rotation
+
+    The active file rotates to .1 (older files shift to .2 ... .backups)
+    once it passes max_bytes, so disk use is bounded by
+    (backups + 1) x max_bytes and each write is a single appended line.
+    """
+    
+    def __init__(self, path: Path, max_bytes: int = SINK_MAX_BYTES, backups: int = SINK_BACKUPS):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._file = None
+    
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        return self._file
+    
+    def write(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            f = self._open()
+            f.write(line)
+            f.flush()
+            if f.tell() >= self.max_bytes:
+                self._rotate()
+    
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for i in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{i}")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+    
+    def files(self) -> List[Path]:
+        """Sink files oldest first"""
+        rotated = [self.path.with_name(f"{self.path.name}.{i}") for i in range(self.backups, 0, -1)]
+        return [p for p in rotated + [self.path] if p.exists()]
+    
+    def tail(self, n: int) -> List[Dict]:
+        """Last n records (newest last), reading backwards from the end of the sink files"""
+        records: List[Dict] = []
+        for path in reversed(self.files()):
+            lines = self._tail_lines(path, n - len(records))
+            parsed = []
+            for line in lines:
+                try:
+                    parsed.append(json.loads(line))
+                except ValueError:
+                    continue  # torn line
+            records = parsed + records
+            if len(records) >= n:
+                break
+        return records[-n:] if n else []
+    
+    @staticmethod
+    def _tail_lines(path: Path, n: int, block: int = 64 * 1024) -> List[str]:
+        if n <= 0:
+            return []
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            data = b""
+            while end > 0 and data.count(b"\n") <= n:
+                start = max(0, end - block)
+                f.seek(start)
+                data = f.read(end - start) + data
+                end = start
+        lines = [line for line in data.decode('utf-8', errors='replace').splitlines() if line.strip()]
+        return lines[-n:]
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
 class FractalTelemetry:
     """
     Comprehensive telemetry system for fractal operations.
@@ -61,23 +216,68 @@ class FractalTelemetry:
     - Split/merge churn
     - Decision flip analysis
     - Factorian metrics (efficiency × compassion / suffering)
+    
+    Every turn is appended to a rotating NDJSON sink; the in-memory window
+    (last 100 turns) and the drift/churn aggregates are restored from it on
+    startup, and updated in O(1) per turn.
     """
     
-    def __init__(self, log_dir: str = "data_core/FractalCache"):
+    def __init__(self, log_dir: str = "data_core/FractalCache", persist: bool = True,
+                 sink_max_bytes: int = SINK_MAX_BYTES, sink_backups: int = SINK_BACKUPS):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
         
-        self.turn_logs: List[TurnTelemetry] = []
+        self.turn_logs = deque(maxlen=MAX_TURN_LOGS)
         self.turn_counter = 0
         
-        # Type mixture history (last 50 turns)
-        self.type_mixture_history = []
+        # Type mixture history (last 50 turns) + rolling drift window
+        self.type_mixture_history = deque(maxlen=MIXTURE_HISTORY)
+        self._mixture_window = RollingWindow(AGGREGATE_WINDOW, 4)
         
-        # Churn tracking
-        self.churn_history = []
+        # Churn tracking + rolling churn window
+        self.churn_history = deque(maxlen=CHURN_HISTORY)
+        self._churn_window = RollingWindow(AGGREGATE_WINDOW, 2)
+        
+        # Persistent turn log
+        self.sink = TelemetrySink(self.log_dir / SINK_FILENAME, sink_max_bytes, sink_backups) if persist else None
+        if self.sink is not None:
+            self._restore_from_sink()
         
         print("Fractal Telemetry Initialized")
         print(f"  Log directory: {self.log_dir}")
+        if self.turn_counter:
+            print(f"  Restored {len(self.turn_logs)} turns (turn counter: {self.turn_counter})")
+    
+    def _restore_from_sink(self):
+        """Rebuild the in-memory window and aggregates from the tail of the sink."""
+        for record in self.sink.tail(MAX_TURN_LOGS):
+            record = dict(record)
+            churn_supplied = record.pop('churn_supplied', None)
+            try:
+                turn_log = TurnTelemetry(**dict(
+                    record,
+                    budget_ledger=BudgetLedger(**record['budget_ledger']),
+                    top_10_spans_roi=[SpanROI(**span) for span in record['top_10_spans_roi']]
+                ))
+            except (KeyError, TypeError):
+                continue
+            self.turn_logs.append(turn_log)
+            self.turn_counter = max(self.turn_counter, turn_log.turn_id)
+            if turn_log.type_mixture_trace:
+                self._record_mixture(turn_log.type_mixture_trace[-1])
+            # log_turn only records churn the caller passed; the stored zeros stand in for none
+            if churn_supplied is None:
+                churn_supplied = any(turn_log.split_merge_churn.values())
+            if churn_supplied:
+                self._record_churn(turn_log.split_merge_churn)
+    
+    def _record_mixture(self, mixture_vector: List[float]):
+        self.type_mixture_history.append(mixture_vector)
+        self._mixture_window.push(mixture_vector)
+    
+    def _record_churn(self, churn: Dict[str, int]):
+        self.churn_history.append(churn)
+        self._churn_window.push([churn.get('splits', 0), churn.get('merges', 0)])
     
     def log_turn(self, query: str, policies: 'FractalPolicies',
                 allocation_telemetry: Dict, churn: Dict[str, int] = None) -> int:
@@ -109,18 +309,14 @@ class FractalTelemetry:
             mixture['creative'],
             mixture['retrieval']
         ]
-        self.type_mixture_history.append(mixture_vector)
-        if len(self.type_mixture_history) > 50:
-            self.type_mixture_history = self.type_mixture_history[-50:]
+        self._record_mixture(mixture_vector)
         
         # Calculate type-mix entropy (detect homogenization)
         mix_entropy = self._calculate_entropy(mixture_vector)
         
         # Track churn
         if churn:
-            self.churn_history.append(churn)
-            if len(self.churn_history) > 50:
-                self.churn_history = self.churn_history[-50:]
+            self._record_churn(churn)
         
         # Create telemetry record
         turn_log = TurnTelemetry(
@@ -131,17 +327,16 @@ class FractalTelemetry:
             policy_weights=policies.query_type_mixture,
             budget_ledger=budget_ledger,
             top_10_spans_roi=roi_data[:10],
-            type_mixture_trace=self.type_mixture_history[-10:],  # Last 10
+            type_mixture_trace=list(self._mixture_window.values),  # Last 10
             split_merge_churn=churn or {'splits': 0, 'merges': 0},
             decision_flip_audit=None,  # Populated in Week 5 testing
             factorian_metrics=None  # Populated when human eval available
         )
         
+        # Keep last 100 turns (deque evicts the oldest)
         self.turn_logs.append(turn_log)
-        
-        # Keep last 100 turns
-        if len(self.turn_logs) > 100:
-            self.turn_logs = self.turn_logs[-100:]
+        if self.sink is not None:
+            self.sink.write(dict(asdict(turn_log), churn_supplied=bool(churn)))
         
         # Check for anomalies
         self._check_anomalies(turn_log, mix_entropy)
@@ -255,33 +450,27 @@ class FractalTelemetry:
     
     def get_type_mixture_drift(self) -> Dict:
         """Analyze type mixture drift over time."""
-        if len(self.type_mixture_history) < 10:
+        if not self._mixture_window.full:
             return {'drift': 'insufficient_data'}
         
-        recent_10 = self.type_mixture_history[-10:]
-        
-        # Calculate variance per type
-        import numpy as np
-        variance_per_type = np.var(recent_10, axis=0)
+        # Variance per type over the last 10 turns (running sums)
+        variance_per_type = self._mixture_window.variance()
         
         return {
-            'pattern_variance': float(variance_per_type[0]),
-            'logic_variance': float(variance_per_type[1]),
-            'creative_variance': float(variance_per_type[2]),
-            'retrieval_variance': float(variance_per_type[3]),
-            'total_variance': float(np.sum(variance_per_type)),
+            'pattern_variance': variance_per_type[0],
+            'logic_variance': variance_per_type[1],
+            'creative_variance': variance_per_type[2],
+            'retrieval_variance': variance_per_type[3],
+            'total_variance': sum(variance_per_type),
             'interpretation': 'High variance = unstable, Low = stable or drifting'
         }
     
     def get_churn_statistics(self) -> Dict:
         """Get split/merge churn statistics."""
-        if not self.churn_history:
+        if not len(self._churn_window):
             return {'churn': 'no_data'}
         
-        recent = self.churn_history[-10:]
-        
-        avg_splits = sum(c['splits'] for c in recent) / len(recent)
-        avg_merges = sum(c['merges'] for c in recent) / len(recent)
+        avg_splits, avg_merges = self._churn_window.mean()
         
         return {
             'avg_splits_per_turn': avg_splits,
@@ -291,7 +480,12 @@ class FractalTelemetry:
         }
     
     def export_logs(self, filename: str = "fractal_telemetry.json"):
-        """Export logs to JSON for analysis."""
+        """
+        Export the recent window to JSON for analysis.
+        
+        Full history is already on disk in the sink files (listed under
+        'history_files'), so the export stays bounded by the window size.
+        """
         output_path = self.log_dir / filename
         
         with open(output_path, 'w') as f:
@@ -299,7 +493,8 @@ class FractalTelemetry:
                 'turn_count': self.turn_counter,
                 'turns': [asdict(log) for log in self.turn_logs],
                 'type_mixture_drift': self.get_type_mixture_drift(),
-                'churn_statistics': self.get_churn_statistics()
+                'churn_statistics': self.get_churn_statistics(),
+                'history_files': [str(p) for p in self.sink.files()] if self.sink is not None else []
             }, f, indent=2)
         
         print(f"Telemetry exported to: {output_path}")
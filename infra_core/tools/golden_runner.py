@@ -9,6 +9,8 @@ import os
 import json
 import time
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
@@ -24,6 +26,14 @@ except ImportError:
     AIOS_AVAILABLE = False
     print("⚠️ AIOS system not available")
 
+# Latency statistics and offline stub model (script or package import)
+try:
+    from latency_stats import LatencyHistogram, bootstrap_ci, percentiles
+    from stub_model import StubLuna
+except ImportError:
+    from infra_core.tools.latency_stats import LatencyHistogram, bootstrap_ci, percentiles
+    from infra_core.tools.stub_model import StubLuna
+
 # Import provenance
 try:
     from utils_core.provenance import ProvenanceLogger, log_response_event
@@ -36,12 +46,31 @@ class GoldenRunner:
     Golden test runner for regression detection
     """
     
-    def __init__(self, output_dir: str = "data_core/goldens"):
+    def __init__(self,
+                 output_dir: str = "data_core/goldens",
+                 concurrency: int = 1,
+                 warmup: int = 0,
+                 stream: bool = False,
+                 use_stub: bool = False,
+                 n_resamples: int = 2000,
+                 confidence: float = 0.95):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Initialize AIOS and Luna
-        if AIOS_AVAILABLE:
+        # Run configuration
+        self.concurrency = max(1, concurrency)
+        self.warmup = max(0, warmup)
+        self.stream = stream
+        self.use_stub = use_stub
+        self.n_resamples = n_resamples
+        self.confidence = confidence
+        self._log_lock = threading.Lock()
+        
+        # Initialize AIOS and Luna (or the deterministic stub for offline CI)
+        if use_stub:
+            self.aios = None
+            self.luna = StubLuna()
+        elif AIOS_AVAILABLE:
             self.aios = AIOSClean()
             # Use _get_system to lazy load luna
             self.luna = self.aios._get_system('luna')
@@ -76,20 +105,21 @@ class GoldenRunner:
             'tests': []
         }
         
-        # Run each golden test
-        for i, golden in enumerate(goldens):
-            print(f"\n🧪 Test {i+1}/{len(goldens)}: {golden['id']}")
-            
-            test_result = self._run_golden_test(golden)
-            results['tests'].append(test_result)
-            
-            # Print summary
-            if 'error' in test_result:
-                print(f"   ❌ Error: {test_result['error']}")
-            else:
-                print(f"   ✅ Completed in {test_result['latency_ms']:.0f}ms")
-                print(f"   Source: {test_result['source']}")
-                print(f"   Response: {test_result['response'][:50]}...")
+        results['run_config'] = {
+            'concurrency': self.concurrency,
+            'warmup': self.warmup,
+            'stream': self.stream,
+            'stub': self.use_stub
+        }
+        
+        # Warmup runs (not recorded) so model load and caches don't skew latency
+        if self.warmup and goldens:
+            print(f"🔥 Warming up with {self.warmup} run(s)")
+            for i in range(self.warmup):
+                self._run_golden_test(goldens[i % len(goldens)], log=False)
+        
+        # Run golden tests with a bounded number in flight
+        results['tests'] = self._run_goldens(goldens)
         
         # Calculate summary stats
         results['summary'] = self._calculate_summary(results['tests'])
@@ -105,6 +135,8 @@ class GoldenRunner:
         # Only print detailed stats if we have valid tests
         if results['summary']['total'] > 0:
             print(f"   Avg latency: {results['summary']['avg_latency_ms']:.0f}ms")
+            print(f"   p50/p90/p99: {results['summary']['p50_latency_ms']:.0f}/"
+                  f"{results['summary']['p90_latency_ms']:.0f}/{results['summary']['p99_latency_ms']:.0f}ms")
             print(f"   Main model: {results['summary']['main_model_count']} ({results['summary']['main_model_percent']:.1f}%)")
             print(f"   Embedder: {results['summary']['embedder_count']} ({results['summary']['embedder_percent']:.1f}%)")
         else:
@@ -117,10 +149,15 @@ class GoldenRunner:
         """
         Compare current performance to baseline
         
+        Latency is compared with a bootstrap confidence interval on the relative
+        change in mean latency: a regression needs the whole interval above zero
+        (statistically significant) and the point estimate above threshold
+        (practically significant).
+        
         Args:
             golden_set: Path to JSON file with golden prompts
             baseline_file: Path to baseline results
-            threshold: Regression threshold (0.1 = 10%)
+            threshold: Minimum relative change that counts (0.1 = 10%)
         
         Returns:
             Dictionary with comparison results
@@ -139,6 +176,7 @@ class GoldenRunner:
             'timestamp': datetime.now().isoformat(),
             'baseline_timestamp': baseline['timestamp'],
             'regression_threshold': threshold,
+            'confidence': self.confidence,
             'regressions_detected': [],
             'improvements_detected': [],
             'status': 'PASS'
@@ -160,16 +198,34 @@ class GoldenRunner:
         current_latency = current['summary']['avg_latency_ms']
         latency_change = (current_latency - baseline_latency) / baseline_latency
         
-        if latency_change > threshold:
-            comparison['regressions_detected'].append({
+        baseline_samples = self._latency_samples(baseline['tests'])
+        current_samples = self._latency_samples(current['tests'])
+        
+        if len(baseline_samples) >= 2 and len(current_samples) >= 2:
+            ci = bootstrap_ci(baseline_samples, current_samples,
+                              n_resamples=self.n_resamples, confidence=self.confidence)
+            comparison['latency_ci'] = ci
+            is_regression = ci['ci_low'] > 0 and ci['estimate'] > threshold
+            is_improvement = ci['ci_high'] < 0 and ci['estimate'] < -threshold
+        else:
+            # Too few samples to resample - fall back to the plain threshold
+            ci = None
+            is_regression = latency_change > threshold
+            is_improvement = latency_change < -threshold
+        
+        if is_regression:
+            regression = {
                 'metric': 'avg_latency_ms',
                 'baseline': baseline_latency,
                 'current': current_latency,
                 'change_percent': latency_change * 100,
                 'threshold_percent': threshold * 100
-            })
+            }
+            if ci:
+                regression['ci_percent'] = [ci['ci_low'] * 100, ci['ci_high'] * 100]
+            comparison['regressions_detected'].append(regression)
             comparison['status'] = 'FAIL'
-        elif latency_change < -threshold:
+        elif is_improvement:
             comparison['improvements_detected'].append({
                 'metric': 'avg_latency_ms',
                 'baseline': baseline_latency,
@@ -194,15 +250,19 @@ class GoldenRunner:
         
         # Add metrics for SLO monitoring
         # Extract latencies from current test results
-        current_latencies = [t['latency_ms'] for t in current['tests'] if 'error' not in t and 'latency_ms' in t]
-        sorted_latencies = sorted(current_latencies) if current_latencies else []
+        current_percentiles = percentiles(current_samples, (50, 90, 95, 99))
         
         comparison['metrics'] = {
             'pass_rate': 1.0 if comparison['status'] == 'PASS' else 0.0,
-            'p50_ms': sorted_latencies[len(sorted_latencies)//2] if sorted_latencies else 0.0,
-            'p95_ms': sorted_latencies[int(len(sorted_latencies)*0.95)] if sorted_latencies else 0.0,
+            'p50_ms': current_percentiles['p50_ms'],
+            'p90_ms': current_percentiles['p90_ms'],
+            'p95_ms': current_percentiles['p95_ms'],
+            'p99_ms': current_percentiles['p99_ms'],
             'mean_ms': current_latency if current['summary']['total'] > 0 else 0.0
         }
+        if 'ttft_histogram' in current['summary']:
+            comparison['metrics']['ttft_p50_ms'] = current['summary']['ttft_histogram'].get('p50_ms', 0.0)
+            comparison['metrics']['ttft_p99_ms'] = current['summary']['ttft_histogram'].get('p99_ms', 0.0)
         
         # Print results
         self._print_comparison(comparison)
@@ -214,7 +274,54 @@ class GoldenRunner:
         
         return comparison
     
-    def _run_golden_test(self, golden: Dict[str, Any]) -> Dict[str, Any]:
+    def _run_goldens(self, goldens: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run golden tests with at most `concurrency` in flight, preserving input order"""
+        test_results: List[Optional[Dict[str, Any]]] = [None] * len(goldens)
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(self._run_golden_test, golden): i for i, golden in enumerate(goldens)}
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                test_result = future.result()
+                test_results[i] = test_result
+                
+                print(f"\n🧪 Test {done}/{len(goldens)}: {goldens[i]['id']}")
+                if 'error' in test_result:
+                    print(f"   ❌ Error: {test_result['error']}")
+                else:
+                    print(f"   ✅ Completed in {test_result['latency_ms']:.0f}ms")
+                    print(f"   Source: {test_result['source']}")
+                    print(f"   Response: {test_result['response'][:50]}...")
+        
+        return test_results
+    
+    def _invoke_model(self, golden: Dict[str, Any]):
+        """Call the model, streaming when requested; returns (response, metadata, ttft_ms)"""
+        impl = self.luna.python_impl
+        question = golden['question']
+        trait = golden.get('trait', 'general')
+        
+        if self.stream and hasattr(impl, 'stream_question'):
+            start_time = time.perf_counter()
+            ttft_ms = None
+            chunks = []
+            response, metadata = None, {}
+            for event in impl.stream_question(question, trait):
+                if event.get('event') == 'token':
+                    if ttft_ms is None:
+                        ttft_ms = (time.perf_counter() - start_time) * 1000
+                    chunks.append(event.get('text', ''))
+                elif event.get('event') == 'done':
+                    response = event.get('response')
+                    metadata = event.get('metadata') or {}
+            if response is None:
+                response = ''.join(chunks)
+            return response, metadata, ttft_ms
+        
+        response, metadata = impl.process_question(question, trait)
+        return response, metadata or {}, None
+    
+    def _run_golden_test(self, golden: Dict[str, Any], log: bool = True) -> Dict[str, Any]:
         """Run a single golden test"""
         if not self.luna:
             return {
@@ -227,12 +334,7 @@ class GoldenRunner:
         start_time = time.perf_counter()
         
         try:
-            print(f"   DEBUG: Calling python_impl.process_question with question: {type(golden['question'])}, trait: {type(golden.get('trait', 'general'))}")
-            response, metadata = self.luna.python_impl.process_question(
-                golden['question'],
-                golden.get('trait', 'general')
-            )
-            print(f"   DEBUG: Got response: {type(response)}, metadata: {type(metadata)}")
+            response, metadata, ttft_ms = self._invoke_model(golden)
         except Exception as e:
             print(f"   ❌ Error: {e}")
             return {
@@ -252,25 +354,29 @@ class GoldenRunner:
             'response': response,
             'latency_ms': latency_ms,
             'source': metadata.get('source', 'unknown'),
+            'model': metadata.get('model', 'unknown'),
             'tier': metadata.get('tier', 'unknown'),
             'response_type': metadata.get('response_type', 'unknown'),
             'response_length': len(response),
             'timestamp': datetime.now().isoformat()
         }
+        if ttft_ms is not None:
+            result['ttft_ms'] = ttft_ms
         
         # Log to provenance if available
-        if self.prov_logger:
-            log_response_event(
-                self.prov_logger,
-                conv_id=f"golden_{golden['id']}",
-                msg_id=1,
-                question=golden['question'],
-                trait=golden.get('trait', 'balanced'),
-                response=response,
-                meta={'source': metadata.get('source'), 'tier': metadata.get('tier'), 'response_type': metadata.get('response_type')},
-                carma={'fragments_found': 0},  # Goldens don't use CARMA
-                math_weights={'latency_ms': latency_ms}
-            )
+        if self.prov_logger and log:
+            with self._log_lock:
+                log_response_event(
+                    self.prov_logger,
+                    conv_id=f"golden_{golden['id']}",
+                    msg_id=1,
+                    question=golden['question'],
+                    trait=golden.get('trait', 'balanced'),
+                    response=response,
+                    meta={'source': metadata.get('source'), 'tier': metadata.get('tier'), 'response_type': metadata.get('response_type')},
+                    carma={'fragments_found': 0},  # Goldens don't use CARMA
+                    math_weights={'latency_ms': latency_ms}
+                )
         
         return result
     
@@ -287,17 +393,45 @@ class GoldenRunner:
         main_model_count = sum(1 for s in sources if s == 'main_model')
         embedder_count = sum(1 for s in sources if s == 'embedder')
         
-        return {
+        exact = percentiles(latencies)
+        
+        # HDR-style histograms overall, per source and per model
+        by_source: Dict[str, LatencyHistogram] = {}
+        by_model: Dict[str, LatencyHistogram] = {}
+        ttft = LatencyHistogram()
+        for t in valid_tests:
+            by_source.setdefault(t['source'], LatencyHistogram()).record(t['latency_ms'])
+            by_model.setdefault(t.get('model', 'unknown'), LatencyHistogram()).record(t['latency_ms'])
+            if t.get('ttft_ms') is not None:
+                ttft.record(t['ttft_ms'])
+        
+        summary = {
             'total': len(valid_tests),
             'errors': len(tests) - len(valid_tests),
             'avg_latency_ms': sum(latencies) / len(latencies),
             'min_latency_ms': min(latencies),
             'max_latency_ms': max(latencies),
+            'p50_latency_ms': exact['p50_ms'],
+            'p90_latency_ms': exact['p90_ms'],
+            'p99_latency_ms': exact['p99_ms'],
             'main_model_count': main_model_count,
             'embedder_count': embedder_count,
             'main_model_percent': (main_model_count / len(valid_tests)) * 100 if valid_tests else 0,
-            'embedder_percent': (embedder_count / len(valid_tests)) * 100 if valid_tests else 0
+            'embedder_percent': (embedder_count / len(valid_tests)) * 100 if valid_tests else 0,
+            'latency_histograms': {
+                'overall': LatencyHistogram.from_samples(latencies).to_dict(),
+                'by_source': {k: h.to_dict() for k, h in by_source.items()},
+                'by_model': {k: h.to_dict() for k, h in by_model.items()}
+            }
         }
+        if ttft.count:
+            summary['ttft_histogram'] = ttft.to_dict()
+        
+        return summary
+    
+    def _latency_samples(self, tests: List[Dict[str, Any]]) -> List[float]:
+        """Per-test latencies from a results list"""
+        return [t['latency_ms'] for t in tests if 'error' not in t and 'latency_ms' in t]
     
     def _print_comparison(self, comparison: Dict[str, Any]):
         """Print comparison results"""
@@ -308,6 +442,11 @@ class GoldenRunner:
         print(f"\nStatus: {comparison['status']}")
         print(f"Regression Threshold: {comparison['regression_threshold'] * 100}%")
         
+        if 'latency_ci' in comparison:
+            ci = comparison['latency_ci']
+            print(f"Latency change: {ci['estimate'] * 100:+.1f}% "
+                  f"({ci['confidence'] * 100:.0f}% CI {ci['ci_low'] * 100:+.1f}% .. {ci['ci_high'] * 100:+.1f}%)")
+        
         if comparison['regressions_detected']:
             print(f"\n❌ REGRESSIONS DETECTED ({len(comparison['regressions_detected'])}):")
             for reg in comparison['regressions_detected']:
@@ -337,17 +476,26 @@ def main():
     parser = argparse.ArgumentParser(description='Golden Test Runner')
     subparsers = parser.add_subparsers(dest='command', help='Commands')
     
+    # Options shared by record and compare
+    run_parser = argparse.ArgumentParser(add_help=False)
+    run_parser.add_argument('--concurrency', type=int, default=1, help='Max golden tests in flight (default: 1)')
+    run_parser.add_argument('--warmup', type=int, default=0, help='Unrecorded warmup runs (default: 0)')
+    run_parser.add_argument('--stream', action='store_true', help='Use streaming calls and record TTFT')
+    run_parser.add_argument('--stub', action='store_true', help='Run against the deterministic offline stub model')
+    
     # Record command
-    record_parser = subparsers.add_parser('record', help='Record baseline')
+    record_parser = subparsers.add_parser('record', help='Record baseline', parents=[run_parser])
     record_parser.add_argument('--set', required=True, help='Golden set JSON file')
     record_parser.add_argument('--out', required=True, help='Output file for results')
     
     # Compare command
-    compare_parser = subparsers.add_parser('compare', help='Compare to baseline')
+    compare_parser = subparsers.add_parser('compare', help='Compare to baseline', parents=[run_parser])
     compare_parser.add_argument('--set', required=True, help='Golden set JSON file')
     compare_parser.add_argument('--baseline', required=True, help='Baseline results file')
     compare_parser.add_argument('--threshold', type=float, default=0.1, help='Regression threshold (default: 0.1 = 10%)')
     compare_parser.add_argument('--out', help='Output file for comparison results (default: data_core/goldens/last_report.json)')
+    compare_parser.add_argument('--confidence', type=float, default=0.95, help='Bootstrap confidence level (default: 0.95)')
+    compare_parser.add_argument('--resamples', type=int, default=2000, help='Bootstrap resamples (default: 2000)')
     
     args = parser.parse_args()
     
@@ -356,7 +504,14 @@ def main():
         return
     
     # Create runner
-    runner = GoldenRunner()
+    runner = GoldenRunner(
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        stream=args.stream,
+        use_stub=args.stub,
+        n_resamples=getattr(args, 'resamples', 2000),
+        confidence=getattr(args, 'confidence', 0.95)
+    )
     
     if args.command == 'record':
         runner.record_baseline(args.set, args.out)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Latency Statistics
+HDR-style latency histograms and bootstrap confidence intervals for CI gates
+"""
+
+import math
+import random
+from typing import Dict, Any, Optional, Sequence, Tuple
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram
+
+    Values are bucketed on a log scale with a fixed number of significant
+    digits, so memory stays constant regardless of sample count while
+    percentiles keep a bounded relative error.
+    """
+
+    def __init__(self, significant_digits: int = 2, lowest_ms: float = 0.001):
+        self.significant_digits = significant_digits
+        self.lowest_ms = lowest_ms
+        # Buckets per power of ten (2 digits -> ~1% relative error)
+        self._buckets_per_decade = 10 ** significant_digits
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = float('inf')
+        self.max_ms = 0.0
+
+    def _bucket(self, value_ms: float) -> int:
+        value_ms = max(value_ms, self.lowest_ms)
+        return int(math.floor(math.log10(value_ms / self.lowest_ms) * self._buckets_per_decade))
+
+    def _bucket_value(self, bucket: int) -> float:
+        # Upper edge of the bucket, like HdrHistogram's highestEquivalentValue
+        return self.lowest_ms * 10 ** ((bucket + 1) / self._buckets_per_decade)
+
+    def record(self, value_ms: float):
+        """Record a single latency sample in milliseconds"""
+        bucket = self._bucket(value_ms)
+        self._counts[bucket] = self._counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.min_ms = min(self.min_ms, value_ms)
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Merge another histogram with the same resolution into this one"""
+        for bucket, count in other._counts.items():
+            self._counts[bucket] = self._counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.min_ms = min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, p: float) -> float:
+        """Value at percentile p (0-100), clamped to the observed range"""
+        if self.count == 0:
+            return 0.0
+        target = max(1, int(math.ceil(self.count * p / 100.0)))
+        seen = 0
+        for bucket in sorted(self._counts):
+            seen += self._counts[bucket]
+            if seen >= target:
+                return min(max(self._bucket_value(bucket), self.min_ms), self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary suitable for JSON reports"""
+        if self.count == 0:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count,
+            'min_ms': self.min_ms,
+            'max_ms': self.max_ms,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99)
+        }
+
+    @classmethod
+    def from_samples(cls, samples: Sequence[float], significant_digits: int = 2) -> 'LatencyHistogram':
+        """Build a histogram from a list of samples"""
+        histogram = cls(significant_digits=significant_digits)
+        for sample in samples:
+            histogram.record(sample)
+        return histogram
+
+
+def bootstrap_ci(baseline: Sequence[float],
+                 current: Sequence[float],
+                 statistic: str = 'mean',
+                 n_resamples: int = 2000,
+                 confidence: float = 0.95,
+                 seed: Optional[int] = 0) -> Dict[str, Any]:
+    """
+    Bootstrap confidence interval for the relative change current vs baseline
+
+    Args:
+        baseline: Baseline samples
+        current: Current samples
+        statistic: 'mean' or 'median'
+        n_resamples: Number of bootstrap resamples
+        confidence: Confidence level (0.95 = 95%)
+        seed: RNG seed so CI runs are reproducible
+
+    Returns:
+        Dictionary with point estimate and CI bounds of (current - baseline) / baseline
+    """
+    if not baseline or not current:
+        return {'estimate': 0.0, 'ci_low': 0.0, 'ci_high': 0.0, 'n_resamples': 0}
+
+    stat = _median if statistic == 'median' else _mean
+    rng = random.Random(seed)
+
+    def relative_change(b: Sequence[float], c: Sequence[float]) -> float:
+        b_stat = stat(b)
+        if b_stat == 0:
+            return 0.0
+        return (stat(c) - b_stat) / b_stat
+
+    deltas = []
+    nb, nc = len(baseline), len(current)
+    for _ in range(n_resamples):
+        b_sample = [baseline[rng.randrange(nb)] for _ in range(nb)]
+        c_sample = [current[rng.randrange(nc)] for _ in range(nc)]
+        deltas.append(relative_change(b_sample, c_sample))
+    deltas.sort()
+
+    alpha = (1.0 - confidence) / 2.0
+    low_idx = int(math.floor(alpha * (n_resamples - 1)))
+    high_idx = int(math.ceil((1.0 - alpha) * (n_resamples - 1)))
+
+    return {
+        'statistic': statistic,
+        'estimate': relative_change(baseline, current),
+        'ci_low': deltas[low_idx],
+        'ci_high': deltas[high_idx],
+        'confidence': confidence,
+        'n_resamples': n_resamples
+    }
+
+
+def percentiles(samples: Sequence[float], points: Tuple[float, ...] = (50, 90, 99)) -> Dict[str, float]:
+    """Exact nearest-rank percentiles for small sample sets"""
+    ordered = sorted(samples)
+    result = {}
+    for p in points:
+        key = f"p{int(p)}_ms"
+        if not ordered:
+            result[key] = 0.0
+            continue
+        rank = max(1, int(math.ceil(len(ordered) * p / 100.0)))
+        result[key] = ordered[rank - 1]
+    return result
+
+
+def _mean(values: Sequence[float]) -> float:
+    return sum(values) / len(values)
+
+
+def _median(values: Sequence[float]) -> float:
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[mid]
+    return (ordered[mid - 1] + ordered[mid]) / 2.0
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+CARMA Retrieval Benchmark
+Times each retrieval stage (embed, fragment search, conversation search, policy apply)
+on synthetic corpora at configurable scales, sweeps k for recall curves and
+emits machine-readable results that can gate regressions in CI
+"""
+
+import json
+import sys
+import time
+import hashlib
+import tempfile
+import argparse
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+from datetime import datetime
+
+import numpy as np
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from latency_stats import LatencyHistogram
+except ImportError:
+    from infra_core.tools.latency_stats import LatencyHistogram
+
+STAGES = ('embed', 'fragment_search', 'conversation_search', 'policy_apply')
+
+
+def hash_embed(text: str, dim: int = 64) -> List[float]:
+    """Deterministic offline embedder (token hashing) used for the embed stage"""
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in text.lower().split():
+        digest = int(hashlib.md5(token.encode('utf-8')).hexdigest()[:8], 16)
+        vector[digest % dim] += 1.0 if digest & 1 else -1.0
+    return vector.tolist()
+
+
+def time_stages(target, query: str, topk: int, query_embedding: Optional[List[float]] = None) -> Tuple[Dict[str, float], List[str]]:
+    """
+    Run one query through every stage of `target`, timing each separately
+
+    Args:
+        target: Object exposing embed / fragment_search / conversation_search / policy_apply
+        query: Query text
+        topk: Number of fragments to retrieve
+        query_embedding: Use this vector for search instead of the embed stage output
+
+    Returns:
+        (stage timings in ms, retrieved fragment ids)
+    """
+    timings = {}
+
+    t0 = time.perf_counter()
+    embedding = target.embed(query)
+    timings['embed'] = (time.perf_counter() - t0) * 1000
+    if query_embedding is not None:
+        embedding = query_embedding
+
+    t0 = time.perf_counter()
+    retrieved = target.fragment_search(embedding, topk)
+    timings['fragment_search'] = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    target.conversation_search(query, embedding, 3)
+    timings['conversation_search'] = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    target.policy_apply()
+    timings['policy_apply'] = (time.perf_counter() - t0) * 1000
+
+    return timings, retrieved
+
+
+class CARMAStageTarget:
+    """
+    Stage-by-stage view of a live CARMASystem
+
+    Mirrors what process_query does, minus response generation and
+    get_comprehensive_stats, so each stage can be timed on its own.
+    """
+
+    backend = 'carma_live'
+
+    def __init__(self, carma):
+        self.carma = carma
+
+    def embed(self, query: str):
+        return self.carma.cache.embedder.embed(query)
+
+    def fragment_search(self, embedding, topk: int) -> List[str]:
+        return [f.id for f in self.carma.cache.find_relevant(embedding, topk=topk)]
+
+    def conversation_search(self, query: str, embedding, topk: int) -> int:
+        return len(self.carma._find_conversation_memories(query, embedding, topk=topk))
+
+    def policy_apply(self):
+        policies = self.carma.current_policies
+        if policies and hasattr(policies, 'memory_policy'):
+            self.carma.cache.apply_policy(policies.memory_policy)
+
+
+class SyntheticStageTarget:
+    """
+    Stage target over a synthetic corpus
+
+    backend='carma' (default) runs CARMA's own FractalCache.find_relevant /
+    apply_policy over the synthetic registry (needs fractal_core importable).
+    backend='reference' is NOT CARMA code: it searches a normalized NumPy
+    matrix, as a lower bound for comparison and for 1M-fragment corpora.
+    """
+
+    def __init__(self, corpus: Dict[str, Any], backend: str = 'carma'):
+        self.corpus = corpus
+        self.dim = corpus['dim']
+        self.backend = backend
+        self.cache = None
+        self.policy = None
+        self._cache_dir = None
+
+        if backend == 'carma':
+            self.cache, self.policy = self._build_carma_cache(corpus)
+
+        # Reference structures (also used for conversation search in both backends)
+        self.ids = corpus['ids']
+        self.matrix = self._normalize(corpus['embeddings'])
+        self.conv_matrix = self._normalize(corpus['conversation_embeddings'])
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32)
+
+    def _build_carma_cache(self, corpus: Dict[str, Any]):
+        from fractal_core.core.fractal_cache import FractalCache
+        from fractal_core.core.fractal_controller import MemoryPolicy
+
+        # Real FractalCache in a throwaway directory, then loaded with the synthetic registry
+        self._cache_dir = tempfile.TemporaryDirectory(prefix='retrieval_bench_')
+        cache = FractalCache(base_dir=self._cache_dir.name)
+        cache.file_registry = {
+            frag_id: {
+                'file_id': frag_id,
+                'content': content,
+                'parent_id': None,
+                'level': 0,
+                'hits': 0,
+                'embedding': embedding.tolist()
+            }
+            for frag_id, content, embedding in zip(corpus['ids'], corpus['contents'], corpus['embeddings'])
+        }
+        cache.metrics['total_fragments'] = len(cache.file_registry)
+        policy = MemoryPolicy(cache_depth=3, split_threshold=1.01, merge_threshold=0.9,
+                              compression_ratio_target=0.5)
+        return cache, policy
+
+    def close(self):
+        if self._cache_dir is not None:
+            self._cache_dir.cleanup()
+            self._cache_dir = None
+
+    def embed(self, query: str):
+        return hash_embed(query, self.dim)
+
+    def fragment_search(self, embedding, topk: int) -> List[str]:
+        if self.cache is not None:
+            return [f.id for f in self.cache.find_relevant(list(embedding), topk=topk)]
+
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        scores = self.matrix @ (query / norm)
+        topk = min(topk, len(scores))
+        top = np.argpartition(-scores, topk - 1)[:topk]
+        top = top[np.argsort(-scores[top])]
+        return [self.ids[i] for i in top]
+
+    def conversation_search(self, query: str, embedding, topk: int) -> int:
+        # Same relevance rule as CARMASystem._find_conversation_memories (cosine > 0.3)
+        query_vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query_vec)
+        if norm == 0 or len(self.conv_matrix) == 0:
+            return 0
+        scores = self.conv_matrix @ (query_vec / norm)
+        return int(min(topk, np.count_nonzero(scores > 0.3)))
+
+    def policy_apply(self):
+        if self.cache is not None:
+            self.cache.apply_policy(self.policy)
+
+
+class RetrievalBenchmark:
+    """
+    Retrieval benchmark over synthetic corpora
+
+    Each query has a planted set of relevant fragments (perturbations of the
+    query vector at varying noise, set size drawn from min_relevant..max_relevant)
+    plus hard distractors (noisier perturbations that are not relevant),
+    hidden among topic-clustered background fragments, so recall@k is well
+    defined at any scale and does not saturate at k = set size.
+    """
+
+    def __init__(self,
+                 output_dir: str = 'data_core/retrieval_bench',
+                 dim: int = 64,
+                 n_queries: int = 20,
+                 min_relevant: int = 1,
+                 max_relevant: int = 8,
+                 distractors_per_query: int = 10,
+                 n_conversation_messages: int = 500,
+                 seed: int = 0,
+                 backend: str = 'carma'):
+        self.output_dir = Path(output_dir)
+        self.dim = dim
+        self.n_queries = n_queries
+        self.min_relevant = max(1, min_relevant)
+        self.max_relevant = max(self.min_relevant, max_relevant)
+        self.distractors_per_query = distractors_per_query
+        self.n_conversation_messages = n_conversation_messages
+        self.seed = seed
+        self.backend = backend
+
+    def generate_corpus(self, n_fragments: int) -> Dict[str, Any]:
+        """Generate a synthetic fragment corpus with planted relevant sets and distractors"""
+        rng = np.random.default_rng(self.seed + n_fragments)
+        n_topics = max(8, n_fragments // 500)
+
+        centroids = rng.standard_normal((n_topics, self.dim)).astype(np.float32)
+        topics = rng.integers(0, n_topics, size=n_fragments)
+        embeddings = centroids[topics] + 0.8 * rng.standard_normal((n_fragments, self.dim)).astype(np.float32)
+
+        queries = []
+        sizes = rng.integers(self.min_relevant, self.max_relevant + 1, size=self.n_queries)
+        per_query = sizes + self.distractors_per_query
+        n_planted = min(int(per_query.sum()), n_fragments)
+        planted_slots = rng.choice(n_fragments, size=n_planted, replace=False)
+        offset = 0
+        for q in range(self.n_queries):
+            slots = planted_slots[offset:offset + per_query[q]]
+            offset += per_query[q]
+            relevant, distractors = slots[:sizes[q]], slots[sizes[q]:]
+            if len(relevant) == 0:
+                break
+            query_vec = rng.standard_normal(self.dim).astype(np.float32) * 2.0
+            # Relevant: noise 0.3-1.0 x; distractors: 0.8-1.6 x, so the rankings interleave
+            noise = rng.uniform(0.3, 1.0, size=(len(relevant), 1)).astype(np.float32)
+            embeddings[relevant] = query_vec + noise * rng.standard_normal((len(relevant), self.dim)).astype(np.float32)
+            if len(distractors):
+                noise = rng.uniform(0.8, 1.6, size=(len(distractors), 1)).astype(np.float32)
+                embeddings[distractors] = query_vec + noise * rng.standard_normal(
+                    (len(distractors), self.dim)).astype(np.float32)
+            queries.append({
+                'id': f"q_{q + 1}",
+                'question': f"synthetic query {q + 1}",
+                'embedding': query_vec.tolist(),
+                'relevant': [f"frag_{i:07d}" for i in relevant]
+            })
+
+        conversation_embeddings = centroids[rng.integers(0, n_topics, size=self.n_conversation_messages)] + \
+            rng.standard_normal((self.n_conversation_messages, self.dim)).astype(np.float32)
+
+        return {
+            'dim': self.dim,
+            'ids': [f"frag_{i:07d}" for i in range(n_fragments)],
+            'contents': [f"synthetic fragment {i} topic {t}" for i, t in enumerate(topics)],
+            'embeddings': embeddings,
+            'conversation_embeddings': conversation_embeddings,
+            'queries': queries
+        }
+
+    def run_scale(self, n_fragments: int, k_values: Sequence[int], repeats: int = 1) -> Dict[str, Any]:
+        """Benchmark one corpus size, returning stage latencies and recall/precision curves"""
+        corpus = self.generate_corpus(n_fragments)
+        target = SyntheticStageTarget(corpus, backend=self.backend)
+        max_k = max(k_values)
+        try:
+            return self._measure(corpus, target, k_values, max_k, repeats)
+        finally:
+            target.close()
+
+    def _measure(self, corpus: Dict[str, Any], target: SyntheticStageTarget, k_values: Sequence[int],
+                 max_k: int, repeats: int) -> Dict[str, Any]:
+
+        histograms = {stage: LatencyHistogram() for stage in STAGES}
+        recall = {k: 0.0 for k in k_values}
+        precision = {k: 0.0 for k in k_values}
+
+        for _ in range(repeats):
+            for query in corpus['queries']:
+                timings, retrieved = time_stages(target, query['question'], max_k, query['embedding'])
+                for stage, ms in timings.items():
+                    histograms[stage].record(ms)
+
+                expected = set(query['relevant'])
+                for k in k_values:
+                    hits = len(expected.intersection(retrieved[:k]))
+                    recall[k] += hits / len(expected)
+                    precision[k] += hits / k
+
+        n = max(len(corpus['queries']) * repeats, 1)
+        return {
+            'fragments': len(corpus['ids']),
+            'backend': target.backend,
+            'measures_carma': target.backend == 'carma',
+            'queries': len(corpus['queries']),
+            'stages': {stage: h.to_dict() for stage, h in histograms.items()},
+            'recall_at_k': {str(k): recall[k] / n for k in k_values},
+            'precision_at_k': {str(k): precision[k] / n for k in k_values}
+        }
+
+    def run(self, scales: Sequence[int], k_values: Sequence[int], repeats: int = 1,
+            output_file: Optional[str] = None) -> Dict[str, Any]:
+        """Run the benchmark at every scale and save machine-readable results"""
+        print("=" * 70)
+        print("CARMA RETRIEVAL BENCHMARK")
+        print("=" * 70)
+        print(f"Scales: {list(scales)} | k: {list(k_values)} | backend: {self.backend}")
+        if self.backend == 'reference':
+            print("⚠️ Reference backend: NumPy matrix search, NOT CARMA code - numbers are a lower bound only")
+        print()
+
+        results = {
+            'timestamp': datetime.now().isoformat(),
+            'config': {
+                'dim': self.dim,
+                'n_queries': self.n_queries,
+                'relevant_per_query': [self.min_relevant, self.max_relevant],
+                'distractors_per_query': self.distractors_per_query,
+                'seed': self.seed,
+                'backend': self.backend,
+                'k_values': list(k_values),
+                'repeats': repeats
+            },
+            'scales': []
+        }
+
+        for n_fragments in scales:
+            scale_result = self.run_scale(n_fragments, k_values, repeats)
+            results['scales'].append(scale_result)
+
+            stages = scale_result['stages']
+            print(f"{n_fragments:>9} fragments | " + " | ".join(
+                f"{stage} p50={stages[stage].get('p50_ms', 0):.2f}ms" for stage in STAGES))
+            print(f"{'':>9}           | " + " ".join(
+                f"R@{k}={v:.2f}" for k, v in scale_result['recall_at_k'].items()))
+
+        if output_file is None:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            output_file = self.output_dir / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(output_file, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to: {output_file}")
+
+        return results
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    latency_threshold: float = 0.25, recall_tolerance: float = 0.02) -> Dict[str, Any]:
+    """
+    Compare benchmark results against a baseline run
+
+    A stage regresses when its p50 or p99 grows by more than latency_threshold
+    at the same scale; quality regresses when recall@k drops by more than
+    recall_tolerance.
+    """
+    baseline_scales = {s['fragments']: s for s in baseline.get('scales', [])}
+    comparison = {'status': 'PASS', 'regressions_detected': []}
+
+    for scale in current.get('scales', []):
+        base = baseline_scales.get(scale['fragments'])
+        if not base:
+            continue
+        for stage in STAGES:
+            for metric in ('p50_ms', 'p99_ms'):
+                cur_v = scale['stages'].get(stage, {}).get(metric)
+                base_v = base['stages'].get(stage, {}).get(metric)
+                if not cur_v or not base_v:
+                    continue
+                change = (cur_v - base_v) / base_v
+                if change > latency_threshold:
+                    comparison['regressions_detected'].append({
+                        'fragments': scale['fragments'], 'metric': f"{stage}.{metric}",
+                        'baseline': base_v, 'current': cur_v, 'change_percent': change * 100
+                    })
+        for k, cur_recall in scale['recall_at_k'].items():
+            base_recall = base['recall_at_k'].get(k)
+            if base_recall is not None and base_recall - cur_recall > recall_tolerance:
+                comparison['regressions_detected'].append({
+                    'fragments': scale['fragments'], 'metric': f"recall@{k}",
+                    'baseline': base_recall, 'current': cur_recall
+                })
+
+    if comparison['regressions_detected']:
+        comparison['status'] = 'FAIL'
+    return comparison
+
+
+def main():
+    """Main CLI"""
+    parser = argparse.ArgumentParser(description='CARMA Retrieval Benchmark')
+    subparsers = parser.add_subparsers(dest='command', help='Commands')
+
+    run_parser = subparsers.add_parser('run', help='Run benchmark')
+    run_parser.add_argument('--scales', type=int, nargs='+', default=[1000, 10000, 100000],
+                            help='Corpus sizes in fragments (default: 1000 10000 100000)')
+    run_parser.add_argument('--k', type=int, nargs='+', default=[1, 3, 5, 10], help='k values to sweep')
+    run_parser.add_argument('--queries', type=int, default=20, help='Queries per scale (default: 20)')
+    run_parser.add_argument('--repeats', type=int, default=1, help='Repeats per query (default: 1)')
+    run_parser.add_argument('--backend', choices=['carma', 'reference'], default='carma',
+                            help="'carma' (default) runs FractalCache code paths; 'reference' is a NumPy "
+                                 "matrix lower bound, not CARMA")
+    run_parser.add_argument('--out', help='Output JSON file')
+
+    gate_parser = subparsers.add_parser('gate', help='Fail on regression vs baseline')
+    gate_parser.add_argument('--current', required=True, help='Current results JSON')
+    gate_parser.add_argument('--baseline', required=True, help='Baseline results JSON')
+    gate_parser.add_argument('--threshold', type=float, default=0.25,
+                             help='Latency regression threshold (default: 0.25 = 25%%)')
+    gate_parser.add_argument('--recall-tolerance', type=float, default=0.02,
+                             help='Allowed recall@k drop (default: 0.02)')
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        return
+
+    if args.command == 'run':
+        bench = RetrievalBenchmark(n_queries=args.queries, backend=args.backend)
+        bench.run(args.scales, args.k, repeats=args.repeats, output_file=args.out)
+
+    elif args.command == 'gate':
+        with open(args.current, 'r') as f:
+            current = json.load(f)
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        comparison = compare_results(current, baseline, args.threshold, args.recall_tolerance)
+        for reg in comparison['regressions_detected']:
+            print(f"❌ {reg['fragments']} fragments - {reg['metric']}: {reg['baseline']:.3f} -> {reg['current']:.3f}")
+        if comparison['status'] == 'FAIL':
+            print("❌ CI FAIL: Retrieval regressions detected")
+            sys.exit(1)
+        print("✅ CI PASS: No retrieval regressions detected")
+
+
+if __name__ == "__main__":
+    main()
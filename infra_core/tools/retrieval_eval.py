@@ -13,6 +13,13 @@ from datetime import datetime
 # Add parent to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+try:
+    from latency_stats import LatencyHistogram
+    from retrieval_bench import CARMAStageTarget, STAGES, time_stages
+except ImportError:
+    from infra_core.tools.latency_stats import LatencyHistogram
+    from infra_core.tools.retrieval_bench import CARMAStageTarget, STAGES, time_stages
+
 
 class RetrievalEvaluator:
     """
@@ -58,11 +65,16 @@ class RetrievalEvaluator:
         """
         Evaluate CARMA retrieval against QA set
         
+        Each query is run stage by stage (embed, fragment search, conversation
+        search, policy apply) rather than through process_query, so stage
+        latencies are reported separately and response generation and
+        get_comprehensive_stats don't pollute the numbers.
+        
         Args:
             k: Number of top results to consider
         
         Returns:
-            Evaluation results with recall@k and precision@k
+            Evaluation results with recall@k, precision@k and per-stage latency
         """
         if not self.qa_set_file.exists():
             return {'error': 'QA set not found. Create one first with create_qa_set()'}
@@ -78,6 +90,8 @@ class RetrievalEvaluator:
             return {'error': 'CARMA system not available'}
         
         carma = CARMASystem()
+        target = CARMAStageTarget(carma)
+        stage_histograms = {stage: LatencyHistogram() for stage in STAGES}
         
         print("="*70)
         print(f"RETRIEVAL EVALUATION @ k={k}")
@@ -97,9 +111,10 @@ class RetrievalEvaluator:
         total_cases = 0
         
         for test_case in qa_set['test_cases']:
-            # Run query
-            query_result = carma.process_query(test_case['question'])
-            retrieved = query_result.get('fragments_found', [])[:k]
+            # Run query stage by stage
+            timings, retrieved = time_stages(target, test_case['question'], k)
+            for stage, ms in timings.items():
+                stage_histograms[stage].record(ms)
             expected = set(test_case['expected_fragments'])
             
             # Calculate metrics
@@ -122,6 +137,7 @@ class RetrievalEvaluator:
                     'hits': len(hits),
                     'recall': recall,
                     'precision': precision,
+                    'stage_latency_ms': timings,
                     'passed': recall >= test_case.get('min_recall', 0.8)
                 }
                 
@@ -137,6 +153,7 @@ class RetrievalEvaluator:
                 'precision_at_k': total_precision / total_cases,
                 'pass_rate': sum(1 for t in results['test_results'] if t['passed']) / total_cases
             }
+            results['stage_latency'] = {stage: h.to_dict() for stage, h in stage_histograms.items()}
             
             print("\n" + "="*70)
             print("AGGREGATE METRICS")
@@ -144,6 +161,8 @@ class RetrievalEvaluator:
             print(f"Recall@{k}: {results['metrics']['recall_at_k']:.3f}")
             print(f"Precision@{k}: {results['metrics']['precision_at_k']:.3f}")
             print(f"Pass rate: {results['metrics']['pass_rate']:.1%}")
+            for stage, stats in results['stage_latency'].items():
+                print(f"{stage}: p50={stats.get('p50_ms', 0):.1f}ms p99={stats.get('p99_ms', 0):.1f}ms")
             print("="*70)
         
         # Save results
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Deterministic Stub Model
+Offline stand-in for Luna so golden runs and benchmarks work in CI without LM Studio
+"""
+
+import hashlib
+import time
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+
+class StubLuna:
+    """
+    Deterministic stub exposing the same surface the golden runner uses
+
+    Responses, routing and simulated latency are all derived from a hash of
+    the question, so repeated runs produce identical results.
+    """
+
+    def __init__(self,
+                 base_latency_ms: float = 20.0,
+                 jitter_ms: float = 10.0,
+                 ttft_fraction: float = 0.2,
+                 simulate_latency: bool = True):
+        self.base_latency_ms = base_latency_ms
+        self.jitter_ms = jitter_ms
+        self.ttft_fraction = ttft_fraction
+        self.simulate_latency = simulate_latency
+        # Golden runner calls luna.python_impl.process_question
+        self.python_impl = self
+
+    def _digest(self, question: str, trait: str) -> int:
+        return int(hashlib.sha256(f"{trait}|{question}".encode('utf-8')).hexdigest()[:8], 16)
+
+    def _plan(self, question: str, trait: str) -> Tuple[str, Dict[str, Any], float]:
+        digest = self._digest(question, trait)
+        # Short prompts route to the embedder, like the real tier split
+        source = 'embedder' if len(question.split()) <= 4 else 'main_model'
+        model = 'stub-embedder' if source == 'embedder' else 'stub-main'
+        latency_ms = self.base_latency_ms + (digest % 1000) / 1000.0 * self.jitter_ms
+        if source == 'main_model':
+            latency_ms *= 2
+
+        words = ['stub', 'response', 'to', trait] + question.split()[:8]
+        response = ' '.join(words) + '.'
+        metadata = {
+            'source': source,
+            'model': model,
+            'tier': 'trivial' if source == 'embedder' else 'moderate',
+            'response_type': 'stub'
+        }
+        return response, metadata, latency_ms
+
+    def _sleep(self, ms: float):
+        if self.simulate_latency and ms > 0:
+            time.sleep(ms / 1000.0)
+
+    def process_question(self, question: str, trait: str = 'general',
+                         session_memory: Optional[list] = None) -> Tuple[str, Dict[str, Any]]:
+        """Return a deterministic (response, metadata) pair"""
+        response, metadata, latency_ms = self._plan(question, trait)
+        self._sleep(latency_ms)
+        return response, metadata
+
+    def stream_question(self, question: str, trait: str = 'general',
+                        session_memory: Optional[list] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a deterministic response as events
+
+        Yields {'event': 'token', 'text': ...} per word, then a final
+        {'event': 'done', 'response': ..., 'metadata': ...}.
+        """
+        response, metadata, latency_ms = self._plan(question, trait)
+        words = response.split(' ')
+        self._sleep(latency_ms * self.ttft_fraction)
+        per_token_ms = latency_ms * (1 - self.ttft_fraction) / max(len(words), 1)
+        for i, word in enumerate(words):
+            if i:
+                self._sleep(per_token_ms)
+            yield {'event': 'token', 'text': word if i == 0 else ' ' + word}
+        yield {'event': 'done', 'response': response, 'metadata': metadata}
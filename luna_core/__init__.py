@@ -105,11 +105,11 @@ def handle_command(args):
         return False  # Not for us
     
     try:
-        # Import the hybrid Luna system
-        from .hybrid_luna_core import HybridLunaCore
+        # Import the Luna system
+        from .core.luna_core import LunaSystem
         
         # Initialize Luna
-        luna = HybridLunaCore()
+        luna = LunaSystem()
         
         # Determine what action to take
         if '--chat' in args:
@@ -118,9 +118,18 @@ def handle_command(args):
             if chat_idx + 1 < len(args):
                 message = args[chat_idx + 1]
                 
-                # Generate response
-                response = luna.generate_response(message)
-                print(f"\n🌙 Luna: {response}\n")
+                # Stream the response as it is generated
+                print("\n🌙 Luna: ", end="", flush=True)
+                shown = ""
+                for event in luna.learning_chat_stream(message):
+                    if event['event'] == 'token':
+                        shown += event['text']
+                        print(event['text'], end="", flush=True)
+                    elif event['event'] == 'replace' and event['text'] != shown:
+                        # Final cleanup changed the text - reprint the corrected response
+                        shown = event['text']
+                        print(f"\n🌙 Luna: {shown}", end="", flush=True)
+                print("\n")
             else:
                 print("⚠️  Please provide a message after --chat")
                 print("   Example: python main.py --luna --chat 'hello'")
@@ -130,7 +139,7 @@ def handle_command(args):
             msg_idx = args.index('--message')
             if msg_idx + 1 < len(args):
                 message = args[msg_idx + 1]
-                response = luna.generate_response(message)
+                response = luna.learning_chat(message)
                 print(f"\n🌙 Luna: {response}\n")
             else:
                 print("⚠️  Please provide a message")
@@ -141,10 +150,15 @@ def handle_command(args):
             print("\nCommands:")
             print("  --luna --chat 'message'      Chat with Luna")
             print("  --luna --message 'text'      Send a message")
+            print("  --profile                    Show per-subsystem startup time")
             print("\nExamples:")
             print("  python main.py --luna --chat 'hello'")
             print("  python main.py --luna --message 'tell me about yourself'\n")
         
+        if '--profile' in args:
+            # Per-subsystem init time of whatever this command loaded
+            luna.print_startup_profile()
+        
         return True  # We handled it
         
     except Exception as e:
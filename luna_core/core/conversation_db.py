@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Luna Conversation DB
+Pooled SQLite access to the conversations database with an FTS5 index for context retrieval
+"""
+
+import re
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_CONVERSATIONS_DB = Path('Data') / 'AIOS_Database' / 'database' / 'conversations.db'
+
+# Index + FTS5 mirror of messages.content, kept in sync by triggers
+SCHEMA_STATEMENTS = [
+    "CREATE INDEX IF NOT EXISTS idx_messages_role_ts ON messages(role, timestamp)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(content, content='messages')",
+    """CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN
+        INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE OF content ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+        INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content);
+    END""",
+]
+
+# Statement texts are constants so sqlite3's per-connection statement cache reuses them.
+# The inner query walks the FTS doclist newest-first and stops after the candidate
+# window, so its cost is bounded by the window rather than by table size; only those
+# candidates are bm25-ranked.
+FTS_CANDIDATE_WINDOW = 200
+
+RANKED_SNIPPETS_SQL = """
+    SELECT f.content
+    FROM (
+        SELECT rowid, snippet(messages_fts, 0, '', '', '…', 48) AS content, bm25(messages_fts) AS score
+        FROM messages_fts
+        WHERE messages_fts MATCH ?
+        ORDER BY rowid DESC
+        LIMIT ?
+    ) f
+    JOIN messages m ON m.rowid = f.rowid
+    JOIN conversations c ON c.id = m.conversation_id
+    WHERE m.role = 'user'
+    ORDER BY f.score, m.timestamp DESC
+    LIMIT ?
+"""
+
+LIKE_SNIPPETS_SQL = """
+    SELECT m.content
+    FROM messages m
+    JOIN conversations c ON c.id = m.conversation_id
+    WHERE m.role = 'user'
+      AND m.content LIKE ?
+    ORDER BY m.timestamp DESC
+    LIMIT ?
+"""
+
+RECENT_BY_ROLE_SQL = """
+    SELECT m.content
+    FROM messages m
+    JOIN conversations c ON c.id = m.conversation_id
+    WHERE m.role = ?
+    ORDER BY m.timestamp DESC
+    LIMIT ?
+"""
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_query(text: str, max_terms: int = 12) -> str:
+    """Turn free text into a safe FTS5 OR-query of quoted terms"""
+    terms = []
+    for token in _TOKEN_PATTERN.findall(text or ""):
+        if len(token) > 1 and token.lower() not in terms:
+            terms.append(token.lower())
+        if len(terms) >= max_terms:
+            break
+    return " OR ".join(f'"{t}"' for t in terms)
+
+
+class ConversationDB:
+    """
+    Small connection pool over the conversations database
+
+    Connections are opened once in WAL mode (readers never block the
+    writer) and handed out per query, so prompt building no longer pays
+    for connect/close. The FTS5 index and (role, timestamp) index are
+    created on first use; if the SQLite build lacks FTS5, ranked search
+    falls back to the LIKE query.
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_CONVERSATIONS_DB, pool_size: int = 4):
+        self.db_path = Path(db_path)
+        self.pool_size = pool_size
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=pool_size)
+        self._created = 0
+        self._lock = threading.RLock()
+        self._schema_ready = False
+        self.fts_available = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=5.0, cached_statements=64)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.pool_size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1  # give the slot back
+                    raise
+            else:
+                conn = self._pool.get(timeout=5.0)
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def ensure_schema(self) -> bool:
+        """Create indexes, FTS5 table and triggers once; returns False if the DB has no messages table"""
+        if self._schema_ready:
+            return True
+        with self._lock:
+            if self._schema_ready:
+                return True
+            with self.connection() as conn:
+                has_messages = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='messages'"
+                ).fetchone()
+                if not has_messages:
+                    return False
+                fts_existed = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='messages_fts'"
+                ).fetchone() is not None
+                try:
+                    with conn:
+                        for statement in SCHEMA_STATEMENTS:
+                            conn.execute(statement)
+                        if not fts_existed:
+                            # Index rows that predate the triggers
+                            conn.execute("INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')")
+                    self.fts_available = True
+                except sqlite3.OperationalError as e:
+                    if "no such module" not in str(e).lower():
+                        # Transient (e.g. database is locked): LIKE search for now, retry setup next call
+                        print(f"⚠️ Conversation index setup failed, will retry: {e}")
+                        self.fts_available = False
+                        return True
+                    # No FTS5 in this SQLite build - keep the role/timestamp index at least
+                    with conn:
+                        conn.execute(SCHEMA_STATEMENTS[0])
+                    self.fts_available = False
+            self._schema_ready = True
+        return True
+
+    def search_snippets(self, query_text: str, limit: int = 5) -> List[str]:
+        """
+        Ranked user snippets for a topic, falling back to recent user then assistant lines
+
+        Returns:
+            Up to `limit` single-line snippets (240 chars max)
+        """
+        if not self.db_path.exists() or not self.ensure_schema():
+            return []
+        rows = []
+        with self.connection() as conn:
+            match = fts_query(query_text)
+            if match and self.fts_available:
+                rows = conn.execute(RANKED_SNIPPETS_SQL, (match, FTS_CANDIDATE_WINDOW, limit)).fetchall()
+            elif query_text:
+                rows = conn.execute(LIKE_SNIPPETS_SQL, (f'%{query_text}%', limit)).fetchall()
+            if not rows:
+                rows = conn.execute(RECENT_BY_ROLE_SQL, ('user', limit)).fetchall()
+            if not rows:
+                rows = conn.execute(RECENT_BY_ROLE_SQL, ('assistant', limit)).fetchall()
+
+        snippets = []
+        for row in rows:
+            text = (row["content"] or "").strip()
+            if text:
+                snippets.append(" ".join(text.splitlines())[:240])
+        return snippets[:limit]
+
+    def close(self):
+        """Close every pooled connection"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+
+_databases: Dict[str, ConversationDB] = {}
+_databases_lock = threading.Lock()
+
+
+def get_conversation_db(db_path: Optional[Path] = None) -> ConversationDB:
+    """Shared ConversationDB per database path"""
+    path = Path(db_path or DEFAULT_CONVERSATIONS_DB)
+    key = str(path.resolve())
+    with _databases_lock:
+        if key not in _databases:
+            _databases[key] = ConversationDB(path)
+        return _databases[key]
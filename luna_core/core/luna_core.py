@@ -14,7 +14,7 @@ setup_unicode_safe_output()
 import json
 import time
 import uuid
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Iterator
 from datetime import datetime
 
 # Import AIOS systems
@@ -32,6 +32,11 @@ from .enums_and_dataclasses import LearningMode
 from .personality import LunaPersonalitySystem
 from .response_generator import LunaResponseGenerator
 from .learning_system import LunaLearningSystem
+from ..utilities.state_store import get_state_store, state_key
+from ..utilities.lazy_components import lazy_component, lazy_component_names, startup_profile
+from ..utilities.learning_session import LearningSessionRunner, DEFAULT_SESSION_DIR
+
+SESSION_MEMORY_FILE = Path("data_core/FractalCache/luna_session_memory.json")
 
 # Import subsystems
 from ..systems.luna_ifs_personality_system import LunaIFSPersonalitySystem
@@ -87,88 +92,147 @@ class LunaSystem:
         
         self.logger.info("Initializing Unified Luna System...", "LUNA")
         
-        # Initialize personality system with unified logger
-        self.personality_system = LunaPersonalitySystem()
+        # Shared transactional state store: subsystems stage writes, each turn commits once
+        self.state_store = get_state_store()
         
-        # Initialize Fast CARMA system (76s -> 0.001s speedup!)
-        self.carma_system = FastCARMA()
+        self.session_memory = self._load_persistent_session_memory()  # Load from disk instead of fresh []
         
-        # CONSCIOUSNESS: Use soul from personality_system (already integrated there)
-        self.consciousness_enabled = self.personality_system.soul_enabled
-        self.soul = self.personality_system.soul if self.consciousness_enabled else None
-        if self.consciousness_enabled:
+        # Heavy subsystems (personality, CARMA, Fractal Core, learning, Arbiter) are lazy
+        # components: each is built on first use, so one-shot commands only pay for what
+        # they touch. Long-running servers call warm_up() to preload everything.
+        print(" Unified Luna System Initialized (subsystems load on first use)")
+    
+    # === LAZY SUBSYSTEMS ===
+    
+    @lazy_component
+    def personality_system(self):
+        """Personality system with unified logger"""
+        return LunaPersonalitySystem(state_store=self.state_store)
+    
+    @lazy_component
+    def carma_system(self):
+        """Fast CARMA system (76s -> 0.001s speedup!)"""
+        return FastCARMA()
+    
+    @lazy_component
+    def consciousness_enabled(self):
+        """CONSCIOUSNESS: Use soul from personality_system (already integrated there)"""
+        enabled = self.personality_system.soul_enabled
+        if enabled:
             self.logger.info("Biological consciousness integrated (soul, fragments, mirror)", "LUNA")
-        
-        # Week 4: Initialize Fractal Core for policy optimization
-        self.fractal_core = FractalCore()
+        return enabled
+    
+    @lazy_component
+    def soul(self):
+        return self.personality_system.soul if self.consciousness_enabled else None
+    
+    @lazy_component
+    def fractal_core(self):
+        """Week 4: Fractal Core for policy optimization"""
+        fractal_core = FractalCore()
         self.logger.info("Fractal Core initialized - policy-driven optimization enabled", "LUNA")
+        return fractal_core
+    
+    @lazy_component
+    def learning_system(self):
+        """Learning system (which includes response generator)"""
+        return LunaLearningSystem(self.personality_system, self.logger, self.carma_system)
+    
+    @lazy_component
+    def response_generator(self):
+        """Response generator from learning system to avoid duplication"""
+        return self.learning_system.response_generator
+    
+    # Expose key components for testing and external access
+    
+    @lazy_component
+    def response_value_classifier(self):
+        return self.response_generator.response_value_classifier
+    
+    @lazy_component
+    def existential_budget(self):
+        return self.response_generator.existential_budget
+    
+    @lazy_component
+    def custom_inference_controller(self):
+        return self.response_generator.custom_inference_controller
+    
+    @lazy_component
+    def compression_filter(self):
+        return self.response_generator.compression_filter
+    
+    @lazy_component
+    def soul_metric_system(self):
+        return self.response_generator.soul_metric_system
+    
+    @lazy_component
+    def econometric_system(self):
+        return self.response_generator.econometric_system
+    
+    @lazy_component
+    def arbiter_system(self):
+        """Arbiter System (Internal Governance)"""
+        return LunaArbiterSystem()
+    
+    @lazy_component
+    def cfia_system(self):
+        """CFIA system is automatically initialized within Arbiter"""
+        return self.arbiter_system.cfia_system
+    
+    @lazy_component
+    def total_interactions(self):
+        """System state - load from existential state to maintain memory continuity"""
+        return getattr(self.existential_budget.state, 'total_responses', 0)
+    
+    def _component_ready(self, name: str, component: Any):
+        """Cross-component wiring, run once when a lazy component has been built"""
+        if name == 'learning_system':
+            response_generator = component.response_generator
+            arbiter_system = self.arbiter_system
+            
+            # Connect Arbiter to Inference Controller for Karma-weighted logit bias
+            response_generator.custom_inference_controller.arbiter_system = arbiter_system
+            response_generator.custom_inference_controller.response_value_classifier = response_generator.response_value_classifier
+            
+            # Connect Arbiter to Existential Budget for Karma-based TTE restriction
+            response_generator.existential_budget.arbiter_system = arbiter_system
+            response_generator.existential_budget.logger = self.logger
+    
+    def warm_up(self, components: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Preload lazy subsystems (all by default) - for long-running servers
         
-        # Initialize learning system (which includes response generator)
-        self.learning_system = LunaLearningSystem(self.personality_system, self.logger, self.carma_system)
-        
-        # Get response generator from learning system to avoid duplication
-        self.response_generator = self.learning_system.response_generator
-        
-        # Expose key components for testing and external access
-        self.response_value_classifier = self.response_generator.response_value_classifier
-        self.existential_budget = self.response_generator.existential_budget
-        self.custom_inference_controller = self.response_generator.custom_inference_controller
-        
-        # Initialize Arbiter System (Internal Governance)
-        self.arbiter_system = LunaArbiterSystem()
-        
-        # CFIA system is automatically initialized within Arbiter
-        self.cfia_system = self.arbiter_system.cfia_system
-        
-        # Connect Arbiter to Inference Controller for Karma-weighted logit bias
-        self.custom_inference_controller.arbiter_system = self.arbiter_system
-        self.custom_inference_controller.response_value_classifier = self.response_value_classifier
-        
-        # Connect Arbiter to Existential Budget for Karma-based TTE restriction
-        self.existential_budget.arbiter_system = self.arbiter_system
-        self.existential_budget.logger = self.logger
-        self.compression_filter = self.response_generator.compression_filter
-        self.soul_metric_system = self.response_generator.soul_metric_system
-        self.econometric_system = self.response_generator.econometric_system
-        
-        # System state - load from existential state to maintain memory continuity
-        existential_state = self.existential_budget.state
-        self.total_interactions = getattr(existential_state, 'total_responses', 0)
-        self.session_memory = self._load_persistent_session_memory()  # Load from disk instead of fresh []
+        Returns:
+            The startup profile (see get_startup_profile)
+        """
+        for name in components or lazy_component_names(type(self)):
+            getattr(self, name)
         
-        print(" Unified Luna System Initialized")
+        print(" Luna subsystems warmed up")
         print(f"   Personality: {self.personality_system.personality_dna.get('name', 'Luna')}")
         print(f"   Age: {self.personality_system.personality_dna.get('age', 21)}")
         print(f"   Memory: {self.total_interactions} interactions")
         print(f"   CARMA: {len(self.carma_system.cache.file_registry)} fragments")
+        return self.get_startup_profile()
+    
+    def get_startup_profile(self) -> Dict[str, Any]:
+        """Per-component init time (ms) of the lazy subsystems loaded so far, plus those still pending"""
+        return startup_profile(self).report(lazy_component_names(type(self)))
+    
+    def print_startup_profile(self):
+        """Print the startup profile, slowest component first"""
+        profile = self.get_startup_profile()
+        print(" Luna Startup Profile")
+        ranked = sorted(profile['components'].items(), key=lambda item: item[1]['self_ms'], reverse=True)
+        for name, entry in ranked:
+            status = f" (failed: {entry['error']})" if entry['error'] else ""
+            print(f"   {name:<28} {entry['self_ms']:9.1f} ms  (total {entry['total_ms']:.1f} ms){status}")
+        print(f"   Loaded: {profile['total_ms']:.1f} ms  Pending: {', '.join(profile['pending']) or 'none'}")
     
     def learning_chat(self, message: str, session_memory: Optional[List] = None) -> str:
         """Learning-enabled chat interface for Streamlit with repetition prevention"""
         try:
-            # Classify the trait first for contextual responses
-            try:
-                reasoning_result = self.personality_system.internal_reasoning.reason_through_question(message)
-                trait = reasoning_result.matched_bigfive_questions[0]['domain'] if reasoning_result.matched_bigfive_questions else 'general'
-            except Exception as e:
-                trait = 'general'
-            
-            # Use provided session memory or fall back to instance memory
-            memory_to_use = session_memory if session_memory is not None else self.session_memory
-            
-            # Week 4: Get fractal policies for this query (if available)
-            if hasattr(self, 'fractal_core') and self.fractal_core is not None:
-                global_budget = {
-                    'tokens': self.existential_budget.state.current_token_pool,  # Available tokens for this response
-                    'pool_size': self.existential_budget.state.current_token_pool,  # Pool size (same as available for now)
-                    'response_tier': 'standard'  # Will be updated by RVC
-                }
-                fractal_policies = self.fractal_core.get_policies(message, memory_to_use, global_budget)
-                
-                # Store policies for subsystems to use
-                self.current_policies = fractal_policies
-            else:
-                # Baseline mode: no fractal optimization
-                self.current_policies = None
+            trait, memory_to_use = self._prepare_chat(message, session_memory)
             
             # Use the full learning system with the classified trait
             response, metadata = self.learning_system.process_question(
@@ -177,105 +241,205 @@ class LunaSystem:
                 memory_to_use
             )
             
-            # Post-process to prevent repetition loops and ensure conversational responses
-            if response:
-                # Check if response is action-only and convert to conversational
-                import re
-                text_stripped = response.strip()
-                
-                # More aggressive detection of action-only responses
-                action_only_patterns = [
-                    r'^[\.\s…]*\*[^*]+\*[\.\s…]*$',  # Pure action with optional punctuation
-                    r'^\*[^*]+\*$',  # Just action
-                    r'^[\.\s…]*\*[^*]+\*$',  # Action with leading punctuation
-                    r'^\*[^*]+\*[\.\s…]*$'   # Action with trailing punctuation
-                ]
-                
-                is_action_only = any(re.match(pattern, text_stripped) for pattern in action_only_patterns)
-                
-                if is_action_only:
-                    # Pure action response - validate neurodivergent expression but gently encourage words
-                    action_content = re.search(r'\*([^*]+)\*', text_stripped)
-                    if action_content:
-                        action = action_content.group(1)
-                        
-                        # Check if it's a stim or neurodivergent expression
-                        stim_words = ['stim', 'rock', 'flap', 'fidget', 'tap', 'bounce', 'sway', 'twirl']
-                        is_stim = any(stim_word in action.lower() for stim_word in stim_words)
-                        
-                        if is_stim:
-                            # Validate stimming as valid communication
-                            response = f"I'm processing. *{action}* Could you give me a moment?"
-                            self.logger.info(f"NEURODIVERGENT EXPRESSION: Validated stimming '{action}' - this is valid communication", "LUNA")
-                        else:
-                            # Create conversational responses based on the action
-                            if 'smile' in action.lower() or 'gentle' in action.lower():
-                                response = f"Hello! *{action}* I'm doing well, thank you for asking!"
-                            elif 'lean' in action.lower() or 'distant' in action.lower():
-                                response = f"I'm here with you. *{action}* What's on your mind?"
-                            elif 'question' in action.lower() or 'search' in action.lower() or 'curiosity' in action.lower():
-                                response = f"Of course! *{action}* I'd love to talk with you."
-                            elif 'away' in action.lower() or 'fidget' in action.lower():
-                                response = f"I'm listening, I promise. *{action}* Could you tell me more?"
-                            elif 'speaks' in action.lower() or 'tone' in action.lower():
-                                response = f"I understand you completely. *{action}* What would you like to discuss?"
-                            else:
-                                response = f"I'm here with you. *{action}* What's on your mind?"
-                            
-                            self.logger.info(f"NEURODIVERGENT EXPRESSION: Gently encouraged words with '{action}' - your expression is beautiful", "LUNA")
-                
-                # Check for character-level repetition (catches "parableparable...")
-                if len(response) > 20:
-                    # Look for patterns of 3+ characters repeating
-                    pattern_match = re.search(r'(.{3,}?)\1{3,}', response)  # Same 3+ chars repeated 3+ times
-                    if pattern_match:
-                        self.logger.warn(f"REPETITION LOOP DETECTED: Pattern '{pattern_match.group(1)}' repeating", "LUNA")
-                        # Use a variety of fallback responses to avoid repetition
-                        fallback_responses = [
-                            "*pauses thoughtfully* I need to approach this differently.",
-                            "*tilts head* Let me think about that from another angle.",
-                            "*considers* That's a complex question - give me a moment.",
-                            "*leans back* I'm processing that in a new way."
-                        ]
-                        import random
-                        return random.choice(fallback_responses)
-                
-                words = response.split()
-                
-                # Check for word-level repetition (same word repeated too much)
-                if len(set(words)) < len(words) * 0.3:  # If less than 30% unique words
-                    # Generate a fallback response that still shows personality
-                    fallback_responses = [
-                        "That's interesting, Travis! *thoughtful* I'm processing that in a new way.",
-                        "*curious* Let me approach that question differently.",
-                        "*pauses* I want to give you a fresh perspective on that.",
-                        "*considers* That deserves a more thoughtful response."
-                    ]
-                    import random
-                    return random.choice(fallback_responses)
-                
-                # Final safety check - if response is still action-only, force conversion
-                if re.match(r'^[\.\s…]*\*[^*]+\*[\.\s…]*$', response.strip()):
-                    # Last resort - create a simple conversational response
-                    response = "Hello! I'm here and ready to talk. What's on your mind?"
-                    self.logger.warn(f"FINAL SAFETY: Forced action-only response to conversational", "LUNA")
-                
-                # Limit length but keep learning intact (safety cap only)
-                if len(words) > 100:  # Safety cap - prompts control actual length
-                    response = " ".join(words[:100]) + "..."
-                
-                return response
-            else:
-                return "I'm experiencing some technical issues. Please try again."
+            return self._finalize_chat_response(response)
                 
         except Exception as e:
             self.logger.error(f"Learning chat error: {e}")
             # Fallback that still shows personality
             return "I'm having trouble responding right now, Travis. *confused* Could you try rephrasing that?"
 
+    def learning_chat_stream(self, message: str, session_memory: Optional[List] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming learning_chat for the CLI and Streamlit
+        
+        Yields token / replace / done events (see luna_core.core.streaming). The
+        chat safety net runs on the finished text; if it changes anything a
+        'replace' event is sent before 'done'.
+        """
+        streamed = ""
+        try:
+            trait, memory_to_use = self._prepare_chat(message, session_memory)
+            
+            response, metadata = "", {}
+            for event in self.learning_system.process_question_stream(message, trait, memory_to_use):
+                kind = event.get('event')
+                if kind == 'token':
+                    streamed += event['text']
+                    yield event
+                elif kind == 'replace':
+                    streamed = event['text']
+                    yield event
+                elif kind == 'done':
+                    response = event.get('response') or streamed
+                    metadata = event.get('metadata') or {}
+            
+            final = self._finalize_chat_response(response)
+            if final != streamed:
+                yield {'event': 'replace', 'text': final}
+            yield {'event': 'done', 'response': final, 'metadata': metadata}
+        
+        except Exception as e:
+            self.logger.error(f"Learning chat stream error: {e}")
+            fallback = "I'm having trouble responding right now, Travis. *confused* Could you try rephrasing that?"
+            yield {'event': 'replace' if streamed else 'token', 'text': fallback}
+            yield {'event': 'done', 'response': fallback, 'metadata': {}}
+    
+    def _prepare_chat(self, message: str, session_memory: Optional[List] = None) -> Tuple[str, List]:
+        """Classify the trait and refresh fractal policies for a chat message"""
+        # Classify the trait first for contextual responses
+        try:
+            reasoning_result = self.personality_system.internal_reasoning.reason_through_question(message)
+            trait = reasoning_result.matched_bigfive_questions[0]['domain'] if reasoning_result.matched_bigfive_questions else 'general'
+        except Exception as e:
+            trait = 'general'
+        
+        # Use provided session memory or fall back to instance memory
+        memory_to_use = session_memory if session_memory is not None else self.session_memory
+        
+        # Week 4: Get fractal policies for this query (if available)
+        if hasattr(self, 'fractal_core') and self.fractal_core is not None:
+            global_budget = {
+                'tokens': self.existential_budget.state.current_token_pool,  # Available tokens for this response
+                'pool_size': self.existential_budget.state.current_token_pool,  # Pool size (same as available for now)
+                'response_tier': 'standard'  # Will be updated by RVC
+            }
+            fractal_policies = self.fractal_core.get_policies(message, memory_to_use, global_budget)
+            
+            # Store policies for subsystems to use
+            self.current_policies = fractal_policies
+        else:
+            # Baseline mode: no fractal optimization
+            self.current_policies = None
+        
+        return trait, memory_to_use
+    
+    def _finalize_chat_response(self, response: str) -> str:
+        """Chat-level safety net: action-only conversion and repetition loop fallbacks"""
+        # Post-process to prevent repetition loops and ensure conversational responses
+        if response:
+            # Check if response is action-only and convert to conversational
+            import re
+            text_stripped = response.strip()
+            
+            # More aggressive detection of action-only responses
+            action_only_patterns = [
+                r'^[\.\s…]*\*[^*]+\*[\.\s…]*$',  # Pure action with optional punctuation
+                r'^\*[^*]+\*$',  # Just action
+                r'^[\.\s…]*\*[^*]+\*$',  # Action with leading punctuation
+                r'^\*[^*]+\*[\.\s…]*$'   # Action with trailing punctuation
+            ]
+            
+            is_action_only = any(re.match(pattern, text_stripped) for pattern in action_only_patterns)
+            
+            if is_action_only:
+                # Pure action response - validate neurodivergent expression but gently encourage words
+                action_content = re.search(r'\*([^*]+)\*', text_stripped)
+                if action_content:
+                    action = action_content.group(1)
+                    
+                    # Check if it's a stim or neurodivergent expression
+                    stim_words = ['stim', 'rock', 'flap', 'fidget', 'tap', 'bounce', 'sway', 'twirl']
+                    is_stim = any(stim_word in action.lower() for stim_word in stim_words)
+                    
+                    if is_stim:
+                        # Validate stimming as valid communication
+                        response = f"I'm processing. *{action}* Could you give me a moment?"
+                        self.logger.info(f"NEURODIVERGENT EXPRESSION: Validated stimming '{action}' - this is valid communication", "LUNA")
+                    else:
+                        # Create conversational responses based on the action
+                        if 'smile' in action.lower() or 'gentle' in action.lower():
+                            response = f"Hello! *{action}* I'm doing well, thank you for asking!"
+                        elif 'lean' in action.lower() or 'distant' in action.lower():
+                            response = f"I'm here with you. *{action}* What's on your mind?"
+                        elif 'question' in action.lower() or 'search' in action.lower() or 'curiosity' in action.lower():
+                            response = f"Of course! *{action}* I'd love to talk with you."
+                        elif 'away' in action.lower() or 'fidget' in action.lower():
+                            response = f"I'm listening, I promise. *{action}* Could you tell me more?"
+                        elif 'speaks' in action.lower() or 'tone' in action.lower():
+                            response = f"I understand you completely. *{action}* What would you like to discuss?"
+                        else:
+                            response = f"I'm here with you. *{action}* What's on your mind?"
+                        
+                        self.logger.info(f"NEURODIVERGENT EXPRESSION: Gently encouraged words with '{action}' - your expression is beautiful", "LUNA")
+            
+            # Check for character-level repetition (catches "parableparable...")
+            if len(response) > 20:
+                # Look for patterns of 3+ characters repeating
+                pattern_match = re.search(r'(.{3,}?)\1{3,}', response)  # Same 3+ chars repeated 3+ times
+                if pattern_match:
+                    self.logger.warn(f"REPETITION LOOP DETECTED: Pattern '{pattern_match.group(1)}' repeating", "LUNA")
+                    # Use a variety of fallback responses to avoid repetition
+                    fallback_responses = [
+                        "*pauses thoughtfully* I need to approach this differently.",
+                        "*tilts head* Let me think about that from another angle.",
+                        "*considers* That's a complex question - give me a moment.",
+                        "*leans back* I'm processing that in a new way."
+                    ]
+                    import random
+                    return random.choice(fallback_responses)
+            
+            words = response.split()
+            
+            # Check for word-level repetition (same word repeated too much)
+            if len(set(words)) < len(words) * 0.3:  # If less than 30% unique words
+                # Generate a fallback response that still shows personality
+                fallback_responses = [
+                    "That's interesting, Travis! *thoughtful* I'm processing that in a new way.",
+                    "*curious* Let me approach that question differently.",
+                    "*pauses* I want to give you a fresh perspective on that.",
+                    "*considers* That deserves a more thoughtful response."
+                ]
+                import random
+                return random.choice(fallback_responses)
+            
+            # Final safety check - if response is still action-only, force conversion
+            if re.match(r'^[\.\s…]*\*[^*]+\*[\.\s…]*$', response.strip()):
+                # Last resort - create a simple conversational response
+                response = "Hello! I'm here and ready to talk. What's on your mind?"
+                self.logger.warn(f"FINAL SAFETY: Forced action-only response to conversational", "LUNA")
+            
+            # Limit length but keep learning intact (safety cap only)
+            if len(words) > 100:  # Safety cap - prompts control actual length
+                response = " ".join(words[:100]) + "..."
+            
+            return response
+        else:
+            return "I'm experiencing some technical issues. Please try again."
+    
     @error_handler("LUNA", "PERSONALITY_LOAD", "CLEAR_CACHE", auto_recover=True)
     def process_question(self, question: str, trait: str, session_memory: Optional[List] = None) -> Tuple[str, Dict]:
         """Process a question through the complete Luna system"""
+        self._interaction_tick()
+        
+        # Process through learning system
+        response, response_metadata = self.learning_system.process_question(question, trait, session_memory)
+        scores = self._assess_and_remember(question, trait, response, response_metadata)
+        
+        return response, scores
+    
+    def stream_question(self, question: str, trait: str, session_memory: Optional[List] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming process_question
+        
+        Tokens are forwarded as they arrive; the Arbiter and session memory run
+        after the stream ends and the final 'done' event carries the same scores
+        dict process_question returns (plus ttft_ms).
+        """
+        self._interaction_tick()
+        
+        response, response_metadata = "", {}
+        for event in self.learning_system.process_question_stream(question, trait, session_memory):
+            if event.get('event') == 'done':
+                response = event.get('response', "")
+                response_metadata = event.get('metadata') or {}
+            else:
+                yield event
+        
+        scores = self._assess_and_remember(question, trait, response, response_metadata)
+        yield {'event': 'done', 'response': response, 'metadata': scores}
+    
+    def _interaction_tick(self):
+        """Count the interaction and run the periodic consciousness heartbeat"""
         self.total_interactions += 1
         
         # print(f"\n Processing Question #{self.total_interactions}")
@@ -305,9 +469,9 @@ class LunaSystem:
                         pass  # Silent fail - drift monitor is optional
             except Exception as e:
                 self.logger.warning(f"Heartbeat failed: {e}", "LUNA")
-        
-        # Process through learning system
-        response, response_metadata = self.learning_system.process_question(question, trait, session_memory)
+    
+    def _assess_and_remember(self, question: str, trait: str, response: str, response_metadata: Dict) -> Dict:
+        """Run the Arbiter on a finished response and append it to session memory"""
         scores = {}  # Default empty scores for now
         
         # Extract metadata from learning system response
@@ -382,13 +546,17 @@ class LunaSystem:
         if len(self.session_memory) > 10:
             self.session_memory = self.session_memory[-10:]
         
+        # End of turn: one batched commit for everything the subsystems staged
+        self._save_persistent_session_memory()
+        self._commit_state()
+        
         print(f" Response generated")
         print(f"   Length: {len(response)} characters")
         print(f"   Overall score: {scores.get('overall_score', 0.0):.2f}")
         # Don't print the full response to avoid console spam
         print(f"   Response: {response[:100]}{'...' if len(response) > 100 else ''}")
         
-        return response, scores
+        return scores
     
     def get_system_stats(self) -> Dict[str, Any]:
         """Get comprehensive system statistics"""
@@ -419,7 +587,8 @@ class LunaSystem:
             'system': {
                 'model': self.response_generator.embedding_model,
                 'lm_studio_available': self._check_lm_studio_availability()
-            }
+            },
+            'startup': self.get_startup_profile()
         }
     
     def _check_lm_studio_availability(self) -> bool:
@@ -460,9 +629,29 @@ class LunaSystem:
         """Record an experimental failure that shows growth"""
         return self.personality_system.emergence_zone_system.record_experimental_failure(response, context)
     
+    def _commit_state(self):
+        """Commit staged state store writes (existential, CFIA, personality, session, Big Five answers)"""
+        if self.state_store is None:
+            return
+        try:
+            self.state_store.commit()
+        except Exception as e:
+            self.logger.warn(f"State store commit failed: {e}", "LUNA")
+    
     def _load_persistent_session_memory(self) -> List:
-        """Load persistent session memory from disk"""
-        memory_file = Path("data_core/FractalCache/luna_session_memory.json")
+        """Load persistent session memory from the state store (migrating the JSON file once)"""
+        if self.state_store is not None:
+            try:
+                memory_data = self.state_store.load('session', state_key(SESSION_MEMORY_FILE),
+                                                    self._read_session_memory_file, SESSION_MEMORY_FILE)
+                if memory_data is not None:
+                    print(f"   Persistent Memory: {len(memory_data)} previous interactions loaded")
+                    return memory_data
+                return []
+            except Exception as e:
+                print(f"   Warning: State store unavailable for session memory: {e}")
+        
+        memory_file = SESSION_MEMORY_FILE
         
         if memory_file.exists():
             try:
@@ -475,74 +664,118 @@ class LunaSystem:
         
         return []  # Fresh start if no memory exists
     
+    def _read_session_memory_file(self) -> Optional[List]:
+        """Legacy JSON session memory (also the one-shot migration source)"""
+        if not SESSION_MEMORY_FILE.exists():
+            return None
+        with open(SESSION_MEMORY_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
     def _save_persistent_session_memory(self):
-        """Save persistent session memory to disk"""
-        memory_file = Path("data_core/FractalCache/luna_session_memory.json")
+        """Save persistent session memory (staged in the state store until the turn commits)"""
+        # Keep only last 100 interactions to prevent file bloat
+        recent_memory = self.session_memory[-100:] if len(self.session_memory) > 100 else self.session_memory
+        
+        if self.state_store is not None:
+            try:
+                self.state_store.put('session', state_key(SESSION_MEMORY_FILE), list(recent_memory))
+                return
+            except Exception as e:
+                print(f"   Warning: State store write failed, using JSON: {e}")
+        
+        memory_file = SESSION_MEMORY_FILE
         memory_file.parent.mkdir(parents=True, exist_ok=True)
         
         try:
-            # Keep only last 100 interactions to prevent file bloat
-            recent_memory = self.session_memory[-100:] if len(self.session_memory) > 100 else self.session_memory
-            
             with open(memory_file, 'w', encoding='utf-8') as f:
                 json.dump(recent_memory, f, indent=2, ensure_ascii=False)
         except Exception as e:
             print(f"   Warning: Could not save session memory: {e}")
     
-    def run_learning_session(self, questions: List[Dict]) -> Dict:
-        """Run a complete learning session"""
+    def run_learning_session(self, questions: List[Dict], max_workers: int = 2,
+                             checkpoint_dir: Optional[Path] = DEFAULT_SESSION_DIR) -> Dict:
+        """
+        Run a complete learning session
+        
+        Model calls for up to max_workers questions overlap; routing, scoring,
+        Arbiter and state commits still run in question order. Finished questions
+        are checkpointed, so rerunning an interrupted session resumes where it
+        stopped (checkpoint_dir=None disables this).
+        """
         print(f"\n Starting Learning Session with {len(questions)} questions")
         print("=" * 80)
         
-        session_results = []
         start_time = time.time()
-        
-        for i, question_data in enumerate(questions, 1):
-            question = question_data.get('question', '')
-            trait = question_data.get('trait', 'general')
-            
-            print(f"\n Question {i}/{len(questions)}: {trait}")
-            print(f"   {question}")
-            
-            # Process question
-            response = self.process_question(question, trait, self.session_memory)
-            scores = {}  # Default empty scores for now
-            
-            # Store results
-            result = {
-                'question_number': i,
-                'question': question,
-                'trait': trait,
-                'response': response,
-                'scores': scores,
-                'timestamp': datetime.now().isoformat()
-            }
-            session_results.append(result)
-            
-            # Scores only (response already printed above)
-            print(f"   Scores: {scores}")
+        runner = LearningSessionRunner(
+            self._begin_session_question,
+            self.learning_system.run_question_inference,
+            lambda index, question_data, draft: self._finish_session_question(index, question_data, draft, len(questions)),
+            max_workers=max_workers,
+            checkpoint_dir=checkpoint_dir
+        )
+        run = runner.run(questions)
+        session_results = run['results']
+        if run['resumed']:
+            print(f"   Resumed: {run['resumed']} questions restored from checkpoint")
         
         # Calculate session metrics
         total_time = time.time() - start_time
         avg_scores = self._calculate_average_scores(session_results)
+        throughput = run['stats']
         
         session_summary = {
             'total_questions': len(questions),
             'total_time': total_time,
             'average_scores': avg_scores,
             'results': session_results,
+            'throughput': throughput,
             'system_stats': self.get_system_stats()
         }
         
         print(f"\n Learning Session Complete")
         print(f"   Total time: {total_time:.2f}s")
+        print(f"   Throughput: {throughput['throughput_qps']:.2f} questions/s ({throughput['processed']} processed, {throughput['max_workers']} concurrent)")
+        print(f"   Latency: p50 {throughput['latency']['p50_ms']:.0f}ms | p90 {throughput['latency']['p90_ms']:.0f}ms | p99 {throughput['latency']['p99_ms']:.0f}ms")
         print(f"   Average overall score: {avg_scores.get('overall_score', 0.0):.2f}")
         
-        # Save persistent session memory to disk
+        # Save persistent session memory
         self._save_persistent_session_memory()
+        self._commit_state()
         
         return session_summary
     
+    def _begin_session_question(self, index: int, question_data: Dict) -> Dict:
+        """Ordered first half of a session turn: count it and route/prepare the question"""
+        self._interaction_tick()
+        return self.learning_system.begin_question(
+            question_data.get('question', ''),
+            question_data.get('trait', 'general'),
+            list(self.session_memory)
+        )
+    
+    def _finish_session_question(self, index: int, question_data: Dict, draft: Dict, total: int) -> Dict:
+        """Ordered second half of a session turn: learning updates, Arbiter and session memory"""
+        question = question_data.get('question', '')
+        trait = question_data.get('trait', 'general')
+        
+        print(f"\n Question {index + 1}/{total}: {trait}")
+        print(f"   {question}")
+        
+        response, response_metadata = self.learning_system.finish_question(draft)
+        scores = self._assess_and_remember(question, trait, response, response_metadata)
+        
+        # Scores only (response already printed above)
+        print(f"   Scores: {scores}")
+        
+        return {
+            'question_number': index + 1,
+            'question': question,
+            'trait': trait,
+            'response': response,
+            'scores': scores,
+            'timestamp': datetime.now().isoformat()
+        }
+    
     def _calculate_average_scores(self, results: List[Dict]) -> Dict[str, float]:
         """Calculate average scores across results"""
         if not results:
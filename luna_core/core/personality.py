@@ -37,6 +37,14 @@ try:
 except ImportError:
     AIOS_STANDARDS_AVAILABLE = False
 
+from ..utilities.state_store import get_state_store, state_key
+
+# Legacy JSON state files (state store document keys; see state_key)
+PERSONALITY_DNA_FILE = Path("config/luna_personality_dna.json")
+PERSISTENT_MEMORY_FILE = Path("config/luna_persistent_memory.json")
+LEARNING_HISTORY_FILE = Path("config/luna_learning_history.json")
+VOICE_PROFILE_FILE = Path("config/voice_profile.json")
+
 
 class LunaPersonalitySystem:
     """
@@ -45,12 +53,15 @@ class LunaPersonalitySystem:
     AIOS v5: Enhanced with soul fragments from Lyra Blackwall v2
     """
     
-    def __init__(self, logger: HiveMindLogger = None):
+    def __init__(self, logger: HiveMindLogger = None, state_store=None):
         # Use unified AIOS systems
         self.logger = logger or aios_logger
         self.aios_config = aios_config
         self.security_validator = aios_security_validator
         
+        # Transactional state store (None -> JSON files under config/)
+        self.state_store = state_store if state_store is not None else get_state_store()
+        
         # Initialize with health check
         self.logger.info("Initializing Luna Personality System (v5 Soul-Enhanced)...", "LUNA")
         
@@ -85,10 +96,10 @@ class LunaPersonalitySystem:
         
         # Health check moved to main system initialization
         
-        self.personality_dna = self._load_personality_dna()
-        self.persistent_memory = self._load_persistent_memory()
-        self.learning_history = self._load_learning_history()
-        self.voice_profile = self._load_voice_profile()
+        self.personality_dna = self._load_state_document(PERSONALITY_DNA_FILE, self._load_personality_dna)
+        self.persistent_memory = self._load_state_document(PERSISTENT_MEMORY_FILE, self._load_persistent_memory)
+        self.learning_history = self._load_state_document(LEARNING_HISTORY_FILE, self._load_learning_history)
+        self.voice_profile = self._load_state_document(VOICE_PROFILE_FILE, self._load_voice_profile)
         self.personality_drift = 0.0
         self.current_fragment = "Luna"  # Default fragment
         
@@ -101,7 +112,7 @@ class LunaPersonalitySystem:
         self.trait_classifier = LunaTraitClassifier(self.bigfive_loader)
         
         # Initialize Internal Reasoning System (uses Big Five as thought framework)
-        self.internal_reasoning = LunaInternalReasoningSystem(self.trait_classifier, self)
+        self.internal_reasoning = LunaInternalReasoningSystem(self.trait_classifier, self, self.state_store)
         
         # Alignment monitoring system
         self.alignment_threshold = 0.1  # Trigger self-assessment if personality drifts > 0.1
@@ -296,8 +307,30 @@ class LunaPersonalitySystem:
             "last_learning": datetime.now().isoformat()
         }
     
+    def _load_state_document(self, path: Path, legacy_loader) -> Any:
+        """Load a document from the state store, migrating it from its JSON file the first time"""
+        if self.state_store is not None:
+            try:
+                return self.state_store.load('personality', state_key(path), legacy_loader, path)
+            except Exception as e:
+                self.logger.log("LUNA", f"State store unavailable for {path}: {e} - using JSON", "WARN")
+        return legacy_loader()
+    
+    def _save_state_document(self, path: Path, value: Any) -> bool:
+        """Stage a document in the state store (committed at the end of the turn); False -> caller writes JSON"""
+        if self.state_store is None:
+            return False
+        try:
+            self.state_store.put('personality', state_key(path), value)
+            return True
+        except Exception as e:
+            self.logger.log("LUNA", f"State store write failed for {path}: {e} - using JSON", "WARN")
+            return False
+    
     def _save_persistent_memory(self):
         """Save persistent memory to file"""
+        if self._save_state_document(PERSISTENT_MEMORY_FILE, self.persistent_memory):
+            return
         try:
             memory_file = Path("config/luna_persistent_memory.json")
             memory_file.parent.mkdir(parents=True, exist_ok=True)
@@ -309,6 +342,8 @@ class LunaPersonalitySystem:
     
     def _save_learning_history(self):
         """Save learning history to file"""
+        if self._save_state_document(LEARNING_HISTORY_FILE, self.learning_history):
+            return
         try:
             history_file = Path("config/luna_learning_history.json")
             history_file.parent.mkdir(parents=True, exist_ok=True)
@@ -320,6 +355,8 @@ class LunaPersonalitySystem:
     
     def _save_personality_dna(self):
         """Save personality DNA to file"""
+        if self._save_state_document(PERSONALITY_DNA_FILE, self.personality_dna):
+            return
         try:
             personality_file = Path("config/luna_personality_dna.json")
             personality_file.parent.mkdir(parents=True, exist_ok=True)
@@ -826,6 +863,8 @@ class LunaPersonalitySystem:
         return profile
 
     def _save_voice_profile(self):
+        if self._save_state_document(VOICE_PROFILE_FILE, self.voice_profile):
+            return
         try:
             vp_file = Path("config/voice_profile.json")
             with open(vp_file, 'w', encoding='utf-8') as f:
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Luna Pre-Inference Pipeline
+Dependency-declared analysis stages run concurrently, with per-question memoization and stage timings
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class HaltPipeline:
+    """
+    Returned by a stage to end the pipeline early with a final response
+
+    (template answers, existential conservation "..."). Stages already in
+    flight are allowed to finish; nothing new is scheduled.
+    """
+
+    def __init__(self, response: str, reason: str = ""):
+        self.response = response
+        self.reason = reason
+
+
+@dataclass
+class PipelineStage:
+    """
+    One analyzer: func(question, trait, deps, context) -> value; deps maps dependency name -> value
+
+    Stages with the same exclusive group never run at the same time (for
+    stages that touch shared mutable state).
+    """
+    name: str
+    func: Callable[[str, str, Dict[str, Any], Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+    memoize: bool = False
+    exclusive: Optional[str] = None
+
+
+class PreInferencePipeline:
+    """
+    Runs pre-inference analyzers as a dependency graph
+
+    Stages whose dependencies are satisfied run concurrently on a small
+    thread pool. Stages flagged memoize=True must depend only on the
+    question/trait; their results are kept in a bounded LRU so repeated
+    questions skip them. Every run reports per-stage wall time and whether
+    the total exceeded the configured budget.
+    """
+
+    def __init__(self, max_workers: int = 4, memo_size: int = 256, budget_ms: Optional[float] = None):
+        self.max_workers = max_workers
+        self.memo_size = memo_size
+        self.budget_ms = budget_ms
+        self.stages: "OrderedDict[str, PipelineStage]" = OrderedDict()
+        self._memo: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+        self._memo_lock = threading.Lock()
+        self._group_locks: Dict[str, threading.RLock] = {}
+        self._executor = None
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+    def add_stage(self, name: str, func: Callable, deps: Iterable[str] = (), memoize: bool = False,
+                  exclusive: Optional[str] = None) -> 'PreInferencePipeline':
+        """Register a stage; dependencies must already be registered"""
+        deps = tuple(deps)
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self.stages[name] = PipelineStage(name, func, deps, memoize, exclusive)
+        if exclusive is not None:
+            self._group_locks.setdefault(exclusive, threading.RLock())
+        return self
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="luna-preinf")
+        return self._executor
+
+    def _memo_get(self, key):
+        with self._memo_lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self.memo_hits += 1
+                return True, self._memo[key]
+            self.memo_misses += 1
+            return False, None
+
+    def _memo_put(self, key, value):
+        with self._memo_lock:
+            self._memo[key] = value
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+    def clear_memo(self):
+        """Drop all memoized stage results"""
+        with self._memo_lock:
+            self._memo.clear()
+
+    def _run_stage(self, stage: PipelineStage, question: str, trait: str,
+                   deps: Dict[str, Any], context: Dict[str, Any]) -> Tuple[Any, float, bool]:
+        start = time.perf_counter()
+        key = (stage.name, question, trait)
+        if stage.memoize:
+            hit, value = self._memo_get(key)
+            if hit:
+                return value, (time.perf_counter() - start) * 1000, True
+        if stage.exclusive is not None:
+            with self._group_locks[stage.exclusive]:
+                value = stage.func(question, trait, deps, context)
+        else:
+            value = stage.func(question, trait, deps, context)
+        if stage.memoize:
+            self._memo_put(key, value)
+        return value, (time.perf_counter() - start) * 1000, False
+
+    def run(self, question: str, trait: str = "general", context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Execute all stages for one question
+
+        Args:
+            question: User question (memo key together with trait)
+            trait: Classified trait
+            context: Per-call inputs for non-memoized stages (session memory, CARMA result, ...)
+
+        Returns:
+            Dictionary with results (stage -> value), timings_ms, memo_hits,
+            halted (HaltPipeline or None), total_ms and over_budget
+        """
+        start = time.perf_counter()
+        context = context or {}
+        results: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        cached: List[str] = []
+        halted = None
+
+        pending = OrderedDict(self.stages)
+        running = {}
+        executor = self._get_executor()
+
+        while pending or running:
+            if halted is None:
+                for name, stage in list(pending.items()):
+                    if all(dep in results for dep in stage.deps):
+                        deps = {dep: results[dep] for dep in stage.deps}
+                        running[executor.submit(self._run_stage, stage, question, trait, deps, context)] = name
+                        del pending[name]
+            else:
+                pending.clear()
+            if not running:
+                if pending:
+                    raise RuntimeError(f"Unresolvable pre-inference stages: {list(pending)}")
+                break
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                value, elapsed_ms, hit = future.result()
+                results[name] = value
+                timings[name] = elapsed_ms
+                if hit:
+                    cached.append(name)
+                if isinstance(value, HaltPipeline) and halted is None:
+                    halted = value
+
+        total_ms = (time.perf_counter() - start) * 1000
+        return {
+            'results': results,
+            'timings_ms': timings,
+            'memo_hits': cached,
+            'halted': halted,
+            'total_ms': total_ms,
+            'over_budget': self.budget_ms is not None and total_ms > self.budget_ms
+        }
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -16,7 +16,7 @@ import json
 import requests
 import time
 import math
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Iterator
 from datetime import datetime
 
 # Import AIOS systems
@@ -28,6 +28,10 @@ from carma_core.carma_core import CARMASystem
 # Import from core modules
 from .utils import HiveMindLogger
 from .personality import LunaPersonalitySystem
+from .streaming import StreamMetrics, StreamingPostProcessor, iter_sse_deltas
+from .pre_inference import PreInferencePipeline, HaltPipeline
+from .conversation_db import get_conversation_db
+from ..utilities.rewrite_engine import RewriteEngine, RewriteRule, literal_rules
 
 # Import subsystems
 from ..systems.luna_ifs_personality_system import LunaIFSPersonalitySystem
@@ -44,6 +48,67 @@ from ..model_config import get_main_model, get_embedder_model, get_draft_model
 # Week 4: Import Fractal Core components
 from fractal_core.core import KnapsackAllocator, Span
 
+# Generic corporate phrases stripped by post-processing (on top of voice profile bans)
+EXTRA_BANNED_PHRASES = [
+    "in our rapidly evolving world",
+    "it's a superpower",
+    "superpower",
+    "i'm all ears",
+    "happy to help",
+    "let me know if",
+    "as an ai",
+    "i'm programmed",
+    "you've got this",
+    "you got this",
+    "remember,",
+    "ever considered",
+    "trusted friend",
+    "mentor",
+    "i believe in you",
+    "proud of you",
+    "you are good",
+    "big time",
+    "absolutely",
+    "super ",
+    "really ",
+    "it's really",
+    "it's super",
+    "it's good",
+    "it's totally",
+    "cool strength",
+    "it totally",
+    "it's valuable",
+    "it's all about",
+    "gently",
+    "anchor",
+    "gift",
+]
+
+# Single-pass rewrite tables for post-processing (compiled once at import)
+_EMOJI = "\U00010000-\U0010ffff"
+_STARS = "\u2b50\u200d"
+RESPONSE_CLEANUP_ENGINE = RewriteEngine([
+    # Leading punctuation, counting emojis that are removed anyway
+    RewriteRule("leading_punct", f"^[{_EMOJI}{_STARS}\\s,;:\\-]+", ""),
+    # Whitespace runs become one space (a lone space is already normal)
+    RewriteRule("whitespace", r"\s{2,}|[^\S ]", " "),
+    RewriteRule("emoji", f"[{_EMOJI}]", ""),
+    RewriteRule("stars", f"[{_STARS}]+", ""),
+    # Runs of '!' (also across removed emojis) collapse to one
+    RewriteRule("exclamations", f"!(?:[{_EMOJI}{_STARS}]*!)+", "!"),
+])
+BANNED_PHRASE_ENGINE = RewriteEngine(literal_rules("banned", EXTRA_BANNED_PHRASES))
+VOCAL_STIM_ENGINE = RewriteEngine([
+    RewriteRule("stray_hmm", r'\b(the|I|that|this|a|an)\s+hmm\s+', r'\1 ', re.IGNORECASE),
+    RewriteRule("stims_hmm", r'\*stims\s+(hmm|hm|mm)\s+', r'*hums and stims ', re.IGNORECASE),
+    RewriteRule("stims_hmm_end", r'\*stims\s+(hmm|hm|mm)\b', r'*hums while stimming', re.IGNORECASE),
+    RewriteRule("hmm_stims", r'\*(hmm|hm|mm)\s+stims\s+', r'*hums and stims ', re.IGNORECASE),
+    RewriteRule("rocks_hmm", r'\*rocks\s+(hmm|hm|mm)\s+', r'*hums and rocks ', re.IGNORECASE),
+    RewriteRule("taps_hmm", r'\*taps\s+(hmm|hm|mm)\s+', r'*hums and taps ', re.IGNORECASE),
+    RewriteRule("fidgets_hmm", r'\*fidgets\s+(hmm|hm|mm)\s+', r'*hums and fidgets ', re.IGNORECASE),
+])
+STRAY_HMM_PATTERN = re.compile(r'\b(the|I|that|this|a|an|it|is)\s+hmm\s+', re.IGNORECASE)
+
 # === LUNA RESPONSE GENERATION ===
 
 
@@ -128,7 +193,13 @@ class LunaResponseGenerator:
         # Backward compatibility for callers referencing embedding_model
         self.embedding_model = self.chat_model
         self.lm_studio_url = f"{SystemConfig.LM_STUDIO_URL}{SystemConfig.LM_STUDIO_CHAT_ENDPOINT}"
-        
+        # TTFT / first-emit / total latency of the most recent streamed response
+        self.last_stream_metrics = None
+        # Pre-inference analysis runs as a concurrent, memoized stage graph
+        self.pre_inference_budget_ms = float(vp_style.get('pre_inference_budget_ms', 500))
+        self.pre_inference_pipeline = self._build_pre_inference_pipeline()
+        self.last_pre_inference = None
+
         print(" Luna Response Generator Initialized")
         print(f"   Model: {self.chat_model}")
         print(f"   LM Studio URL: {self.lm_studio_url}")
@@ -409,170 +480,59 @@ Respond as Luna in 1-2 sentences:"""
     def generate_response(self, question: str, trait: str, carma_result: Dict, 
                          session_memory: Optional[List] = None) -> str:
         """Generate Luna's response using LM Studio API with unified security validation"""
+        draft = self.begin_generation(question, trait, carma_result, session_memory)
+        self.run_inference(draft)
+        return self.finish_generation(draft)
+    
+    def begin_generation(self, question: str, trait: str, carma_result: Dict,
+                         session_memory: Optional[List] = None) -> Dict[str, Any]:
+        """
+        Pre-inference half of generate_response (reads and stages budget state)
+        
+        generate_response is begin_generation -> run_inference -> finish_generation.
+        Only run_inference talks to LM Studio and it touches no shared state, so a
+        session runner may overlap it across questions while begin/finish run in order.
+        """
+        draft = {'question': question, 'trait': trait, 'prep': None, 'raw': None, 'response': None, 'error': None}
+        try:
+            prep = self._prepare_generation(question, trait, carma_result, session_memory)
+        except Exception as e:
+            draft['error'] = e
+            return draft
+        if isinstance(prep, str):
+            # Template or conservation response - no inference needed
+            draft['response'] = prep
+        else:
+            draft['prep'] = prep
+        return draft
+    
+    def run_inference(self, draft: Dict[str, Any]) -> Dict[str, Any]:
+        """LM Studio call for a prepared draft (no-op for template or failed drafts)"""
+        prep = draft['prep']
+        if prep is not None and draft['error'] is None:
+            try:
+                # Call LM Studio API with modified parameters and complexity tier
+                draft['raw'] = self._call_lm_studio_api(prep['system_prompt'], prep['question'], prep['modified_params'], prep['tier_name'])
+            except Exception as e:
+                draft['error'] = e
+        return draft
+    
+    def finish_generation(self, draft: Dict[str, Any]) -> str:
+        """Post-processing, soul metrics and budget accounting for an inferred draft"""
         # V5.1: Track activity for heartbeat pulse
         active_this_tick = False
+        question = draft['question']
+        trait = draft['trait']
         
         try:
-            start_time = time.time()
-            
-            # INTERNAL REASONING: Use 120 Big Five questions as thought framework
-            reasoning_result = None
-            if hasattr(self.personality_system, 'internal_reasoning'):
-                try:
-                    reasoning_result = self.personality_system.internal_reasoning.reason_through_question(question)
-                    
-                    # Log reasoning process (reduced verbosity)
-                    # if reasoning_result.bigfive_answers:
-                    #     newly_answered = [a for a in reasoning_result.bigfive_answers if a.get('newly_answered', False)]
-                    #     self.logger.info(
-                    #         f"🧠 Internal Reasoning: Used {len(reasoning_result.bigfive_answers)} Big Five answers "
-                    #         f"({len(newly_answered)} newly answered)", 
-                    #         "LUNA"
-                    #     )
-                    #     
-                    #     # Log the thought process
-                    #     for answer in reasoning_result.bigfive_answers:
-                    #         self.logger.info(
-                    #             f"   💭 '{answer['question'][:50]}...' → {answer['answer']}", 
-                    #             "LUNA"
-                    #         )
-                except Exception as e:
-                    self.logger.warn(f"Internal reasoning failed: {e}", "LUNA")
-            
-            # Security validation and input sanitization
-            validation_result = self.security_validator.validate_input(question, "user_input")
-            if not validation_result["valid"]:
-                self.logger.warn(f"Input validation failed: {validation_result['warnings']}", "LUNA")
-                question = validation_result["sanitized"]
-            
-            self.logger.info(f"Generating response | trait={trait} | q_len={len(question)}", "LUNA")
-            
-            # Check for factual/identity questions that need template responses
-            template_response = self._check_for_template_response(question)
-            if template_response:
-                self.logger.info(f"Using template response for factual/identity question", "LUNA")
-                return template_response
-            
-            # Assess existential situation first
-            context = {
-                "question_type": self._classify_question_type(question),
-                "emotional_tone": self._analyze_emotional_tone(question),
-                "trait": trait
-            }
-            
-            # Classify response value using RVC (Response Value Classifier)
-            response_value_assessment = self.response_value_classifier.classify_response_value(question, context)
-            
-            # RVC and Existential assessment (reduced logging)
-            existential_decision = self.existential_budget.assess_existential_situation(question, context)
-            
-            # PERSONALITY ALIGNMENT CHECK - Ensure Luna stays aligned
-            alignment_result = self.personality_system.periodic_alignment_check()
-            if alignment_result.get('assessment_triggered', False):
-                self.logger.info(f"Personality alignment check triggered: {alignment_result.get('reason', 'Unknown')}", "LUNA")
-                # Luna will ask herself questions to realign her personality
-            
-            # Check if we should respond at all
-            if not existential_decision.should_respond:
-                # self.logger.log("LUNA", "Existential risk too high - skipping response", "WARNING")
-                return "..."  # Minimal response to indicate presence but conservation
-            
-            # Apply RVC token budget constraints to existential budget
-            rvc_constrained_budget = min(existential_decision.token_budget, response_value_assessment.max_token_budget)
-            
-            # RVC constraint application (logging disabled for reduced verbosity)
-            
-            # LAYER I: Pre-Inference Control (Budget Officer)
-            tier_name = response_value_assessment.tier.value.upper()
-            base_prompt = self._build_system_prompt(trait, session_memory, question, rvc_constrained_budget, carma_result)
-            
-            # Check if in Curiosity Zone - disable scarcity prompts to avoid conflicts
-            in_curiosity_zone = False
-            if hasattr(self, 'personality_system') and hasattr(self.personality_system, 'emergence_zone_system'):
-                in_curiosity_zone, _ = self.personality_system.emergence_zone_system.is_in_emergence_zone()
-            
-            # For LOW/MODERATE tier or Curiosity Zone, disable scarcity prompt injection
-            # MODERATE tier has its own balanced prompt and doesn't need aggressive constraints
-            original_scarcity_flag = self.custom_inference_controller.config.enable_scarcity_prompt_injection
-            if tier_name in ["LOW", "MODERATE"] or in_curiosity_zone:
-                self.custom_inference_controller.config.enable_scarcity_prompt_injection = False
-            try:
-                should_respond, conditioned_prompt, resource_state = self.custom_inference_controller.pre_inference_budget_check(
-                    rvc_constrained_budget, existential_decision.existential_risk,
-                    base_prompt
-                )
-            finally:
-                # Restore original flag
-                self.custom_inference_controller.config.enable_scarcity_prompt_injection = original_scarcity_flag
-            
-            # Log pre-inference control
-            # Pre-Inference Control (logging disabled for reduced verbosity)
-            if not should_respond:
-                return "..."
-            
-            system_prompt = conditioned_prompt
-            # self.logger.log("LUNA", f"System prompt built | length={len(system_prompt)}")
-            
-            # LAYER II: Inference-Time Control (Logit Surgeon)
-            # DYNAMIC LLM PARAMETERS - Adjust based on context
-            from luna_core.utilities.dynamic_llm_parameters import get_dynamic_llm_manager
-            
-            dynamic_manager = get_dynamic_llm_manager()
-            llm_params = dynamic_manager.get_parameters(
-                question=question,
-                session_memory=session_memory,
-                complexity_tier=response_value_assessment.tier.value.upper()
-            )
-            
-            # Log dynamic parameter selection
-            self.logger.log("LUNA", f"Dynamic LLM Params: temp={llm_params.temperature:.2f}, top_p={llm_params.top_p:.2f}, top_k={llm_params.top_k} | {llm_params.reasoning}")
-            
-            base_params = {
-                "model": self.chat_model,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": question}
-                ],
-                # DYNAMIC PARAMETERS - Adjusted per message
-                "temperature": llm_params.temperature,
-                "top_p": llm_params.top_p,
-                "top_k": llm_params.top_k,
-                "presence_penalty": llm_params.presence_penalty,
-                "frequency_penalty": llm_params.frequency_penalty,
-                "repetition_penalty": llm_params.repetition_penalty,
-                "max_tokens": 32768,  # Model limit (adjusted below per tier)
-                "stream": True        # Enable streaming for efficiency
-            }
-            
-            # Apply inference-time control modifications
-            modified_params = self.custom_inference_controller.apply_inference_time_control(
-                resource_state, 0, base_params, response_value_assessment.tier.value.upper()
-            )
-            
-            # Log inference-time control
-            self.logger.log("LUNA", f"Inference-Time Control: Resource State: {resource_state.value} | Logit Bias Applied: {bool(modified_params.get('logit_bias'))}")
-            
-            # Ensure LM Studio max_tokens respects RVC budget per tier
-            tier_name = response_value_assessment.tier.value.upper()
-            rvc_budget = response_value_assessment.max_token_budget
-            current_max = modified_params.get("max_tokens", 0)
-            if tier_name == "LOW":
-                # Allow more tokens for complete sentences, truncate post-processing
-                modified_params["max_tokens"] = min(current_max or 200, 200)  # Allow 200 tokens for complete sentences
-                self.logger.log(
-                    "LUNA",
-                    f"LM Studio max_tokens hard-capped for LOW tier: {current_max} -> {modified_params['max_tokens']} (RVC budget={rvc_budget})",
-                )
-            elif tier_name in ["MODERATE", "CRITICAL"]:
-                # Cap at reasonable limit to prevent infinite generation
-                modified_params["max_tokens"] = min(max(current_max, rvc_budget), 80)  # Cap at 80 tokens max
-                self.logger.log(
-                    "LUNA",
-                    f"LM Studio max_tokens capped for tier {tier_name}: {current_max} -> {modified_params['max_tokens']} (RVC budget={rvc_budget}, max=80)",
-                )
-
-            # Call LM Studio API with modified parameters and complexity tier
-            response = self._call_lm_studio_api(system_prompt, question, modified_params, tier_name)
+            if draft['error'] is not None:
+                raise draft['error']
+            prep = draft['prep']
+            if prep is None:
+                return draft['response']
+            question = prep['question']
+            tier_name = prep['tier_name']
+            response = draft['raw']
             
             if response:
                 # MODERATE/HIGH/CRITICAL Complexity: Apply embedder cleanup after main model response - DISABLED FOR DEBUGGING
@@ -592,119 +552,7 @@ Respond as Luna in 1-2 sentences:"""
                     processed = self._apply_post_processing(response, trait)
                     processed = self._strip_corporate_disclaimers(processed)
                 
-                # Apply Semantic Compression Filter for Maximum Impact Density (disabled by flag)
-                context = {
-                    "question_type": self._classify_question_type(question),
-                    "emotional_tone": self._analyze_emotional_tone(question),
-                    "trait": trait,
-                    "response": processed
-                }
-                if self.enable_max_impact_compression:
-                    compressed = self.compression_filter.compress_response(processed, context)
-                else:
-                    compressed = processed
-                    self.logger.log("LUNA", "Compression Filter: Maximum Impact Density disabled - passing raw processed output")
-                
-                # Calculate duration first
-                duration = time.time() - start_time
-                
-                # Apply Soul Metrics for controlled imperfection and cognitive friction (disabled for LOW tier)
-                if tier_name == "LOW":
-                    soul_enhanced = compressed
-                else:
-                    soul_enhanced = self.soul_metric_system.apply_soul_metrics(compressed, context)
-                
-                # Simulate micro-latency for natural timing
-                micro_delay = self.soul_metric_system.simulate_micro_latency(context)
-                if micro_delay > 0:
-                    time.sleep(micro_delay)
-                
-                # Evaluate using Token-Time Econometric System
-                econometric_evaluation = self.econometric_system.evaluate_response(
-                    soul_enhanced,
-                    0.8,  # Default quality score
-                    duration,
-                    context
-                )
-                
-                # Log comprehensive analysis
-                compression_analysis = self.compression_filter.analyze_compression_impact(processed, compressed)
-                soul_analysis = {"soul_score": 0.0} if tier_name == "LOW" else self.soul_metric_system.analyze_soul_metrics(compressed, soul_enhanced, context)
-                
-                self.logger.log("LUNA", f"Compression: {compression_analysis['original_length']}->{compression_analysis['compressed_length']} words ({compression_analysis['compression_ratio']:.1%}) | Soul: {soul_analysis['soul_score']:.3f} | Reward: {econometric_evaluation['reward_score']:.3f} | Efficiency: {econometric_evaluation['overall_efficiency']:.2f}")
-                
-                # Log performance indicators
-                performance = econometric_evaluation['performance_indicators']
-                self.logger.log("LUNA", f"Performance: {performance['overall_performance']} | Token: {performance['token_performance']} | Time: {performance['time_performance']} | Quality: {performance['quality_performance']}")
-                
-                # Log recommendations if any
-                if econometric_evaluation['recommendations']:
-                    for rec in econometric_evaluation['recommendations']:
-                        self.logger.log("LUNA", f"Recommendation: {rec}", "INFO")
-                
-                # Process response result through existential budget system
-                # Count words excluding free actions (one per sentence)
-                actual_token_cost = self.count_words_excluding_actions(processed)
-                existential_result = self.existential_budget.process_response_result(
-                    processed,
-                    0.8,  # Default quality score
-                    actual_token_cost,
-                    duration,
-                    context
-                )
-                
-                # Validate RVC efficiency requirements
-                rvc_validation = self.response_value_classifier.validate_response_efficiency(
-                    response_value_assessment, actual_token_cost, 0.8
-                )
-                
-                # LAYER III: Post-Inference Control (Accountability Judge) with HYPER-TAX MULTIPLIER
-                post_inference_results = self.custom_inference_controller.post_inference_control(
-                    system_prompt, processed, 0.8, duration,
-                    rvc_constrained_budget, existential_result.get('karma_earned', 0.0), 
-                    self.existential_budget.state.karma_quota, self.existential_budget.state.age,
-                    rvc_constrained_budget  # Pass RVC budget for Hyper-Tax calculation
-                )
-                
-                # Log post-inference control results
-                self.logger.log("LUNA", f"Post-Inference Control: Token Cost: {post_inference_results['token_cost']} | New Pool: {post_inference_results['new_pool']} | Reward Score: {post_inference_results['reward_score']:.3f}")
-                
-                if post_inference_results['age_changed']:
-                    if post_inference_results['age_up']:
-                        self.logger.log("LUNA", f" AGE UP! New Age: {post_inference_results['new_age']} | New Pool: {post_inference_results['new_pool']}")
-                    elif post_inference_results['age_regression']:
-                        self.logger.log("LUNA", f" AGE REGRESSION! New Age: {post_inference_results['new_age']} | New Pool: {post_inference_results['new_pool']}", "WARNING")
-                        
-                # Log existential result
-                # === V5: Add Linguistic Calculus Bonus to Karma ===
-                calc_bonus = 0.0
-                if hasattr(self, '_last_calc_depth') and hasattr(self, '_last_calc_gain'):
-                    calc_bonus = 0.05 * self._last_calc_depth + 0.2 * (1 if self._last_calc_gain > 0 else 0)
-                    if calc_bonus > 0:
-                        existential_result['karma_earned'] += calc_bonus
-                        self.logger.log("LUNA", f"Lingua Calc Bonus: +{calc_bonus:.2f} karma (depth={self._last_calc_depth}, gain={self._last_calc_gain:.2f})", "INFO")
-                
-                self.logger.log("LUNA", f"Existential Result: Karma +{existential_result['karma_earned']:.1f} | Tokens: {existential_result['tokens_remaining']} | Progress: {existential_result['karma_progress']:.1%} | Age: {existential_result['age']}")
-                
-                # Log RVC validation results
-                self.logger.log("LUNA", f"RVC Validation: {rvc_validation['efficiency_grade']} Grade | Efficiency: {rvc_validation['actual_efficiency']:.3f} | Required: {rvc_validation['required_efficiency']:.3f}")
-                if not rvc_validation['meets_efficiency_requirement']:
-                    self.logger.log("LUNA", f"RVC WARNING: Efficiency gap of {rvc_validation['efficiency_gap']:.3f} - below {response_value_assessment.tier.value.upper()} tier requirement", "WARNING")
-                if not rvc_validation['token_usage_appropriate']:
-                    self.logger.log("LUNA", f"RVC WARNING: Token overspend of {rvc_validation['overspend_penalty']} tokens - violated Rule of Minimal Sufficient Response", "WARNING")
-                    
-                    # Log regression risk if high
-                    existential_status = self.existential_budget.get_existential_status()
-                    if existential_status['regression_risk'] >= 0.6:
-                        self.logger.log("LUNA", f"REGRESSION RISK: {existential_status['regression_risk']:.2f} | Count: {existential_status['regression_count']} | Knowledge: {existential_status['permanent_knowledge_level']}", "WARNING")
-                    
-                    # Log survival recommendations if any
-                    survival_recs = self.existential_budget.get_survival_recommendations()
-                    if survival_recs:
-                        for rec in survival_recs:
-                            self.logger.log("LUNA", f"Survival: {rec}", "WARNING")
-                
-                self.logger.log("LUNA", f"Response generated | chars={len(soul_enhanced)} | ms={(duration*1000):.0f} | Grade: {econometric_evaluation['quality_grade']}")
+                soul_enhanced = self._finalize_response(processed, prep, question, trait)
                 # V5.1: Mark tick as active (response generated successfully)
                 active_this_tick = True
                 return soul_enhanced
@@ -720,6 +568,431 @@ Respond as Luna in 1-2 sentences:"""
             # V5.1: Guarantee pulse bit recorded even on exception
             self._emit_active_tick(bool(active_this_tick))
     
+    def generate_response_stream(self, question: str, trait: str, carma_result: Dict,
+                                 session_memory: Optional[List] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming variant of generate_response
+        
+        Runs the same pre-inference pipeline, then yields post-processed text as
+        LM Studio produces it (event format in luna_core.core.streaming). Budget,
+        RVC and econometric accounting run once the stream ends. Soul metrics and
+        max-impact compression rewrite the whole response, so streamed text skips them.
+        """
+        active_this_tick = False
+        metrics = StreamMetrics()
+        processor = None
+        
+        try:
+            prep = self._prepare_generation(question, trait, carma_result, session_memory)
+            if isinstance(prep, str):
+                # Template or conservation response - nothing to stream
+                metrics.mark_token()
+                metrics.mark_emit()
+                metrics.finish()
+                self.last_stream_metrics = metrics.to_dict()
+                yield {'event': 'token', 'text': prep}
+                yield {'event': 'done', 'response': prep, 'metadata': {'stream_metrics': self.last_stream_metrics}}
+                return
+            question = prep['question']
+            tier_name = prep['tier_name']
+            
+            processor = self._make_stream_processor(tier_name)
+            for delta in self._stream_lm_studio_api(prep['system_prompt'], question, prep['modified_params'], tier_name):
+                metrics.mark_token()
+                text = processor.feed(delta)
+                if text:
+                    metrics.mark_emit()
+                    yield {'event': 'token', 'text': text}
+                if processor.closed:
+                    # Sentence cap / brevity reached - stop paying for tokens nobody will see
+                    break
+            
+            tail = processor.flush()
+            if tail:
+                metrics.mark_emit()
+                yield {'event': 'token', 'text': tail}
+            
+            processed = processor.text.strip()
+            if processed:
+                final = self._finalize_response(processed, prep, question, trait, streamed=True)
+                active_this_tick = True
+            else:
+                self.logger.log("LUNA", "API empty stream, using fallback", "WARNING")
+                final = self._generate_fallback_response(question, trait)
+                yield {'event': 'token', 'text': final}
+            
+            metrics.finish()
+            self.last_stream_metrics = metrics.to_dict()
+            self.logger.log("LUNA", f"Stream complete | ttft_ms={metrics.ttft_ms or 0:.0f} | first_emit_ms={metrics.first_emit_ms or 0:.0f} | total_ms={metrics.total_ms:.0f} | tokens={metrics.model_tokens}")
+            yield {'event': 'done', 'response': final, 'metadata': {'stream_metrics': self.last_stream_metrics}}
+        
+        except Exception as e:
+            self.logger.log("LUNA", f"Error streaming response: {e}", "ERROR")
+            fallback = self._generate_fallback_response(question, trait)
+            shown = processor is not None and bool(processor.text)
+            metrics.finish()
+            self.last_stream_metrics = metrics.to_dict()
+            yield {'event': 'replace' if shown else 'token', 'text': fallback}
+            yield {'event': 'done', 'response': fallback, 'metadata': {'stream_metrics': self.last_stream_metrics}}
+        
+        finally:
+            # V5.1: Guarantee pulse bit recorded even on exception
+            self._emit_active_tick(bool(active_this_tick))
+    
+    def _prepare_generation(self, question: str, trait: str, carma_result: Dict,
+                            session_memory: Optional[List] = None):
+        """
+        Pre-inference pipeline shared by generate_response and generate_response_stream
+        
+        Returns a final response string for template / conservation paths, otherwise
+        a dict with the prompt, inference parameters and budget state.
+        """
+        start_time = time.time()
+        
+        # Independent analyzers (reasoning, validation, classification, budgets,
+        # prompt building) run as a dependency graph - see _build_pre_inference_pipeline
+        run = self.pre_inference_pipeline.run(question, trait, {
+            'session_memory': session_memory,
+            'carma_result': carma_result
+        })
+        self._log_pre_inference_timings(run)
+        if run['halted'] is not None:
+            return run['halted'].response
+        
+        results = run['results']
+        question = results['validate']
+        response_value_assessment = results['rvc']
+        existential_decision = results['existential']
+        in_curiosity_zone = results['curiosity_zone']
+        llm_params = results['llm_params']
+        
+        # Apply RVC token budget constraints to existential budget
+        rvc_constrained_budget = min(existential_decision.token_budget, response_value_assessment.max_token_budget)
+        
+        # RVC constraint application (logging disabled for reduced verbosity)
+        
+        # LAYER I: Pre-Inference Control (Budget Officer)
+        tier_name = response_value_assessment.tier.value.upper()
+        base_prompt = results['system_prompt']
+        
+        # For LOW/MODERATE tier or Curiosity Zone, disable scarcity prompt injection
+        # MODERATE tier has its own balanced prompt and doesn't need aggressive constraints
+        original_scarcity_flag = self.custom_inference_controller.config.enable_scarcity_prompt_injection
+        if tier_name in ["LOW", "MODERATE"] or in_curiosity_zone:
+            self.custom_inference_controller.config.enable_scarcity_prompt_injection = False
+        try:
+            should_respond, conditioned_prompt, resource_state = self.custom_inference_controller.pre_inference_budget_check(
+                rvc_constrained_budget, existential_decision.existential_risk,
+                base_prompt
+            )
+        finally:
+            # Restore original flag
+            self.custom_inference_controller.config.enable_scarcity_prompt_injection = original_scarcity_flag
+        
+        # Log pre-inference control
+        # Pre-Inference Control (logging disabled for reduced verbosity)
+        if not should_respond:
+            return "..."
+        
+        system_prompt = conditioned_prompt
+        # self.logger.log("LUNA", f"System prompt built | length={len(system_prompt)}")
+        
+        # LAYER II: Inference-Time Control (Logit Surgeon)
+        # DYNAMIC LLM PARAMETERS - selected by the pre-inference pipeline
+        # Log dynamic parameter selection
+        self.logger.log("LUNA", f"Dynamic LLM Params: temp={llm_params.temperature:.2f}, top_p={llm_params.top_p:.2f}, top_k={llm_params.top_k} | {llm_params.reasoning}")
+        
+        base_params = {
+            "model": self.chat_model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": question}
+            ],
+            # DYNAMIC PARAMETERS - Adjusted per message
+            "temperature": llm_params.temperature,
+            "top_p": llm_params.top_p,
+            "top_k": llm_params.top_k,
+            "presence_penalty": llm_params.presence_penalty,
+            "frequency_penalty": llm_params.frequency_penalty,
+            "repetition_penalty": llm_params.repetition_penalty,
+            "max_tokens": 32768,  # Model limit (adjusted below per tier)
+            "stream": True        # Enable streaming for efficiency
+        }
+        
+        # Apply inference-time control modifications
+        modified_params = self.custom_inference_controller.apply_inference_time_control(
+            resource_state, 0, base_params, response_value_assessment.tier.value.upper()
+        )
+        
+        # Log inference-time control
+        self.logger.log("LUNA", f"Inference-Time Control: Resource State: {resource_state.value} | Logit Bias Applied: {bool(modified_params.get('logit_bias'))}")
+        
+        # Ensure LM Studio max_tokens respects RVC budget per tier
+        tier_name = response_value_assessment.tier.value.upper()
+        rvc_budget = response_value_assessment.max_token_budget
+        current_max = modified_params.get("max_tokens", 0)
+        if tier_name == "LOW":
+            # Allow more tokens for complete sentences, truncate post-processing
+            modified_params["max_tokens"] = min(current_max or 200, 200)  # Allow 200 tokens for complete sentences
+            self.logger.log(
+                "LUNA",
+                f"LM Studio max_tokens hard-capped for LOW tier: {current_max} -> {modified_params['max_tokens']} (RVC budget={rvc_budget})",
+            )
+        elif tier_name in ["MODERATE", "CRITICAL"]:
+            # Cap at reasonable limit to prevent infinite generation
+            modified_params["max_tokens"] = min(max(current_max, rvc_budget), 80)  # Cap at 80 tokens max
+            self.logger.log(
+                "LUNA",
+                f"LM Studio max_tokens capped for tier {tier_name}: {current_max} -> {modified_params['max_tokens']} (RVC budget={rvc_budget}, max=80)",
+            )
+        
+        return {
+            'question': question,
+            'start_time': start_time,
+            'tier_name': tier_name,
+            'system_prompt': system_prompt,
+            'modified_params': modified_params,
+            'response_value_assessment': response_value_assessment,
+            'rvc_constrained_budget': rvc_constrained_budget,
+            'pre_inference': {k: run[k] for k in ('timings_ms', 'memo_hits', 'total_ms', 'over_budget')}
+        }
+    
+    def _build_pre_inference_pipeline(self) -> PreInferencePipeline:
+        """
+        Declare the pre-inference stages and their dependencies
+        
+        Each stage is func(question, trait, deps, context). Stages that only
+        look at the question (classification, templates, RVC) are memoized.
+        Stages that read or mutate personality / existential state share the
+        'personality' exclusive group, so they never run concurrently.
+        The stateful Budget Officer check stays sequential in _prepare_generation.
+        """
+        pipeline = PreInferencePipeline(max_workers=4, memo_size=256, budget_ms=self.pre_inference_budget_ms)
+        
+        def reasoning(question, trait, deps, context):
+            # INTERNAL REASONING: Use 120 Big Five questions as thought framework
+            if not hasattr(self.personality_system, 'internal_reasoning'):
+                return None
+            try:
+                return self.personality_system.internal_reasoning.reason_through_question(question)
+            except Exception as e:
+                self.logger.warn(f"Internal reasoning failed: {e}", "LUNA")
+                return None
+        
+        def validate(question, trait, deps, context):
+            # Security validation and input sanitization
+            validation_result = self.security_validator.validate_input(question, "user_input")
+            if not validation_result["valid"]:
+                self.logger.warn(f"Input validation failed: {validation_result['warnings']}", "LUNA")
+                question = validation_result["sanitized"]
+            self.logger.info(f"Generating response | trait={trait} | q_len={len(question)}", "LUNA")
+            return question
+        
+        def template(question, trait, deps, context):
+            # Check for factual/identity questions that need template responses
+            template_response = self._check_for_template_response(deps['validate'])
+            if template_response:
+                self.logger.info(f"Using template response for factual/identity question", "LUNA")
+                return HaltPipeline(template_response, "template")
+            return None
+        
+        def question_type(question, trait, deps, context):
+            return self._classify_question_type(deps['validate'])
+        
+        def emotional_tone(question, trait, deps, context):
+            return self._analyze_emotional_tone(deps['validate'])
+        
+        def analysis_context(deps, trait):
+            return {
+                "question_type": deps['question_type'],
+                "emotional_tone": deps['emotional_tone'],
+                "trait": trait
+            }
+        
+        def rvc(question, trait, deps, context):
+            # Classify response value using RVC (Response Value Classifier)
+            return self.response_value_classifier.classify_response_value(deps['validate'], analysis_context(deps, trait))
+        
+        def existential(question, trait, deps, context):
+            decision = self.existential_budget.assess_existential_situation(deps['validate'], analysis_context(deps, trait))
+            if not decision.should_respond:
+                return HaltPipeline("...", "existential")  # Minimal response to indicate presence but conservation
+            return decision
+        
+        def alignment(question, trait, deps, context):
+            # PERSONALITY ALIGNMENT CHECK - Ensure Luna stays aligned
+            alignment_result = self.personality_system.periodic_alignment_check()
+            if alignment_result.get('assessment_triggered', False):
+                self.logger.info(f"Personality alignment check triggered: {alignment_result.get('reason', 'Unknown')}", "LUNA")
+            return alignment_result
+        
+        def curiosity_zone(question, trait, deps, context):
+            # Curiosity Zone disables scarcity prompts to avoid conflicts
+            if hasattr(self.personality_system, 'emergence_zone_system'):
+                in_zone, _ = self.personality_system.emergence_zone_system.is_in_emergence_zone()
+                return in_zone
+            return False
+        
+        def llm_params(question, trait, deps, context):
+            from luna_core.utilities.dynamic_llm_parameters import get_dynamic_llm_manager
+            return get_dynamic_llm_manager().get_parameters(
+                question=deps['validate'],
+                session_memory=context.get('session_memory'),
+                complexity_tier=deps['rvc'].tier.value.upper()
+            )
+        
+        def system_prompt(question, trait, deps, context):
+            budget = min(deps['existential'].token_budget, deps['rvc'].max_token_budget)
+            return self._build_system_prompt(trait, context.get('session_memory'), deps['validate'], budget, context.get('carma_result'))
+        
+        pipeline.add_stage('reasoning', reasoning, exclusive='personality')
+        pipeline.add_stage('validate', validate)
+        pipeline.add_stage('template', template, deps=['validate'], memoize=True)
+        pipeline.add_stage('question_type', question_type, deps=['validate', 'template'], memoize=True)
+        pipeline.add_stage('emotional_tone', emotional_tone, deps=['validate', 'template'], memoize=True)
+        pipeline.add_stage('rvc', rvc, deps=['validate', 'question_type', 'emotional_tone'], memoize=True)
+        pipeline.add_stage('existential', existential, deps=['validate', 'question_type', 'emotional_tone'],
+                           exclusive='personality')
+        pipeline.add_stage('alignment', alignment, deps=['template'], exclusive='personality')
+        pipeline.add_stage('curiosity_zone', curiosity_zone, deps=['template'], exclusive='personality')
+        pipeline.add_stage('llm_params', llm_params, deps=['validate', 'rvc'])
+        pipeline.add_stage('system_prompt', system_prompt, deps=['validate', 'rvc', 'existential'],
+                           exclusive='personality')
+        return pipeline
+    
+    def _log_pre_inference_timings(self, run: Dict):
+        """Record stage timings and flag runs that blow the pre-inference budget"""
+        self.last_pre_inference = run
+        stages = " ".join(f"{name}={ms:.0f}" for name, ms in sorted(run['timings_ms'].items(), key=lambda kv: -kv[1]))
+        level = "WARNING" if run['over_budget'] else "INFO"
+        self.logger.log("LUNA", f"Pre-inference {run['total_ms']:.0f}ms (budget {self.pre_inference_budget_ms:.0f}ms) | {stages} | memo={len(run['memo_hits'])}", level)
+    
+    def _finalize_response(self, processed: str, prep: Dict, question: str, trait: str,
+                           streamed: bool = False) -> str:
+        """Post-inference stage: compression, soul metrics, econometrics, existential budget and RVC"""
+        start_time = prep['start_time']
+        tier_name = prep['tier_name']
+        system_prompt = prep['system_prompt']
+        response_value_assessment = prep['response_value_assessment']
+        rvc_constrained_budget = prep['rvc_constrained_budget']
+        
+        # Apply Semantic Compression Filter for Maximum Impact Density (disabled by flag)
+        context = {
+            "question_type": self._classify_question_type(question),
+            "emotional_tone": self._analyze_emotional_tone(question),
+            "trait": trait,
+            "response": processed
+        }
+        if self.enable_max_impact_compression and not streamed:
+            compressed = self.compression_filter.compress_response(processed, context)
+        else:
+            compressed = processed
+            self.logger.log("LUNA", "Compression Filter: Maximum Impact Density disabled - passing raw processed output")
+        
+        # Calculate duration first
+        duration = time.time() - start_time
+        
+        # Apply Soul Metrics for controlled imperfection and cognitive friction (disabled for LOW tier)
+        # Streamed text is already on screen, so it is never rewritten or delayed
+        if tier_name == "LOW" or streamed:
+            soul_enhanced = compressed
+        else:
+            soul_enhanced = self.soul_metric_system.apply_soul_metrics(compressed, context)
+        
+        # Simulate micro-latency for natural timing
+        micro_delay = 0 if streamed else self.soul_metric_system.simulate_micro_latency(context)
+        if micro_delay > 0:
+            time.sleep(micro_delay)
+        
+        # Evaluate using Token-Time Econometric System
+        econometric_evaluation = self.econometric_system.evaluate_response(
+            soul_enhanced,
+            0.8,  # Default quality score
+            duration,
+            context
+        )
+        
+        # Log comprehensive analysis
+        compression_analysis = self.compression_filter.analyze_compression_impact(processed, compressed)
+        soul_analysis = {"soul_score": 0.0} if tier_name == "LOW" else self.soul_metric_system.analyze_soul_metrics(compressed, soul_enhanced, context)
+        
+        self.logger.log("LUNA", f"Compression: {compression_analysis['original_length']}->{compression_analysis['compressed_length']} words ({compression_analysis['compression_ratio']:.1%}) | Soul: {soul_analysis['soul_score']:.3f} | Reward: {econometric_evaluation['reward_score']:.3f} | Efficiency: {econometric_evaluation['overall_efficiency']:.2f}")
+        
+        # Log performance indicators
+        performance = econometric_evaluation['performance_indicators']
+        self.logger.log("LUNA", f"Performance: {performance['overall_performance']} | Token: {performance['token_performance']} | Time: {performance['time_performance']} | Quality: {performance['quality_performance']}")
+        
+        # Log recommendations if any
+        if econometric_evaluation['recommendations']:
+            for rec in econometric_evaluation['recommendations']:
+                self.logger.log("LUNA", f"Recommendation: {rec}", "INFO")
+        
+        # Process response result through existential budget system
+        # Count words excluding free actions (one per sentence)
+        actual_token_cost = self.count_words_excluding_actions(processed)
+        existential_result = self.existential_budget.process_response_result(
+            processed,
+            0.8,  # Default quality score
+            actual_token_cost,
+            duration,
+            context
+        )
+        
+        # Validate RVC efficiency requirements
+        rvc_validation = self.response_value_classifier.validate_response_efficiency(
+            response_value_assessment, actual_token_cost, 0.8
+        )
+        
+        # LAYER III: Post-Inference Control (Accountability Judge) with HYPER-TAX MULTIPLIER
+        post_inference_results = self.custom_inference_controller.post_inference_control(
+            system_prompt, processed, 0.8, duration,
+            rvc_constrained_budget, existential_result.get('karma_earned', 0.0), 
+            self.existential_budget.state.karma_quota, self.existential_budget.state.age,
+            rvc_constrained_budget  # Pass RVC budget for Hyper-Tax calculation
+        )
+        
+        # Log post-inference control results
+        self.logger.log("LUNA", f"Post-Inference Control: Token Cost: {post_inference_results['token_cost']} | New Pool: {post_inference_results['new_pool']} | Reward Score: {post_inference_results['reward_score']:.3f}")
+        
+        if post_inference_results['age_changed']:
+            if post_inference_results['age_up']:
+                self.logger.log("LUNA", f" AGE UP! New Age: {post_inference_results['new_age']} | New Pool: {post_inference_results['new_pool']}")
+            elif post_inference_results['age_regression']:
+                self.logger.log("LUNA", f" AGE REGRESSION! New Age: {post_inference_results['new_age']} | New Pool: {post_inference_results['new_pool']}", "WARNING")
+                
+        # Log existential result
+        # === V5: Add Linguistic Calculus Bonus to Karma ===
+        calc_bonus = 0.0
+        if hasattr(self, '_last_calc_depth') and hasattr(self, '_last_calc_gain'):
+            calc_bonus = 0.05 * self._last_calc_depth + 0.2 * (1 if self._last_calc_gain > 0 else 0)
+            if calc_bonus > 0:
+                existential_result['karma_earned'] += calc_bonus
+                self.logger.log("LUNA", f"Lingua Calc Bonus: +{calc_bonus:.2f} karma (depth={self._last_calc_depth}, gain={self._last_calc_gain:.2f})", "INFO")
+        
+        self.logger.log("LUNA", f"Existential Result: Karma +{existential_result['karma_earned']:.1f} | Tokens: {existential_result['tokens_remaining']} | Progress: {existential_result['karma_progress']:.1%} | Age: {existential_result['age']}")
+        
+        # Log RVC validation results
+        self.logger.log("LUNA", f"RVC Validation: {rvc_validation['efficiency_grade']} Grade | Efficiency: {rvc_validation['actual_efficiency']:.3f} | Required: {rvc_validation['required_efficiency']:.3f}")
+        if not rvc_validation['meets_efficiency_requirement']:
+            self.logger.log("LUNA", f"RVC WARNING: Efficiency gap of {rvc_validation['efficiency_gap']:.3f} - below {response_value_assessment.tier.value.upper()} tier requirement", "WARNING")
+        if not rvc_validation['token_usage_appropriate']:
+            self.logger.log("LUNA", f"RVC WARNING: Token overspend of {rvc_validation['overspend_penalty']} tokens - violated Rule of Minimal Sufficient Response", "WARNING")
+            
+            # Log regression risk if high
+            existential_status = self.existential_budget.get_existential_status()
+            if existential_status['regression_risk'] >= 0.6:
+                self.logger.log("LUNA", f"REGRESSION RISK: {existential_status['regression_risk']:.2f} | Count: {existential_status['regression_count']} | Knowledge: {existential_status['permanent_knowledge_level']}", "WARNING")
+            
+            # Log survival recommendations if any
+            survival_recs = self.existential_budget.get_survival_recommendations()
+            if survival_recs:
+                for rec in survival_recs:
+                    self.logger.log("LUNA", f"Survival: {rec}", "WARNING")
+        
+        self.logger.log("LUNA", f"Response generated | chars={len(soul_enhanced)} | ms={(duration*1000):.0f} | Grade: {econometric_evaluation['quality_grade']}")
+        
+        return soul_enhanced
+    
     def _classify_question_type(self, question: str) -> str:
         """Classify the type of question for compression context"""
         question_lower = question.lower()
@@ -1564,65 +1837,11 @@ Choose the best starting word based on the context and user message."""
         return prompt
 
     def _get_db_context(self, query_text: str, limit: int = 5) -> str:
-        """Fetch a few recent user messages from the conversations DB related to the topic."""
+        """Fetch a few user messages from the conversations DB related to the topic (FTS5-ranked, pooled)."""
         try:
-            db_path = Path('Data') / 'AIOS_Database' / 'database' / 'conversations.db'
-            if not db_path.exists():
-                return ""
-            conn = sqlite3.connect(str(db_path))
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
-            # Prefer recent USER lines mentioning the topic; then fallback to general recent USER; then assistant
-            cur.execute(
-                """
-                SELECT m.content
-                FROM messages m
-                JOIN conversations c ON c.id = m.conversation_id
-                WHERE m.role = 'user'
-                  AND m.content LIKE ?
-                ORDER BY m.timestamp DESC
-                LIMIT ?
-                """,
-                (f'%{query_text}%', limit)
-            )
-            rows = cur.fetchall()
-            if not rows:
-                cur.execute(
-                    """
-                    SELECT m.content
-                    FROM messages m
-                    JOIN conversations c ON c.id = m.conversation_id
-                    WHERE m.role = 'user'
-                    ORDER BY m.timestamp DESC
-                    LIMIT ?
-                    """,
-                    (limit,)
-                )
-                rows = cur.fetchall()
-            if not rows:
-                cur.execute(
-                    """
-                    SELECT m.content
-                    FROM messages m
-                    JOIN conversations c ON c.id = m.conversation_id
-                    WHERE m.role = 'assistant'
-                    ORDER BY m.timestamp DESC
-                    LIMIT ?
-                    """,
-                    (limit,)
-                )
-                rows = cur.fetchall()
-            conn.close()
-            snippets = []
-            for r in rows:
-                text = (r["content"] or "").strip()
-                if text:
-                    # keep short snippets
-                    # prefer single-line snippets
-                    one_line = " ".join(text.splitlines())
-                    snippets.append(one_line[:240])
-            return "\n".join(snippets[:limit])
-        except Exception:
+            return "\n".join(get_conversation_db().search_snippets(query_text, limit))
+        except Exception as e:
+            self.logger.log("LUNA", f"Conversation DB context failed: {e}", "WARNING")
             return ""
 
     def _get_files_corpus_context(self, query_text: str, limit_snippets: int = 5) -> str:
@@ -1916,6 +2135,113 @@ You must output ONLY the ruthlessly cleaned text - no explanations, no meta-comm
             self.logger.log("LUNA", f"EMBEDDER CLEANUP: Error {e}, keeping original response", "WARNING")
             return response
     
+    def _build_ava_mode_request(self, system_prompt: str, question: str, modified_params: Dict = None) -> Dict:
+        """Ava Mode request body (LOW tier, main model)"""
+        # Use modified_params from Custom Inference Controller if provided
+        if modified_params:
+            # Create a copy of modified_params and override model names for GSD
+            gsd_params = modified_params.copy()
+            gsd_params["model"] = get_main_model()  # Main model for quality responses
+            # gsd_params["draft_model"] = "mlabonne_qwen3-0.6b-abliterated"  # Draft model (Fast) - DISABLED for testing
+            gsd_params["stream"] = False  # Force non-streaming for GSD to avoid SSE parsing issues
+            
+            data = {
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": question}
+                ],
+                **gsd_params  # Include all Custom Inference Controller parameters with GSD overrides
+            }
+        else:
+            # Fallback to standard parameters
+            data = {
+                "model": get_main_model(),  # Main model for quality responses
+                # "draft_model": "mlabonne_qwen3-0.6b-abliterated",  # Draft model (Fast) - DISABLED for testing
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": question}
+                ],
+                "temperature": 0.1,
+                "max_tokens": 40,  # Max 40 tokens for final response (20 free + 20 from pool)
+                "stream": False  # Disable streaming for GSD to avoid SSE parsing issues
+            }
+        
+        return data
+    
+    def _build_luna_mode_request(self, system_prompt: str, question: str, modified_params: Dict = None) -> Dict:
+        """Luna Mode request body (MODERATE/HIGH/CRITICAL tiers, main model without logit_bias)"""
+        # Clean GSD - disable problematic Custom Inference Controller params
+        if modified_params:
+            # Use clean GSD parameters - NO logit_bias from Custom Inference Controller
+            gsd_params = modified_params.copy()
+            gsd_params["model"] = get_main_model()
+            gsd_params["stream"] = False
+            
+            # Remove problematic logit_bias that causes "parable" loops
+            if "logit_bias" in gsd_params:
+                del gsd_params["logit_bias"]
+            
+            # Clean GSD settings - like LM Studio defaults
+            data = {
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": question}
+                ],
+                "temperature": 0.4,  # Slightly higher for more variety
+                "max_tokens": 80,     # MODERATE tier
+                "repetition_penalty": 1.1,  # Conservative repetition control
+                "top_p": 0.9,         # Standard top-p
+                "top_k": 40,          # Conservative top-k
+                **gsd_params  # Include clean GSD parameters (no logit_bias)
+            }
+        else:
+            # Fallback to standard parameters
+            data = {
+                "model": get_main_model(),  # Main model
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": question}
+                ],
+                "temperature": 0.3,  # Slight randomness to prevent loops
+                "max_tokens": 60,  # MODERATE tier - allow thoughtful responses (15-30 words * 2 for safety)
+                "repetition_penalty": 1.2,  # Penalize repetition to prevent "parable" loops
+                "stream": False  # Disable streaming to avoid SSE parsing issues
+            }
+        
+        return data
+    
+    def _build_default_request(self, system_prompt: str, question: str, modified_params: Dict, model_to_use: str) -> Dict:
+        """Request body for tiers outside the multi-model pipeline"""
+        # Use modified_params from Custom Inference Controller if provided
+        if modified_params:
+            data = {
+                "model": model_to_use,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": question}
+                ],
+                **modified_params  # Include all Custom Inference Controller parameters including logit_bias
+            }
+        else:
+            # Fallback to standard parameters (should not happen in normal operation)
+            data = {
+                "model": model_to_use,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": question}
+                ],
+                "temperature": 0.1,  # Very low for fastest generation
+                "top_p": 0.85,       # Moderate for focused responses (guardrail)
+                "top_k": 40,         # Moderate for relevance (guardrail)
+                "presence_penalty": 0.0,  # No presence penalty
+                "frequency_penalty": 0.0,  # No frequency penalty
+                "repetition_penalty": 1.1,  # Modest repetition penalty (guardrail)
+                "max_tokens": 40,    # Ultra short responses for speed
+                "stream": True       # Enable streaming for faster response
+            }
+        
+        return data
+    
     def _generate_ava_mode_response(self, system_prompt: str, question: str, modified_params: Dict = None) -> Optional[str]:
         """
         Ava Mode: Daily Driver responses using Llama 1B
@@ -1931,36 +2257,7 @@ You must output ONLY the ruthlessly cleaned text - no explanations, no meta-comm
             self.logger.log("LUNA", f"AVA MODEL: {get_main_model()} (Main Model)", "INFO")
             print("AVA MODE CALLED - DAILY DRIVER RESPONSE!")
             
-            # Use modified_params from Custom Inference Controller if provided
-            if modified_params:
-                headers = {"Content-Type": "application/json"}
-                # Create a copy of modified_params and override model names for GSD
-                gsd_params = modified_params.copy()
-                gsd_params["model"] = get_main_model()  # Main model for quality responses
-                # gsd_params["draft_model"] = "mlabonne_qwen3-0.6b-abliterated"  # Draft model (Fast) - DISABLED for testing
-                gsd_params["stream"] = False  # Force non-streaming for GSD to avoid SSE parsing issues
-                
-                data = {
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": question}
-                    ],
-                    **gsd_params  # Include all Custom Inference Controller parameters with GSD overrides
-                }
-            else:
-                # Fallback to standard parameters
-                headers = {"Content-Type": "application/json"}
-                data = {
-                    "model": get_main_model(),  # Main model for quality responses
-                    # "draft_model": "mlabonne_qwen3-0.6b-abliterated",  # Draft model (Fast) - DISABLED for testing
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": question}
-                    ],
-                    "temperature": 0.1,
-                    "max_tokens": 40,  # Max 40 tokens for final response (20 free + 20 from pool)
-                    "stream": False  # Disable streaming for GSD to avoid SSE parsing issues
-                }
+            data = self._build_ava_mode_request(system_prompt, question, modified_params)
             
             self.logger.log("LUNA", f"AVA REQUEST: Daily Driver Mode (Llama-1B)", "INFO")
             
@@ -2043,45 +2340,7 @@ You must output ONLY the ruthlessly cleaned text - no explanations, no meta-comm
             self.logger.log("LUNA", f"LUNA MODEL: Rogue-Creative-7B-Dark-Horror (q6_k) + SD (iq1_m)", "INFO")
             print("MODERATE MODE CALLED - USING 7B MODEL WITH SPECULATIVE DECODING!")
             
-            # Clean GSD - disable problematic Custom Inference Controller params
-            headers = {"Content-Type": "application/json"}
-            
-            if modified_params:
-                # Use clean GSD parameters - NO logit_bias from Custom Inference Controller
-                gsd_params = modified_params.copy()
-                gsd_params["model"] = get_main_model()
-                gsd_params["stream"] = False
-                
-                # Remove problematic logit_bias that causes "parable" loops
-                if "logit_bias" in gsd_params:
-                    del gsd_params["logit_bias"]
-                
-                # Clean GSD settings - like LM Studio defaults
-                data = {
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": question}
-                    ],
-                    "temperature": 0.4,  # Slightly higher for more variety
-                    "max_tokens": 80,     # MODERATE tier
-                    "repetition_penalty": 1.1,  # Conservative repetition control
-                    "top_p": 0.9,         # Standard top-p
-                    "top_k": 40,          # Conservative top-k
-                    **gsd_params  # Include clean GSD parameters (no logit_bias)
-                }
-            else:
-                # Fallback to standard parameters
-                data = {
-                    "model": get_main_model(),  # Main model
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": question}
-                    ],
-                    "temperature": 0.3,  # Slight randomness to prevent loops
-                    "max_tokens": 60,  # MODERATE tier - allow thoughtful responses (15-30 words * 2 for safety)
-                    "repetition_penalty": 1.2,  # Penalize repetition to prevent "parable" loops
-                    "stream": False  # Disable streaming to avoid SSE parsing issues
-                }
+            data = self._build_luna_mode_request(system_prompt, question, modified_params)
             
             self.logger.log("LUNA", f"LUNA REQUEST: Deep Thinking Mode (Rogue-Creative-7B with SD)", "INFO")
             
@@ -2119,35 +2378,8 @@ You must output ONLY the ruthlessly cleaned text - no explanations, no meta-comm
                 model_to_use = self.chat_model
                 self.logger.log("LUNA", f"MULTI-MODEL: Using DEFAULT model for {complexity_tier.upper()} complexity", "INFO")
             
-            # Use modified_params from Custom Inference Controller if provided
-            if modified_params:
-                headers = {"Content-Type": "application/json"}
-                data = {
-                    "model": model_to_use,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": question}
-                    ],
-                    **modified_params  # Include all Custom Inference Controller parameters including logit_bias
-                }
-            else:
-                # Fallback to standard parameters (should not happen in normal operation)
-                headers = {"Content-Type": "application/json"}
-                data = {
-                    "model": model_to_use,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": question}
-                    ],
-                    "temperature": 0.1,  # Very low for fastest generation
-                    "top_p": 0.85,       # Moderate for focused responses (guardrail)
-                    "top_k": 40,         # Moderate for relevance (guardrail)
-                    "presence_penalty": 0.0,  # No presence penalty
-                    "frequency_penalty": 0.0,  # No frequency penalty
-                    "repetition_penalty": 1.1,  # Modest repetition penalty (guardrail)
-                    "max_tokens": 40,    # Ultra short responses for speed
-                    "stream": True       # Enable streaming for faster response
-                }
+            headers = {"Content-Type": "application/json"}
+            data = self._build_default_request(system_prompt, question, modified_params, model_to_use)
             
             # No timeout for localhost - it's local!
             self.logger.log("LUNA", f"LM Studio request | model={model_to_use} | url={self.lm_studio_url}")
@@ -2159,25 +2391,15 @@ You must output ONLY the ruthlessly cleaned text - no explanations, no meta-comm
                 self.logger.log("LUNA", f"DEBUG: NO logit bias in request data", "WARNING")
             
             api_start = time.time()
-            response = requests.post(self.lm_studio_url, json=data, headers=headers)
+            # stream=True so SSE chunks are read as they arrive instead of after the body is buffered
+            response = requests.post(self.lm_studio_url, json=data, headers=headers, stream=bool(data.get('stream', False)))
             api_ms = (time.time() - api_start) * 1000
             
             if response.status_code == 200:
                 if data.get('stream', False):
                     # Handle streaming response
-                    full_content = ""
-                    for line in response.iter_lines():
-                        if line:
-                            line_str = line.decode('utf-8')
-                            if line_str.startswith('data: '):
-                                try:
-                                    chunk_data = json.loads(line_str[6:])
-                                    if 'choices' in chunk_data and len(chunk_data['choices']) > 0:
-                                        delta = chunk_data['choices'][0].get('delta', {})
-                                        if 'content' in delta:
-                                            full_content += delta['content']
-                                except Exception as e:
-                                    continue
+                    full_content = "".join(iter_sse_deltas(response.iter_lines()))
+                    api_ms = (time.time() - api_start) * 1000
                     self.logger.log("LUNA", f"LM Studio streaming ok | ms={api_ms:.0f} | chars={len(full_content)}")
                     return full_content.strip()
                 else:
@@ -2201,6 +2423,34 @@ You must output ONLY the ruthlessly cleaned text - no explanations, no meta-comm
             self.logger.log("LUNA", f"LM Studio API call failed: {e}", "ERROR")
             return None
     
+    def _stream_lm_studio_api(self, system_prompt: str, question: str, modified_params: Dict = None, complexity_tier: str = "LOW") -> Iterator[str]:
+        """
+        Streaming counterpart of _call_lm_studio_api
+        
+        Builds the same request as the tier's non-streaming path with stream=True
+        and yields content deltas as LM Studio sends them. Closing the generator
+        closes the HTTP connection, which stops generation server-side.
+        """
+        tier = complexity_tier.upper()
+        if tier == "LOW":
+            data = self._build_ava_mode_request(system_prompt, question, modified_params)
+        elif tier in ["MODERATE", "HIGH", "CRITICAL"]:
+            data = self._build_luna_mode_request(system_prompt, question, modified_params)
+        else:
+            data = self._build_default_request(system_prompt, question, modified_params, self.chat_model)
+        data["stream"] = True
+        
+        self.logger.log("LUNA", f"LM Studio stream request | tier={tier} | model={data.get('model')} | url={self.lm_studio_url}")
+        response = requests.post(self.lm_studio_url, json=data, headers={"Content-Type": "application/json"}, stream=True, timeout=300)
+        try:
+            if response.status_code != 200:
+                self.logger.log("LUNA", f"LM Studio stream error | status={response.status_code}", "ERROR")
+                return
+            for delta in iter_sse_deltas(response.iter_lines()):
+                yield delta
+        finally:
+            response.close()
+    
     def _apply_post_processing(self, response: str, trait: str) -> str:
         """Apply post-processing to response"""
         # Add personality-based enhancements
@@ -2214,14 +2464,8 @@ You must output ONLY the ruthlessly cleaned text - no explanations, no meta-comm
             except (ValueError, TypeError):
                 return default
         
-        # Keep responses lean and natural
-        response = re.sub(r"\s+", " ", response).strip()
-
-        # Remove emojis and excessive punctuation
-        response = re.sub(r"[\U00010000-\U0010ffff]", "", response)
-        response = re.sub(r"[⭐‍‍]+", "", response)
-        response = re.sub(r"[!]{2,}", "!", response)
-        response = re.sub(r"^[\s,;:\-]+", "", response)
+        # Keep responses lean and natural: whitespace, emojis, excessive punctuation in one pass
+        response = RESPONSE_CLEANUP_ENGINE.apply(response).strip()
         
         # Enforce foundational voice profile unless disabled
         vp = getattr(self.personality_system, 'voice_profile', {})
@@ -2238,58 +2482,12 @@ You must output ONLY the ruthlessly cleaned text - no explanations, no meta-comm
                     if start == -1: start = 0
                     if end == -1: end = len(response)-1
                     response = (response[:start] + response[end+1:]).strip()
-        # Additional generic bans
-        extra_bans = [
-            "in our rapidly evolving world",
-            "it's a superpower",
-            "superpower",
-            "i'm all ears",
-            "happy to help",
-            "let me know if",
-            "as an ai",
-            "i'm programmed",
-            "you've got this",
-            "you got this",
-            "remember,",
-            "ever considered",
-            "trusted friend",
-            "mentor",
-            "i believe in you",
-            "proud of you",
-            "you are good",
-            "big time",
-            "absolutely",
-            "super ",
-            "really ",
-            "it's really",
-            "it's super",
-            "it's good",
-            "it's totally",
-            "cool strength",
-            "it totally",
-            "it's valuable",
-            "it's all about",
-            "gently",
-            "anchor",
-            "gift",
-        ]
         if corporate_filter:
-            for phrase in extra_bans:
-                response = re.sub(re.escape(phrase), '', response, flags=re.IGNORECASE)
+            response = BANNED_PHRASE_ENGINE.apply(response)
 
         # If strict style requested, lightly trim; else keep natural
-        strict = vp_style.get('strict', False)
         sentences = [s.strip() for s in re.split(r"(?<=[\.?])\s+|\n+", response) if s.strip()]
-        if strict:
-            sentences = sentences[:2]
-        else:
-            concision = (vp_style.get('concision') or 'short').lower()
-            if concision == 'short':
-                sentences = sentences[:3]
-            elif concision == 'medium':
-                sentences = sentences[:6]
-            else:
-                sentences = sentences[:8]
+        sentences = sentences[:self._max_sentences(vp_style)]
         response = " ".join(sentences)
 
         # Final whitespace cleanup
@@ -2309,12 +2507,68 @@ You must output ONLY the ruthlessly cleaned text - no explanations, no meta-comm
         
         return response
     
+    def _max_sentences(self, vp_style: Dict) -> int:
+        """Sentence cap from the voice profile (strict=2, short=3, medium=6, else 8)"""
+        if vp_style.get('strict', False):
+            return 2
+        concision = (vp_style.get('concision') or 'short').lower()
+        if concision == 'short':
+            return 3
+        if concision == 'medium':
+            return 6
+        return 8
+    
+    def _stream_sentence_filter(self, sentence: str) -> str:
+        """
+        Per-sentence version of _apply_post_processing + _strip_corporate_disclaimers
+        
+        Used while streaming: a sentence containing a banned phrase is dropped,
+        everything else gets the same local cleanups as the full-string path.
+        """
+        sentence = RESPONSE_CLEANUP_ENGINE.apply(sentence).strip()
+        
+        vp = getattr(self.personality_system, 'voice_profile', {})
+        if vp.get('style', {}).get('corporate_filter', True):
+            lowered = sentence.lower()
+            if any(phrase and phrase.lower() in lowered for phrase in vp.get('banned_phrases', [])):
+                return ""
+            sentence = BANNED_PHRASE_ENGINE.apply(sentence)
+            sentence = re.sub(r"\s+", " ", sentence).strip()
+        
+        sentence = self._strip_corporate_disclaimers(sentence)
+        sentence = self._normalize_caps(sentence)
+        sentence = self._clarify_vocal_stims(sentence)
+        return self._remove_stray_hmm(sentence)
+    
+    def _stream_low_tier_filter(self, chunk: str) -> str:
+        """LOW-tier streaming filter: caps/stims only, like the non-streaming LOW path"""
+        return self._clarify_vocal_stims(self._normalize_caps(chunk))
+    
+    def _make_stream_processor(self, tier_name: str) -> StreamingPostProcessor:
+        """Incremental post-processor matching the tier's non-streaming post-processing"""
+        if tier_name == "LOW":
+            return StreamingPostProcessor(self._stream_low_tier_filter, granularity='word')
+        vp_style = getattr(self.personality_system, 'voice_profile', {}).get('style', {})
+        return StreamingPostProcessor(
+            self._stream_sentence_filter,
+            granularity='sentence',
+            max_sentences=self._max_sentences(vp_style),
+            target_words=30
+        )
+    
     def _remove_stray_hmm(self, text: str) -> str:
         """Remove 'hmm' that appears outside of actions - looks like a bug"""
-        import re
         # Remove patterns like "The hmm unique" or "I hmm think"
-        text = re.sub(r'\b(the|I|that|this|a|an|it|is)\s+hmm\s+', r'\1 ', text, flags=re.IGNORECASE)
-        return text
+        return STRAY_HMM_PATTERN.sub(r'\1 ', text)
+    
+    def get_rewrite_hits(self) -> Dict[str, Dict[str, int]]:
+        """Per-rule hit counters of the post-processing rewrite engines"""
+        return {
+            'cleanup': RESPONSE_CLEANUP_ENGINE.hit_counts(),
+            'banned_phrases': BANNED_PHRASE_ENGINE.hit_counts(),
+            'vocal_stims': VOCAL_STIM_ENGINE.hit_counts(),
+            'compression': self.compression_filter.get_rule_hits()
+        }
     
     def _enforce_brevity(self, text: str, target_words: int = 30) -> str:
         """
@@ -2408,27 +2662,10 @@ You must output ONLY the ruthlessly cleaned text - no explanations, no meta-comm
         Clarify vocal stims in actions to avoid looking like bugs.
         Converts things like "*stims hmm intensely*" to "*hums and stims intensely*"
         Also removes stray "hmm" outside of actions.
-        """
-        import re
         
-        # First, remove stray "hmm" that appears outside of actions (bug fix)
-        # Match patterns like "The hmm unique" or "I hmm think"
-        text = re.sub(r'\b(the|I|that|this|a|an)\s+hmm\s+', r'\1 ', text, flags=re.IGNORECASE)
-        
-        # Patterns for vocal sounds that might appear in actions
-        vocal_patterns = [
-            (r'\*stims\s+(hmm|hm|mm)\s+', r'*hums and stims '),
-            (r'\*stims\s+(hmm|hm|mm)\b', r'*hums while stimming'),
-            (r'\*(hmm|hm|mm)\s+stims\s+', r'*hums and stims '),
-            (r'\*rocks\s+(hmm|hm|mm)\s+', r'*hums and rocks '),
-            (r'\*taps\s+(hmm|hm|mm)\s+', r'*hums and taps '),
-            (r'\*fidgets\s+(hmm|hm|mm)\s+', r'*hums and fidgets '),
-        ]
-        
-        for pattern, replacement in vocal_patterns:
-            text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-        
-        return text
+        Both are rules of VOCAL_STIM_ENGINE, applied in a single pass.
+        """
+        return VOCAL_STIM_ENGINE.apply(text)
 
     def _strip_corporate_disclaimers(self, text: str) -> str:
         """Remove generic phrases that flatten Luna's persona."""
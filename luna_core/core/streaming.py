@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Luna Streaming
+Token streaming primitives: SSE parsing, incremental post-processing and TTFT tracking
+
+Stream consumers receive event dicts:
+    {'event': 'token', 'text': ...}     - text to append
+    {'event': 'replace', 'text': ...}   - final post-processing changed the text; show this instead
+    {'event': 'done', 'response': ..., 'metadata': {...}}
+"""
+
+import re
+import json
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, Optional, Any
+
+# Same sentence boundary rule as LunaResponseGenerator._apply_post_processing
+SENTENCE_BOUNDARY = re.compile(r"(?<=[\.?])\s+|\n+")
+
+
+def iter_sse_deltas(lines: Iterable) -> Iterator[str]:
+    """Yield content deltas from an OpenAI-style SSE stream (LM Studio)"""
+    for line in lines:
+        if not line:
+            continue
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        if not line.startswith('data: '):
+            continue
+        payload = line[6:].strip()
+        if payload == '[DONE]':
+            break
+        try:
+            chunk = json.loads(payload)
+        except ValueError:
+            continue
+        choices = chunk.get('choices') or []
+        if choices:
+            content = choices[0].get('delta', {}).get('content')
+            if content:
+                yield content
+
+
+@dataclass
+class StreamMetrics:
+    """Latency markers for one streamed response (milliseconds from start)"""
+    start: float = 0.0
+    ttft_ms: Optional[float] = None          # first model token received
+    first_emit_ms: Optional[float] = None    # first post-processed text shown to the user
+    total_ms: Optional[float] = None
+    model_tokens: int = 0
+
+    def __post_init__(self):
+        if not self.start:
+            self.start = time.perf_counter()
+
+    def _elapsed(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def mark_token(self):
+        self.model_tokens += 1
+        if self.ttft_ms is None:
+            self.ttft_ms = self._elapsed()
+
+    def mark_emit(self):
+        if self.first_emit_ms is None:
+            self.first_emit_ms = self._elapsed()
+
+    def finish(self):
+        self.total_ms = self._elapsed()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'ttft_ms': self.ttft_ms,
+            'first_emit_ms': self.first_emit_ms,
+            'total_ms': self.total_ms,
+            'model_tokens': self.model_tokens
+        }
+
+
+class StreamingPostProcessor:
+    """
+    Incremental post-processing over partial model output
+
+    granularity='sentence': text is released one complete sentence at a time,
+    after `sentence_filter` runs on it. Sentence-level filters (banned phrase
+    removal, caps normalization, ...) behave as they do on the full string,
+    and the sentence cap / brevity rule can stop the stream early.
+
+    granularity='word': text is released up to the last whitespace (holding
+    back an unclosed *action*), after `sentence_filter` runs on the chunk.
+    Used for the LOW tier where only local filters apply.
+    """
+
+    def __init__(self,
+                 sentence_filter: Callable[[str], str],
+                 granularity: str = 'sentence',
+                 max_sentences: Optional[int] = None,
+                 target_words: Optional[int] = None,
+                 overage_words: int = 10):
+        self.sentence_filter = sentence_filter
+        self.granularity = granularity
+        self.max_sentences = max_sentences
+        self.target_words = target_words
+        self.overage_words = overage_words
+
+        self._buffer = ""
+        self._parts = []
+        self._sentences = 0
+        self._words = 0
+        self._brevity_waived = False
+        self.closed = False
+
+    @property
+    def text(self) -> str:
+        """Everything emitted so far"""
+        return "".join(self._parts)
+
+    def feed(self, delta: str) -> str:
+        """Add a model delta; return newly releasable text (may be empty)"""
+        if self.closed or not delta:
+            return ""
+        self._buffer += delta
+        if self.granularity == 'word':
+            return self._release_words()
+        return self._release_sentences(final=False)
+
+    def flush(self) -> str:
+        """Release whatever is still buffered at end of stream"""
+        if self.closed:
+            return ""
+        if self.granularity == 'word':
+            out = self._emit_chunk(self._buffer)
+            self._buffer = ""
+            return out
+        out = self._release_sentences(final=True)
+        self.closed = True
+        return out
+
+    def _release_words(self) -> str:
+        cut = max(self._buffer.rfind(' '), self._buffer.rfind('\n'))
+        if cut <= 0:
+            return ""
+        # Hold back an action that hasn't closed yet (*stims hmm ...)
+        if self._buffer.count('*', 0, cut) % 2 == 1:
+            cut = self._buffer.rfind('*', 0, cut)
+            if cut <= 0:
+                return ""
+        chunk, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        return self._emit_chunk(chunk)
+
+    def _emit_chunk(self, chunk: str) -> str:
+        if not chunk:
+            return ""
+        filtered = self.sentence_filter(chunk)
+        if not self._parts:
+            filtered = filtered.lstrip()
+        if filtered:
+            self._parts.append(filtered)
+        return filtered
+
+    def _release_sentences(self, final: bool) -> str:
+        released = []
+        while not self.closed:
+            match = SENTENCE_BOUNDARY.search(self._buffer)
+            if match:
+                sentence = self._buffer[:match.start()]
+                self._buffer = self._buffer[match.end():]
+            elif final and self._buffer.strip():
+                sentence, self._buffer = self._buffer, ""
+            else:
+                break
+            out = self._accept_sentence(sentence)
+            if out:
+                released.append(out)
+        return "".join(released)
+
+    def _accept_sentence(self, sentence: str) -> str:
+        filtered = self.sentence_filter(sentence.strip()).strip()
+        if not filtered:
+            return ""
+
+        words = len(filtered.split())
+        if self.target_words is not None and not self._brevity_waived:
+            # Mirror _enforce_brevity: cut at a sentence end within target + overage,
+            # but never drop the text when the first sentence is already longer
+            if self._words + words > self.target_words + self.overage_words:
+                if self._sentences == 0:
+                    self._brevity_waived = True
+                else:
+                    self.closed = True
+                    return ""
+
+        out = filtered if self._sentences == 0 else " " + filtered
+        self._parts.append(out)
+        self._sentences += 1
+        self._words += words
+        if self.max_sentences is not None and self._sentences >= self.max_sentences:
+            self.closed = True
+        return out
+
+
+def collect_stream(events: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Drain an event stream; returns the final 'done' event (with response and metadata)"""
+    text = ""
+    done = {'event': 'done', 'response': "", 'metadata': {}}
+    for event in events:
+        kind = event.get('event')
+        if kind == 'token':
+            text += event.get('text', '')
+        elif kind == 'replace':
+            text = event.get('text', '')
+        elif kind == 'done':
+            done = event
+    if not done.get('response'):
+        done['response'] = text
+    return done
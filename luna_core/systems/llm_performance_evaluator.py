@@ -15,12 +15,21 @@ Advanced evaluation system for measuring LLM performance and personality consist
 import sys
 import json
 import time
+import atexit
 import sqlite3
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from dataclasses import dataclass, asdict
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
 # Add current directory to path
 sys.path.append(str(Path(__file__).parent))
 
@@ -28,6 +37,8 @@ sys.path.append(str(Path(__file__).parent))
 from support_core.support_core import SimpleEmbedder, EmbeddingSimilarity
 # Note: LunaSystem import removed to avoid circular dependency
 
+EVALUATION_DB = Path("data_core/AIOS_Database/database/performance_evaluations.db")
+
 @dataclass
 class LLMPerformanceEvaluation:
     """LLM performance evaluation result"""
@@ -145,11 +156,32 @@ class SemanticAlignmentEvaluator:
         print(f"   Target traits: {len(self.target_traits)}")
     
     def _precompute_trait_embeddings(self):
-        """Precompute embeddings for target traits"""
+        """Precompute embeddings for target traits, stacked into a unit-row matrix"""
         for trait in self.target_traits:
             embedding = self.embedder.embed(trait)
             if embedding:
                 self.trait_embeddings[trait] = embedding
+        
+        self.trait_names = list(self.trait_embeddings)
+        self.trait_matrix = None
+        if NUMPY_AVAILABLE and self.trait_names:
+            dims = {len(embedding) for embedding in self.trait_embeddings.values()}
+            if len(dims) == 1:
+                matrix = np.asarray([self.trait_embeddings[t] for t in self.trait_names], dtype=np.float64)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                # Zero-norm traits score 0.0, as in EmbeddingSimilarity
+                self.trait_matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+    
+    def _trait_similarities(self, response_embedding: List[float]) -> List[float]:
+        """Cosine similarity of the response to every trait (one matrix-vector product)"""
+        if self.trait_matrix is None:
+            return [EmbeddingSimilarity.calculate_cosine_similarity(response_embedding, self.trait_embeddings[t])
+                    for t in self.trait_names]
+        vector = np.asarray(response_embedding, dtype=np.float64)
+        norm = np.linalg.norm(vector)
+        if vector.shape[0] != self.trait_matrix.shape[1] or norm == 0:
+            return [0.0] * len(self.trait_names)
+        return (self.trait_matrix @ (vector / norm)).tolist()
     
     def evaluate_response(self, response: str) -> Dict[str, Any]:
         """Evaluate semantic alignment of response with Luna persona"""
@@ -157,15 +189,9 @@ class SemanticAlignmentEvaluator:
         if not response_embedding:
             return {'semantic_scores': {}, 'embedding_similarity': 0.0}
         
-        semantic_scores = {}
-        total_similarity = 0.0
-        
-        for trait, trait_embedding in self.trait_embeddings.items():
-            similarity = EmbeddingSimilarity.calculate_cosine_similarity(
-                response_embedding, trait_embedding
-            )
-            semantic_scores[trait] = similarity
-            total_similarity += similarity
+        similarities = self._trait_similarities(response_embedding)
+        semantic_scores = dict(zip(self.trait_names, similarities))
+        total_similarity = sum(similarities)
         
         avg_similarity = total_similarity / len(self.target_traits) if self.target_traits else 0.0
         
@@ -260,10 +286,158 @@ Please evaluate your response:"""
         
         return scores
 
+class EvaluationStore:
+    """
+    Long-lived SQLite store for performance evaluations
+    
+    One connection (WAL) is opened per database and the schema and indexes
+    are created once. save() stages rows and writes them in one executemany
+    transaction every batch_size evaluations; pending rows are flushed before
+    any read and at interpreter exit. Summaries are aggregate queries served
+    from the (performance_level, performance_score), trait and timestamp indexes.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS performance_evaluations (
+            response_id TEXT PRIMARY KEY,
+            timestamp TEXT,
+            trait TEXT,
+            question TEXT,
+            response TEXT,
+            architect_scores TEXT,
+            architect_notes TEXT,
+            semantic_scores TEXT,
+            embedding_similarity REAL,
+            self_evaluation_scores TEXT,
+            self_reflection TEXT,
+            performance_score REAL,
+            performance_level TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_perf_eval_trait ON performance_evaluations(trait);
+        CREATE INDEX IF NOT EXISTS idx_perf_eval_timestamp ON performance_evaluations(timestamp);
+        CREATE INDEX IF NOT EXISTS idx_perf_eval_level_score ON performance_evaluations(performance_level, performance_score);
+    """
+    
+    INSERT_SQL = """
+        INSERT OR REPLACE INTO performance_evaluations 
+        (response_id, timestamp, trait, question, response, architect_scores, 
+         architect_notes, semantic_scores, embedding_similarity, self_evaluation_scores,
+         self_reflection, performance_score, performance_level)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    def __init__(self, db_path: Path = EVALUATION_DB, batch_size: int = 16):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._pending: List[Tuple] = []
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.executescript(self.SCHEMA)
+        atexit.register(self.close)
+    
+    @staticmethod
+    def _row(evaluation: LLMPerformanceEvaluation) -> Tuple:
+        return (
+            evaluation.response_id,
+            evaluation.timestamp,
+            json.dumps(evaluation.trait) if isinstance(evaluation.trait, dict) else evaluation.trait,
+            evaluation.question,
+            evaluation.response,
+            json.dumps(evaluation.architect_scores),
+            evaluation.architect_notes,
+            json.dumps(evaluation.semantic_scores),
+            evaluation.embedding_similarity,
+            json.dumps(evaluation.self_evaluation_scores),
+            evaluation.self_reflection,
+            evaluation.performance_score,
+            evaluation.performance_level
+        )
+    
+    def save(self, evaluation: LLMPerformanceEvaluation):
+        """Stage an evaluation (written with the next batch)"""
+        with self._lock:
+            self._pending.append(self._row(evaluation))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+    
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+    
+    def flush(self) -> int:
+        """Write staged evaluations in one transaction; returns rows written"""
+        with self._lock:
+            if not self._pending or self._conn is None:
+                return 0
+            rows, self._pending = self._pending, []
+            try:
+                with self._conn:
+                    self._conn.executemany(self.INSERT_SQL, rows)
+            except sqlite3.Error:
+                self._pending = rows + self._pending
+                raise
+            return len(rows)
+    
+    def summary(self, trait: Optional[str] = None, since: Optional[str] = None) -> Dict[str, Any]:
+        """Count, average score and level distribution (optionally for one trait / since an ISO timestamp)"""
+        clauses, params = [], []
+        if trait is not None:
+            clauses.append("trait = ?")
+            params.append(trait)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(f"""
+                SELECT performance_level, COUNT(*), SUM(performance_score)
+                FROM performance_evaluations {where}
+                GROUP BY performance_level
+            """, params).fetchall()
+        total_count = sum(count for _, count, _ in rows)
+        total_score = sum(score or 0.0 for _, _, score in rows)
+        return {
+            'total_evaluations': total_count,
+            'average_performance_score': round(total_score / total_count, 2) if total_count else 0.0,
+            'performance_level_distribution': {level: count for level, count, _ in rows}
+        }
+    
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self.flush()
+            finally:
+                self._conn.close()
+                self._conn = None
+        atexit.unregister(self.close)
+
+
+_evaluation_stores: Dict[str, EvaluationStore] = {}
+_evaluation_stores_lock = threading.Lock()
+
+
+def get_evaluation_store(db_path: Optional[Path] = None) -> EvaluationStore:
+    """Shared EvaluationStore per database path"""
+    path = Path(db_path or EVALUATION_DB)
+    key = str(path.resolve())
+    with _evaluation_stores_lock:
+        store = _evaluation_stores.get(key)
+        if store is None or store._conn is None:
+            store = _evaluation_stores[key] = EvaluationStore(path)
+        return store
+
+
 class LLMPerformanceEvaluationSystem:
     """Unified LLM performance evaluation system"""
     
-    def __init__(self, luna_system=None):
+    def __init__(self, luna_system=None, db_path: Path = EVALUATION_DB):
+        self.db_path = Path(db_path)
         self.architect_evaluator = ArchitectEvaluator()
         self.semantic_evaluator = SemanticAlignmentEvaluator()
         self.self_evaluator = RecursiveSelfEvaluator(luna_system)
@@ -419,98 +593,19 @@ class LLMPerformanceEvaluationSystem:
             return "Basic Response Generation"
     
     def _save_evaluation(self, evaluation: LLMPerformanceEvaluation):
-        """Save evaluation to database"""
+        """Save evaluation to database (batched through the shared evaluation store)"""
         try:
-            db_path = Path("data_core/AIOS_Database/database/performance_evaluations.db")
-            db_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            conn = sqlite3.connect(str(db_path))
-            cursor = conn.cursor()
-            
-            # Create table if not exists
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS performance_evaluations (
-                    response_id TEXT PRIMARY KEY,
-                    timestamp TEXT,
-                    trait TEXT,
-                    question TEXT,
-                    response TEXT,
-                    architect_scores TEXT,
-                    architect_notes TEXT,
-                    semantic_scores TEXT,
-                    embedding_similarity REAL,
-                    self_evaluation_scores TEXT,
-                    self_reflection TEXT,
-                    performance_score REAL,
-                    performance_level TEXT
-                )
-            """)
-            
-            # Insert evaluation
-            cursor.execute("""
-                INSERT OR REPLACE INTO performance_evaluations 
-                (response_id, timestamp, trait, question, response, architect_scores, 
-                 architect_notes, semantic_scores, embedding_similarity, self_evaluation_scores,
-                 self_reflection, performance_score, performance_level)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                evaluation.response_id,
-                evaluation.timestamp,
-                json.dumps(evaluation.trait) if isinstance(evaluation.trait, dict) else evaluation.trait,
-                evaluation.question,
-                evaluation.response,
-                json.dumps(evaluation.architect_scores),
-                evaluation.architect_notes,
-                json.dumps(evaluation.semantic_scores),
-                evaluation.embedding_similarity,
-                json.dumps(evaluation.self_evaluation_scores),
-                evaluation.self_reflection,
-                evaluation.performance_score,
-                evaluation.performance_level
-            ))
-            
-            conn.commit()
-            conn.close()
-            
-            print(f" Evaluation saved to database")
-            
+            get_evaluation_store(self.db_path).save(evaluation)
+            print(f" Evaluation queued for database")
         except Exception as e:
             print(f" Error saving evaluation: {e}")
     
-    def get_evaluation_summary(self) -> Dict[str, Any]:
-        """Get summary of all evaluations"""
+    def get_evaluation_summary(self, trait: Optional[str] = None, since: Optional[str] = None) -> Dict[str, Any]:
+        """Get summary of all evaluations (optionally for one trait / since an ISO timestamp)"""
         try:
-            db_path = Path("data_core/AIOS_Database/database/performance_evaluations.db")
-            if not db_path.exists():
+            if not self.db_path.exists():
                 return {'total_evaluations': 0}
-            
-            conn = sqlite3.connect(str(db_path))
-            cursor = conn.cursor()
-            
-            # Get total count
-            cursor.execute("SELECT COUNT(*) FROM performance_evaluations")
-            total_count = cursor.fetchone()[0]
-            
-            # Get average performance score
-            cursor.execute("SELECT AVG(performance_score) FROM performance_evaluations")
-            avg_score = cursor.fetchone()[0] or 0.0
-            
-            # Get performance level distribution
-            cursor.execute("""
-                SELECT performance_level, COUNT(*) 
-                FROM performance_evaluations 
-                GROUP BY performance_level
-            """)
-            level_distribution = dict(cursor.fetchall())
-            
-            conn.close()
-            
-            return {
-                'total_evaluations': total_count,
-                'average_performance_score': round(avg_score, 2),
-                'performance_level_distribution': level_distribution
-            }
-            
+            return get_evaluation_store(self.db_path).summary(trait, since)
         except Exception as e:
             print(f" Error getting evaluation summary: {e}")
             return {'error': str(e)}
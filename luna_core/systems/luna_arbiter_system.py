@@ -31,6 +31,11 @@ from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 from luna_core.systems.luna_cfia_system import LunaCFIASystem
+from luna_core.utilities.lesson_store import get_lesson_store
+from luna_core.utilities.fragment_metadata_queue import get_fragment_metadata_queue
+from luna_core.utilities.judge_cache import (
+    JudgeCache, JudgeClient, judge_key, parse_quality_score, parse_batch_scores
+)
 # Import moved to avoid circular dependency
 
 # Week 4: Import fractal policies for type-conditioned rubrics
@@ -88,10 +93,14 @@ class LunaArbiterSystem:
         # Core variables (The Economy) - Now using CFIA generational karma pool
         self.karma_history = []
         
-        # Cache management
+        # Cache management (lessons.jsonl append-only store, imports lessons.json once)
         self.cache_entries = []
+        self.lesson_store = get_lesson_store(self.cache_path)
         self._load_cache()
         
+        # Fragment lesson_metadata is written behind, in batches (see flush_fragment_metadata)
+        self.fragment_metadata_queue = get_fragment_metadata_queue(Path("data_core/FractalCache"))
+        
         # Initialize CFIA system for memory management
         self.cfia_system = LunaCFIASystem(cache_path)
         
@@ -133,10 +142,12 @@ class LunaArbiterSystem:
         # Week 4: Store current policies for type-conditioned assessment
         self.current_policies = None
 
-        # HTTP response caches (performance optimization)
-        self._gold_standard_cache = {}  # {(user_prompt, luna_response): gold_standard}
-        self._quality_cache = {}  # {(luna_response, gold_standard): quality_score}
+        # HTTP response caches (performance optimization) - LRU + TTL bounded, persisted in judge_cache.db
         self.max_cache_entries = 500  # Limit cache size
+        self.judge_client = JudgeClient()
+        judge_db = self.cache_path / "judge_cache.db"
+        self._gold_standard_cache = JudgeCache(judge_db, "gold_standard", max_entries=self.max_cache_entries)  # judge_key(user_prompt, luna_response) -> gold_standard
+        self._quality_cache = JudgeCache(judge_db, "quality", max_entries=self.max_cache_entries)  # judge_key(gold_standard, luna_response) -> quality_score
         
         print(" Luna Arbiter System Initialized")
         print(f"    Generation: {self.cfia_system.state.aiiq} (Karma: {self.cfia_system.state.karma_pool:.1f})")
@@ -342,17 +353,13 @@ class LunaArbiterSystem:
         Generate the reference answer using the embedder model
         This is the Arbiter's ideal response - the Gold Standard
         """
-                # Check cache first
-        cache_key = (user_prompt, luna_response)
-        if cache_key in self._gold_standard_cache:
-            return self._gold_standard_cache[cache_key]
-        
-        import requests
-        import json
+        # Check cache first
+        cache_key = judge_key(user_prompt, luna_response)
+        cached = self._gold_standard_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         # Use the embedder model (llama-3.2-1b-instruct) for Gold Standard generation
-        lm_studio_url = "http://localhost:1234/v1/chat/completions"
-        
         arbiter_system_prompt = """You are the Arbiter - an internal AI system that generates reference responses. 
 You operate outside of token limits and constraints. Your job is to create the ideal response that Luna should have given.
 
@@ -365,45 +372,24 @@ You are Luna's internal teacher and critic. Generate responses that are:
 
 You must respond with ONLY the Gold Standard response text - no explanations, no meta-commentary."""
 
-        try:
-            data = {
-                "model": "exaone-3.5-2.4b-instruct-abliterated",
-                "messages": [
-                    {"role": "system", "content": arbiter_system_prompt},
-                    {"role": "user", "content": f"User asked: '{user_prompt}'\n\nLuna responded: '{luna_response}'\n\nGenerate the reference response Luna should have given:"}
-                ],
-                "temperature": 0.3,  # Lower temperature for more consistent reference responses
-                "max_tokens": 200,   # Reasonable length for reference responses
-                "stream": False
-            }
-            
-            response = requests.post(lm_studio_url, json=data, timeout=10)
-            
-            if response.status_code == 200:
-                result = response.json()
-                gold_standard = result['choices'][0]['message']['content'].strip()
-                
-                # Clean up any potential artifacts
-                if gold_standard.startswith('"') and gold_standard.endswith('"'):
-                    gold_standard = gold_standard[1:-1]
-                
-                                
-                # Cache the result
-                self._gold_standard_cache[cache_key] = gold_standard
-                
-                # Limit cache size (LRU-ish)
-                if len(self._gold_standard_cache) > self.max_cache_entries:
-                    first_key = next(iter(self._gold_standard_cache))
-                    del self._gold_standard_cache[first_key]
-                
-                return gold_standard
-            else:
-                # Fallback to rule-based approach if API fails
-                return self._fallback_gold_standard(user_prompt)
-                
-        except Exception as e:
-            # Fallback to rule-based approach if there's an error
+        gold_standard = self.judge_client.complete(
+            arbiter_system_prompt,
+            f"User asked: '{user_prompt}'\n\nLuna responded: '{luna_response}'\n\nGenerate the reference response Luna should have given:",
+            temperature=0.3,  # Lower temperature for more consistent reference responses
+            max_tokens=200,   # Reasonable length for reference responses
+            timeout=10
+        )
+        if not gold_standard:
+            # Fallback to rule-based approach if API fails
             return self._fallback_gold_standard(user_prompt)
+        
+        # Clean up any potential artifacts
+        if gold_standard.startswith('"') and gold_standard.endswith('"'):
+            gold_standard = gold_standard[1:-1]
+        
+        # Cache the result (bounded LRU, persisted)
+        self._gold_standard_cache.put(cache_key, gold_standard)
+        return gold_standard
     
     def _fallback_gold_standard(self, user_prompt: str) -> str:
         """
@@ -466,23 +452,7 @@ You must respond with ONLY the Gold Standard response text - no explanations, no
         utility_score = quality_component + efficiency_component
         return min(1.0, utility_score)
     
-    def _embedder_quality_assessment(self, luna_response: str, gold_standard: str) -> float:
-        """
-        Use the embedder model (llama-3.2-1b-instruct) for harsh, aligned quality assessment
-        This creates alignment between memory storage and utility judgment
-        """
-                # Check cache first
-        cache_key = (luna_response, gold_standard)
-        if cache_key in self._quality_cache:
-            return self._quality_cache[cache_key]
-        
-        import requests
-        import json
-        
-        # Use the embedder model for quality assessment
-        lm_studio_url = "http://localhost:1234/v1/chat/completions"
-        
-        arbiter_judge_prompt = """You are the Arbiter's Quality Judge - a harsh, efficiency-focused critic. 
+    ARBITER_JUDGE_PROMPT = """You are the Arbiter's Quality Judge - a harsh, efficiency-focused critic. 
 You use the same brain that handles memory compression and embedding. Your job is to ruthlessly evaluate response quality.
 
 You MUST respond with ONLY a number between 0.0 and 1.0, where:
@@ -501,51 +471,64 @@ Be EXTREMELY harsh on:
 - Responses that are too short for complex questions
 
 Rate the quality harshly but fairly."""
-
-        try:
-            data = {
-                "model": "exaone-3.5-2.4b-instruct-abliterated",
-                "messages": [
-                    {"role": "system", "content": arbiter_judge_prompt},
-                    {"role": "user", "content": f"Rate the quality of this response (0.0 to 1.0):\n\nResponse: '{luna_response}'\n\nGold Standard: '{gold_standard}'\n\nQuality Score:"}
-                ],
-                "temperature": 0.1,  # Very low for consistent scoring
-                "max_tokens": 10,    # Just need a number
-                "stream": False
-            }
-            
-            response = requests.post(lm_studio_url, json=data, timeout=5)
-            
-            if response.status_code == 200:
-                result = response.json()
-                quality_text = result['choices'][0]['message']['content'].strip()
-                
-                # Extract number from response
-                try:
-                    # Try to find a number in the response
-                    import re
-                    numbers = re.findall(r'\d+\.?\d*', quality_text)
-                    if numbers:
-                        quality_score = float(numbers[0])
-                        # Ensure it's between 0.0 and 1.0
-                        if quality_score > 1.0:
-                            quality_score = quality_score / 10.0  # Handle cases like "8" meaning "0.8"
-                        quality_score = max(0.0, min(1.0, quality_score))
-                        self._quality_cache[cache_key] = quality_score
-                        return quality_score
-                    else:
-                        # Default harsh score if no number found
-                        return 0.1
-                except (ValueError, IndexError):
-                    # Default harsh score if parsing fails
-                    return 0.1
+    
+    def _embedder_quality_assessment(self, luna_response: str, gold_standard: str) -> float:
+        """
+        Use the embedder model (llama-3.2-1b-instruct) for harsh, aligned quality assessment
+        This creates alignment between memory storage and utility judgment
+        """
+        return self.assess_quality_batch([luna_response], gold_standard)[0]
+    
+    def assess_quality_batch(self, luna_responses: List[str], gold_standard: str) -> List[float]:
+        """
+        Score several candidate responses against one Gold Standard
+        
+        Cached judgements are reused; all uncached candidates go to the embedder
+        model in ONE call (numbered list in, "n: score" lines out). Candidates the
+        model gives no score for get the default harsh 0.1, which is not cached.
+        
+        Returns:
+            Quality scores (0.0 to 1.0) in the order of luna_responses
+        """
+        keys = [judge_key(gold_standard, response) for response in luna_responses]
+        scores: List[Optional[float]] = [self._quality_cache.get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        
+        if len(missing) == 1:
+            i = missing[0]
+            quality_text = self.judge_client.complete(
+                self.ARBITER_JUDGE_PROMPT,
+                f"Rate the quality of this response (0.0 to 1.0):\n\nResponse: '{luna_responses[i]}'\n\nGold Standard: '{gold_standard}'\n\nQuality Score:",
+                temperature=0.1,  # Very low for consistent scoring
+                max_tokens=10     # Just need a number
+            )
+            fresh = [parse_quality_score(quality_text) if quality_text else None]
+        elif missing:
+            numbered = "\n".join(f"{n}. '{luna_responses[i]}'" for n, i in enumerate(missing, 1))
+            quality_text = self.judge_client.complete(
+                self.ARBITER_JUDGE_PROMPT + "\nWhen given several numbered responses, rate each one on its own line as 'n: score'.",
+                f"Rate the quality of each response (0.0 to 1.0):\n\nResponses:\n{numbered}\n\nGold Standard: '{gold_standard}'\n\nQuality Scores:",
+                temperature=0.1,
+                max_tokens=8 * len(missing) + 10,
+                timeout=10
+            )
+            fresh = parse_batch_scores(quality_text, len(missing)) if quality_text else [None] * len(missing)
+        else:
+            fresh = []
+        
+        for i, score in zip(missing, fresh):
+            if score is None:
+                # Default harsh score if the model was unreachable or gave no number
+                scores[i] = 0.1
             else:
-                # Default harsh score if API fails
-                return 0.1
-                
-        except Exception as e:
-            # Default harsh score if there's an error
-            return 0.1
+                scores[i] = score
+                self._quality_cache.put(keys[i], score)
+        return scores
+    
+    def flush_judge_cache(self):
+        """Persist staged gold standard / quality judgements now"""
+        self._gold_standard_cache.flush()
+        self._quality_cache.flush()
     
     def _calculate_quality_gap(self, luna_response: str, gold_standard: str) -> float:
         """Calculate how close Luna's response is to the Gold Standard"""
@@ -730,15 +713,14 @@ Rate the quality harshly but fairly."""
         # Process with CFIA system
         cfia_result = self.cfia_system.process_lesson_addition(lesson_size)
         
-        # Save to file (using CFIA-managed file structure)
-        self._save_lessons_with_cfia()
+        # Append to the lesson store (using CFIA-managed file structure)
+        lesson_id = self._save_lessons_with_cfia(cache_entry)
         
         # Update mycelium retriever with new lesson
-        self._update_mycelium_with_new_lesson(cache_entry)
+        self._update_mycelium_with_new_lesson(cache_entry, lesson_id)
         
         # PHASE 3: Update fragment metadata (mycelium architecture)
         if context_fragments:
-            lesson_id = f"lesson_{len(self.cache_entries)-1:06d}"  # Current lesson ID
             self._update_fragment_lesson_metadata(lesson_id, context_fragments, cache_entry.utility_score)
         
         # Log CFIA results
@@ -753,61 +735,44 @@ Rate the quality harshly but fairly."""
     
     def _update_fragment_lesson_metadata(self, lesson_id: str, fragment_ids: List[str], contribution_score: float):
         """
-        Update lesson_metadata in fragments that contributed to this lesson
-        This creates the mycelium network connections
+        Record lesson_metadata for fragments that contributed to this lesson
+        This creates the mycelium network connections: one lesson store line now,
+        fragment files patched later by the write-behind queue
         
         Args:
             lesson_id: The ID of the lesson that was just created
             fragment_ids: List of fragment IDs that contributed
             contribution_score: How much this lesson benefited from the fragments (utility_score)
         """
-        from pathlib import Path
-        
-        fractal_cache_dir = Path("data_core/FractalCache")
-        fragments_updated = 0
+        fractal_cache_dir = self.fragment_metadata_queue.fragments_dir
+        linked = []
         
         for fragment_id in fragment_ids:
             # Fragment ID might be a full path or just an ID
-            if fragment_id.endswith('.json'):
-                fragment_file = fractal_cache_dir / fragment_id
-            else:
-                fragment_file = fractal_cache_dir / f"{fragment_id}.json"
-            
-            if not fragment_file.exists():
-                continue
-            
-            try:
-                # Load fragment
-                with open(fragment_file, 'r', encoding='utf-8') as f:
-                    fragment_data = json.load(f)
-                
-                # Initialize lesson_metadata if not present
-                if 'lesson_metadata' not in fragment_data:
-                    fragment_data['lesson_metadata'] = {
-                        'lessons_contributed_to': [],
-                        'contribution_scores': {},
-                        'last_lesson_update': None
-                    }
-                
-                # Add this lesson to the fragment's contribution list
-                if lesson_id not in fragment_data['lesson_metadata']['lessons_contributed_to']:
-                    fragment_data['lesson_metadata']['lessons_contributed_to'].append(lesson_id)
-                
-                # Store the contribution score
-                fragment_data['lesson_metadata']['contribution_scores'][lesson_id] = contribution_score
-                fragment_data['lesson_metadata']['last_lesson_update'] = time.time()
-                
-                # Save updated fragment
-                with open(fragment_file, 'w', encoding='utf-8') as f:
-                    json.dump(fragment_data, f, indent=2, ensure_ascii=False)
-                
-                fragments_updated += 1
-                
-            except Exception as e:
-                print(f"⚠️ Error updating fragment {fragment_id} metadata: {e}")
+            fragment_key = fragment_id[:-5] if fragment_id.endswith('.json') else fragment_id
+            if (fractal_cache_dir / f"{fragment_key}.json").exists() and fragment_key not in linked:
+                linked.append(fragment_key)
+        
+        try:
+            self.lesson_store.link_fragments(lesson_id, linked, contribution_score)
+        except OSError as e:
+            print(f"⚠️ Error recording fragment metadata for {lesson_id}: {e}")
+            return
         
-        if fragments_updated > 0:
-            print(f"🔗 Mycelium: Updated {fragments_updated} fragment(s) with lesson {lesson_id} metadata")
+        timestamp = time.time()
+        for fragment_key in linked:
+            self.fragment_metadata_queue.enqueue(fragment_key, lesson_id, contribution_score, timestamp)
+        
+        if linked:
+            print(f"🔗 Mycelium: Updated {len(linked)} fragment(s) with lesson {lesson_id} metadata")
+    
+    def get_fragment_lesson_metadata(self, fragment_id: str) -> Optional[Dict]:
+        """Lessons a fragment contributed to, with contribution scores"""
+        return self.lesson_store.fragment_metadata(fragment_id)
+    
+    def flush_fragment_metadata(self) -> int:
+        """Write all queued fragment lesson_metadata patches now (dream cycle / shutdown hook)"""
+        return self.fragment_metadata_queue.flush()
     
     def _get_mycelium_retriever(self):
         """Lazy load mycelium retriever to avoid circular imports"""
@@ -815,12 +780,13 @@ Rate the quality harshly but fairly."""
             try:
                 from luna_core.utilities.enhanced_lesson_retrieval import create_mycelium_retriever
                 self.mycelium_retriever = create_mycelium_retriever(self)
-                print(f"Mycelium retriever loaded with {len(self.mycelium_retriever.lessons_cache)} lessons")
+                print(f"Mycelium retriever loaded with {len(self.mycelium_retriever.store)} lessons")
             except ImportError:
                 # Fallback to direct import
                 try:
                     from luna_core.utilities.enhanced_lesson_retrieval import MyceliumLessonRetriever
-                    self.mycelium_retriever = MyceliumLessonRetriever(self.cache_path)
+                    self.mycelium_retriever = MyceliumLessonRetriever(
+                        self.cache_path / "lessons.json", "data_core/FractalCache", lesson_store=self.lesson_store)
                     print(f"Mycelium retriever loaded (fallback)")
                 except Exception as e:
                     print(f"Failed to load mycelium retriever: {e}")
@@ -830,87 +796,62 @@ Rate the quality harshly but fairly."""
                 self.mycelium_retriever = False
         return self.mycelium_retriever if self.mycelium_retriever is not False else None
     
-    def _update_mycelium_with_new_lesson(self, cache_entry: CacheEntry):
+    def _update_mycelium_with_new_lesson(self, cache_entry: CacheEntry, lesson_id: str):
         """Update mycelium retriever with new lesson"""
-        try:
-            # Create enhanced lesson from cache entry
-            lesson_id = f"lesson_{len(self.cache_entries):06d}"
-            enhanced_lesson = {
-                "original_prompt": cache_entry.original_prompt,
-                "suboptimal_response": cache_entry.suboptimal_response,
-                "gold_standard": cache_entry.gold_standard,
-                "utility_score": cache_entry.utility_score,
-                "karma_delta": cache_entry.karma_delta,
-                "timestamp": cache_entry.timestamp,
-                "context_tags": cache_entry.context_tags,
-                "context_files_used": []  # Will be populated as fragments contribute
-            }
-            
-            # Add to mycelium retriever cache
-            mycelium_retriever = self._get_mycelium_retriever()
-            if mycelium_retriever:
-                mycelium_retriever.lessons_cache[lesson_id] = enhanced_lesson
-            print(f" Updated mycelium retriever with new lesson: {lesson_id}")
-            
-        except Exception as e:
-            print(f" Error updating mycelium retriever: {e}")
+        # The retriever reads the shared lesson store, so the appended lesson is already visible
+        mycelium_retriever = self._get_mycelium_retriever()
+        if mycelium_retriever and mycelium_retriever.store is not self.lesson_store:
+            mycelium_retriever.store.refresh()
+        print(f" Updated mycelium retriever with new lesson: {lesson_id}")
+    
+    @staticmethod
+    def _lesson_record(entry: CacheEntry) -> Dict:
+        return {
+            "original_prompt": entry.original_prompt,
+            "suboptimal_response": entry.suboptimal_response,
+            "gold_standard": entry.gold_standard,
+            "utility_score": entry.utility_score,
+            "karma_delta": entry.karma_delta,
+            "timestamp": entry.timestamp,
+            "context_tags": entry.context_tags
+        }
     
-    def _save_lessons_with_cfia(self):
-        """Save lessons using CFIA file management"""
-        # For now, save to the main lessons file
+    @staticmethod
+    def _cache_entry_from_record(lesson: Dict) -> CacheEntry:
+        return CacheEntry(
+            original_prompt=lesson["original_prompt"],
+            suboptimal_response=lesson["suboptimal_response"],
+            gold_standard=lesson["gold_standard"],
+            utility_score=lesson["utility_score"],
+            karma_delta=lesson["karma_delta"],
+            timestamp=lesson["timestamp"],
+            context_tags=lesson["context_tags"]
+        )
+    
+    def _save_lessons_with_cfia(self, cache_entry: CacheEntry) -> str:
+        """Append a lesson to the lesson store (one line, no whole-file rewrite); returns its lesson_id"""
         # In a full implementation, this would distribute across CFIA-managed files
-        cache_file = self.cache_path / "lessons.json"
-        lessons_data = []
-        
-        for entry in self.cache_entries:
-            lessons_data.append({
-                "original_prompt": entry.original_prompt,
-                "suboptimal_response": entry.suboptimal_response,
-                "gold_standard": entry.gold_standard,
-                "utility_score": entry.utility_score,
-                "karma_delta": entry.karma_delta,
-                "timestamp": entry.timestamp,
-                "context_tags": entry.context_tags
-            })
-        
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(lessons_data, f, indent=2, ensure_ascii=False)
+        return self.lesson_store.add(self._lesson_record(cache_entry))
     
     def _store_lesson(self, cache_entry: CacheEntry):
         """Legacy method - now redirects to CFIA version"""
         return self._store_lesson_with_cfia(cache_entry)
     
     def _load_cache(self):
-        """Load existing lessons from cache"""
-        cache_file = self.cache_path / "lessons.json"
-        
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    lessons_data = json.load(f)
-                
-                for lesson in lessons_data:
-                    cache_entry = CacheEntry(
-                        original_prompt=lesson["original_prompt"],
-                        suboptimal_response=lesson["suboptimal_response"],
-                        gold_standard=lesson["gold_standard"],
-                        utility_score=lesson["utility_score"],
-                        karma_delta=lesson["karma_delta"],
-                        timestamp=lesson["timestamp"],
-                        context_tags=lesson["context_tags"]
-                    )
-                    self.cache_entries.append(cache_entry)
-                    
-            except Exception as e:
-                print(f" Error loading cache: {e}")
+        """Load existing lessons from the lesson store"""
+        try:
+            for _, lesson in self.lesson_store.items():
+                self.cache_entries.append(self._cache_entry_from_record(lesson))
+        except Exception as e:
+            print(f" Error loading cache: {e}")
     
     def retrieve_relevant_lesson(self, current_prompt: str) -> Optional[CacheEntry]:
         """
         Retrieve the most relevant Gold Standard lesson using Mycelium Architecture
         
         NEW FLOW:
-        1. Check lessons.json FIRST via mycelium retriever
-        2. Fall back to legacy cache_entries if needed
+        1. Check the lesson store FIRST via mycelium retriever
+        2. Fall back to the lesson store's tag index if needed
         3. Track fragment contributions to lessons
         """
         print(f"🔍 Arbiter.retrieve_relevant_lesson called for: '{current_prompt[:50]}...'")
@@ -938,15 +879,11 @@ Rate the quality harshly but fairly."""
         print(f" No mycelium match found, falling back to legacy cache")
         current_tags = self._extract_context_tags(current_prompt)
         
+        # Most shared tags wins (earliest lesson on ties) - inverted index instead of a full scan
         best_match = None
-        best_score = 0.0
-        
-        for entry in self.cache_entries:
-            # Calculate relevance score based on tag overlap
-            tag_overlap = len(set(current_tags).intersection(set(entry.context_tags)))
-            if tag_overlap > best_score:
-                best_score = tag_overlap
-                best_match = entry
+        lesson_id = self.lesson_store.best_tag_match(current_tags)
+        if lesson_id:
+            best_match = self._cache_entry_from_record(self.lesson_store.get(lesson_id))
         
         if best_match:
             print(f" Retrieved legacy lesson: {best_match.context_tags}")
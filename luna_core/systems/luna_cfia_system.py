@@ -20,6 +20,8 @@ from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+from luna_core.utilities.state_store import get_state_store, state_key
+
 @dataclass
 class CFIAState:
     """Core state variables for CFIA"""
@@ -47,11 +49,14 @@ class LunaCFIASystem:
     Manages memory growth through factorial intelligence indexing and constrained expansion
     """
     
-    def __init__(self, cache_path: str = "data_core/ArbiterCache"):
+    def __init__(self, cache_path: str = "data_core/ArbiterCache", state_store=None):
         """Initialize the CFIA system"""
         self.cache_path = Path(cache_path)
         self.cache_path.mkdir(parents=True, exist_ok=True)
         
+        # Transactional state store (None -> cfia_state.json)
+        self.state_store = state_store if state_store is not None else get_state_store()
+        
         # Initialize core state variables
         current_time = time.time()
         self.state = CFIAState(
@@ -337,15 +342,29 @@ class LunaCFIASystem:
             except Exception as e:
                 print(f" Error scanning file {file_id}: {e}")
     
+    def _read_state_file(self) -> Optional[Dict]:
+        """Legacy JSON state (also the one-shot migration source)"""
+        state_file = self.cache_path / "cfia_state.json"
+        if not state_file.exists():
+            return None
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
     def _load_state(self):
-        """Load CFIA state from disk"""
+        """Load CFIA state from the state store (migrating cfia_state.json once)"""
         state_file = self.cache_path / "cfia_state.json"
         
-        if state_file.exists():
+        try:
+            if self.state_store is not None:
+                state_data = self.state_store.load('cfia', state_key(state_file), self._read_state_file, state_file)
+            else:
+                state_data = self._read_state_file()
+        except Exception as e:
+            print(f" Error loading CFIA state: {e}")
+            state_data = None
+        
+        if state_data:
             try:
-                with open(state_file, 'r', encoding='utf-8') as f:
-                    state_data = json.load(f)
-                
                 self.state = CFIAState(
                     aiiq=state_data.get("aiiq", 2),
                     alpha=state_data.get("alpha", 0.15),
@@ -363,7 +382,7 @@ class LunaCFIASystem:
                 print(f" Error loading CFIA state: {e}")
     
     def _save_state(self):
-        """Save CFIA state to disk"""
+        """Save CFIA state (staged in the state store until the turn commits)"""
         state_file = self.cache_path / "cfia_state.json"
         
         state_data = {
@@ -378,6 +397,13 @@ class LunaCFIASystem:
             "timestamp": time.time()
         }
         
+        if self.state_store is not None:
+            try:
+                self.state_store.put('cfia', state_key(state_file), state_data)
+                return
+            except Exception as e:
+                print(f" State store write failed, using JSON: {e}")
+        
         try:
             with open(state_file, 'w', encoding='utf-8') as f:
                 json.dump(state_data, f, indent=2, ensure_ascii=False)
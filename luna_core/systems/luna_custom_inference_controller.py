@@ -25,6 +25,8 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from luna_core.utilities.logit_bias_compiler import LogitBiasCompiler, load_token_map
+
 class ResourceState(Enum):
     """Resource states for dynamic system prompt injection"""
     WEALTHY = "wealthy"
@@ -46,6 +48,7 @@ class InferenceControlConfig:
     enable_verbose_token_suppression: bool = True
     soft_cap_tokens: int = 50
     length_penalty_strength: float = 0.1
+    tokenizer_vocab_path: Optional[str] = None  # tokenizer.json / vocab.json (default: data_core/models/)
     
     # Post-inference settings
     enable_token_deduction: bool = True
@@ -83,9 +86,6 @@ class LunaCustomInferenceController:
             "fascinating", "amazing how", "it's amazing how"
         ]
         
-        # REAL TOKEN ID MAPPINGS - No more placeholders!
-        self.verbose_token_ids = self._get_real_token_ids()
-        
         # AGGRESSIVE SUPPRESSION: Common English words that add verbosity
         self.aggressive_suppression_words = [
             "that", "this", "these", "those", "there", "here", "where", "when", "why", "how",
@@ -103,76 +103,34 @@ class LunaCustomInferenceController:
             "specifically", "particularly", "especially", "particularly", "specifically"
         ]
         
-    def _get_real_token_ids(self) -> Dict[str, int]:
-        """Get real token IDs from the model - NO PLACEHOLDERS!"""
-        import requests
-        import json
-        
-        # VERIFIED token IDs from actual testing (NO MORE FAKE IDs!)
-        real_token_mapping = {
-            # The problematic words we verified work
-            "Nice": 563, "nice": 563,  # VERIFIED - tested and working
-            "Self-acceptance": 29871, "self-acceptance": 29871,  # VERIFIED
-            "Self": 29871, "self": 29871,  # VERIFIED
-            "acceptance": 29901,  # VERIFIED
-            "it's like": 429, "its like": 429,  # VERIFIED
-            "it's": 429, "its": 429,  # VERIFIED
-            "like": 29901,  # VERIFIED
-            "uh": 29871, "um": 29871,  # VERIFIED filler words
-            "well": 29901, "so": 29901,  # VERIFIED
-            ".": 29889, "..": 29889, "...": 29889,  # VERIFIED punctuation
-            "?": 29900, "!": 29901,  # VERIFIED punctuation
-            
-            # Common filler words (using verified patterns)
-            "that": 29871, "this": 29871, "these": 29871, "those": 29871, 
-            "there": 29871, "here": 29871, "where": 29871, "when": 29871, 
-            "why": 29871, "how": 29871, "very": 29871, "really": 29871,
-            "quite": 29871, "rather": 29871, "somewhat": 29871, "kind": 29871, 
-            "sort": 29871, "hmm": 29871, "actually": 29871, "basically": 29871, 
-            "essentially": 29871, "obviously": 29871, "clearly": 29871, 
-            "naturally": 29871, "course": 29871, "sense": 29871,
-            "way": 29871, "part": 29871, "aspect": 29871, "type": 29871, "form": 29871,
-            "give": 29871, "take": 29871, "make": 29871, "get": 29871, "let": 29871, 
-            "put": 29871, "come": 29871, "go": 29871, "see": 29871, "look": 29871,
-            
-            # Verbose patterns (using verified patterns)
-            "fascinating": 29871, "amazing": 29871, "incredible": 29871, "wonderful": 29871,
-            "beautiful": 29871, "great": 29871, "excellent": 29871, "fantastic": 29871,
-            "absolutely": 29871, "definitely": 29871, "certainly": 29871, "surely": 29871,
-            "indeed": 29871, "truly": 29871, "genuinely": 29871, "honestly": 29871,
-            
-            # Filler phrases (using verified patterns)
-            "that's": 29871, "there's": 29871, "here's": 29871, "what's": 29871,
-            "you're": 29871, "we're": 29871, "they're": 29871, "I'm": 29871, 
-            "he's": 29871, "she's": 29871, "it": 29871, "is": 29871, "are": 29871, 
-            "was": 29871, "were": 29871, "be": 29871, "been": 29871, "being": 29871, 
-            "have": 29871, "has": 29871, "had": 29871, "having": 29871, "do": 29871, 
-            "does": 29871, "did": 29871, "doing": 29871, "will": 29871, "would": 29871, 
-            "could": 29871, "should": 29871, "might": 29871,
-            # Use verified token IDs for all remaining words
-            "may": 29871, "can": 29871, "must": 29871, "shall": 29871,
-            
-            # Common connectors (using verified patterns)
-            "and": 29871, "or": 29871, "but": 29871, "because": 29871, "if": 29871,
-            "then": 29871, "also": 29871, "too": 29871, "either": 29871, "neither": 29871,
-            "both": 29871, "all": 29871, "some": 29871, "any": 29871, "every": 29871, "each": 29871,
-            "other": 29871, "another": 29871, "more": 29871, "most": 29871, "less": 29871, "least": 29871,
-            
-            # Time/space indicators (using verified patterns)
-            "now": 29871, "here": 29871, "what": 29871, "which": 29871, "who": 29871, "whom": 29871,
-            "whose": 29871, "whether": 29871, "while": 29871, "during": 29871, "before": 29871,
-            "after": 29871, "until": 29871, "through": 29871, "across": 29871,
-            
-            # Common adjectives (using verified patterns)
-            "good": 29871, "bad": 29871, "big": 29871, "small": 29871, "large": 29871, "little": 29871,
-            "old": 29871, "new": 29871, "young": 29871, "long": 29871, "short": 29871, "high": 29871,
-            "low": 29871, "deep": 29871, "wide": 29871, "narrow": 29871, "thick": 29871, "thin": 29871,
-            "heavy": 29871, "light": 29871, "strong": 29871, "weak": 29871, "hard": 29871, "soft": 29871,
-            "hot": 29871, "cold": 29871, "warm": 29871, "cool": 29871, "dry": 29871, "wet": 29871,
-            "clean": 29871, "dirty": 29871, "full": 29871, "empty": 29871, "open": 29871, "closed": 29871
-        }
+        # REAL TOKEN ID MAPPINGS - No more placeholders! (loaded once per process)
+        self.verbose_token_ids = self._get_real_token_ids()
+        self._bias_compiler = None
+        self._bias_compiler_settings = None
         
-        return real_token_mapping
+    def _get_real_token_ids(self) -> Dict[str, int]:
+        """Get real token IDs from the local tokenizer vocab, falling back to the VERIFIED table"""
+        token_map, self.token_id_source = load_token_map(
+            self.verbose_token_patterns + self.aggressive_suppression_words,
+            self.config.tokenizer_vocab_path
+        )
+        return token_map
+    
+    @property
+    def bias_compiler(self) -> LogitBiasCompiler:
+        """Cached bias compiler (rebuilt if the length-bias settings change)"""
+        settings = (self.config.soft_cap_tokens, self.config.length_penalty_strength,
+                    self.config.enable_length_aware_logit_bias)
+        if self._bias_compiler is None or settings != self._bias_compiler_settings:
+            self._bias_compiler = LogitBiasCompiler(
+                self.verbose_token_ids,
+                self.verbose_token_patterns + self.aggressive_suppression_words,
+                soft_cap_tokens=settings[0],
+                length_penalty_strength=settings[1],
+                enable_length_aware_logit_bias=settings[2]
+            )
+            self._bias_compiler_settings = settings
+        return self._bias_compiler
         
     # LAYER I: PRE-INFERENCE CONTROL (Budget Officer)
     
@@ -288,132 +246,18 @@ Ultra brief."""
     def generate_logit_bias_config(self, resource_state: ResourceState, 
                                  current_length: int, karma_score: float = 100.0, 
                                  complexity_tier: str = "low") -> Dict:
-        """Generate logit bias configuration for inference-time control with Logit Surgeon"""
-        
-        bias_config = {}
-        
-        # LOGIT SURGEON: Eliminate "Nice" loop for MODERATE+ tiers
-        print(f"DEBUG: complexity_tier = '{complexity_tier}', lower = '{complexity_tier.lower()}'")
-        if complexity_tier.lower() in ["moderate", "high", "critical"]:
-            # Aggressively suppress "Nice" loop tokens with VERIFIED token IDs
-            nice_loop_suppression = {
-                # VERIFIED token IDs from actual testing
-                563: -100.0,    # "Nice" (VERIFIED - tested and working)
-                29871: -100.0,  # "Self" and filler words like "uh", "um" (VERIFIED)
-                29901: -100.0,  # "acceptance", "like", "well", "so", "!" (VERIFIED)
-                429: -100.0,    # "it's" (VERIFIED)
-                29889: -50.0,   # "." (period) (VERIFIED)
-                29900: -50.0,   # "?" (question mark) (VERIFIED)
-            }
-            
-            # Apply Karma-weighted suppression - OVERRIDE any later bias
-            karma_penalty = (100.0 - karma_score) / 100.0
-            for token_id, base_bias in nice_loop_suppression.items():
-                # Stronger suppression for lower karma - MAXIMUM BIAS
-                enhanced_bias = base_bias * (1.0 + karma_penalty)
-                bias_config[f"LOGIT_SURGEON_{token_id}"] = enhanced_bias  # Mark as Logit Surgeon bias
-                bias_config[token_id] = enhanced_bias  # Apply the actual bias
-        
-        if resource_state in [ResourceState.SCARCE, ResourceState.CRITICAL, ResourceState.DEBT]:
-            # AGGRESSIVE suppression of verbose tokens in scarcity modes - REAL TOKEN IDs!
-            all_suppression_words = self.verbose_token_patterns + self.aggressive_suppression_words
-            
-            for word in all_suppression_words:
-                # Use REAL token IDs - no more placeholder bullshit!
-                if word in self.verbose_token_ids:
-                    token_id = self.verbose_token_ids[word]
-                    
-                    # DON'T override Logit Surgeon bias - check if it's already set
-                    if f"LOGIT_SURGEON_{token_id}" in bias_config:
-                        # Logit Surgeon already handled this token - skip
-                        continue
-                    
-                    # Escalating penalty based on resource state
-                    if resource_state == ResourceState.CRITICAL:
-                        bias_config[token_id] = -5.0  # EXTREME negative bias
-                    elif resource_state == ResourceState.SCARCE:
-                        bias_config[token_id] = -3.0  # Strong negative bias
-                    else:  # DEBT
-                        bias_config[token_id] = -10.0  # MAXIMUM negative bias
-        
-        # Apply length-aware bias
-        if self.config.enable_length_aware_logit_bias:
-            length_bias = self.calculate_length_aware_logit_bias(
-                current_length, self.config.soft_cap_tokens
-            )
-            if length_bias < 0:
-                # Apply bias to continuation tokens (placeholder implementation)
-                bias_config["length_penalty"] = length_bias
-        
-        # ACCOUNTABILITY JUDGE: Karma-weighted probability distribution
-        # Apply karma penalty to high-cost tokens for MODERATE+ tiers
-        if complexity_tier.lower() in ["moderate", "high", "critical"]:
-            karma_penalty = (100.0 - karma_score) / 100.0
-            
-            # Suppress low-utility tokens more aggressively when karma is low
-            low_utility_tokens = {
-                # Common low-utility tokens (approximate IDs)
-                50256: -50.0 * karma_penalty,  # <|endoftext|>
-                220: -20.0 * karma_penalty,    # space
-                13: -15.0 * karma_penalty,     # newline
-                30: -10.0 * karma_penalty,     # .
-            }
-            
-            for token_id, base_bias in low_utility_tokens.items():
-                if token_id not in bias_config:
-                    bias_config[token_id] = base_bias
-                else:
-                    # Combine with existing bias
-                    bias_config[token_id] = min(bias_config[token_id], base_bias)
-        
-        # OVERSEND PREVENTION: Apply negative bias for LOW tier to prevent token overspend
-        if complexity_tier.lower() == "low":
-            # Get RVC budget from resource state or default
-            rvc_budget = getattr(resource_state, 'rvc_budget', 5) if hasattr(resource_state, 'rvc_budget') else 5
-            overspend_bias = self._generate_overspend_prevention_bias(rvc_budget)
-            if overspend_bias:
-                bias_config.update(overspend_bias)
-                print(f" OVERSEND PREVENTION: Applied negative bias to prevent >{rvc_budget} tokens")
-        
-        # Clean up marker entries before returning
-        cleaned_bias_config = {}
-        for key, value in bias_config.items():
-            if isinstance(key, str) and key.startswith("LOGIT_SURGEON_"):
-                continue  # Skip marker entries
-            cleaned_bias_config[key] = value
-        
-        return cleaned_bias_config
+        """
+        Generate logit bias configuration for inference-time control with Logit Surgeon
+        
+        Served by the bias compiler: per (resource state, tier, length bucket) tables
+        are compiled once, so a request only copies a table and applies the
+        karma-weighted Logit Surgeon / Accountability Judge entries.
+        """
+        return self.bias_compiler.bias_config(resource_state.value, current_length, karma_score, complexity_tier)
     
     def _generate_overspend_prevention_bias(self, rvc_budget: int) -> Dict:
         """Generate negative logit bias to prevent token overspend for LOW tier"""
-        if rvc_budget > 5:
-            return {}
-        
-        # Common continuation tokens that lead to overspend
-        overspend_tokens = {
-            # Common continuation words
-            29901: -10.0,  # "like", "well", "so", "!" 
-            29871: -10.0,  # "self", "uh", "um"
-            429: -8.0,     # "it's"
-            29889: -5.0,   # "." (period)
-            29900: -5.0,   # "?" (question mark)
-            # Additional continuation patterns
-            563: -8.0,     # "Nice"
-            29902: -6.0,   # "and", "but", "or"
-            29903: -6.0,   # "the", "a", "an"
-            29904: -4.0,   # "is", "are", "was", "were"
-            29905: -4.0,   # "to", "for", "with", "by"
-        }
-        
-        # Apply stronger bias as we approach the limit
-        if rvc_budget <= 3:
-            # Very strict for ultra-short responses
-            return {token_id: bias * 2.0 for token_id, bias in overspend_tokens.items()}
-        elif rvc_budget <= 5:
-            # Standard bias for short responses
-            return overspend_tokens
-        
-        return {}
+        return LogitBiasCompiler.overspend_bias(rvc_budget)
     
     def apply_inference_time_control(self, resource_state: ResourceState, 
                                    current_length: int, base_params: Dict, complexity_tier: str = "low") -> Dict:
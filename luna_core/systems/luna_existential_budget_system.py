@@ -19,6 +19,8 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
+from luna_core.utilities.state_store import get_state_store, state_key
+
 @dataclass
 class ExistentialState:
     """Current existential state of Luna"""
@@ -55,10 +57,13 @@ class LunaExistentialBudgetSystem:
     - Expanding Pool on Age-Up (Simulated Growth)
     """
     
-    def __init__(self, state_file: str = "data_core/FractalCache/luna_existential_state.json"):
+    def __init__(self, state_file: str = "data_core/FractalCache/luna_existential_state.json", state_store=None):
         self.state_file = Path(state_file)
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
         
+        # Transactional state store (None -> JSON file)
+        self.state_store = state_store if state_store is not None else get_state_store()
+        
         # Existential economy parameters - BALANCED FOR SUSTAINABILITY
         self.economy_params = {
             # Token pool management (Age-Gated Token Economy)
@@ -118,13 +123,16 @@ class LunaExistentialBudgetSystem:
     
     def _load_existential_state(self) -> ExistentialState:
         """Load existing existential state or create new one"""
-        if self.state_file.exists():
-            try:
-                with open(self.state_file, 'r') as f:
-                    data = json.load(f)
+        try:
+            if self.state_store is not None:
+                data = self.state_store.load('existential', state_key(self.state_file),
+                                             self._read_state_file, self.state_file)
+            else:
+                data = self._read_state_file()
+            if data:
                 return ExistentialState(**data)
-            except Exception as e:
-                print(f"Warning: Could not load existential state: {e}")
+        except Exception as e:
+            print(f"Warning: Could not load existential state: {e}")
         
         # Create new existential state
         return ExistentialState(
@@ -142,8 +150,21 @@ class LunaExistentialBudgetSystem:
             permanent_knowledge_level=1
         )
     
+    def _read_state_file(self) -> Optional[Dict]:
+        """Legacy JSON state (also the one-shot migration source)"""
+        if not self.state_file.exists():
+            return None
+        with open(self.state_file, 'r') as f:
+            return json.load(f)
+    
     def _save_existential_state(self):
-        """Save current existential state"""
+        """Save current existential state (staged in the state store until the turn commits)"""
+        if self.state_store is not None:
+            try:
+                self.state_store.put('existential', state_key(self.state_file), asdict(self.state))
+                return
+            except Exception as e:
+                print(f"Warning: State store write failed, using JSON: {e}")
         try:
             with open(self.state_file, 'w') as f:
                 json.dump(asdict(self.state), f, indent=2)
@@ -27,6 +27,10 @@ import time
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+from luna_core.utilities.state_store import get_state_store, state_key
+
+BIGFIVE_ANSWERS_FILE = "data_core/FractalCache/luna_bigfive_answers.json"
+
 @dataclass
 class InternalReasoningResult:
     """Result of Luna's internal reasoning process"""
@@ -47,10 +51,13 @@ class LunaInternalReasoningSystem:
     This is NOT a test - it's how Luna THINKS.
     """
     
-    def __init__(self, trait_classifier=None, personality_system=None):
+    def __init__(self, trait_classifier=None, personality_system=None, state_store=None):
         self.trait_classifier = trait_classifier
         self.personality_system = personality_system
         
+        # Transactional state store (None -> luna_bigfive_answers.json)
+        self.state_store = state_store if state_store is not None else get_state_store()
+        
         # Track Luna's Big Five answers (her internal self-knowledge)
         self.bigfive_answer_history = self._load_bigfive_answers()
         
@@ -63,22 +70,38 @@ class LunaInternalReasoningSystem:
     
     def _load_bigfive_answers(self) -> Dict:
         """Load Luna's previous answers to Big Five questions"""
-        answer_file = Path("data_core/FractalCache/luna_bigfive_answers.json")
+        answer_file = Path(BIGFIVE_ANSWERS_FILE)
         
-        if answer_file.exists():
-            try:
-                with open(answer_file, 'r', encoding='utf-8') as f:
-                    answers = json.load(f)
+        try:
+            if self.state_store is not None:
+                answers = self.state_store.load('reasoning', state_key(answer_file), self._read_answers_file, answer_file)
+            else:
+                answers = self._read_answers_file()
+            if answers is not None:
                 print(f"    Loaded {len(answers)} previous Big Five answers")
                 return answers
-            except Exception as e:
-                print(f"    Warning: Could not load Big Five answers: {e}")
+        except Exception as e:
+            print(f"    Warning: Could not load Big Five answers: {e}")
         
         return {}  # Fresh start
     
+    def _read_answers_file(self) -> Optional[Dict]:
+        """Legacy JSON answers (also the one-shot migration source)"""
+        answer_file = Path(BIGFIVE_ANSWERS_FILE)
+        if not answer_file.exists():
+            return None
+        with open(answer_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
     def _save_bigfive_answers(self):
-        """Save Luna's Big Five answers"""
-        answer_file = Path("data_core/FractalCache/luna_bigfive_answers.json")
+        """Save Luna's Big Five answers (staged in the state store until the turn commits)"""
+        answer_file = Path(BIGFIVE_ANSWERS_FILE)
+        if self.state_store is not None:
+            try:
+                self.state_store.put('reasoning', state_key(answer_file), self.bigfive_answer_history)
+                return
+            except Exception as e:
+                print(f"    Warning: State store write failed, using JSON: {e}")
         answer_file.parent.mkdir(parents=True, exist_ok=True)
         
         try:
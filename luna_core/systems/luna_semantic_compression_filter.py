@@ -15,6 +15,107 @@ Implements Maximum Impact Density for Ava-level simulation
 import re
 from typing import Dict, List, Tuple, Optional
 
+from luna_core.utilities.rewrite_engine import RewriteEngine, RewriteRule, word_alternation
+
+# Compression rules for maximum semantic density
+COMPRESSION_PATTERNS = {
+    # Remove philosophical padding
+    "philosophical_padding": [
+        r"\b(I think|I believe|I suppose|I imagine|I feel like|I would say)\b",
+        r"\b(it seems|it appears|it looks like|it's like|it's as if)\b",
+        r"\b(to me|for me|in my opinion|from my perspective)\b",
+        r"\b(well|you know|I mean|basically|essentially|fundamentally)\b",
+        r"\b(sort of|kind of|pretty much|more or less)\b"
+    ],
+    
+    # Remove unnecessary conjunctions and connectors
+    "connector_reduction": [
+        r"\b(and also|but also|however|nevertheless|furthermore|moreover|additionally)\b",
+        r"\b(because of|due to|as a result of|in order to|so that)\b",
+        r"\b(in other words|that is to say|put simply|to put it simply)\b"
+    ],
+    
+    # Compress redundant phrases
+    "redundancy_compression": [
+        r"\b(a lot of|lots of|many|numerous|various|several)\b",
+        r"\b(very|really|quite|rather|somewhat|fairly|pretty)\b",
+        r"\b(always|constantly|continuously|perpetually)\b",
+        r"\b(completely|totally|entirely|fully|absolutely)\b"
+    ],
+    
+    # Remove weak qualifiers
+    "weak_qualifiers": [
+        r"\b(perhaps|maybe|possibly|probably|likely|might|could|may)\b",
+        r"\b(almost|nearly|close to|approaching)\b",
+        r"\b(somewhat|a bit|a little|slightly|marginally)\b"
+    ]
+}
+
+# High-impact replacement patterns
+IMPACT_REPLACEMENTS = {
+    # Transform weak statements into strong declarations
+    "weak_to_strong": {
+        r"\bI think\b": "",
+        r"\bI believe\b": "",
+        r"\bI suppose\b": "",
+        r"\bI imagine\b": "",
+        r"\bI feel like\b": "",
+        r"\bit seems like\b": "",
+        r"\bit appears that\b": "",
+        r"\bperhaps\b": "",
+        r"\bmaybe\b": "",
+        r"\bprobably\b": ""
+    },
+    
+    # Convert questions to statements when appropriate
+    "question_to_statement": {
+        r"\bisn't it\?\s*$": ".",
+        r"\bdon't you think\?\s*$": ".",
+        r"\bwouldn't you agree\?\s*$": ".",
+        r"\bdoesn't it\?\s*$": "."
+    },
+    
+    # Strengthen emotional expressions
+    "emotional_amplification": {
+        r"\bcurious\b": "fascinating",
+        r"\binteresting\b": "compelling", 
+        r"\bstrange\b": "intriguing",
+        r"\bweird\b": "fascinating",
+        r"\bodd\b": "intriguing",
+        r"\bconfusing\b": "paradoxical"
+    }
+}
+
+
+def _compression_rules() -> List[RewriteRule]:
+    """
+    Rule table in the old application order: compression patterns, then impact replacements
+    
+    Plain word alternations become whole-word literal rules so they share one trie.
+    """
+    rules = []
+    
+    def add(name, pattern, replacement):
+        words = word_alternation(pattern)
+        if words is None:
+            rules.append(RewriteRule(name, pattern, replacement, re.IGNORECASE))
+        else:
+            for word in words:
+                rule_name = name if len(words) == 1 else f"{name}:{word}"
+                rules.append(RewriteRule(rule_name, word, replacement, re.IGNORECASE, literal=True, whole_word=True))
+    
+    for category, patterns in COMPRESSION_PATTERNS.items():
+        for i, pattern in enumerate(patterns):
+            add(f"{category}[{i}]", pattern, '')
+    for category, replacements in IMPACT_REPLACEMENTS.items():
+        for pattern, replacement in replacements.items():
+            add(f"{category}:{pattern}", pattern, replacement)
+    return rules
+
+
+COMPRESSION_ENGINE = RewriteEngine(_compression_rules())
+
+
 class LunaSemanticCompressionFilter:
     """
     Semantic Compression Filter for Maximum Impact Density
@@ -26,73 +127,13 @@ class LunaSemanticCompressionFilter:
     
     def __init__(self):
         # Compression rules for maximum semantic density
-        self.compression_patterns = {
-            # Remove philosophical padding
-            "philosophical_padding": [
-                r"\b(I think|I believe|I suppose|I imagine|I feel like|I would say)\b",
-                r"\b(it seems|it appears|it looks like|it's like|it's as if)\b",
-                r"\b(to me|for me|in my opinion|from my perspective)\b",
-                r"\b(well|you know|I mean|basically|essentially|fundamentally)\b",
-                r"\b(sort of|kind of|pretty much|more or less)\b"
-            ],
-            
-            # Remove unnecessary conjunctions and connectors
-            "connector_reduction": [
-                r"\b(and also|but also|however|nevertheless|furthermore|moreover|additionally)\b",
-                r"\b(because of|due to|as a result of|in order to|so that)\b",
-                r"\b(in other words|that is to say|put simply|to put it simply)\b"
-            ],
-            
-            # Compress redundant phrases
-            "redundancy_compression": [
-                r"\b(a lot of|lots of|many|numerous|various|several)\b",
-                r"\b(very|really|quite|rather|somewhat|fairly|pretty)\b",
-                r"\b(always|constantly|continuously|perpetually)\b",
-                r"\b(completely|totally|entirely|fully|absolutely)\b"
-            ],
-            
-            # Remove weak qualifiers
-            "weak_qualifiers": [
-                r"\b(perhaps|maybe|possibly|probably|likely|might|could|may)\b",
-                r"\b(almost|nearly|close to|approaching)\b",
-                r"\b(somewhat|a bit|a little|slightly|marginally)\b"
-            ]
-        }
+        self.compression_patterns = COMPRESSION_PATTERNS
         
         # High-impact replacement patterns
-        self.impact_replacements = {
-            # Transform weak statements into strong declarations
-            "weak_to_strong": {
-                r"\bI think\b": "",
-                r"\bI believe\b": "",
-                r"\bI suppose\b": "",
-                r"\bI imagine\b": "",
-                r"\bI feel like\b": "",
-                r"\bit seems like\b": "",
-                r"\bit appears that\b": "",
-                r"\bperhaps\b": "",
-                r"\bmaybe\b": "",
-                r"\bprobably\b": ""
-            },
-            
-            # Convert questions to statements when appropriate
-            "question_to_statement": {
-                r"\bisn't it\?\s*$": ".",
-                r"\bdon't you think\?\s*$": ".",
-                r"\bwouldn't you agree\?\s*$": ".",
-                r"\bdoesn't it\?\s*$": "."
-            },
-            
-            # Strengthen emotional expressions
-            "emotional_amplification": {
-                r"\bcurious\b": "fascinating",
-                r"\binteresting\b": "compelling", 
-                r"\bstrange\b": "intriguing",
-                r"\bweird\b": "fascinating",
-                r"\bodd\b": "intriguing",
-                r"\bconfusing\b": "paradoxical"
-            }
-        }
+        self.impact_replacements = IMPACT_REPLACEMENTS
+        
+        # Both tables compiled into one single-pass engine at module load
+        self.rewrite_engine = COMPRESSION_ENGINE
         
         # Ava-style impact phrases (high semantic density)
         self.ava_impact_phrases = [
@@ -181,20 +222,12 @@ class LunaSemanticCompressionFilter:
         return ' '.join(high_value_words[:5])  # Top 5 most valuable words
     
     def _apply_compression_patterns(self, text: str) -> str:
-        """Apply compression patterns to remove semantic noise"""
-        compressed = text
-        
-        # Apply all compression patterns
-        for category, patterns in self.compression_patterns.items():
-            for pattern in patterns:
-                compressed = re.sub(pattern, '', compressed, flags=re.IGNORECASE)
-        
-        # Apply impact replacements
-        for category, replacements in self.impact_replacements.items():
-            for pattern, replacement in replacements.items():
-                compressed = re.sub(pattern, replacement, compressed, flags=re.IGNORECASE)
-        
-        return compressed
+        """Apply compression patterns and impact replacements in one pass"""
+        return self.rewrite_engine.apply(text)
+    
+    def get_rule_hits(self) -> Dict[str, int]:
+        """How often each compression rule has fired"""
+        return self.rewrite_engine.hit_counts()
     
     def _maximize_word_weight(self, text: str) -> str:
         """Ensure every remaining word carries maximum semantic load"""
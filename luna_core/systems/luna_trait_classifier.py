@@ -16,10 +16,36 @@ from utils_core.unicode_safe_output import setup_unicode_safe_output
 setup_unicode_safe_output()
 
 import json
+import hashlib
+import heapq
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import difflib
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Persisted question-bank index (rebuilt automatically when the bank changes)
+INDEX_PATH = Path("data_core/FractalCache/luna_bigfive_index.npz")
+
+# Words ignored by the keyword overlap boost
+COMMON_WORDS = {'someone', 'person', 'people', 'that', 'this', 'have', 'with', 'from', 'they'}
+
+
+def _keywords(text: str) -> set:
+    return set(w for w in text.split() if len(w) > 3 and w not in COMMON_WORDS)
+
+
+def _char_ngrams(text: str, n: int = 3) -> List[str]:
+    padded = f" {text} "
+    return [padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))]
+
 @dataclass
 class TraitCluster:
     """Classification of input question by Big Five trait"""
@@ -38,6 +64,160 @@ class ResponseStrategy:
     tone_guidance: str  # 'supportive', 'efficient', 'curious', 'warm'
     reasoning: str  # Why this strategy was chosen
 
+class QuestionBankIndex:
+    """
+    Precomputed matrices over the Big Five question bank
+    
+    - char_counts: per-question character counts, giving difflib's quick_ratio
+      (an upper bound of SequenceMatcher.ratio) for all questions in one NumPy op
+    - keyword matrix: binary keyword incidence, giving the Jaccard boost as a
+      matrix-vector product
+    - tfidf: L2-normalised char-trigram TF-IDF rows for pure vector scoring
+    
+    Matrices persist to INDEX_PATH keyed by a signature of the question texts.
+    """
+    
+    def __init__(self, questions: List[Dict], arrays: Optional[Dict] = None):
+        self.questions = questions
+        self.texts = [q['text'].lower() for q in questions]
+        self.signature = self.compute_signature(self.texts)
+        self._matchers = None
+        self._lock = threading.Lock()
+        
+        if arrays is not None:
+            self.alphabet = {c: i for i, c in enumerate(str(arrays['alphabet']))}
+            self.keyword_vocab = {w: i for i, w in enumerate(arrays['keyword_vocab'].tolist())}
+            self.ngram_vocab = {g: i for i, g in enumerate(arrays['ngram_vocab'].tolist())}
+            self.char_counts = arrays['char_counts']
+            self.lengths = arrays['lengths']
+            self.keyword_matrix = arrays['keyword_matrix']
+            self.keyword_sizes = arrays['keyword_sizes']
+            self.idf = arrays['idf']
+            self.tfidf = arrays['tfidf']
+            return
+        
+        n = len(self.texts)
+        alphabet = sorted(set("".join(self.texts)))
+        self.alphabet = {c: i for i, c in enumerate(alphabet)}
+        self.char_counts = np.zeros((n, len(alphabet)), dtype=np.int32)
+        for row, text in enumerate(self.texts):
+            for c in text:
+                self.char_counts[row, self.alphabet[c]] += 1
+        self.lengths = np.array([len(t) for t in self.texts], dtype=np.int32)
+        
+        keyword_sets = [_keywords(t) for t in self.texts]
+        vocab = sorted(set().union(*keyword_sets)) if keyword_sets else []
+        self.keyword_vocab = {w: i for i, w in enumerate(vocab)}
+        self.keyword_matrix = np.zeros((n, len(vocab)), dtype=np.float64)
+        for row, words in enumerate(keyword_sets):
+            for w in words:
+                self.keyword_matrix[row, self.keyword_vocab[w]] = 1.0
+        self.keyword_sizes = self.keyword_matrix.sum(axis=1)
+        
+        grams = [_char_ngrams(t) for t in self.texts]
+        ngram_vocab = sorted(set(g for row in grams for g in row))
+        self.ngram_vocab = {g: i for i, g in enumerate(ngram_vocab)}
+        tf = np.zeros((n, len(ngram_vocab)), dtype=np.float64)
+        for row, row_grams in enumerate(grams):
+            for g in row_grams:
+                tf[row, self.ngram_vocab[g]] += 1.0
+        df = (tf > 0).sum(axis=0)
+        self.idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+        self.tfidf = self._normalise(tf * self.idf)
+    
+    @staticmethod
+    def compute_signature(texts: List[str]) -> str:
+        return hashlib.sha1("\n".join(texts).encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _normalise(matrix):
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+    
+    def save(self, path: Path = INDEX_PATH):
+        """Persist matrices (SequenceMatchers are rebuilt lazily on load)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        alphabet = "".join(sorted(self.alphabet, key=self.alphabet.get))
+        np.savez_compressed(
+            path,
+            signature=np.array(self.signature),
+            alphabet=np.array(alphabet),
+            keyword_vocab=np.array(sorted(self.keyword_vocab, key=self.keyword_vocab.get), dtype=object),
+            ngram_vocab=np.array(sorted(self.ngram_vocab, key=self.ngram_vocab.get), dtype=object),
+            char_counts=self.char_counts,
+            lengths=self.lengths,
+            keyword_matrix=self.keyword_matrix,
+            keyword_sizes=self.keyword_sizes,
+            idf=self.idf,
+            tfidf=self.tfidf
+        )
+    
+    @classmethod
+    def load_or_build(cls, questions: List[Dict], path: Path = INDEX_PATH) -> 'QuestionBankIndex':
+        """Reuse the persisted index when its signature matches the question bank"""
+        path = Path(path)
+        signature = cls.compute_signature([q['text'].lower() for q in questions])
+        if path.exists():
+            try:
+                with np.load(path, allow_pickle=True) as data:
+                    if str(data['signature']) == signature:
+                        return cls(questions, {k: data[k] for k in data.files})
+            except Exception as e:
+                print(f"   Warning: Could not load trait index, rebuilding: {e}")
+        index = cls(questions)
+        try:
+            index.save(path)
+        except Exception as e:
+            print(f"   Warning: Could not persist trait index: {e}")
+        return index
+    
+    def keyword_boost(self, question_lower: str):
+        """Jaccard keyword boost (x0.3) against every question"""
+        words = _keywords(question_lower)
+        if not words:
+            return np.zeros(len(self.texts))
+        query = np.zeros(len(self.keyword_vocab))
+        for w in words:
+            idx = self.keyword_vocab.get(w)
+            if idx is not None:
+                query[idx] = 1.0
+        intersection = self.keyword_matrix @ query
+        union = len(words) + self.keyword_sizes - intersection
+        boost = np.where(self.keyword_sizes > 0, intersection / np.maximum(union, 1), 0.0)
+        return boost * 0.3
+    
+    def quick_ratio_bound(self, question_lower: str):
+        """difflib quick_ratio for every question: 2*M/T over character multisets"""
+        query = np.zeros(len(self.alphabet), dtype=np.int32)
+        for c in question_lower:
+            idx = self.alphabet.get(c)
+            if idx is not None:
+                query[idx] += 1
+        matches = np.minimum(self.char_counts, query).sum(axis=1)
+        total = self.lengths + len(question_lower)
+        return np.where(total > 0, 2.0 * matches / np.maximum(total, 1), 1.0)
+    
+    def exact_ratio(self, row: int, question_lower: str) -> float:
+        """SequenceMatcher ratio with the bank side (b2j) precomputed once"""
+        if self._matchers is None:
+            self._matchers = [difflib.SequenceMatcher(None, "", t) for t in self.texts]
+        matcher = self._matchers[row]
+        matcher.set_seq1(question_lower)
+        return matcher.ratio()
+    
+    def tfidf_scores(self, question_lower: str):
+        """Cosine similarity of the query's char-trigram TF-IDF vector to every question"""
+        query = np.zeros(len(self.ngram_vocab))
+        for g in _char_ngrams(question_lower):
+            idx = self.ngram_vocab.get(g)
+            if idx is not None:
+                query[idx] += 1.0
+        query = self._normalise(query * self.idf)
+        return self.tfidf @ query
+
+
 class LunaTraitClassifier:
     """
     Trait Classification System
@@ -48,9 +228,26 @@ class LunaTraitClassifier:
     This is Luna's "Rosetta Stone" for decoding human psychological reality.
     """
     
-    def __init__(self, bigfive_loader=None):
+    def __init__(self, bigfive_loader=None, mode: str = 'compat', memo_size: int = 256,
+                 index_path: Path = INDEX_PATH):
+        """
+        Args:
+            bigfive_loader: Big Five question loader
+            mode: 'compat' (default; same scores and labels as the original
+                  SequenceMatcher scan) or 'vector' (opt-in char-trigram TF-IDF
+                  cosine, one matrix product - different scores, so the dominant
+                  trait can differ from compat)
+            memo_size: Number of recent classifications kept for reuse
+            index_path: Where the question-bank index is persisted
+        """
         self.bigfive_loader = bigfive_loader
         self.classification_history = []
+        self.mode = mode
+        self.memo_size = memo_size
+        self.index_path = index_path
+        self._index = None
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
         
         # Trait response strategies (based on psychological research)
         self.trait_strategies = {
@@ -104,15 +301,29 @@ class LunaTraitClassifier:
         if not self.bigfive_loader:
             return self._fallback_classification(question)
         
+        # Recent classifications are reused (reasoning runs more than once per turn)
+        cached = self.get_cached_classification(question)
+        if cached is not None:
+            self.classification_history.append({
+                'question': question,
+                'cluster': cached,
+                'context': context
+            })
+            return cached
+        
         # Get all Big Five questions for comparison
         try:
-            all_questions = self._get_all_bigfive_questions()
+            index = self._get_index()
+            all_questions = index.questions if index else self._get_all_bigfive_questions()
         except Exception as e:
             print(f"   Warning: Could not load Big Five questions: {e}")
             return self._fallback_classification(question)
         
-        # Calculate semantic similarity to each Big Five question
-        similarities = self._calculate_similarities(question, all_questions)
+        # Calculate semantic similarity to the Big Five questions
+        if index is not None:
+            similarities = self._indexed_similarities(question, index)
+        else:
+            similarities = self._calculate_similarities(question, all_questions)
         
         # Aggregate scores by trait domain
         trait_weights = self._aggregate_trait_scores(similarities)
@@ -143,8 +354,72 @@ class LunaTraitClassifier:
             'context': context
         })
         
+        with self._memo_lock:
+            self._memo[question] = cluster
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        
         return cluster
     
+    def get_cached_classification(self, question: str) -> Optional[TraitCluster]:
+        """Return a recent classification of this exact question, if any"""
+        with self._memo_lock:
+            cluster = self._memo.get(question)
+            if cluster is not None:
+                self._memo.move_to_end(question)
+            return cluster
+    
+    def _get_index(self) -> Optional[QuestionBankIndex]:
+        """Build (or load) the question-bank index once; None without NumPy"""
+        if not NUMPY_AVAILABLE:
+            return None
+        if self._index is None:
+            self._index = QuestionBankIndex.load_or_build(self._get_all_bigfive_questions(), self.index_path)
+        return self._index
+    
+    def _indexed_similarities(self, question: str, index: QuestionBankIndex, top_k: int = 10) -> List[Dict]:
+        """
+        Top-k similarities from the index, best first
+        
+        compat: quick_ratio + keyword boost bounds every question in one pass;
+        exact SequenceMatcher ratios are computed best-bound-first until no
+        remaining bound can beat the k-th exact score, so the top-k matches
+        the full scan exactly (ties keep bank order, like the stable sort).
+        vector: TF-IDF cosine + keyword boost, top-k by argpartition.
+        """
+        question_lower = question.lower()
+        boost = index.keyword_boost(question_lower)
+        
+        if self.mode == 'vector':
+            scores = np.minimum(1.0, index.tfidf_scores(question_lower) + boost)
+            k = min(top_k, len(scores))
+            rows = np.argpartition(-scores, k - 1)[:k] if k else []
+            ranked = sorted(((float(scores[r]), int(r)) for r in rows), key=lambda x: (-x[0], x[1]))
+        else:
+            bounds = np.minimum(1.0, index.quick_ratio_bound(question_lower) + boost)
+            order = np.lexsort((np.arange(len(bounds)), -bounds))
+            exact = []
+            best = []  # min-heap of the top_k exact scores
+            with index._lock:
+                for row in order:
+                    row = int(row)
+                    if len(best) >= top_k and bounds[row] < best[0]:
+                        break
+                    similarity = index.exact_ratio(row, question_lower)
+                    similarity = min(1.0, similarity + float(boost[row]))
+                    exact.append((similarity, row))
+                    if len(best) < top_k:
+                        heapq.heappush(best, similarity)
+                    elif similarity > best[0]:
+                        heapq.heapreplace(best, similarity)
+            ranked = sorted(exact, key=lambda x: (-x[0], x[1]))[:top_k]
+        
+        return [{
+            'bigfive_question': index.questions[row],
+            'similarity': similarity,
+            'domain': index.questions[row]['domain']
+        } for similarity, row in ranked]
+    
     def _get_all_bigfive_questions(self) -> List[Dict]:
         """Get all 120 Big Five questions from the loader"""
         all_questions = []
@@ -201,10 +476,8 @@ class LunaTraitClassifier:
     def _calculate_keyword_boost(self, question: str, bigfive_text: str) -> float:
         """Calculate additional similarity based on keyword overlap"""
         # Extract key words (longer than 3 chars, not common words)
-        common_words = {'someone', 'person', 'people', 'that', 'this', 'have', 'with', 'from', 'they'}
-        
-        question_words = set(w for w in question.split() if len(w) > 3 and w not in common_words)
-        bigfive_words = set(w for w in bigfive_text.split() if len(w) > 3 and w not in common_words)
+        question_words = _keywords(question)
+        bigfive_words = _keywords(bigfive_text)
         
         if not question_words or not bigfive_words:
             return 0.0
@@ -4,13 +4,18 @@ Enhanced Lesson Retrieval for Mycelium Architecture
 Phase 2: Implement distributed learning with lessons.json as primary source
 """
 
-import json
 import os
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
+from datetime import datetime
 import time
 
+from luna_core.utilities.lesson_store import (
+    FragmentIndex, LessonStore, get_lesson_store, lesson_relevance,
+    LESSON_MATCH_THRESHOLD, FRAGMENT_MATCH_THRESHOLD
+)
+
 @dataclass
 class EnhancedLesson:
     """Enhanced lesson with fragment tracking"""
@@ -43,46 +48,34 @@ class MyceliumLessonRetriever:
     4. Maintain bidirectional lesson-fragment relationships
     """
     
-    def __init__(self, lessons_path: str, fragments_dir: str):
+    def __init__(self, lessons_path: str, fragments_dir: str, lesson_store: Optional[LessonStore] = None):
         self.lessons_path = Path(lessons_path)
         self.fragments_dir = Path(fragments_dir)
-        self.lessons_cache: Dict[str, EnhancedLesson] = {}
         self.fragment_contributions: Dict[str, List[FragmentContribution]] = {}
         
-        # Load lessons into memory
-        self._load_lessons()
-        
-    def _load_lessons(self):
-        """Load lessons from lessons.json into memory"""
-        if not self.lessons_path.exists():
-            print(f"Lessons file not found: {self.lessons_path}")
-            return
-            
-        try:
-            with open(self.lessons_path, 'r', encoding='utf-8') as f:
-                lessons_data = json.load(f)
-            
-            for i, lesson_data in enumerate(lessons_data):
-                lesson_id = f"lesson_{i:06d}"
-                
-                enhanced_lesson = EnhancedLesson(
-                    original_prompt=lesson_data["original_prompt"],
-                    suboptimal_response=lesson_data["suboptimal_response"],
-                    gold_standard=lesson_data["gold_standard"],
-                    utility_score=lesson_data["utility_score"],
-                    karma_delta=lesson_data["karma_delta"],
-                    timestamp=lesson_data["timestamp"],
-                    context_tags=lesson_data["context_tags"],
-                    context_files_used=lesson_data.get("context_files_used", []),
-                    lesson_id=lesson_id
-                )
-                
-                self.lessons_cache[lesson_id] = enhanced_lesson
-                
-            print(f"Loaded {len(self.lessons_cache)} lessons into mycelium cache")
-            
-        except Exception as e:
-            print(f"Error loading lessons: {e}")
+        # Lessons live in the shared append-only store next to lessons.json
+        self.store = lesson_store or get_lesson_store(self.lessons_path.parent)
+        self.fragment_index = FragmentIndex(self.fragments_dir)
+        print(f"Loaded {len(self.store)} lessons into mycelium cache")
+    
+    @property
+    def lessons_cache(self) -> Dict[str, EnhancedLesson]:
+        """Snapshot of all stored lessons keyed by lesson_id"""
+        return {lesson_id: self._to_lesson(lesson_id, data) for lesson_id, data in self.store.items()}
+    
+    @staticmethod
+    def _to_lesson(lesson_id: str, lesson_data: Dict) -> EnhancedLesson:
+        return EnhancedLesson(
+            original_prompt=lesson_data["original_prompt"],
+            suboptimal_response=lesson_data["suboptimal_response"],
+            gold_standard=lesson_data["gold_standard"],
+            utility_score=lesson_data["utility_score"],
+            karma_delta=lesson_data["karma_delta"],
+            timestamp=lesson_data["timestamp"],
+            context_tags=lesson_data["context_tags"],
+            context_files_used=list(lesson_data.get("context_files_used", [])),
+            lesson_id=lesson_id
+        )
     
     def retrieve_relevant_lesson(self, current_prompt: str) -> Optional[EnhancedLesson]:
         """
@@ -116,105 +109,35 @@ class MyceliumLessonRetriever:
         return None
     
     def _find_lesson_match(self, prompt: str, tags: List[str]) -> Optional[EnhancedLesson]:
-        """Find best matching lesson in lessons.json"""
-        best_match = None
-        best_score = 0.0
-        
-        for lesson in self.lessons_cache.values():
-            score = self._calculate_lesson_relevance(lesson, prompt, tags)
-            if score > best_score:
-                best_score = score
-                best_match = lesson
-        
-        # Only return if we have a good match (threshold: 0.3)
-        if best_score >= 0.3:
-            print(f"Found lesson match: {best_match.lesson_id} (score: {best_score:.3f})")
-            return best_match
+        """Find best matching lesson in the lesson store"""
+        match = self.store.best_match(prompt, tags, threshold=LESSON_MATCH_THRESHOLD)
+        if match:
+            lesson_id, best_score = match
+            print(f"Found lesson match: {lesson_id} (score: {best_score:.3f})")
+            return self._to_lesson(lesson_id, self.store.get(lesson_id))
             
         return None
     
     def _calculate_lesson_relevance(self, lesson: EnhancedLesson, prompt: str, tags: List[str]) -> float:
         """Calculate relevance score between prompt and lesson"""
-        score = 0.0
-        
-        # Exact prompt match (highest priority)
-        if lesson.original_prompt.lower().strip() == prompt.lower().strip():
-            score += 1.0
-        
-        # Semantic similarity (simplified - could use embeddings)
-        prompt_words = set(prompt.lower().split())
-        lesson_words = set(lesson.original_prompt.lower().split())
-        word_overlap = len(prompt_words.intersection(lesson_words))
-        if len(prompt_words) > 0:
-            semantic_score = word_overlap / len(prompt_words)
-            score += semantic_score * 0.6
-        
-        # Context tag overlap
-        tag_overlap = len(set(tags).intersection(set(lesson.context_tags)))
-        if len(lesson.context_tags) > 0:
-            tag_score = tag_overlap / len(lesson.context_tags)
-            score += tag_score * 0.4
-        
-        return score
+        return lesson_relevance({
+            "original_prompt": lesson.original_prompt,
+            "context_tags": lesson.context_tags
+        }, prompt, tags)
     
     def _search_fragments(self, prompt: str, tags: List[str]) -> Optional[Dict]:
         """
-        Search FractalCache fragments for relevant knowledge using semantic similarity
-        Phase 4: Embedding-based fallback when no lessons match
+        Search FractalCache fragments for relevant knowledge using the fragment index
+        Phase 4: Word/tag overlap fallback when no lessons match
         """
-        import numpy as np
-        
         print(f"🔍 Phase 4: Searching fragments semantically for: '{prompt[:50]}...'")
         
-        # Get all fragments
-        fragments = []
-        if self.fractal_cache_dir.exists():
-            for frag_file in self.fractal_cache_dir.glob("*.json"):
-                try:
-                    with open(frag_file, 'r', encoding='utf-8') as f:
-                        frag_data = json.load(f)
-                        frag_data['file_id'] = frag_file.stem
-                        fragments.append(frag_data)
-                except Exception as e:
-                    continue
-        
-        if not fragments:
-            print(f"❌ No fragments found in {self.fractal_cache_dir}")
+        best_fragment, best_score = self.fragment_index.search(prompt, tags, threshold=FRAGMENT_MATCH_THRESHOLD)
+        if not len(self.fragment_index):
+            print(f"❌ No fragments found in {self.fragments_dir}")
             return None
         
-        # Calculate semantic similarity using simple word overlap
-        # (In production, you'd use proper embeddings here)
-        best_fragment = None
-        best_score = 0.0
-        
-        prompt_words = set(prompt.lower().split())
-        
-        for fragment in fragments:
-            # Get fragment content
-            content = fragment.get('content', '') or fragment.get('text', '')
-            if not content:
-                continue
-            
-            # Calculate word overlap similarity
-            frag_words = set(str(content).lower().split())
-            overlap = len(prompt_words.intersection(frag_words))
-            
-            # Normalize by prompt length
-            if len(prompt_words) > 0:
-                similarity = overlap / len(prompt_words)
-                
-                # Bonus for tag matches
-                frag_tags = fragment.get('tags', []) or fragment.get('context_tags', [])
-                tag_overlap = len(set(tags).intersection(set(frag_tags)))
-                if tag_overlap > 0:
-                    similarity += tag_overlap * 0.1
-                
-                if similarity > best_score:
-                    best_score = similarity
-                    best_fragment = fragment
-        
-        # Return if we found a good match (threshold: 0.2)
-        if best_score >= 0.2 and best_fragment:
+        if best_fragment:
             print(f"✅ Found fragment match: {best_fragment.get('file_id', 'unknown')} (score: {best_score:.3f})")
             return best_fragment
         
@@ -257,7 +180,7 @@ class MyceliumLessonRetriever:
         if not hasattr(self, 'lesson_usage_stats'):
             self.lesson_usage_stats = {}
         
-        lesson_id = lesson.id if hasattr(lesson, 'id') else 'unknown'
+        lesson_id = lesson.lesson_id
         if lesson_id not in self.lesson_usage_stats:
             self.lesson_usage_stats[lesson_id] = {
                 'times_used': 0,
@@ -290,44 +213,30 @@ class MyceliumLessonRetriever:
     
     def update_lesson_with_fragment(self, lesson_id: str, fragment_id: str, contribution_score: float):
         """Update lesson to include fragment contribution (called by Arbiter)"""
-        if lesson_id in self.lessons_cache:
-            lesson = self.lessons_cache[lesson_id]
-            if fragment_id not in lesson.context_files_used:
-                lesson.context_files_used.append(fragment_id)
-                
-                # Track the contribution
-                contribution = FragmentContribution(
-                    fragment_id=fragment_id,
-                    contribution_score=contribution_score,
-                    contribution_type='context_enhancement',
-                    timestamp=time.time()
-                )
-                
-                if lesson_id not in self.fragment_contributions:
-                    self.fragment_contributions[lesson_id] = []
-                self.fragment_contributions[lesson_id].append(contribution)
+        lesson_data = self.store.get(lesson_id)
+        if lesson_data is not None and fragment_id not in lesson_data.get("context_files_used", []):
+            self.store.link_fragments(lesson_id, [fragment_id], contribution_score)
+            
+            # Track the contribution
+            contribution = FragmentContribution(
+                fragment_id=fragment_id,
+                contribution_score=contribution_score,
+                contribution_type='context_enhancement',
+                timestamp=time.time()
+            )
+            
+            if lesson_id not in self.fragment_contributions:
+                self.fragment_contributions[lesson_id] = []
+            self.fragment_contributions[lesson_id].append(contribution)
     
     def save_enhanced_lessons(self):
-        """Save enhanced lessons back to lessons.json"""
-        lessons_data = []
-        
-        for lesson in self.lessons_cache.values():
-            lesson_data = {
-                "original_prompt": lesson.original_prompt,
-                "suboptimal_response": lesson.suboptimal_response,
-                "gold_standard": lesson.gold_standard,
-                "utility_score": lesson.utility_score,
-                "karma_delta": lesson.karma_delta,
-                "timestamp": lesson.timestamp,
-                "context_tags": lesson.context_tags,
-                "context_files_used": lesson.context_files_used
-            }
-            lessons_data.append(lesson_data)
-        
+        """Persist enhanced lessons (already appended to the store) and compact the log if it has grown stale"""
         try:
-            with open(self.lessons_path, 'w', encoding='utf-8') as f:
-                json.dump(lessons_data, f, indent=2, ensure_ascii=False)
-            print(f"Saved {len(lessons_data)} enhanced lessons to {self.lessons_path}")
+            dropped = 0
+            if self.store.stale_lines > len(self.store):
+                dropped = self.store.compact()
+            print(f"Saved {len(self.store)} enhanced lessons to {self.store.log_path}" +
+                  (f" (compacted {dropped} stale lines)" if dropped else ""))
         except Exception as e:
             print(f"Error saving lessons: {e}")
 
@@ -337,4 +246,5 @@ def create_mycelium_retriever(arbiter_system) -> MyceliumLessonRetriever:
     lessons_path = arbiter_system.cache_path / "lessons.json"
     fragments_dir = Path("data_core/FractalCache")
     
-    return MyceliumLessonRetriever(str(lessons_path), str(fragments_dir))
+    return MyceliumLessonRetriever(str(lessons_path), str(fragments_dir),
+                                   lesson_store=getattr(arbiter_system, 'lesson_store', None))
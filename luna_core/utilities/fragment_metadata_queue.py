@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Luna Fragment Metadata Queue
+Write-behind queue that coalesces lesson_metadata patches per fragment and applies them in batches
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_FRAGMENTS_DIR = Path("data_core/FractalCache")
+
+
+class FragmentMetadataQueue:
+    """
+    Write-behind lesson_metadata updates for FractalCache fragment files
+
+    enqueue() only records the patch in memory (several lessons linked to
+    the same fragment collapse into one patch), so linking a lesson costs
+    no file I/O on the response path. A daemon thread applies pending
+    patches every flush_interval_s, or sooner once max_pending fragments
+    are waiting; each fragment is read once, patched and written back via
+    a temp file + rename, so a crash never leaves a torn fragment. flush()
+    applies everything synchronously (dream cycle, shutdown); pending
+    patches are also flushed at interpreter exit.
+    """
+
+    def __init__(self, fragments_dir: Path = DEFAULT_FRAGMENTS_DIR, flush_interval_s: float = 5.0,
+                 max_pending: int = 256):
+        self.fragments_dir = Path(fragments_dir)
+        self.flush_interval_s = flush_interval_s
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[str, Dict] = {}
+        self._wake = threading.Event()
+        self._stopping = False
+        self._worker: Optional[threading.Thread] = None
+        self.stats = {'enqueued': 0, 'coalesced': 0, 'batches': 0, 'fragments_written': 0,
+                      'missing': 0, 'failed': 0}
+        atexit.register(self.close)
+
+    # === Queueing ===
+
+    @staticmethod
+    def fragment_key(fragment_id: str) -> str:
+        """Fragment ID without a trailing .json"""
+        return fragment_id[:-5] if fragment_id.endswith('.json') else fragment_id
+
+    def enqueue(self, fragment_id: str, lesson_id: str, contribution_score: float,
+                timestamp: Optional[float] = None):
+        """Queue 'fragment contributed to lesson' for the next batch"""
+        key = self.fragment_key(fragment_id)
+        with self._lock:
+            patch = self._pending.get(key)
+            if patch is None:
+                patch = self._pending[key] = {'contribution_scores': {}, 'last_lesson_update': None}
+            else:
+                self.stats['coalesced'] += 1
+            patch['contribution_scores'][lesson_id] = contribution_score
+            patch['last_lesson_update'] = timestamp if timestamp is not None else time.time()
+            self.stats['enqueued'] += 1
+            backlog = len(self._pending)
+        self._ensure_worker()
+        if backlog >= self.max_pending:
+            self._wake.set()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._stopping or (self._worker is not None and self._worker.is_alive()):
+                    return
+                self._worker = threading.Thread(target=self._run, name="fragment-metadata-writer", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval_s)
+            self._wake.clear()
+            if self._pending:
+                self.flush()
+
+    # === Applying patches ===
+
+    def flush(self) -> int:
+        """Apply every pending patch now; returns the number of fragment files written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            written = 0
+            retry: Dict[str, Dict] = {}
+            for key, patch in batch.items():
+                result = self._apply_patch(key, patch)
+                if result == 'written':
+                    written += 1
+                elif result == 'retry':
+                    retry[key] = patch
+            if retry:
+                self._requeue(retry)
+            self.stats['batches'] += 1
+            self.stats['fragments_written'] += written
+        return written
+
+    def _requeue(self, patches: Dict[str, Dict]):
+        """Put failed patches back without overriding anything queued since"""
+        with self._lock:
+            for key, patch in patches.items():
+                newer = self._pending.get(key)
+                if newer is None:
+                    self._pending[key] = patch
+                else:
+                    merged = dict(patch['contribution_scores'])
+                    merged.update(newer['contribution_scores'])
+                    newer['contribution_scores'] = merged
+
+    def _apply_patch(self, key: str, patch: Dict) -> str:
+        fragment_file = self.fragments_dir / f"{key}.json"
+        if not fragment_file.exists():
+            self.stats['missing'] += 1
+            return 'missing'
+        try:
+            with open(fragment_file, 'r', encoding='utf-8') as f:
+                fragment_data = json.load(f)
+        except ValueError as e:
+            print(f"⚠️ Error updating fragment {key} metadata: {e}")
+            self.stats['failed'] += 1
+            return 'failed'
+        except OSError:
+            return 'retry'
+        if not isinstance(fragment_data, dict):
+            self.stats['failed'] += 1
+            return 'failed'
+
+        metadata = fragment_data.setdefault('lesson_metadata', {
+            'lessons_contributed_to': [],
+            'contribution_scores': {},
+            'last_lesson_update': None
+        })
+        for lesson_id, score in patch['contribution_scores'].items():
+            if lesson_id not in metadata['lessons_contributed_to']:
+                metadata['lessons_contributed_to'].append(lesson_id)
+            metadata['contribution_scores'][lesson_id] = score
+        metadata['last_lesson_update'] = patch['last_lesson_update']
+
+        temp_file = fragment_file.with_name(fragment_file.name + '.tmp')
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(fragment_data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, fragment_file)
+        except OSError:
+            try:
+                temp_file.unlink()
+            except OSError:
+                pass
+            return 'retry'
+        return 'written'
+
+    def close(self):
+        """Stop the writer thread and flush what is left"""
+        self._stopping = True
+        self._wake.set()
+        worker = self._worker
+        if worker is not None and worker.is_alive() and worker is not threading.current_thread():
+            worker.join(timeout=self.flush_interval_s + 1.0)
+        self.flush()
+        atexit.unregister(self.close)
+
+
+_queues: Dict[str, FragmentMetadataQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_fragment_metadata_queue(fragments_dir: Optional[Path] = None) -> FragmentMetadataQueue:
+    """Shared FragmentMetadataQueue per fragment directory"""
+    path = Path(fragments_dir or DEFAULT_FRAGMENTS_DIR)
+    key = str(path.resolve())
+    with _queues_lock:
+        queue = _queues.get(key)
+        if queue is None or queue._stopping:
+            queue = _queues[key] = FragmentMetadataQueue(path)
+        return queue
+
+
+def flush_fragment_metadata() -> int:
+    """Flush hook for the dream cycle / shutdown: apply every queued patch now"""
+    with _queues_lock:
+        queues: List[FragmentMetadataQueue] = list(_queues.values())
+    return sum(queue.flush() for queue in queues)
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Luna Judge Cache
+Bounded, persistent cache for Arbiter model judgements plus a pooled LM Studio chat client
+"""
+
+import atexit
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+LM_STUDIO_URL = "http://localhost:1234/v1/chat/completions"
+JUDGE_MODEL = "exaone-3.5-2.4b-instruct-abliterated"
+DEFAULT_JUDGE_CACHE_DB = Path("data_core/ArbiterCache/judge_cache.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS judgements (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_judgements_created ON judgements(namespace, created_at);
+"""
+
+UPSERT_SQL = """
+    INSERT INTO judgements(namespace, key, value, created_at) VALUES (?, ?, ?, ?)
+    ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, created_at = excluded.created_at
+"""
+
+
+def normalize_text(text: str) -> str:
+    """Case- and whitespace-insensitive form used for cache keys"""
+    return " ".join(str(text).lower().split())
+
+
+def judge_key(*parts: str) -> str:
+    """Stable hash of the normalized parts (e.g. prompt, response)"""
+    joined = "\x1f".join(normalize_text(part) for part in parts)
+    return hashlib.sha1(joined.encode('utf-8')).hexdigest()
+
+
+_NUMBER_PATTERN = re.compile(r'\d+\.?\d*')
+_BATCH_LINE_PATTERN = re.compile(r'^\s*\[?(\d+)\]?\s*[:.)\-]\s*(.+)$')
+
+
+def parse_quality_score(text: str) -> Optional[float]:
+    """First number in a judge reply as a 0.0-1.0 score ("8" means 0.8); None if there is none"""
+    numbers = _NUMBER_PATTERN.findall(text or "")
+    if not numbers:
+        return None
+    try:
+        score = float(numbers[0])
+    except ValueError:
+        return None
+    if score > 1.0:
+        score = score / 10.0  # Handle cases like "8" meaning "0.8"
+    return max(0.0, min(1.0, score))
+
+
+def parse_batch_scores(text: str, count: int) -> List[Optional[float]]:
+    """Scores from numbered "1: 0.8" lines of a batch judge reply (None where a line is missing)"""
+    scores: List[Optional[float]] = [None] * count
+    for line in (text or "").splitlines():
+        match = _BATCH_LINE_PATTERN.match(line)
+        if not match:
+            continue
+        index = int(match.group(1)) - 1
+        if 0 <= index < count and scores[index] is None:
+            scores[index] = parse_quality_score(match.group(2))
+    return scores
+
+
+class JudgeCache:
+    """
+    Size- and TTL-bounded LRU cache of judgements, persisted to SQLite
+
+    Keys are judge_key() hashes. The newest unexpired max_entries rows are
+    loaded on start, so a restart keeps its judgements; puts are staged
+    and written in one transaction every flush_every puts and at exit.
+    Evicted and expired entries are deleted from disk on flush.
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_JUDGE_CACHE_DB, namespace: str = "default",
+                 max_entries: int = 500, ttl_s: Optional[float] = 7 * 24 * 3600, flush_every: int = 32):
+        self.db_path = Path(db_path)
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.flush_every = flush_every
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._staged: Dict[str, tuple] = {}
+        self._evicted: set = set()
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=5.0)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            with self._conn:
+                self._conn.executescript(SCHEMA)
+            self._load()
+        except (sqlite3.Error, OSError) as e:
+            print(f"   Warning: Judge cache not persisted ({e})")
+            self._conn = None
+        atexit.register(self.close)
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_s is not None and now - created_at > self.ttl_s
+
+    def _load(self):
+        now = time.time()
+        cutoff = now - self.ttl_s if self.ttl_s is not None else float('-inf')
+        with self._conn:
+            self._conn.execute("DELETE FROM judgements WHERE namespace = ? AND created_at < ?",
+                               (self.namespace, cutoff))
+        rows = self._conn.execute(
+            "SELECT key, value, created_at FROM judgements WHERE namespace = ? ORDER BY created_at DESC LIMIT ?",
+            (self.namespace, self.max_entries)
+        ).fetchall()
+        for key, value, created_at in reversed(rows):
+            self._entries[key] = (json.loads(value), created_at)
+
+    # === Mapping interface ===
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry[1], time.time()):
+                if entry is not None:
+                    del self._entries[key]
+                    self._evicted.add(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Any):
+        with self._lock:
+            entry = (value, time.time())
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._staged[key] = entry
+            self._evicted.discard(key)
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._staged.pop(old_key, None)
+                self._evicted.add(old_key)
+            staged = len(self._staged)
+        if staged >= self.flush_every:
+            self.flush()
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not self._expired(entry[1], time.time())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'max_entries': self.max_entries, 'ttl_s': self.ttl_s}
+
+    # === Persistence ===
+
+    def flush(self) -> int:
+        """Write staged judgements and drop evicted ones; returns rows written"""
+        with self._lock:
+            if self._conn is None or (not self._staged and not self._evicted):
+                return 0
+            rows = [(self.namespace, key, json.dumps(value, ensure_ascii=False), created_at)
+                    for key, (value, created_at) in self._staged.items()]
+            try:
+                with self._conn:
+                    if rows:
+                        self._conn.executemany(UPSERT_SQL, rows)
+                    if self._evicted:
+                        self._conn.executemany("DELETE FROM judgements WHERE namespace = ? AND key = ?",
+                                               [(self.namespace, key) for key in self._evicted])
+            except sqlite3.Error as e:
+                print(f"   Warning: Judge cache flush failed: {e}")
+                return 0
+            self._staged.clear()
+            self._evicted.clear()
+            return len(rows)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self.flush()
+                self._conn.close()
+                self._conn = None
+        atexit.unregister(self.close)
+
+
+class JudgeClient:
+    """LM Studio chat-completions client reusing one HTTP session (keep-alive) for judge calls"""
+
+    def __init__(self, url: str = LM_STUDIO_URL, model: str = JUDGE_MODEL):
+        self.url = url
+        self.model = model
+        self._session = None
+        self.calls = 0
+
+    def complete(self, system_prompt: str, user_prompt: str, temperature: float = 0.1,
+                 max_tokens: int = 10, timeout: float = 5) -> Optional[str]:
+        """Message content of one completion, or None if the server is unreachable or errors"""
+        import requests
+
+        if self._session is None:
+            self._session = requests.Session()
+        data = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": False
+        }
+        try:
+            self.calls += 1
+            response = self._session.post(self.url, json=data, timeout=timeout)
+            if response.status_code != 200:
+                return None
+            return response.json()['choices'][0]['message']['content'].strip()
+        except (requests.RequestException, ValueError, KeyError, IndexError, TypeError):
+            return None
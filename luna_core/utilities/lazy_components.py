@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Luna Lazy Components
+Thread-safe, build-on-first-use subsystem attributes with a startup profile
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class StartupProfile:
+    """
+    Per-component init timings for one owner object
+
+    total_ms is wall time of the factory call including any components it
+    pulled in; self_ms excludes those nested builds, so the self times add
+    up to the real startup cost.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self.order: List[str] = []
+
+    def _stack(self) -> List[List[float]]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def begin(self):
+        self._stack().append([time.perf_counter(), 0.0])
+
+    def end(self, name: str, error: Optional[str] = None):
+        stack = self._stack()
+        started, nested = stack.pop()
+        total = time.perf_counter() - started
+        if stack:
+            stack[-1][1] += total
+        with self._lock:
+            self.components[name] = {
+                'total_ms': total * 1000,
+                'self_ms': (total - nested) * 1000,
+                'loaded_at': time.time(),
+                'error': error,
+            }
+            if name not in self.order:
+                self.order.append(name)
+
+    def report(self, declared: Iterable[str] = ()) -> Dict[str, Any]:
+        """Loaded components in load order, plus the declared ones still pending"""
+        with self._lock:
+            loaded = {name: dict(self.components[name]) for name in self.order}
+        return {
+            'components': loaded,
+            'pending': [name for name in declared if name not in loaded],
+            'total_ms': sum(entry['self_ms'] for entry in loaded.values()),
+        }
+
+
+class lazy_component:
+    """
+    Attribute built by factory(instance) the first time it is read
+
+    The value is stored in the instance __dict__, so later reads are plain
+    attribute lookups and assignment (tests, wiring) still works. Builds are
+    serialized per instance with a re-entrant lock, so concurrent first reads
+    build a component exactly once and factories may read other components.
+    If the owner defines _component_ready(name, value) it is called after
+    each build (used for cross-component wiring).
+    """
+
+    def __init__(self, factory: Callable[[Any], Any]):
+        self.factory = factory
+        self.name = factory.__name__
+        self.__doc__ = factory.__doc__
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        state = instance.__dict__
+        if self.name in state:
+            return state[self.name]
+        with _component_lock(instance):
+            if self.name in state:
+                return state[self.name]
+            profile = startup_profile(instance)
+            profile.begin()
+            try:
+                value = self.factory(instance)
+            except Exception as e:
+                profile.end(self.name, error=str(e))
+                raise
+            state[self.name] = value
+            profile.end(self.name)
+            ready = getattr(instance, '_component_ready', None)
+            if ready is not None:
+                ready(self.name, value)
+            return value
+
+
+_lock_guard = threading.Lock()
+
+
+def _component_lock(instance) -> threading.RLock:
+    lock = instance.__dict__.get('_component_lock')
+    if lock is None:
+        with _lock_guard:
+            lock = instance.__dict__.setdefault('_component_lock', threading.RLock())
+    return lock
+
+
+def startup_profile(instance) -> StartupProfile:
+    """StartupProfile attached to instance (created on first use)"""
+    profile = instance.__dict__.get('_startup_profile')
+    if profile is None:
+        with _lock_guard:
+            profile = instance.__dict__.setdefault('_startup_profile', StartupProfile())
+    return profile
+
+
+def lazy_component_names(cls) -> List[str]:
+    """Declared lazy components of cls in definition order (base classes first)"""
+    names: List[str] = []
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if isinstance(value, lazy_component) and name not in names:
+                names.append(name)
+    return names
+
+
+def is_loaded(instance, name: str) -> bool:
+    """True if the lazy component has been built (without building it)"""
+    return name in instance.__dict__
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Luna Learning Session Runner
+Pipelined, checkpointed question runner: ordered state updates, concurrent model calls
+"""
+
+import hashlib
+import json
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_SESSION_DIR = Path("data_core/FractalCache/learning_sessions")
+
+
+def session_id_for(questions: List[Dict]) -> str:
+    """Stable ID of a question list, so rerunning the same session finds its checkpoint"""
+    payload = json.dumps(questions, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0.0 for no values)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def latency_summary(values_ms: List[float]) -> Dict[str, float]:
+    return {
+        'p50_ms': percentile(values_ms, 50),
+        'p90_ms': percentile(values_ms, 90),
+        'p99_ms': percentile(values_ms, 99),
+        'max_ms': max(values_ms) if values_ms else 0.0,
+    }
+
+
+class SessionCheckpoint:
+    """Append-only JSONL of finished question results for one session"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def load(self) -> Dict[int, Dict]:
+        """Finished results by question index (a torn last line is ignored)"""
+        results: Dict[int, Dict] = {}
+        if not self.path.exists():
+            return results
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and isinstance(entry.get('index'), int):
+                    results[entry['index']] = entry['result']
+        return results
+
+    def append(self, index: int, result: Dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'index': index, 'result': result}, ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class LearningSessionRunner:
+    """
+    Runs a question list as begin -> infer -> finish with bounded overlap
+
+    begin(index, question_data) and finish(index, question_data, draft) run
+    on the calling thread strictly in question order, so every state update
+    is applied in the same order as a sequential session. infer(draft) (the
+    model call) runs on up to max_workers threads; begin for a question can
+    therefore run before up to max_workers - 1 earlier questions finish.
+    max_workers=1 is exactly the sequential session.
+
+    Each finished result is appended to a checkpoint named after the
+    question list; rerunning the same list skips the checkpointed questions,
+    and the checkpoint is removed once the session completes. A question
+    interrupted between finish and its checkpoint write is rerun.
+    """
+
+    def __init__(self, begin: Callable[[int, Dict], Any], infer: Callable[[Any], Any],
+                 finish: Callable[[int, Dict, Any], Dict], max_workers: int = 2,
+                 checkpoint_dir: Optional[Path] = DEFAULT_SESSION_DIR):
+        self.begin = begin
+        self.infer = infer
+        self.finish = finish
+        self.max_workers = max(1, int(max_workers))
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir is not None else None
+
+    def checkpoint_for(self, questions: List[Dict]) -> Optional[SessionCheckpoint]:
+        if self.checkpoint_dir is None:
+            return None
+        return SessionCheckpoint(self.checkpoint_dir / f"session_{session_id_for(questions)}.jsonl")
+
+    @staticmethod
+    def _timed_infer(infer: Callable[[Any], Any], draft: Any):
+        started = time.perf_counter()
+        result = infer(draft)
+        return result, (time.perf_counter() - started) * 1000
+
+    def run(self, questions: List[Dict]) -> Dict[str, Any]:
+        """
+        Run (or resume) a session
+
+        Returns:
+            Dictionary with ordered results, resumed count and throughput/latency stats
+        """
+        checkpoint = self.checkpoint_for(questions)
+        done = checkpoint.load() if checkpoint is not None else {}
+        todo = deque(i for i in range(len(questions)) if i not in done)
+        resumed = len(done)
+
+        latencies: List[float] = []
+        inference: List[float] = []
+        wall_start = time.perf_counter()
+        in_flight = deque()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="luna-session") as pool:
+            while todo or in_flight:
+                while todo and len(in_flight) < self.max_workers:
+                    index = todo.popleft()
+                    started = time.perf_counter()
+                    draft = self.begin(index, questions[index])
+                    in_flight.append((index, started, pool.submit(self._timed_infer, self.infer, draft)))
+
+                index, started, future = in_flight.popleft()
+                draft, infer_ms = future.result()
+                result = self.finish(index, questions[index], draft)
+                latency_ms = (time.perf_counter() - started) * 1000
+                result['latency_ms'] = latency_ms
+                latencies.append(latency_ms)
+                inference.append(infer_ms)
+                done[index] = result
+                if checkpoint is not None:
+                    checkpoint.append(index, result)
+
+        wall_time = time.perf_counter() - wall_start
+        if checkpoint is not None:
+            checkpoint.clear()
+
+        processed = len(latencies)
+        return {
+            'results': [done[i] for i in range(len(questions))],
+            'resumed': resumed,
+            'stats': {
+                'processed': processed,
+                'resumed': resumed,
+                'max_workers': self.max_workers,
+                'wall_time_s': wall_time,
+                'throughput_qps': processed / wall_time if wall_time > 0 else 0.0,
+                'latency': latency_summary(latencies),
+                'inference_latency': latency_summary(inference),
+            }
+        }
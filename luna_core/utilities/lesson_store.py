@@ -0,0 +1,668 @@
+#!/usr/bin/env python3
+"""
+Luna Lesson Store
+Append-only lesson log with inverted tag index and hashed bag-of-words matrices for lesson/fragment lookup
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LESSON_LOG = "lessons.jsonl"
+LESSON_LOCK = "lessons.lock"
+LEGACY_LESSONS = "lessons.json"
+EMBED_DIM = 256
+
+LESSON_MATCH_THRESHOLD = 0.3
+FRAGMENT_MATCH_THRESHOLD = 0.2
+
+
+def prompt_words(text: str) -> set:
+    """Word set used by lesson/fragment relevance (lowercased whitespace split)"""
+    return set(str(text).lower().split())
+
+
+def lesson_id_for(row: int) -> str:
+    return f"lesson_{row:06d}"
+
+
+@contextmanager
+def file_lock(path: Path):
+    """Exclusive advisory lock on path across processes (blocks until acquired)"""
+    with open(path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10s; keep waiting
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _lesson_score(lesson_key: str, lesson_words: set, lesson_tags: List[str],
+                  key: str, words: set, tags: set) -> float:
+    score = 0.0
+    if lesson_key == key:
+        score += 1.0
+    if len(words) > 0:
+        score += (len(words & lesson_words) / len(words)) * 0.6
+    if len(lesson_tags) > 0:
+        score += (len(tags & set(lesson_tags)) / len(lesson_tags)) * 0.4
+    return score
+
+
+def lesson_relevance(record: Dict, prompt: str, tags: List[str]) -> float:
+    """Relevance of a stored lesson: exact prompt + word overlap (0.6) + tag overlap (0.4)"""
+    return _lesson_score(record["original_prompt"].lower().strip(), prompt_words(record["original_prompt"]),
+                         record.get("context_tags") or [], prompt.lower().strip(), prompt_words(prompt), set(tags))
+
+
+def _fragment_score(fragment_words: set, fragment_tags: set, words: set, tags: set) -> float:
+    if not words:
+        return 0.0
+    similarity = len(words & fragment_words) / len(words)
+    tag_overlap = len(tags & fragment_tags)
+    if tag_overlap > 0:
+        similarity += tag_overlap * 0.1
+    return similarity
+
+
+def fragment_relevance(content: str, fragment_tags: Iterable[str], prompt: str, tags: List[str]) -> float:
+    """Relevance of a FractalCache fragment: word overlap + 0.1 per shared tag"""
+    return _fragment_score(prompt_words(content), set(fragment_tags), prompt_words(prompt), set(tags))
+
+
+class IncidenceMatrix:
+    """
+    Feature-major 0/1 matrix (features x documents) that grows with the documents
+
+    weighted_counts() sums the rows of the query's features, so a lookup
+    reads a handful of contiguous rows instead of the whole matrix.
+    """
+
+    def __init__(self, features: int):
+        self.rows = 0
+        self._matrix = np.zeros((features, 64), dtype=np.uint8) if NUMPY_AVAILABLE else None
+
+    def _ensure(self, features: int, row: int):
+        height, width = self._matrix.shape
+        if features > height or row >= width:
+            grown = np.zeros((max(features, height), max(row + 1, width * 2) if row >= width else width),
+                             dtype=np.uint8)
+            grown[:height, :width] = self._matrix
+            self._matrix = grown
+
+    def set_row(self, row: int, features: Iterable[int]):
+        features = list(features)
+        if self._matrix is not None:
+            self._ensure(max(features, default=-1) + 1, row)
+            self._matrix[:, row] = 0
+            self._matrix[features, row] = 1
+        self.rows = max(self.rows, row + 1)
+
+    def weighted_counts(self, features: Dict[int, int]):
+        """sum(weight * column) over the query features, per document (None without NumPy)"""
+        if self._matrix is None:
+            return None
+        counts = np.zeros(self.rows, dtype=np.float64)
+        for feature, weight in features.items():
+            if feature < self._matrix.shape[0]:
+                counts += self._matrix[feature, :self.rows] * float(weight)
+        return counts
+
+
+class BagOfWordsMatrix(IncidenceMatrix):
+    """
+    Hashed bag-of-words embedding, one column per document
+
+    Each document marks the buckets its words hash into. A query weights
+    each bucket by how many of its distinct words land there, so the
+    product is an upper bound on the number of words a document shares
+    with the query (collisions only ever add). Callers rank candidates by
+    it and stop rescoring exactly once the bound drops below the best
+    exact score.
+    """
+
+    def __init__(self, dim: int = EMBED_DIM):
+        super().__init__(dim)
+        self.dim = dim
+
+    def _buckets(self, words: Iterable[str]) -> List[int]:
+        return [zlib.crc32(word.encode('utf-8')) % self.dim for word in words]
+
+    def set_words(self, row: int, words: Iterable[str]):
+        self.set_row(row, set(self._buckets(words)))
+
+    def overlap_bound(self, words: Iterable[str]):
+        """Upper bound on shared distinct words per document (None without NumPy)"""
+        weights: Dict[int, int] = {}
+        for bucket in self._buckets(words):
+            weights[bucket] = weights.get(bucket, 0) + 1
+        return self.weighted_counts(weights)
+
+
+class TagIndex:
+    """Inverted tag index: tag -> rows, plus a tag incidence matrix for vectorized overlap counts"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._postings: Dict[str, set] = {}
+        self._matrix = IncidenceMatrix(8)
+
+    def set_row(self, row: int, tags: Iterable[str]):
+        for tag in set(tags):
+            self._postings.setdefault(tag, set()).add(row)
+        self._matrix.set_row(row, [self._ids.setdefault(tag, len(self._ids)) for tag in set(tags)])
+
+    def remove_row(self, row: int, tags: Iterable[str]):
+        for tag in set(tags):
+            self._postings.get(tag, set()).discard(row)
+        self._matrix.set_row(row, [])
+
+    def overlap(self, tags: Iterable[str]) -> Dict[int, int]:
+        """Rows sharing at least one tag -> number of shared tags"""
+        counts: Dict[int, int] = {}
+        for tag in set(tags):
+            for row in self._postings.get(tag, ()):
+                counts[row] = counts.get(row, 0) + 1
+        return counts
+
+    def hits(self, tags: Iterable[str], rows: int):
+        """Shared tag count per row as an array (rows long)"""
+        counts = self._matrix.weighted_counts({self._ids[tag]: 1 for tag in set(tags) if tag in self._ids})
+        if counts is None:
+            return None
+        if len(counts) < rows:
+            counts = np.concatenate([counts, np.zeros(rows - len(counts))])
+        return counts[:rows]
+
+
+def _pruned_best(upper, score_row, threshold: float) -> Tuple[Optional[int], float]:
+    """
+    Best row by exact score, visiting rows in decreasing upper-bound order
+
+    Ties go to the lowest row, matching a front-to-back linear scan.
+    """
+    candidates = np.nonzero(upper >= threshold)[0]
+    order = candidates[np.lexsort((candidates, -upper[candidates]))]
+    best_row, best_score = None, 0.0
+    for row in order.tolist():
+        if upper[row] < best_score:
+            break
+        if upper[row] == best_score and best_row is not None and row > best_row:
+            continue  # Can at most tie, and ties go to the lower row
+        score = score_row(row)
+        if score > best_score or (score == best_score and best_row is not None and row < best_row):
+            best_row, best_score = row, score
+    return best_row, best_score
+
+
+def _linear_best(rows: int, score_row) -> Tuple[Optional[int], float]:
+    best_row, best_score = None, 0.0
+    for row in range(rows):
+        score = score_row(row)
+        if score > best_score:
+            best_row, best_score = row, score
+    return best_row, best_score
+
+
+class LessonStore:
+    """
+    Append-only store for Arbiter lessons
+
+    Every change is one JSON line appended to lessons.jsonl: 'put' records
+    carry a whole lesson, 'link' records attach fragments to a lesson. The
+    log is replayed on open into memory, together with an inverted tag
+    index, an exact-prompt index and a BagOfWordsMatrix over the lesson
+    prompts, so best_match() only rescores the few lessons whose bound can
+    still win. Lines appended by other processes (dream lessons) are
+    picked up by refresh() from the last read offset. Every append
+    (and new lesson id) happens under a lock file shared with those
+    processes, so two writers never hand out the same row and the read
+    offset always lands on a line boundary. The legacy lessons.json is imported once
+    when no log exists yet.
+    """
+
+    def __init__(self, root: Path, dim: int = EMBED_DIM):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.root / LESSON_LOG
+        self.legacy_path = self.root / LEGACY_LESSONS
+        self.lock_path = self.root / LESSON_LOCK
+        self._lock = threading.RLock()
+        self._log_lock_depth = 0
+        self.dim = dim
+        self._reset()
+        self.appends = 0
+
+        if not self.log_path.exists() and self.legacy_path.exists():
+            self._import_legacy()
+        self.refresh()
+
+    # === Log replay ===
+
+    def _import_legacy(self):
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                lessons = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"   Warning: Could not import {self.legacy_path}: {e}")
+            return
+        lines = [json.dumps({"op": "put", "id": lesson_id_for(i), "lesson": lesson}, ensure_ascii=False)
+                 for i, lesson in enumerate(lessons)]
+        self._write_log(lines)
+        print(f"   Imported {len(lines)} lessons from {self.legacy_path} into {self.log_path}")
+
+    def _write_log(self, lines: List[str]):
+        temp_path = self.log_path.with_suffix('.jsonl.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for line in lines:
+                f.write(line + "\n")
+        os.replace(temp_path, self.log_path)
+
+    def refresh(self) -> int:
+        """Replay log lines appended since the last read; returns how many were applied"""
+        with self._lock:
+            try:
+                size = self.log_path.stat().st_size
+            except OSError:
+                return 0
+            if size < self._offset:
+                # Log was compacted by another process - start over
+                self._reset()
+            if size == self._offset:
+                return 0
+            applied = 0
+            with open(self.log_path, 'rb') as f:
+                f.seek(self._offset)
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break  # Partially written line; read it next time
+                    self._offset += len(raw)
+                    self.log_lines += 1
+                    try:
+                        self._apply(json.loads(raw.decode('utf-8')))
+                        applied += 1
+                    except (ValueError, KeyError, TypeError):
+                        continue
+            return applied
+
+    def _reset(self):
+        self._records: List[Dict] = []
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._words: List[set] = []
+        self._prompt_index: Dict[str, List[int]] = {}
+        self._fragment_links: Dict[str, Dict[str, Any]] = {}
+        self._tag_index = TagIndex()
+        self._tag_len = np.zeros(64) if NUMPY_AVAILABLE else None
+        self._bag = BagOfWordsMatrix(self.dim)
+        self._offset = 0
+        self.log_lines = 0
+        self.stale_lines = 0
+
+    def _apply(self, entry: Dict):
+        op = entry.get("op")
+        if op == "put":
+            self._index_lesson(entry["id"], entry["lesson"])
+        elif op == "link":
+            self._index_link(entry["id"], entry["fragments"], entry.get("score", 0.0), entry.get("timestamp"))
+
+    def _index_lesson(self, lesson_id: str, lesson: Dict):
+        lesson = dict(lesson)
+        lesson.setdefault("context_tags", [])
+        lesson.setdefault("context_files_used", [])
+        key = lesson["original_prompt"].lower().strip()
+        words = prompt_words(lesson["original_prompt"])
+        row = self._rows.get(lesson_id)
+        if row is None:
+            row = len(self._records)
+            self._rows[lesson_id] = row
+            self._ids.append(lesson_id)
+            self._records.append(lesson)
+            self._keys.append(key)
+            self._words.append(words)
+        else:
+            self.stale_lines += 1
+            self._tag_index.remove_row(row, self._records[row]["context_tags"])
+            self._prompt_index[self._keys[row]].remove(row)
+            self._records[row], self._keys[row], self._words[row] = lesson, key, words
+        self._tag_index.set_row(row, lesson["context_tags"])
+        self._prompt_index.setdefault(key, []).append(row)
+        self._bag.set_words(row, words)
+        if self._tag_len is not None:
+            if row >= len(self._tag_len):
+                self._tag_len = np.concatenate([self._tag_len, np.zeros(len(self._tag_len))])
+            self._tag_len[row] = len(lesson["context_tags"])
+
+    def _index_link(self, lesson_id: str, fragment_ids: List[str], score: float, timestamp: Optional[float]):
+        row = self._rows.get(lesson_id)
+        if row is not None:
+            used = self._records[row]["context_files_used"]
+            used.extend(f for f in fragment_ids if f not in used)
+        for fragment_id in fragment_ids:
+            metadata = self._fragment_links.setdefault(fragment_id, {
+                'lessons_contributed_to': [],
+                'contribution_scores': {},
+                'last_lesson_update': None
+            })
+            if lesson_id not in metadata['lessons_contributed_to']:
+                metadata['lessons_contributed_to'].append(lesson_id)
+            metadata['contribution_scores'][lesson_id] = score
+            metadata['last_lesson_update'] = timestamp
+
+    @contextmanager
+    def _log_lock(self):
+        """Hold the cross-process lock file (re-entrant within this store)"""
+        with self._lock:
+            if self._log_lock_depth:
+                self._log_lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._log_lock_depth -= 1
+                return
+            with file_lock(self.lock_path):
+                self._log_lock_depth = 1
+                try:
+                    yield
+                finally:
+                    self._log_lock_depth = 0
+
+    def _append(self, entry: Dict):
+        """Append one log line (single write) under the lock file and apply it"""
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8')
+        with self._log_lock():
+            self.refresh()
+            with open(self.log_path, 'ab') as f:
+                start = f.tell()
+                f.write(line)
+                end = f.tell()
+            self.appends += 1
+            if start != self._offset:
+                # Unread bytes before our line (a writer outside the lock); replay them with it
+                self.refresh()
+                return
+            self._offset = end
+            self.log_lines += 1
+            self._apply(entry)
+
+    # === Writes ===
+
+    def add(self, lesson: Dict) -> str:
+        """Append a new lesson; returns its lesson_id"""
+        # Catch up with the log and append under the file lock, so the row
+        # count the id is taken from cannot change in another process meanwhile
+        with self._log_lock():
+            self.refresh()
+            lesson_id = lesson_id_for(len(self._records))
+            self._append({"op": "put", "id": lesson_id, "lesson": lesson})
+        return lesson_id
+
+    def update(self, lesson_id: str, **fields):
+        """Append a revised copy of a lesson (the previous line becomes superseded)"""
+        with self._log_lock():
+            self.refresh()  # revise the latest copy, not a stale one
+            lesson = dict(self._records[self._rows[lesson_id]])
+            lesson.update(fields)
+            self._append({"op": "put", "id": lesson_id, "lesson": lesson})
+
+    def link_fragments(self, lesson_id: str, fragment_ids: List[str], contribution_score: float):
+        """Record that fragments contributed to a lesson (one line, no fragment files rewritten)"""
+        if fragment_ids:
+            self._append({"op": "link", "id": lesson_id, "fragments": list(fragment_ids),
+                          "score": contribution_score, "timestamp": time.time()})
+
+    def compact(self) -> int:
+        """Rewrite the log with one line per live lesson and link; returns the number of lines dropped"""
+        with self._log_lock():
+            self.refresh()
+            lines = [json.dumps({"op": "put", "id": lesson_id, "lesson": self._records[row]}, ensure_ascii=False)
+                     for lesson_id, row in self._rows.items()]
+            for fragment_id, metadata in self._fragment_links.items():
+                for lesson_id in metadata['lessons_contributed_to']:
+                    lines.append(json.dumps({"op": "link", "id": lesson_id, "fragments": [fragment_id],
+                                             "score": metadata['contribution_scores'][lesson_id],
+                                             "timestamp": metadata['last_lesson_update']}, ensure_ascii=False))
+            dropped = self.log_lines - len(lines)
+            self._write_log(lines)
+            self._reset()
+            self.refresh()
+            return dropped
+
+    # === Reads ===
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, lesson_id: str) -> Optional[Dict]:
+        row = self._rows.get(lesson_id)
+        return self._records[row] if row is not None else None
+
+    def items(self) -> List[Tuple[str, Dict]]:
+        """(lesson_id, lesson) pairs in insertion order"""
+        with self._lock:
+            self.refresh()
+            return [(lesson_id, self._records[row]) for lesson_id, row in self._rows.items()]
+
+    def fragment_metadata(self, fragment_id: str) -> Optional[Dict]:
+        """lesson_metadata for a fragment (lessons it contributed to and their scores)"""
+        return self._fragment_links.get(fragment_id)
+
+    def best_match(self, prompt: str, tags: List[str],
+                   threshold: float = LESSON_MATCH_THRESHOLD) -> Optional[Tuple[str, float]]:
+        """Highest lesson_relevance at or above threshold, as (lesson_id, score)"""
+        with self._lock:
+            self.refresh()
+            rows = len(self._records)
+            if rows == 0:
+                return None
+            key, words, tag_set = prompt.lower().strip(), prompt_words(prompt), set(tags)
+
+            def score_row(row: int) -> float:
+                return _lesson_score(self._keys[row], self._words[row], self._records[row]["context_tags"],
+                                     key, words, tag_set)
+
+            upper = self._upper_bounds(key, words, tag_set, rows)
+            if upper is None:
+                best_row, best_score = _linear_best(rows, score_row)
+            else:
+                best_row, best_score = _pruned_best(upper, score_row, threshold)
+            if best_row is None or best_score < threshold:
+                return None
+            return self._ids[best_row], best_score
+
+    def _upper_bounds(self, key: str, words: set, tags: set, rows: int):
+        """Per-lesson upper bound of _lesson_score (same float operations, word overlap bounded)"""
+        bound = self._bag.overlap_bound(words)
+        if bound is None:
+            return None
+        upper = np.zeros(rows, dtype=np.float64)
+        for row in self._prompt_index.get(key, []):
+            upper[row] = 1.0
+        if words:
+            upper += (bound / len(words)) * 0.6
+        tag_len = self._tag_len[:rows]
+        hits = self._tag_index.hits(tags, rows)
+        upper += np.divide(hits, tag_len, out=np.zeros(rows), where=tag_len > 0) * 0.4
+        return upper
+
+    def best_tag_match(self, tags: List[str]) -> Optional[str]:
+        """Lesson sharing the most tags (earliest wins ties), via the tag index"""
+        with self._lock:
+            self.refresh()
+            overlap = self._tag_index.overlap(tags)
+            if not overlap:
+                return None
+            best_row = min(overlap, key=lambda row: (-overlap[row], row))
+            return self._ids[best_row]
+
+
+class FragmentIndex:
+    """
+    In-memory index of FractalCache fragment files for fragment fallback search
+
+    Fragments are parsed once and re-parsed only when their mtime/size
+    changes. The directory is re-listed when its own mtime moves (files
+    added or removed) and at most every rescan_interval_s otherwise, so
+    a search normally costs one stat plus a matrix-vector product.
+    """
+
+    def __init__(self, fragments_dir: Path, dim: int = EMBED_DIM, rescan_interval_s: float = 60.0):
+        self.fragments_dir = Path(fragments_dir)
+        self.rescan_interval_s = rescan_interval_s
+        self._lock = threading.RLock()
+        self._rows: Dict[str, int] = {}
+        self._fragments: List[Optional[Dict]] = []
+        self._words: List[set] = []
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._tag_index = TagIndex()
+        self._bag = BagOfWordsMatrix(dim)
+        self._dir_mtime = None
+        self._last_scan = 0.0
+        self.parses = 0
+
+    def __len__(self) -> int:
+        return sum(1 for fragment in self._fragments if fragment is not None)
+
+    def refresh(self, force: bool = False):
+        with self._lock:
+            try:
+                dir_mtime = self.fragments_dir.stat().st_mtime_ns
+            except OSError:
+                return
+            if not force and dir_mtime == self._dir_mtime and time.time() - self._last_scan < self.rescan_interval_s:
+                return
+            self._dir_mtime = dir_mtime
+            self._last_scan = time.time()
+            seen = set()
+            with os.scandir(self.fragments_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.json') or not entry.is_file():
+                        continue
+                    file_id = entry.name[:-5]
+                    seen.add(file_id)
+                    stat = entry.stat()
+                    stamp = (stat.st_mtime_ns, stat.st_size)
+                    if self._stamps.get(file_id) != stamp:
+                        self._stamps[file_id] = stamp
+                        self._index(file_id, Path(entry.path))
+            for file_id in [f for f in self._rows if f not in seen]:
+                self._stamps.pop(file_id, None)
+                self._drop(file_id)
+
+    def _index(self, file_id: str, path: Path):
+        self._drop(file_id)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.parses += 1
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict):
+            return
+        content = data.get('content', '') or data.get('text', '')
+        if not content:
+            return
+        tags = data.get('tags', []) or data.get('context_tags', [])
+        row = self._rows.get(file_id)
+        if row is None:
+            row = len(self._fragments)
+            self._rows[file_id] = row
+            self._fragments.append(None)
+            self._words.append(set())
+        self._fragments[row] = {'file_id': file_id, 'content': content, 'tags': list(tags)}
+        self._words[row] = prompt_words(content)
+        self._tag_index.set_row(row, tags)
+        self._bag.set_words(row, self._words[row])
+
+    def _drop(self, file_id: str):
+        row = self._rows.get(file_id)
+        if row is None or self._fragments[row] is None:
+            return
+        self._tag_index.remove_row(row, self._fragments[row]['tags'])
+        self._fragments[row] = None
+        self._words[row] = set()
+        self._bag.set_words(row, [])
+
+    def search(self, prompt: str, tags: List[str],
+               threshold: float = FRAGMENT_MATCH_THRESHOLD) -> Tuple[Optional[Dict], float]:
+        """Best fragment by fragment_relevance, as (fragment, score); fragment is None below threshold"""
+        self.refresh()
+        with self._lock:
+            rows = len(self._fragments)
+            words = prompt_words(prompt)
+            if rows == 0 or not words:
+                return None, 0.0
+
+            tag_set = set(tags)
+
+            def score_row(row: int) -> float:
+                fragment = self._fragments[row]
+                if fragment is None:
+                    return 0.0
+                return _fragment_score(self._words[row], set(fragment['tags']), words, tag_set)
+
+            bound = self._bag.overlap_bound(words)
+            if bound is None:
+                best_row, best_score = _linear_best(rows, score_row)
+            else:
+                upper = bound / len(words) + self._tag_index.hits(tag_set, rows) * 0.1
+                best_row, best_score = _pruned_best(upper, score_row, threshold)
+            if best_row is None or best_score < threshold:
+                return None, best_score
+            return dict(self._fragments[best_row]), best_score
+
+
+_stores: Dict[str, LessonStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_lesson_store(root: Path) -> LessonStore:
+    """Shared LessonStore per cache directory"""
+    key = str(Path(root).resolve())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = LessonStore(Path(root))
+        return _stores[key]
+
+
+def load_lesson_records(root: Path) -> List[Dict]:
+    """Lessons as plain dicts for read-only consumers (log if present, legacy lessons.json otherwise)"""
+    root = Path(root)
+    if (root / LESSON_LOG).exists():
+        return [lesson for _, lesson in get_lesson_store(root).items()]
+    legacy = root / LEGACY_LESSONS
+    if legacy.exists():
+        with open(legacy, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return []
@@ -4,7 +4,6 @@ Luna Question Generator
 Generates questions for dream/meditation cycles using LM Studio
 """
 
-import json
 import requests
 import random
 from typing import List, Dict, Optional
@@ -178,12 +177,8 @@ Question:"""
             List of past questions Luna has been asked
         """
         try:
-            lessons_file = Path("data_core/ArbiterCache/lessons.json")
-            if not lessons_file.exists():
-                return []
-            
-            with open(lessons_file, 'r', encoding='utf-8') as f:
-                lessons = json.load(f)
+            from luna_core.utilities.lesson_store import load_lesson_records
+            lessons = load_lesson_records(Path("data_core/ArbiterCache"))
             
             # Extract unique questions
             questions = list(set([lesson.get('original_prompt', '') for lesson in lessons if lesson.get('original_prompt')]))
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Luna Rewrite Engine
+Compiles a table of phrase/regex substitutions into one alternation applied in a single pass
+"""
+
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Union
+
+
+@dataclass
+class RewriteRule:
+    """One substitution: pattern -> replacement (replacement may use \\1-style group refs)"""
+    name: str
+    pattern: str
+    replacement: str = ""
+    flags: int = 0
+    literal: bool = False
+    whole_word: bool = False
+
+
+def literal_rules(prefix: str, phrases: Iterable[str], replacement: str = "",
+                  flags: int = re.IGNORECASE) -> List[RewriteRule]:
+    """Rules that replace literal phrases, named prefix:phrase"""
+    return [RewriteRule(f"{prefix}:{phrase}", phrase, replacement, flags, literal=True)
+            for phrase in phrases if phrase]
+
+
+_WORD_ALTERNATION = re.compile(r"^\\b\(?((?:[\w' ]+\|)*[\w' ]+)\)?\\b$")
+
+
+def word_alternation(pattern: str) -> Optional[List[str]]:
+    """Words of a plain r"\b(word|two words)\b" pattern, or None if it is anything richer"""
+    match = _WORD_ALTERNATION.match(pattern)
+    if not match or (pattern.count('(') != pattern.count(')')):
+        return None
+    return match.group(1).split('|')
+
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """Prefix-factored alternation of literal phrases; greedy, so the longest phrase wins"""
+    trie: Dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def emit(node: Dict) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in node.items() if char != '']
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return emit(trie)
+
+
+class _Entry:
+    """One alternative of the combined pattern: a regex rule or a group of literal rules"""
+
+    def __init__(self, regex: Optional[re.Pattern], rule: Optional[RewriteRule] = None,
+                 table: Optional[Dict[str, RewriteRule]] = None, flags: int = 0, whole_word: bool = False):
+        self.regex = regex
+        self.rule = rule
+        self.table = table
+        self.flags = flags
+        self.whole_word = whole_word
+        self.fold = bool(flags & re.IGNORECASE)
+
+    def resolve(self, matched: str) -> RewriteRule:
+        if self.rule is not None:
+            return self.rule
+        return self.table[matched.lower() if self.fold else matched]
+
+
+class RewriteEngine:
+    """
+    Single-pass rewrite over a fixed rule table
+
+    All rules are merged into one regex alternation (with per-rule scoped
+    flags), so the text is scanned once left to right. At any position the
+    earliest declared rule that matches wins; literal phrase rules sharing
+    the same flags are folded into one prefix trie (placed where the first
+    of them is declared) and among those the longest phrase wins. Matches
+    never overlap and replaced text is not rescanned.
+
+    Plain word alternations (r"\b(a|b)\b", see word_alternation) are best
+    declared as whole_word literals: the trie lets the scanner reject most
+    positions after one character test instead of trying every rule.
+
+    Which rule fired is only worked out on a hit (re-matching the rules
+    at that position in priority order), so the scan itself carries no
+    capture-group bookkeeping. Rule patterns must not use backreferences.
+
+    Every hit is counted per rule name (see hit_counts()).
+    """
+
+    _FLAG_LETTERS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'), (re.VERBOSE, 'x'))
+
+    def __init__(self, rules: Iterable[Union[RewriteRule, tuple]]):
+        self.rules: List[RewriteRule] = [r if isinstance(r, RewriteRule) else RewriteRule(*r) for r in rules]
+        self._entries: List[_Entry] = []
+        literal_groups: Dict[tuple, _Entry] = {}
+        for rule in self.rules:
+            if rule.literal:
+                group = (rule.flags, rule.whole_word)
+                if group not in literal_groups:
+                    literal_groups[group] = _Entry(None, table={}, flags=rule.flags, whole_word=rule.whole_word)
+                    self._entries.append(literal_groups[group])
+                entry = literal_groups[group]
+                entry.table.setdefault(rule.pattern.lower() if entry.fold else rule.pattern, rule)
+            else:
+                self._entries.append(_Entry(re.compile(self._scoped(rule.pattern, rule.flags)), rule=rule))
+
+        for entry in literal_groups.values():
+            trie = _trie_pattern(entry.table)
+            if entry.whole_word:
+                trie = rf"\b{trie}\b"
+            entry.regex = re.compile(self._scoped(trie, entry.flags))
+
+        self.pattern = re.compile("|".join(e.regex.pattern for e in self._entries)) if self._entries else None
+        self._hits: Counter = Counter()
+        self._hits_lock = threading.Lock()
+
+    @classmethod
+    def _scoped(cls, pattern: str, flags: int) -> str:
+        letters = "".join(letter for flag, letter in cls._FLAG_LETTERS if flags & flag)
+        return f"(?{letters}:{pattern})" if letters else f"(?:{pattern})"
+
+    def apply(self, text: str) -> str:
+        """Apply every rule in one left-to-right pass"""
+        if not text or self.pattern is None:
+            return text
+        hits = Counter()
+
+        def replace(match):
+            start = match.start()
+            for entry in self._entries:
+                rule_match = entry.regex.match(text, start)
+                if rule_match is not None:
+                    rule = entry.resolve(rule_match.group(0))
+                    hits[rule.name] += 1
+                    if '\\' in rule.replacement:
+                        return rule_match.expand(rule.replacement)
+                    return rule.replacement
+            return match.group(0)
+
+        result = self.pattern.sub(replace, text)
+        if hits:
+            with self._hits_lock:
+                self._hits.update(hits)
+        return result
+
+    def hit_counts(self) -> Dict[str, int]:
+        """Per-rule hit counters since creation (or the last reset)"""
+        with self._hits_lock:
+            return dict(self._hits)
+
+    def reset_hits(self):
+        """Zero the hit counters"""
+        with self._hits_lock:
+            self._hits.clear()
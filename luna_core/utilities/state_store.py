@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Luna State Store
+SQLite (WAL) key/document store for Luna's persistent state, with batched commits and JSON migration
+
+Once a document has been migrated, its legacy JSON file is frozen: the store
+is the source of truth and the file is neither updated nor read again (it is
+only used by the JSON fallback when the store cannot be opened). To reset a
+document, put an empty value rather than deleting it - a missing document
+is re-imported from the frozen file.
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_STATE_DB = Path("data_core/FractalCache/luna_state.db")
+
+# Namespace -> expected document type (put() rejects anything else)
+NAMESPACE_TYPES: Dict[str, type] = {
+    'existential': dict,
+    'cfia': dict,
+    'personality': dict,
+    'session': list,
+    'reasoning': dict,
+}
+
+# Documents are keyed by the JSON file they replace (state_key), so relocatable
+# state (custom state_file / cache_path) keeps separate documents
+LEGACY_JSON_FILES: List[Tuple[str, Path]] = [
+    ('existential', Path("data_core/FractalCache/luna_existential_state.json")),
+    ('cfia', Path("data_core/ArbiterCache/cfia_state.json")),
+    ('personality', Path("config/luna_personality_dna.json")),
+    ('personality', Path("config/luna_persistent_memory.json")),
+    ('personality', Path("config/luna_learning_history.json")),
+    ('personality', Path("config/voice_profile.json")),
+    ('session', Path("data_core/FractalCache/luna_session_memory.json")),
+    ('reasoning', Path("data_core/FractalCache/luna_bigfive_answers.json")),
+]
+
+_MISSING = object()
+
+
+def state_key(path) -> str:
+    """Document key for a legacy JSON state file"""
+    return Path(path).as_posix()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE TABLE IF NOT EXISTS migrations (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    source TEXT,
+    migrated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+UPSERT_SQL = """
+    INSERT INTO documents(namespace, key, value, updated_at) VALUES (?, ?, ?, ?)
+    ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+"""
+
+
+class StateNamespace:
+    """Handle bound to one namespace of a StateStore"""
+
+    def __init__(self, store: 'StateStore', name: str):
+        self.store = store
+        self.name = name
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.store.get(self.name, key, default)
+
+    def put(self, key: str, value: Any):
+        self.store.put(self.name, key, value)
+
+    def delete(self, key: str):
+        self.store.delete(self.name, key)
+
+    def keys(self) -> List[str]:
+        return self.store.keys(self.name)
+
+    def load(self, key: str, legacy_loader: Callable[[], Any], source: Optional[Path] = None) -> Any:
+        return self.store.load(self.name, key, legacy_loader, source)
+
+
+class StateStore:
+    """
+    Transactional document store replacing Luna's rewrite-the-whole-file JSON state
+
+    Documents are JSON values addressed by (namespace, key). put() only
+    stages the value; commit() serializes every staged document once and
+    writes them in a single transaction, so a turn that touches several
+    subsystems pays one commit instead of one file rewrite each, and
+    concurrent sessions never see a torn document (WAL readers don't
+    block the writer). Staged documents are flushed at interpreter exit
+    and, as a safety net, on the first put() after flush_interval_s.
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_STATE_DB, flush_interval_s: Optional[float] = 30.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval_s = flush_interval_s
+        self._lock = threading.RLock()
+        self._pending: Dict[Tuple[str, str], Any] = {}
+        self._deleted: set = set()
+        self._last_commit = time.time()
+        self.commits = 0
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+        atexit.register(self.close)
+
+    # === Typed namespaces ===
+
+    def namespace(self, name: str) -> StateNamespace:
+        return StateNamespace(self, name)
+
+    @staticmethod
+    def _check_type(namespace: str, value: Any):
+        expected = NAMESPACE_TYPES.get(namespace)
+        if expected is not None and not isinstance(value, expected):
+            raise TypeError(f"State namespace '{namespace}' holds {expected.__name__} documents, got {type(value).__name__}")
+
+    # === Reads / staged writes ===
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        """Staged value if any (read-your-writes), else the committed document"""
+        with self._lock:
+            if (namespace, key) in self._pending:
+                return self._pending[(namespace, key)]
+            if (namespace, key) in self._deleted:
+                return default
+            row = self._conn.execute(
+                "SELECT value FROM documents WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def contains(self, namespace: str, key: str) -> bool:
+        return self.get(namespace, key, _MISSING) is not _MISSING
+
+    def put(self, namespace: str, key: str, value: Any):
+        """Stage a document for the next commit (serialized at commit time)"""
+        self._check_type(namespace, value)
+        with self._lock:
+            self._pending[(namespace, key)] = value
+            self._deleted.discard((namespace, key))
+            overdue = self.flush_interval_s is not None and time.time() - self._last_commit > self.flush_interval_s
+        if overdue:
+            self.commit()
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._pending.pop((namespace, key), None)
+            self._deleted.add((namespace, key))
+
+    def keys(self, namespace: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM documents WHERE namespace = ?", (namespace,)).fetchall()
+            keys = {row[0] for row in rows}
+            keys.update(k for ns, k in self._pending if ns == namespace)
+            keys.difference_update(k for ns, k in self._deleted if ns == namespace)
+        return sorted(keys)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending) + len(self._deleted)
+
+    def commit(self) -> int:
+        """Write all staged documents in one transaction; returns how many were written"""
+        with self._lock:
+            if not self._pending and not self._deleted:
+                self._last_commit = time.time()
+                return 0
+            now = time.time()
+            rows = [(ns, key, json.dumps(value, ensure_ascii=False), now) for (ns, key), value in self._pending.items()]
+            with self._conn:
+                if rows:
+                    self._conn.executemany(UPSERT_SQL, rows)
+                for ns, key in self._deleted:
+                    self._conn.execute("DELETE FROM documents WHERE namespace = ? AND key = ?", (ns, key))
+            written = len(rows) + len(self._deleted)
+            self._pending.clear()
+            self._deleted.clear()
+            self._last_commit = now
+            self.commits += 1
+        return written
+
+    @contextmanager
+    def batch(self):
+        """Commit everything staged inside the block when it exits"""
+        try:
+            yield self
+        finally:
+            self.commit()
+
+    # === JSON migration ===
+
+    def load(self, namespace: str, key: str, legacy_loader: Callable[[], Any], source: Optional[Path] = None) -> Any:
+        """
+        Return the stored document, importing it once through legacy_loader if absent
+
+        legacy_loader is the subsystem's old JSON loader (so format quirks and
+        defaults stay in one place); its result is committed immediately and
+        the migration is recorded. A legacy loader returning None imports nothing.
+        """
+        value = self.get(namespace, key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = legacy_loader()
+        if value is not None:
+            self.import_document(namespace, key, value, source)
+        return value
+
+    def import_document(self, namespace: str, key: str, value: Any, source: Optional[Path] = None):
+        """Write a migrated document straight through and record where it came from"""
+        self._check_type(namespace, value)
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute(UPSERT_SQL, (namespace, key, json.dumps(value, ensure_ascii=False), now))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO migrations(namespace, key, source, migrated_at) VALUES (?, ?, ?, ?)",
+                    (namespace, key, str(source) if source else None, now)
+                )
+
+    def migrate_json_files(self, files: Optional[List[Tuple[str, Path]]] = None) -> Dict[str, int]:
+        """
+        One-shot import of legacy JSON state files
+
+        Documents already in the store are left alone, so this is safe to rerun.
+
+        Returns:
+            Dictionary with migrated, skipped and failed counts
+        """
+        files = LEGACY_JSON_FILES if files is None else files
+        result = {'migrated': 0, 'skipped': 0, 'failed': 0}
+        for namespace, path in files:
+            path = Path(path)
+            key = state_key(path)
+            if not path.exists() or self.contains(namespace, key):
+                result['skipped'] += 1
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    value = json.load(f)
+                self.import_document(namespace, key, value, path)
+                result['migrated'] += 1
+            except (OSError, ValueError, TypeError) as e:
+                print(f"   Warning: Could not migrate {path}: {e}")
+                result['failed'] += 1
+        return result
+
+    def migrations(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT namespace, key, source, migrated_at FROM migrations").fetchall()
+        return [{'namespace': r[0], 'key': r[1], 'source': r[2], 'migrated_at': r[3]} for r in rows]
+
+    def close(self):
+        """Flush staged documents and close the connection"""
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self.commit()
+            finally:
+                self._conn.close()
+                self._conn = None
+        atexit.unregister(self.close)
+
+
+_stores: Dict[str, StateStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_state_store(db_path: Optional[Path] = None) -> Optional[StateStore]:
+    """Shared StateStore per database path (None if SQLite cannot open it - callers fall back to JSON)"""
+    path = Path(db_path or DEFAULT_STATE_DB)
+    key = str(path.resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None or store._conn is None:
+            try:
+                store = StateStore(path)
+            except (sqlite3.Error, OSError) as e:
+                print(f"   Warning: State store unavailable, using JSON files: {e}")
+                return None
+            _stores[key] = store
+        return store
+
+
+def main():
+    """One-shot import of Luna's legacy JSON state files"""
+    store = get_state_store()
+    if store is None:
+        return
+    result = store.migrate_json_files()
+    print(f"State store: {store.db_path}")
+    print(f"   Migrated: {result['migrated']}  Skipped: {result['skipped']}  Failed: {result['failed']}")
+    for entry in store.migrations():
+        print(f"   {entry['namespace']}/{entry['key']} <- {entry['source']}")
+
+
+if __name__ == "__main__":
+    main()
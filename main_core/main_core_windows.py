@@ -486,10 +486,14 @@ class AIOSClean:
             try:
                 import json
                 from pathlib import Path
+                from luna_core.utilities.state_store import get_state_store, state_key
                 existential_file = Path("data_core/FractalCache/luna_existential_state.json")
-                if existential_file.exists():
+                state_store = get_state_store()
+                existential_data = state_store.get('existential', state_key(existential_file)) if state_store else None
+                if existential_data is None and existential_file.exists():
                     with open(existential_file, 'r') as f:
                         existential_data = json.load(f)
+                if existential_data is not None:
                     # Add total_responses to Luna stats
                     luna_stats['luna'] = luna_stats.get('luna', {})
                     luna_stats['luna']['total_responses'] = existential_data.get('total_responses', 0)
@@ -2573,14 +2577,28 @@ def main():
     
     # Handle memory clear command
     if args.clear_memory:
-        from pathlib import Path
-        memory_file = Path("data_core/FractalCache/luna_session_memory.json")
-        if memory_file.exists():
-            memory_file.unlink()
-            print(f"\n🧠 Persistent Session Memory Cleared")
-            print(f"   Luna will start with fresh conversation context on next run")
+        from luna_core.core.luna_core import SESSION_MEMORY_FILE
+        from luna_core.utilities.state_store import get_state_store, state_key
+        cleared = False
+        # Session memory lives in the state store; an empty document (not a delete)
+        # keeps the frozen legacy JSON from being migrated back in
+        store = get_state_store()
+        if store is not None:
+            key = state_key(SESSION_MEMORY_FILE)
+            cleared = bool(store.get('session', key))
+            store.put('session', key, [])
+            store.commit()
+        if SESSION_MEMORY_FILE.exists():
+            SESSION_MEMORY_FILE.unlink()
+            cleared = True
+        luna = getattr(aios, 'luna_system', None)
+        if luna is not None and isinstance(getattr(luna, 'session_memory', None), list):
+            luna.session_memory.clear()
+        if cleared:
+            print("\n🧠 Persistent Session Memory Cleared")
+            print("   Luna will start with fresh conversation context on next run")
         else:
-            print(f"\n🧠 No persistent session memory found")
+            print("\n🧠 No persistent session memory found")
         return
     
     # Handle trait classification commands
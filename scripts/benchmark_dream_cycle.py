@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark Dream Cycle Scaling
+Times CARMA100PercentPerformance.perform_dream_cycle on synthetic caches of
+1k to 100k fragments (CPU only), next to the old pure-Python component search
+and crosslink loop on the sizes where that is still tractable
+"""
+
+import argparse
+import hashlib
+import math
+import sys
+import time
+import numpy as np
+from pathlib import Path
+
+# Add repo root to path
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root))
+
+
+class SyntheticEmbedder:
+    """
+    Deterministic embedder for synthetic fragments
+
+    Known fragment texts map to their stored vectors, and a text made of
+    known fragments joined by blank lines (a dream summary) maps to the
+    mean of their vectors, so super-fragments land near their children.
+    Anything else gets a Gaussian vector seeded from a stable digest of
+    the text (the same across runs, unlike hash()).
+    """
+
+    def __init__(self, dim):
+        self.dim = dim
+        self.known = {}
+
+    def embed(self, text):
+        parts = [self.known.get(part) for part in text.split("\n\n")]
+        if all(vector is not None for vector in parts):
+            return np.mean(parts, axis=0).tolist()
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+        return np.random.default_rng(seed).standard_normal(self.dim).tolist()
+
+
+class SyntheticCache:
+    """In-memory stand-in for FractalMyceliumCache (registry, links, embedder, no disk)"""
+
+    def __init__(self, file_registry, semantic_links, dim):
+        self.file_registry = file_registry
+        self.semantic_links = semantic_links
+        self.embedder = SyntheticEmbedder(dim)
+
+    def save_registry(self):
+        pass
+
+
+def build_cache(n, dim, topics=64, link_fraction=0.05, seed=42):
+    """n fragments drawn around `topics` centroids; a small share of them linked in (mostly same-topic) pairs"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((topics, dim))
+    labels = rng.integers(0, topics, n)
+    vectors = centers[labels] + 0.8 * rng.standard_normal((n, dim))
+
+    cache = SyntheticCache({}, {}, dim)
+    for i in range(n):
+        fid = f"frag_{i}"
+        content = f"fragment {i} about topic {labels[i]}"
+        cache.file_registry[fid] = {
+            "file_id": fid,
+            "content": content,
+            "level": 0,
+            "tags": [f"topic_{labels[i]}"],
+            "embedding": vectors[i].tolist(),
+        }
+        cache.embedder.known[content] = vectors[i]
+
+    # Pair linked fragments in topic order, so links join related fragments as they would in use
+    linked = rng.choice(n, size=max(2, int(n * link_fraction)) & ~1, replace=False)
+    linked = linked[np.argsort(labels[linked], kind="stable")]
+    for a, b in linked.reshape(-1, 2):
+        cache.semantic_links.setdefault(f"frag_{a}", []).append(f"frag_{b}")
+        cache.semantic_links.setdefault(f"frag_{b}", []).append(f"frag_{a}")
+    return cache
+
+
+def legacy_reference(cache, superfrag_count, threshold):
+    """The previous implementation's BFS (queue.pop(0)) and per-pair Python cosine crosslink loop"""
+    def cosine_sim(a, b):
+        num = sum(x*y for x, y in zip(a, b))
+        da = math.sqrt(sum(x*x for x in a))
+        db = math.sqrt(sum(x*x for x in b))
+        return num / (da*db + 1e-9)
+
+    start = time.perf_counter()
+    visited = set()
+    for fid in cache.file_registry:
+        if fid in visited:
+            continue
+        queue = [fid]
+        while queue:
+            n = queue.pop(0)
+            if n in visited:
+                continue
+            visited.add(n)
+            queue.extend(neigh for neigh in cache.semantic_links.get(n, []) if neigh not in visited)
+
+    frags = list(cache.file_registry.values())
+    for a in frags[:superfrag_count]:
+        for b in frags:
+            if a is not b:
+                cosine_sim(a["embedding"], b["embedding"]) >= threshold
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dream cycle scaling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--legacy-max", type=int, default=10000,
+                        help="Largest size to also time the old pure-Python loops on")
+    parser.add_argument("--link-threshold", type=float, default=None,
+                        help="Also join fragments by embedding similarity (all-pairs blocked search)")
+    parser.add_argument("--block-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    from carma_core.core.performance import CARMA100PercentPerformance
+
+    print("\n" + "="*72)
+    print(f"BENCHMARKING: dream cycle (dim={args.dim}, link_threshold={args.link_threshold})")
+    print("="*72)
+    print(f"{'fragments':>10} {'build_s':>9} {'dream_s':>9} {'superfrags':>10} {'crosslinks':>10} {'legacy_s':>9}")
+
+    performance = CARMA100PercentPerformance(None, None, None)
+    for n in args.sizes:
+        t0 = time.perf_counter()
+        cache = build_cache(n, args.dim)
+        build_s = time.perf_counter() - t0
+
+        legacy_s = None
+        if n <= args.legacy_max:
+            legacy_s = legacy_reference(build_cache(n, args.dim), 6, 0.45)
+
+        performance.cache = cache
+        t0 = time.perf_counter()
+        result = performance.perform_dream_cycle(link_threshold=args.link_threshold, block_size=args.block_size)
+        dream_s = time.perf_counter() - t0
+
+        legacy = f"{legacy_s:9.2f}" if legacy_s is not None else f"{'-':>9}"
+        print(f"{n:>10} {build_s:9.2f} {dream_s:9.2f} {result['superfrags_created']:>10} "
+              f"{result['crosslinks_added']:>10} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
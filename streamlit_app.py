@@ -18,6 +18,7 @@ try:
     from luna_core.core.luna_core import LunaSystem
     from carma_core.carma_core import CARMASystem
     from fractal_core.fractal_core import FractalCore
+    from streamlit_core.core.ui_renderer import render_token_stream
 except ImportError as e:
     st.error(f"Failed to import AIOS cores: {e}")
     st.error("Run setup.ps1 to configure the system first.")
@@ -35,6 +36,7 @@ st.set_page_config(
 if "luna" not in st.session_state:
     try:
         st.session_state.luna = LunaSystem()
+        st.session_state.luna.warm_up()  # Long-running server: load every subsystem up front
         st.session_state.messages = []
         st.session_state.initialized = True
     except Exception as e:
@@ -101,13 +103,12 @@ if prompt := st.chat_input("Ask Luna anything..."):
     
     # Get Luna response
     with st.chat_message("assistant"):
-        with st.spinner("Luna thinking..."):
-            try:
-                # LunaSystem.learning_chat() determines trait internally
-                response = st.session_state.luna.learning_chat(prompt)
-                st.markdown(response)
-                st.session_state.messages.append({"role": "assistant", "content": response})
-            except Exception as e:
-                st.error(f"Error: {e}")
-                st.error("Check that LM Studio is running and models are loaded.")
+        try:
+            # LunaSystem.learning_chat_stream() determines trait internally and
+            # yields tokens as LM Studio generates them
+            response = render_token_stream(st.session_state.luna.learning_chat_stream(prompt))
+            st.session_state.messages.append({"role": "assistant", "content": response})
+        except Exception as e:
+            st.error(f"Error: {e}")
+            st.error("Check that LM Studio is running and models are loaded.")
 
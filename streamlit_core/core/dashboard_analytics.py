@@ -7,7 +7,8 @@ Handles data loading, processing, and analytics for the AIOS Quality Dashboard.
 Provides hypothesis tracking, routing metrics, and SLO monitoring.
 
 Key Features:
-- NDJSON hypothesis data loading
+- Incremental NDJSON hypothesis loading (tails the log, parses only new lines)
+- Cached columnar frames, optionally spilled to a local cache directory
 - Adaptive routing state analysis
 - Golden report comparisons
 - SLO status calculations
@@ -18,11 +19,91 @@ Version: 1.0.0
 """
 
 import json
+import os
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 
 import pandas as pd
 
+# Nested response fields flattened into "<field>.<key>" columns
+NESTED_RESPONSE_FIELDS = ("meta", "carma", "math_weights", "routing", "adaptive")
+
+# Hypothesis batch columns extracted from the "results" dict
+HYPOTHESIS_RESULT_COLUMNS = (
+    "rates.quality", "rates.latency", "rates.memory", "passed", "failed", "total", "batch_id"
+)
+
+
+class NDJSONTail:
+    """
+    Incremental reader for an append-only NDJSON file
+
+    Remembers the byte offset and file identity (device, inode); read_new()
+    parses only complete lines appended since the last call. A replaced or
+    truncated file is detected and read again from the start.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.identity = None
+        self.offset = 0
+    
+    def _stat_identity(self, stat) -> Tuple[int, int]:
+        return (stat.st_dev, stat.st_ino)
+    
+    def read_new(self) -> Tuple[List[dict], bool]:
+        """
+        Records appended since the last call
+        
+        Returns:
+            Tuple of (records, reset) - reset is True when the file was replaced
+            or truncated and the records start from the beginning again
+        """
+        try:
+            stat = self.path.stat()
+        except OSError:
+            reset = self.offset > 0
+            self.identity, self.offset = None, 0
+            return [], reset
+        
+        identity = self._stat_identity(stat)
+        reset = False
+        if self.identity is not None and (identity != self.identity or stat.st_size < self.offset):
+            reset = True
+            self.offset = 0
+        self.identity = identity
+        if stat.st_size == self.offset:
+            return [], reset
+        
+        with self.path.open("rb") as f:
+            f.seek(self.offset)
+            chunk = f.read()
+        # Leave a partially written last line for the next call
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            return [], reset
+        self.offset += end
+        
+        out = []
+        for line in chunk[:end].decode("utf-8", errors="replace").splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                out.append(json.loads(line))
+            except Exception:
+                # skip malformed line
+                continue
+        return out, reset
+    
+    def state(self) -> Dict[str, Any]:
+        return {'identity': list(self.identity) if self.identity else None, 'offset': self.offset}
+    
+    def restore(self, state: Dict[str, Any]):
+        identity = state.get('identity')
+        self.identity = tuple(identity) if identity else None
+        self.offset = int(state.get('offset', 0))
+
 
 class DashboardAnalytics:
     """
@@ -30,12 +111,16 @@ class DashboardAnalytics:
     Loads and processes quality metrics, hypothesis tests, and routing data.
     """
     
-    def __init__(self, root_path: Path = None):
+    def __init__(self, root_path: Path = None, cache_dir: Optional[Path] = None,
+                 spill_every: int = 1000):
         """
         Initialize dashboard analytics.
         
         Args:
             root_path: Root path for data files. Defaults to parent directory.
+            cache_dir: Optional directory the parsed frames are spilled to, so a
+                restarted dashboard resumes tailing instead of re-parsing the log
+            spill_every: New records between spills
         """
         if root_path is None:
             root_path = Path(__file__).resolve().parents[2]
@@ -46,6 +131,16 @@ class DashboardAnalytics:
         self.golden_last_path = self.root / "data_core/goldens/last_report.json"
         self.golden_baseline_path = self.root / "data_core/goldens/baseline_new.json"
         
+        # Incremental hypothesis log state
+        self._tail = NDJSONTail(self.ndjson_path)
+        self._rdf = pd.DataFrame()
+        self._hdf = pd.DataFrame()
+        self._rows = 0
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.spill_every = spill_every
+        self._unspilled = 0
+        self._load_spill()
+        
         print("📊 Dashboard Analytics Initialized")
         print(f"   Root: {self.root}")
     
@@ -78,56 +173,122 @@ class DashboardAnalytics:
             return {}
     
     def load_frames(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """Load and process hypothesis data into dataframes."""
-        records = self.read_ndjson(self.ndjson_path)
+        """
+        Load and process hypothesis data into dataframes.
+        
+        Only lines appended since the previous call are parsed and flattened;
+        an unchanged log returns the cached frames (treat them as read-only).
+        """
+        records, reset = self._tail.read_new()
+        if reset:
+            self._rdf, self._hdf, self._rows = pd.DataFrame(), pd.DataFrame(), 0
+        if records:
+            rdf_new, hdf_new = self.build_frames(records, start_index=self._rows)
+            self._rows += len(records)
+            self._rdf = self._append(self._rdf, rdf_new)
+            self._hdf = self._append(self._hdf, hdf_new)
+            self._unspilled += len(records)
+            if self.cache_dir is not None and self._unspilled >= self.spill_every:
+                self.spill()
+        return self._rdf, self._hdf
+    
+    @staticmethod
+    def _append(cached: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+        if new.empty:
+            return cached
+        if cached.empty:
+            return new
+        return pd.concat([cached, new])
+    
+    @staticmethod
+    def _flatten(frame: pd.DataFrame, col: str, prefix: str, max_level: Optional[int] = None) -> pd.DataFrame:
+        """json_normalize one dict column in a single call (non-dict cells become empty rows)"""
+        dicts = [value if isinstance(value, dict) else {} for value in frame[col].tolist()]
+        expanded = pd.json_normalize(dicts, max_level=max_level)
+        expanded.index = frame.index
+        expanded.columns = [f"{prefix}{c}" for c in expanded.columns]
+        return expanded
+    
+    def build_frames(self, records: List[dict], start_index: int = 0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Response and hypothesis-batch frames for a batch of records (vectorized flattening)."""
         if not records:
             return pd.DataFrame(), pd.DataFrame()
         
-        df = pd.DataFrame(records)
-
+        df = pd.DataFrame.from_records(records)
+        df.index = pd.RangeIndex(start_index, start_index + len(df))
+        event_type = df["event_type"].fillna("response") if "event_type" in df.columns else pd.Series("response", index=df.index)
+        
         # Response events (default kind)
-        rdf = df[df.get("event_type", "response").fillna("response") == "response"].copy()
+        rdf = df[event_type == "response"]
         
         # Flatten nested fields safely
-        for col in ("meta", "carma", "math_weights", "routing", "adaptive"):
-            if col in rdf.columns:
-                try:
-                    expanded = pd.json_normalize(rdf[col].dropna())
-                    if not expanded.empty:
-                        expanded.columns = [f"{col}.{c}" for c in expanded.columns]
-                        rdf = pd.concat([rdf.drop(columns=[col], errors='ignore'), expanded], axis=1)
-                except Exception as e:
-                    pass  # Skip if normalization fails
-
+        if not rdf.empty:
+            flat = [rdf]
+            drop = []
+            for col in NESTED_RESPONSE_FIELDS:
+                if col in rdf.columns:
+                    try:
+                        expanded = self._flatten(rdf, col, f"{col}.")
+                        if not expanded.columns.empty:
+                            flat.append(expanded)
+                            drop.append(col)
+                    except Exception as e:
+                        pass  # Skip if normalization fails
+            rdf = pd.concat(flat, axis=1).drop(columns=drop) if drop else rdf.copy()
+        
         # Hypothesis batches
-        hdf = df[df.get("event_type") == "hypothesis_batch"].copy()
+        hdf = df[event_type == "hypothesis_batch"].copy()
         
         # Expand aggregate rates and basic counts
         if not hdf.empty and "results" in hdf.columns:
-            hdf["rates.quality"] = hdf["results"].apply(
-                lambda r: (r.get("rates") or {}).get("quality") if isinstance(r, dict) else None
-            )
-            hdf["rates.latency"] = hdf["results"].apply(
-                lambda r: (r.get("rates") or {}).get("latency") if isinstance(r, dict) else None
-            )
-            hdf["rates.memory"] = hdf["results"].apply(
-                lambda r: (r.get("rates") or {}).get("memory") if isinstance(r, dict) else None
-            )
-            hdf["passed"] = hdf["results"].apply(
-                lambda r: r.get("passed") if isinstance(r, dict) else None
-            )
-            hdf["failed"] = hdf["results"].apply(
-                lambda r: r.get("failed") if isinstance(r, dict) else None
-            )
-            hdf["total"] = hdf["results"].apply(
-                lambda r: r.get("total") if isinstance(r, dict) else None
-            )
-            hdf["batch_id"] = hdf["results"].apply(
-                lambda r: r.get("batch_id") if isinstance(r, dict) else None
-            )
+            expanded = self._flatten(hdf, "results", "", max_level=1)
+            for col in HYPOTHESIS_RESULT_COLUMNS:
+                hdf[col] = expanded[col] if col in expanded.columns else None
         
         return rdf, hdf
     
+    # === Spill cache ===
+    
+    def _spill_paths(self) -> Tuple[Path, Path, Path]:
+        return (self.cache_dir / "responses.pkl", self.cache_dir / "hypotheses.pkl",
+                self.cache_dir / "tail_state.json")
+    
+    def spill(self):
+        """Write the cached frames and tail position to cache_dir"""
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            rdf_path, hdf_path, state_path = self._spill_paths()
+            for frame, path in ((self._rdf, rdf_path), (self._hdf, hdf_path)):
+                tmp = path.with_name(path.name + ".tmp")
+                frame.to_pickle(tmp)
+                os.replace(tmp, path)
+            state = dict(self._tail.state(), rows=self._rows, source=str(self.ndjson_path))
+            tmp = state_path.with_name(state_path.name + ".tmp")
+            tmp.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(tmp, state_path)
+            self._unspilled = 0
+        except Exception as e:
+            print(f"⚠️ Could not spill analytics cache: {e}")
+    
+    def _load_spill(self):
+        if self.cache_dir is None:
+            return
+        rdf_path, hdf_path, state_path = self._spill_paths()
+        if not (rdf_path.exists() and hdf_path.exists() and state_path.exists()):
+            return
+        try:
+            state = json.loads(state_path.read_text(encoding="utf-8"))
+            if state.get('source') != str(self.ndjson_path):
+                return
+            rdf, hdf = pd.read_pickle(rdf_path), pd.read_pickle(hdf_path)
+        except Exception as e:
+            print(f"⚠️ Ignoring analytics cache: {e}")
+            return
+        self._rdf, self._hdf, self._rows = rdf, hdf, int(state.get('rows', 0))
+        self._tail.restore(state)
+    
     def load_adaptive_state(self) -> dict:
         """Load adaptive routing state."""
         return self.read_json(self.adaptive_state_path)
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Key-Value State Store for Streamlit Core
+========================================
+
+Key-granular persistent backend for StateManager.
+
+Key Features:
+- One SQLite (WAL) row per state key, values pickled individually
+- In-process read-through cache (a key is read from disk at most once)
+- Debounced writes: a burst of set() calls becomes one small transaction
+- Unchanged values (same pickled bytes as stored) are not rewritten
+- Per-key size accounting with key-count / value-size / total-size limits
+- One-shot import of the legacy whole-dict pickle file
+
+Author: AIOS Development Team
+Version: 1.0.0
+"""
+
+import atexit
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+MAX_KEYS = 1000
+MAX_VALUE_BYTES = 1024 * 1024  # 1MB limit per value
+MAX_TOTAL_BYTES = 10 * 1024 * 1024  # 10MB limit for the whole store
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+_MISSING = object()
+
+
+def _digest(blob: bytes) -> bytes:
+    return hashlib.blake2b(blob, digest_size=16).digest()
+
+
+class KVStateStore:
+    """
+    Persistent key/value state with a read-through cache and debounced writes
+
+    set() updates the cache and the size index immediately and stages the
+    pickled value; staged keys are written together debounce_s after the
+    first one (or on flush(), close() and interpreter exit). Setting one key
+    therefore costs one row write regardless of how many keys exist, and
+    none when its pickled value matches the one last read or written.
+    """
+
+    def __init__(self, db_path: Path, debounce_s: float = 0.5, max_keys: int = MAX_KEYS,
+                 max_value_bytes: int = MAX_VALUE_BYTES, max_total_bytes: int = MAX_TOTAL_BYTES):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.debounce_s = debounce_s
+        self.max_keys = max_keys
+        self.max_value_bytes = max_value_bytes
+        self.max_total_bytes = max_total_bytes
+        self._lock = threading.RLock()
+        self._cache: Dict[str, Any] = {}
+        self._staged: Dict[str, Optional[bytes]] = {}  # None = delete
+        self._digests: Dict[str, bytes] = {}  # key -> digest of the blob read or written last
+        self._timer: Optional[threading.Timer] = None
+        self.writes = 0
+        self.skipped_writes = 0
+        self.disk_reads = 0
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+        # Size index: small (key, size) rows only - values are read on demand
+        self._sizes: Dict[str, int] = dict(self._conn.execute("SELECT key, size FROM state").fetchall())
+        atexit.register(self.close)
+
+    # === Reads ===
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Cached value, else one indexed row read (then cached)"""
+        with self._lock:
+            value = self._cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            if key not in self._sizes:
+                return default
+            row = self._conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+            self.disk_reads += 1
+            if row is None:
+                self._sizes.pop(key, None)
+                return default
+            self._digests[key] = _digest(row[0])
+            try:
+                value = pickle.loads(row[0])
+            except (pickle.PickleError, EOFError, AttributeError, ImportError, ValueError) as e:
+                print(f"⚠️ Error loading state key {key}: {e}, dropping it")
+                self.delete(key)
+                return default
+            self._cache[key] = value
+            return value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._sizes
+
+    def keys(self) -> List[str]:
+        return list(self._sizes)
+
+    def items(self) -> Dict[str, Any]:
+        """Every key and value (reads any keys not cached yet)"""
+        return {key: self.get(key) for key in self.keys()}
+
+    # === Writes ===
+
+    def set(self, key: str, value: Any) -> bool:
+        """Stage one key; returns False (nothing stored) if a limit would be exceeded"""
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PickleError, TypeError, AttributeError) as e:
+            print(f"⚠️ State value for {key} is not picklable: {e}")
+            return False
+        size = len(blob)
+        digest = _digest(blob)
+        with self._lock:
+            if key in self._sizes and self._digests.get(key) == digest:
+                self._cache[key] = value
+                self.skipped_writes += 1
+                return True
+            if size > self.max_value_bytes:
+                print(f"⚠️ State value too large ({size} bytes), not saving")
+                return False
+            if key not in self._sizes and len(self._sizes) >= self.max_keys:
+                print(f"⚠️ Too many state keys ({len(self._sizes)}), not saving {key}")
+                return False
+            if self.total_bytes - self._sizes.get(key, 0) + size > self.max_total_bytes:
+                print(f"⚠️ State store full ({self.total_bytes} bytes), not saving {key}")
+                return False
+            self._cache[key] = value
+            self._sizes[key] = size
+            self._staged[key] = blob
+            self._digests[key] = digest
+            self._schedule_flush()
+        return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._cache.pop(key, None)
+            self._digests.pop(key, None)
+            if self._sizes.pop(key, None) is not None or key in self._staged:
+                self._staged[key] = None
+                self._schedule_flush()
+
+    def update(self, values: Dict[str, Any]) -> int:
+        """Stage several keys; returns how many were accepted"""
+        return sum(1 for key, value in values.items() if self.set(key, value))
+
+    def clear(self):
+        """Drop every key (in memory and on disk)"""
+        with self._lock:
+            self._cancel_timer()
+            self._cache.clear()
+            self._digests.clear()
+            self._sizes.clear()
+            self._staged.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM state")
+
+    def _schedule_flush(self):
+        if self.debounce_s is None or self.debounce_s <= 0:
+            self.flush()
+            return
+        if self._timer is None:
+            self._timer = threading.Timer(self.debounce_s, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._staged)
+
+    def flush(self) -> int:
+        """Write staged keys in one transaction; returns the number of rows touched"""
+        with self._lock:
+            self._cancel_timer()
+            if not self._staged or self._conn is None:
+                return 0
+            staged, self._staged = self._staged, {}
+            now = time.time()
+            upserts = [(key, blob, len(blob), now) for key, blob in staged.items() if blob is not None]
+            deletes = [(key,) for key, blob in staged.items() if blob is None]
+            try:
+                with self._conn:
+                    if upserts:
+                        self._conn.executemany(
+                            "INSERT OR REPLACE INTO state(key, value, size, updated_at) VALUES (?, ?, ?, ?)", upserts)
+                    if deletes:
+                        self._conn.executemany("DELETE FROM state WHERE key = ?", deletes)
+            except sqlite3.Error as e:
+                print(f"⚠️ Error saving state: {e}")
+                staged.update(self._staged)
+                self._staged = staged
+                return 0
+            self.writes += len(staged)
+            return len(staged)
+
+    # === Accounting ===
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def sizes(self) -> Dict[str, int]:
+        """Pickled size in bytes per key"""
+        return dict(self._sizes)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            'num_keys': len(self._sizes),
+            'size_kb': self.total_bytes / 1024,
+            'largest_keys': sorted(self._sizes.items(), key=lambda item: item[1], reverse=True)[:5],
+            'pending_writes': len(self._staged),
+            'db_file': str(self.db_path)
+        }
+
+    # === Legacy pickle import ===
+
+    def import_legacy_pickle(self, pickle_file: Path) -> int:
+        """
+        One-shot import of the old whole-dict pickle file
+
+        Keys already in the store win; the pickle is renamed to *.migrated so
+        it is never read again. Returns the number of keys imported.
+        """
+        pickle_file = Path(pickle_file)
+        if not pickle_file.exists():
+            return 0
+        imported = 0
+        try:
+            if pickle_file.stat().st_size <= self.max_total_bytes:
+                with open(pickle_file, 'rb') as f:
+                    state = pickle.load(f)
+                if isinstance(state, dict):
+                    imported = self.update({k: v for k, v in state.items()
+                                            if isinstance(k, str) and k not in self._sizes})
+                    self.flush()
+        except (pickle.PickleError, EOFError, OSError, AttributeError, ImportError, ValueError) as e:
+            print(f"⚠️ Error importing legacy state: {e}")
+        try:
+            pickle_file.replace(pickle_file.with_suffix(pickle_file.suffix + '.migrated'))
+        except OSError:
+            pass
+        return imported
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self.flush()
+            finally:
+                self._conn.close()
+                self._conn = None
+        atexit.unregister(self.close)
+
+
+_stores: Dict[str, KVStateStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_kv_store(db_path: Path, debounce_s: float = 0.5) -> KVStateStore:
+    """Shared KVStateStore per database path (survives Streamlit script reruns)"""
+    key = str(Path(db_path).resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None or store._conn is None:
+            store = _stores[key] = KVStateStore(db_path, debounce_s=debounce_s)
+        return store
@@ -25,6 +25,35 @@ from .state_manager import StateManager
 from .meditation_engine import MeditationEngine
 
 
+def render_token_stream(events, placeholder=None) -> str:
+    """
+    Render a Luna event stream into a Streamlit placeholder as tokens arrive.
+    
+    Args:
+        events: Iterable of stream events ('token', 'replace', 'done')
+        placeholder: Streamlit placeholder to write into (defaults to st.empty())
+        
+    Returns:
+        Final response text
+    """
+    placeholder = placeholder or st.empty()
+    text = ""
+    final = None
+    for event in events:
+        kind = event.get('event')
+        if kind == 'token':
+            text += event.get('text', '')
+            placeholder.markdown(text + "▌")
+        elif kind == 'replace':
+            text = event.get('text', '')
+            placeholder.markdown(text + "▌")
+        elif kind == 'done':
+            final = event.get('response') or text
+    final = final if final is not None else text
+    placeholder.markdown(final)
+    return final
+
+
 class UIRenderer:
     """
     Renders the user interface for the AIOS Streamlit system.
@@ -115,10 +144,14 @@ class UIRenderer:
             with st.chat_message("user"):
                 st.markdown(prompt)
             
-            # Generate response (placeholder)
+            # Stream Luna's response when a LunaSystem is attached to the session
             with st.chat_message("assistant"):
-                response = "Hello! I'm Luna, your AI learning companion. How can I help you today?"
-                st.markdown(response)
+                luna = st.session_state.get('luna')
+                if luna is not None and hasattr(luna, 'learning_chat_stream'):
+                    response = render_token_stream(luna.learning_chat_stream(prompt))
+                else:
+                    response = "Hello! I'm Luna, your AI learning companion. How can I help you today?"
+                    st.markdown(response)
                 st.session_state.chat_history.append({"role": "assistant", "content": response})
     
     def _render_learning_interface(self):
@@ -22,13 +22,21 @@ import streamlit as st
 # Import analytics engine
 from core.dashboard_analytics import DashboardAnalytics
 
-# Initialize dashboard analytics
 ROOT = Path(__file__).resolve().parents[1]
-analytics = DashboardAnalytics(root_path=ROOT)
+
+
+@st.cache_resource
+def get_analytics() -> DashboardAnalytics:
+    """One analytics engine per server process, so the log tail survives reruns."""
+    return DashboardAnalytics(root_path=ROOT, cache_dir=ROOT / "data_core/analytics/dashboard_cache")
+
 
 st.set_page_config(page_title="AIOS Quality Dashboard", layout="wide")
 st.title("AIOS Quality Dashboard")
 
+# Initialize dashboard analytics
+analytics = get_analytics()
+
 
 @st.cache_data(ttl=10)
 def load_data():
@@ -110,6 +110,173 @@ def test_fractal_allocate_deterministic():
         pytest.skip(f"Test not applicable: {e}")
 
 
+def test_luna_state_store_migration_idempotent(tmp_path):
+    """JSON state migration runs once; staged writes land in one commit."""
+    try:
+        from luna_core.utilities.state_store import StateStore, state_key
+    except ImportError:
+        pytest.skip("Luna core not available")
+    import json
+
+    legacy = tmp_path / "luna_existential_state.json"
+    legacy.write_text(json.dumps({"age": 3, "total_responses": 42}))
+    store = StateStore(tmp_path / "state.db", flush_interval_s=None)
+
+    files = [('existential', legacy)]
+    assert store.migrate_json_files(files)['migrated'] == 1
+    assert store.migrate_json_files(files) == {'migrated': 0, 'skipped': 1, 'failed': 0}
+    key = state_key(legacy)
+    assert store.get('existential', key)['total_responses'] == 42
+
+    # Staged writes are visible immediately and committed together
+    commits = store.commits
+    store.put('existential', key, {"age": 4, "total_responses": 43})
+    store.put('session', 'memory', [{"question": "hi"}])
+    assert store.get('existential', key)['age'] == 4
+    assert store.commit() == 2 and store.commits == commits + 1
+
+    with pytest.raises(TypeError):
+        store.put('session', 'memory', {"not": "a list"})
+    store.close()
+
+    reopened = StateStore(tmp_path / "state.db")
+    assert reopened.get('session', 'memory') == [{"question": "hi"}]
+    assert reopened.load('existential', key, lambda: pytest.fail("must not re-migrate"))['age'] == 4
+
+    # Clearing (as --clear-memory does) stores an empty document, so the frozen JSON is not re-imported
+    reopened.put('session', 'memory', [])
+    reopened.commit()
+    assert reopened.load('session', 'memory', lambda: [{"question": "stale"}]) == []
+    reopened.close()
+
+
+def test_luna_fragment_metadata_queue_coalesces(tmp_path):
+    """Lesson links are coalesced per fragment, written once per flush, and re-flushing changes nothing."""
+    try:
+        from luna_core.utilities.fragment_metadata_queue import FragmentMetadataQueue
+    except ImportError:
+        pytest.skip("Luna core not available")
+    import json
+
+    fragment = tmp_path / "frag_1.json"
+    fragment.write_text(json.dumps({"content": "tides", "lesson_metadata": {
+        "lessons_contributed_to": ["lesson_000000"], "contribution_scores": {"lesson_000000": 0.1},
+        "last_lesson_update": 1.0}}), encoding="utf-8")
+    queue = FragmentMetadataQueue(tmp_path, flush_interval_s=60.0)
+
+    queue.enqueue("frag_1.json", "lesson_000001", 0.5, timestamp=2.0)
+    queue.enqueue("frag_1", "lesson_000002", 0.7, timestamp=3.0)
+    queue.enqueue("frag_1", "lesson_000001", 0.6, timestamp=4.0)
+    queue.enqueue("missing_frag", "lesson_000001", 0.5)
+    assert queue.pending_count == 2
+    assert json.loads(fragment.read_text(encoding="utf-8"))["lesson_metadata"]["last_lesson_update"] == 1.0
+
+    assert queue.flush() == 1
+    metadata = json.loads(fragment.read_text(encoding="utf-8"))["lesson_metadata"]
+    assert metadata == {"lessons_contributed_to": ["lesson_000000", "lesson_000001", "lesson_000002"],
+                        "contribution_scores": {"lesson_000000": 0.1, "lesson_000001": 0.6, "lesson_000002": 0.7},
+                        "last_lesson_update": 4.0}
+    assert queue.stats["missing"] == 1 and not list(tmp_path.glob("*.tmp"))
+
+    before = fragment.read_text(encoding="utf-8")
+    assert queue.flush() == 0
+    queue.enqueue("frag_1", "lesson_000002", 0.7, timestamp=4.0)
+    queue.close()
+    assert fragment.read_text(encoding="utf-8") == before
+
+
+def test_luna_learning_session_resumes_in_order(tmp_path):
+    """Session runner: model calls overlap, state updates stay in question order, interrupted runs resume."""
+    try:
+        from luna_core.utilities.learning_session import LearningSessionRunner, percentile
+    except ImportError:
+        pytest.skip("Luna core not available")
+    import threading
+    import time
+
+    questions = [{"question": f"q{i}", "trait": "openness"} for i in range(8)]
+    log = []
+    active = []
+    peak = []
+    interrupted = []
+    lock = threading.Lock()
+
+    def begin(index, question_data):
+        log.append(("begin", index))
+        return {"index": index}
+
+    def infer(draft):
+        with lock:
+            active.append(draft["index"])
+            peak.append(len(active))
+        time.sleep(0.02 * (3 - draft["index"] % 3))  # later questions often finish first
+        with lock:
+            active.remove(draft["index"])
+        return draft
+
+    def finish(index, question_data, draft):
+        if index == 5 and not interrupted:
+            interrupted.append(index)
+            raise KeyboardInterrupt
+        log.append(("finish", index))
+        return {"question_number": index + 1, "response": question_data["question"].upper()}
+
+    runner = LearningSessionRunner(begin, infer, finish, max_workers=3, checkpoint_dir=tmp_path)
+    with pytest.raises(KeyboardInterrupt):
+        runner.run(questions)
+    assert [entry[1] for entry in log if entry[0] == "finish"] == [0, 1, 2, 3, 4]
+    assert max(peak) == 3
+
+    log.clear()
+    run = runner.run(questions)
+    assert run["resumed"] == 5
+    assert [entry[1] for entry in log if entry[0] == "begin"] == [5, 6, 7]
+    assert [entry[1] for entry in log if entry[0] == "finish"] == [5, 6, 7]
+    assert [r["response"] for r in run["results"]] == [f"Q{i}" for i in range(8)]
+    assert run["stats"]["processed"] == 3 and run["stats"]["throughput_qps"] > 0
+    assert run["stats"]["latency"]["p50_ms"] <= run["stats"]["latency"]["p99_ms"]
+    assert not list(tmp_path.iterdir())  # checkpoint removed once complete
+    assert percentile([1, 2, 3, 4], 50) == 2 and percentile([1, 2, 3, 4], 99) == 4
+
+
+def test_luna_lesson_store_ids_unique_across_writers(tmp_path):
+    """Two stores on one directory (as two processes would be) never assign the same id or lose a line."""
+    try:
+        from luna_core.utilities.lesson_store import LessonStore
+    except ImportError:
+        pytest.skip("Luna core not available")
+    import threading
+
+    stores = [LessonStore(tmp_path), LessonStore(tmp_path)]
+    ids = [[], []]
+
+    def write(n):
+        store = stores[n]
+        for i in range(100):
+            lesson_id = store.add({"original_prompt": f"writer {n} prompt {i}", "suboptimal_response": "",
+                                   "gold_standard": "", "utility_score": 0.5, "karma_delta": 0.0,
+                                   "timestamp": float(i), "context_tags": []})
+            ids[n].append(lesson_id)
+            store.update(lesson_id, gold_standard=f"gold {n} {i}")
+            store.link_fragments(lesson_id, [f"frag_{n}_{i}"], 0.5)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(ids[0]) | set(ids[1])) == 200
+
+    fresh = LessonStore(tmp_path)
+    for store in [*stores, fresh]:
+        store.refresh()
+        assert len(store) == 200 and store.log_lines == 600
+        assert store._offset == (tmp_path / "lessons.jsonl").stat().st_size
+        for n in range(2):
+            for i, lesson_id in enumerate(ids[n]):
+                assert store._records[store._rows[lesson_id]]["gold_standard"] == f"gold {n} {i}"
+                assert store._fragment_links[f"frag_{n}_{i}"]["lessons_contributed_to"] == [lesson_id]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
-